@@ -0,0 +1,78 @@
+"""
+Compares the codecs available for serializing contents: for each codec the same synthetic contents are serialized
+and then loaded, and the size on disk together with the load throughput is reported.
+
+    python benchmarks/codec_benchmark.py --contents 500 --embedding-shape 30 300
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, EmbeddingField, \
+    FeaturesBagField, SimpleField
+from orange_cb_recsys.utils.serialization import available_codecs, content_file_path, serialize, deserialize
+
+
+def create_contents(n_contents: int, embedding_shape: tuple, n_features: int):
+    rng = np.random.default_rng(0)
+    contents = []
+    for i in range(n_contents):
+        content = Content('tt{}'.format(i))
+        content.append_field_representation('Title', SimpleField('title {}'.format(i)), 'original')
+        content.append_field_representation(
+            'Plot', FeaturesBagField({'word{}'.format(j): float(rng.random())
+                                      for j in rng.choice(10 * n_features, n_features, replace=False)}), 'tfidf')
+        content.append_field_representation('Plot', EmbeddingField(rng.random(embedding_shape)), 'embedding')
+        contents.append(content)
+    return contents
+
+
+def benchmark(contents, codec: str, directory: str):
+    paths = [content_file_path(directory, content.content_id, codec) for content in contents]
+
+    start = time.perf_counter()
+    for content, path in zip(contents, paths):
+        serialize(content, path, codec)
+    write_time = time.perf_counter() - start
+
+    size = sum(os.path.getsize(path) for path in paths)
+
+    start = time.perf_counter()
+    for path in paths:
+        deserialize(path)
+    load_time = time.perf_counter() - start
+
+    for path in paths:
+        os.remove(path)
+
+    return size, write_time, load_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--contents', type=int, default=200)
+    parser.add_argument('--embedding-shape', type=int, nargs='+', default=[30, 300])
+    parser.add_argument('--features', type=int, default=100)
+    parser.add_argument('--codecs', nargs='+', default=available_codecs())
+    args = parser.parse_args()
+
+    contents = create_contents(args.contents, tuple(args.embedding_shape), args.features)
+
+    directory = tempfile.mkdtemp()
+    try:
+        print('{:<8}{:>12}{:>12}{:>12}{:>16}'.format('codec', 'size (MB)', 'write (s)', 'load (s)',
+                                                      'load (items/s)'))
+        for codec in args.codecs:
+            size, write_time, load_time = benchmark(contents, codec, directory)
+            print('{:<8}{:>12.2f}{:>12.3f}{:>12.3f}{:>16.1f}'.format(codec, size / 2 ** 20, write_time, load_time,
+                                                                    len(contents) / load_time))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
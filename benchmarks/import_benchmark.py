@@ -0,0 +1,80 @@
+"""
+Measures the import time of the public entry points of the framework: each entry point is imported by a new
+interpreter run with 'python -X importtime', and its total import time is reported together with the heavy optional
+dependencies it imported. The exit status is 1 if an entry point imports a heavy dependency or takes more than
+--max-seconds, so the benchmark can be used to keep the startup from regressing.
+
+    python benchmarks/import_benchmark.py --max-seconds 2
+"""
+import argparse
+import re
+import subprocess
+import sys
+from typing import List, Tuple
+
+# public entry points, none of them should import the heavy optional dependencies
+ENTRY_POINTS = [
+    'orange_cb_recsys.content_analyzer',
+    'orange_cb_recsys.recsys',
+    'orange_cb_recsys.evaluation',
+    'orange_cb_recsys.utils',
+    'orange_cb_recsys.content_analyzer.content_analyzer_main',
+    'orange_cb_recsys.content_analyzer.config',
+]
+
+# optional dependencies imported only when the classes using them are accessed
+HEAVY_DEPENDENCIES = [
+    'sentence_transformers', 'torch', 'transformers', 'gensim', 'wikipedia2vec', 'pywsd', 'textblob', 'whoosh',
+    'nltk', 'sklearn', 'networkx', 'matplotlib'
+]
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)$')
+
+
+def import_time(statement: str) -> Tuple[float, List[str]]:
+    """
+    Runs the import statement in a new interpreter and returns the tuple (total import time in seconds, names of
+    all the modules imported)
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, universal_newlines=True, check=True)
+    total = 0
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match is not None:
+            modules.append(match.group(4))
+            # the cumulative time of the top level imports (indented by one space) includes their own imports
+            if len(match.group(3)) == 1:
+                total += int(match.group(2))
+    return total / 10 ** 6, modules
+
+
+def heavy_dependencies(modules: List[str]) -> List[str]:
+    """
+    Returns the heavy dependencies among the modules passed as argument
+    """
+    top_level_modules = {module.split('.')[0] for module in modules}
+    return [dependency for dependency in HEAVY_DEPENDENCIES if dependency in top_level_modules]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entry-points', nargs='+', default=ENTRY_POINTS)
+    parser.add_argument('--max-seconds', type=float, default=None)
+    args = parser.parse_args()
+
+    regressions = False
+    print('{:<60}{:>10}  {}'.format('entry point', 'time (s)', 'heavy dependencies'))
+    for entry_point in args.entry_points:
+        seconds, modules = import_time('import ' + entry_point)
+        heavy = heavy_dependencies(modules)
+        print('{:<60}{:>10.3f}  {}'.format(entry_point, seconds, ', '.join(heavy) or '-'))
+        if len(heavy) != 0 or (args.max_seconds is not None and seconds > args.max_seconds):
+            regressions = True
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
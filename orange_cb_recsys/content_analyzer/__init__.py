@@ -1,17 +1,55 @@
-from . import content_representation
-from .embeddings import embedding_learner
-from . import field_content_production_techniques
-from . import information_processor
-from . import memory_interfaces
-from . import ratings_manager
-
-from .content_representation import *
-from orange_cb_recsys.content_analyzer.embeddings.embedding_learner import *
-from .field_content_production_techniques import *
-from .information_processor import *
-from .memory_interfaces import *
-from .ratings_manager import *
-from .config import ExogenousConfig, UserAnalyzerConfig, ItemAnalyzerConfig, FieldConfig
-from .content_analyzer_main import ContentAnalyzer
-from .exogenous_properties_retrieval import DBPediaMappingTechnique, PropertiesFromDataset, BabelPyEntityLinking
-from .raw_information_source import CSVFile, JSONFile, DATFile, SQLDatabase
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+# the public classes (and the heavy dependencies of their modules) are imported only when they are first accessed
+_exports = {
+    'Content': '.content_representation',
+
+    'GensimDoc2Vec': '.embeddings.embedding_learner',
+    'GensimFastText': '.embeddings.embedding_learner',
+    'GensimLatentSemanticAnalysis': '.embeddings.embedding_learner',
+    'GensimRandomIndexing': '.embeddings.embedding_learner',
+    'GensimWord2Vec': '.embeddings.embedding_learner',
+    'embedding_learner': '.embeddings',
+
+    'Centroid': '.field_content_production_techniques',
+    'Sum': '.field_content_production_techniques',
+    'WordEmbeddingTechnique': '.field_content_production_techniques',
+    'SentenceEmbeddingTechnique': '.field_content_production_techniques',
+    'DocumentEmbeddingTechnique': '.field_content_production_techniques',
+    'FromWordsSentenceEmbeddingTechnique': '.field_content_production_techniques',
+    'FromSentencesDocumentEmbeddingTechnique': '.field_content_production_techniques',
+    'FromWordsDocumentEmbeddingTechnique': '.field_content_production_techniques',
+    'WhooshTfIdf': '.field_content_production_techniques',
+    'SkLearnTfIdf': '.field_content_production_techniques',
+    'OriginalData': '.field_content_production_techniques',
+    'DefaultTechnique': '.field_content_production_techniques',
+    'PyWSDSynsetDocumentFrequency': '.field_content_production_techniques',
+
+    'NLTK': '.information_processor',
+
+    'KeywordIndex': '.memory_interfaces',
+    'SearchIndex': '.memory_interfaces',
+
+    'NumberNormalizer': '.ratings_manager',
+    'RatingsImporter': '.ratings_manager',
+    'TextBlobSentimentAnalysis': '.ratings_manager',
+
+    'ExogenousConfig': '.config',
+    'UserAnalyzerConfig': '.config',
+    'ItemAnalyzerConfig': '.config',
+    'FieldConfig': '.config',
+    'ContentAnalyzer': '.content_analyzer_main',
+    'ShardedContentAnalyzer': '.sharded_content_analyzer',
+    'DBPediaMappingTechnique': '.exogenous_properties_retrieval',
+    'PropertiesFromDataset': '.exogenous_properties_retrieval',
+    'BabelPyEntityLinking': '.exogenous_properties_retrieval',
+    'CSVFile': '.raw_information_source',
+    'JSONFile': '.raw_information_source',
+    'JSONLinesFile': '.raw_information_source',
+    'DATFile': '.raw_information_source',
+    'SQLDatabase': '.raw_information_source',
+    'MaterializedSource': '.raw_information_source',
+}
+
+__all__ = [name for name in _exports if name != 'embedding_learner']
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -1,14 +1,20 @@
 import abc
+import copy
 import re
 from abc import ABC
 from typing import List, Dict, Union, Iterator
 
+from orange_cb_recsys.content_analyzer.content_representation.content import EMBEDDING_PRECISIONS
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.embedding_technique.combining_technique \
+    import CombiningTechnique
 from orange_cb_recsys.content_analyzer.field_content_production_techniques.field_content_production_technique import \
     FieldContentProductionTechnique, DefaultTechnique
 from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
 from orange_cb_recsys.content_analyzer.exogenous_properties_retrieval import ExogenousPropertiesRetrieval
 from orange_cb_recsys.content_analyzer.memory_interfaces.memory_interfaces import InformationInterface
 from orange_cb_recsys.content_analyzer.raw_information_source import RawInformationSource
+from orange_cb_recsys.utils.json_exporter import check_json_format
+from orange_cb_recsys.utils.serialization import check_codec
 
 
 class FieldConfig:
@@ -51,6 +57,12 @@ class FieldConfig:
 
         nothing will be done on the field. The ContentAnalyzer will just decode the data without applying anything else
 
+        FieldConfig(WordEmbeddingTechnique(Gensim('glove-twitter-25')), embedding_precision='int8',
+                    embedding_combiner=Centroid())
+
+        this will store, for each content, the centroid of the word embeddings of the field instead of the whole
+        matrix, quantized as int8 values with a float32 scale
+
     Args:
         content_technique (FieldContentProductionTechnique): technique that will be applied to the field in order to
             produce a complex representation of said field
@@ -63,6 +75,11 @@ class FieldConfig:
             generated by this config. (the content analyzer main will handle cases where a list of FieldConfigs for a
             field has non unique ids)
         lang (str): string code that represents the language the preprocessors will be set to
+        embedding_precision (str): precision of the embeddings (EmbeddingField) produced by the content_technique:
+            'float64' keeps them as they are produced, 'float32' halves their size and 'int8' stores them as int8
+            codes with a float32 scale for each row (dequantized when their value is requested)
+        embedding_combiner (CombiningTechnique): if defined, the embeddings matrices (produced by the word or
+            sentence granularity techniques) are combined with it, and only the combined vector is stored
     """
 
     def __init__(self,
@@ -70,7 +87,9 @@ class FieldConfig:
                  preprocessing: Union[InformationProcessor, List[InformationProcessor]] = None,
                  memory_interface: InformationInterface = None,
                  id: str = None,
-                 lang: str = "EN"):
+                 lang: str = "EN",
+                 embedding_precision: str = 'float64',
+                 embedding_combiner: CombiningTechnique = None):
 
         if preprocessing is None:
             preprocessing = []
@@ -78,11 +97,17 @@ class FieldConfig:
         if id is not None:
             self._check_custom_id(id)
 
+        if embedding_precision not in EMBEDDING_PRECISIONS:
+            raise ValueError("Precision {} is not available! Available precisions are: {}".format(
+                embedding_precision, list(EMBEDDING_PRECISIONS)))
+
         self.__content_technique = content_technique
         self.__preprocessing = preprocessing
         self.__memory_interface = memory_interface
         self.__id = id
         self.__lang = lang
+        self.__embedding_precision = embedding_precision
+        self.__embedding_combiner = embedding_combiner
         self.__content_technique.lang = self.__lang
 
         if not isinstance(self.__preprocessing, list):
@@ -126,6 +151,21 @@ class FieldConfig:
         """
         return self.__lang
 
+    @property
+    def embedding_precision(self) -> str:
+        """
+        Getter for the precision in which the embeddings produced by the config are stored
+        """
+        return self.__embedding_precision
+
+    @property
+    def embedding_combiner(self) -> CombiningTechnique:
+        """
+        Getter for the technique combining the embeddings matrices produced by the config, None if the whole matrices
+        are stored
+        """
+        return self.__embedding_combiner
+
     def _check_custom_id(self, id: str):
         if not re.match("^[A-Za-z0-9_-]+$", id):
             raise ValueError("The custom id {} is not valid!\n"
@@ -138,7 +178,9 @@ class FieldConfig:
         return "< " + "FieldConfig: " + "" \
                "\nId:" + str(self.__id) + \
                "\nProduction Technique:" + str(self.__content_technique) +\
-               "\nInformation Processors: " + str(self.__preprocessing) + " >"
+               "\nInformation Processors: " + str(self.__preprocessing) + \
+               "\nEmbedding precision: " + self.__embedding_precision + \
+               "\nEmbedding combiner: " + str(self.__embedding_combiner) + " >"
 
 
 class ExogenousConfig:
@@ -220,6 +262,40 @@ class ContentAnalyzerConfig(ABC):
             configurations on
         exogenous_representation_list: list of techniques that are used to retrieve exogenous properties that represent
             the contents
+        export_json (bool): if True, the produced contents will also be exported in a 'contents.json' file (or
+            'contents.jsonl' if json_format is 'jsonl'). The contents are exported one at a time while they are
+            serialized
+        columnar_store (bool): if True, the produced contents will be serialized in a columnar store (one column for
+            each field representation) instead of one compressed pickle file for each content
+        codec (str): codec used to compress the file of each content ('none', 'gzip', 'bz2', 'lzma' and, if the
+            corresponding packages are installed, 'zstd' and 'lz4'). With any codec other than 'lzma' the numpy
+            arrays in the contents are serialized out-of-band, so that they are not copied when loaded
+        chunk_size (int): if defined, the contents are produced, indexed and serialized chunk_size at a time, so that
+            the memory used depends on the size of the chunks instead of the size of the whole source. If None, every
+            content is produced before being serialized
+        incremental (bool): if True and the output directory contains the contents produced by a previous incremental
+            analysis, only the raw contents that are new or that have been modified (or whose configs have been
+            modified) are processed, and the contents no longer in the source are deleted. Each raw content is
+            identified by a fingerprint of its data and of the configs applied to it (the configs are compared using
+            their repr, so a full analysis is needed if a parameter not shown in the repr is changed).
+            The memory interfaces are updated instead of being recreated. Not available with the columnar store
+        drift_threshold (float): used only in incremental mode if some field is processed by a technique that needs
+            the whole collection (CollectionBasedTechnique). The changed contents are produced with the statistics of
+            the current collection, while the unchanged ones keep the representations produced with the statistics of
+            the previous collections: once the fraction of the catalog changed since the last full analysis exceeds
+            this threshold, the whole catalog is processed again
+        json_format (str): format of the exported contents, 'json' for a json array or 'jsonl' for JSON Lines
+        pretty_json (bool): if True, the contents in the json array are indented, otherwise each of them is written in
+            a single line. The contents exported in JSON Lines are never indented
+        n_workers (int): number of processes used to produce the representations of the fields. If greater than 1,
+            the representations of the different fields and field configs are produced concurrently by a pool of
+            processes (so the techniques and their results must be picklable), while the memory interfaces are still
+            written by the main process only
+        preprocessing_cache_budget (int): when more field configs of a field have the same preprocessing list, the
+            data of the field is preprocessed only once and cached for the following field configs (see
+            PreprocessingCache). This is the maximum size in bytes of the cache kept in memory, the rest is moved on
+            disk. If None, the preprocessed data is not cached. The cache is used only by the field configs whose
+            representations are produced by the main process (so not when n_workers is greater than 1)
     """
 
     def __init__(self, source: RawInformationSource,
@@ -228,7 +304,16 @@ class ContentAnalyzerConfig(ABC):
                  field_dict: Dict[str, List[FieldConfig]] = None,
                  exogenous_representation_list:
                  Union[ExogenousConfig, List[ExogenousConfig]] = None,
-                 export_json: bool = False):
+                 export_json: bool = False,
+                 columnar_store: bool = False,
+                 codec: str = 'lzma',
+                 chunk_size: int = None,
+                 incremental: bool = False,
+                 drift_threshold: float = 0.2,
+                 n_workers: int = 1,
+                 json_format: str = 'json',
+                 pretty_json: bool = True,
+                 preprocessing_cache_budget: Union[int, None] = 256 * 1024 ** 2):
         if field_dict is None:
             field_dict = {}
         if exogenous_representation_list is None:
@@ -240,6 +325,27 @@ class ContentAnalyzerConfig(ABC):
         self.__field_dict: Dict[str, List[FieldConfig]] = field_dict
         self.__exogenous_representation_list: List[ExogenousPropertiesRetrieval] = exogenous_representation_list
         self.__export_json: bool = export_json
+        self.__columnar_store: bool = columnar_store
+        check_codec(codec)
+        self.__codec: str = codec
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("The chunk size must be a positive number!")
+        self.__chunk_size: int = chunk_size
+        if incremental and columnar_store:
+            raise ValueError("The incremental analysis is not available with the columnar store!")
+        self.__incremental: bool = incremental
+        if not 0 <= drift_threshold <= 1:
+            raise ValueError("The drift threshold must be between 0 and 1!")
+        self.__drift_threshold: float = drift_threshold
+        if n_workers < 1:
+            raise ValueError("The number of workers must be a positive number!")
+        self.__n_workers: int = n_workers
+        check_json_format(json_format)
+        self.__json_format: str = json_format
+        self.__pretty_json: bool = pretty_json
+        if preprocessing_cache_budget is not None and preprocessing_cache_budget < 0:
+            raise ValueError("The budget of the preprocessing cache can't be negative!")
+        self.__preprocessing_cache_budget: Union[int, None] = preprocessing_cache_budget
 
         if not isinstance(self.__exogenous_representation_list, list):
             self.__exogenous_representation_list = [self.__exogenous_representation_list]
@@ -279,6 +385,69 @@ class ContentAnalyzerConfig(ABC):
     def export_json(self) -> bool:
         return self.__export_json
 
+    @property
+    def json_format(self) -> str:
+        """
+        Getter for the format of the exported contents ('json' or 'jsonl')
+        """
+        return self.__json_format
+
+    @property
+    def pretty_json(self) -> bool:
+        """
+        Getter for the flag that defines if the contents exported in a json array are indented
+        """
+        return self.__pretty_json
+
+    @property
+    def columnar_store(self) -> bool:
+        """
+        Getter for the flag that defines if the contents will be serialized in a columnar store
+        """
+        return self.__columnar_store
+
+    @property
+    def codec(self) -> str:
+        """
+        Getter for the codec used to compress the serialized contents
+        """
+        return self.__codec
+
+    @property
+    def chunk_size(self) -> int:
+        """
+        Getter for the number of contents produced and serialized at a time
+        """
+        return self.__chunk_size
+
+    @property
+    def incremental(self) -> bool:
+        """
+        Getter for the flag that defines if only the new or modified raw contents will be processed
+        """
+        return self.__incremental
+
+    @property
+    def drift_threshold(self) -> float:
+        """
+        Getter for the fraction of changed contents after which the whole catalog is processed again
+        """
+        return self.__drift_threshold
+
+    @property
+    def preprocessing_cache_budget(self) -> Union[int, None]:
+        """
+        Maximum size in bytes of the preprocessed data cached in memory, None if the preprocessed data is not cached
+        """
+        return self.__preprocessing_cache_budget
+
+    @property
+    def n_workers(self) -> int:
+        """
+        Getter for the number of processes used to produce the representations of the fields
+        """
+        return self.__n_workers
+
     def get_configs_list(self, field_name: str) -> Iterator[FieldConfig]:
         """
         Getter the list of the field configs specified for the input field
@@ -355,6 +524,24 @@ class ContentAnalyzerConfig(ABC):
         """
         self.__exogenous_representation_list.extend(config_list)
 
+    def shard(self, shard_index: int, shard_count: int, output_directory: str) -> 'ContentAnalyzerConfig':
+        """
+        Returns a copy of the config that produces only the contents in the shard_index-th of shard_count shards of
+        the source (see RawInformationSource.shard), serializing them in the output_directory passed as argument.
+        The copy shares the field configs (and so the techniques) with this config and never exports the contents in
+        a json file, since the file of the whole collection is written once every shard has been produced
+
+        Args:
+            shard_index (int): position of the shard, from 0 to shard_count - 1
+            shard_count (int): number of shards in which the source is split
+            output_directory (str): directory where the contents of the shard will be serialized
+        """
+        shard_config = copy.copy(self)
+        shard_config.__source = self.__source.shard(shard_index, shard_count)
+        shard_config.__output_directory = output_directory
+        shard_config.__export_json = False
+        return shard_config
+
     @abc.abstractmethod
     def __str__(self):
         raise NotImplementedError
@@ -1,18 +1,32 @@
+import hashlib
 import json
-import pickle
 import re
-import lzma
 import os
 import shutil
-from typing import List, Dict
-
-from orange_cb_recsys.content_analyzer.config import ContentAnalyzerConfig
-from orange_cb_recsys.content_analyzer.content_representation.content import Content, IndexField, ContentEncoder
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import List, Dict, Iterator, Tuple, Union
+
+from orange_cb_recsys.content_analyzer.config import ContentAnalyzerConfig, FieldConfig
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, IndexField, \
+    FieldRepresentation, EmbeddingField, QuantizedEmbeddingField, create_embedding_field
+from orange_cb_recsys.content_analyzer.content_representation.columnar_store import ColumnarStoreWriter
 from orange_cb_recsys.content_analyzer.content_representation.representation_container import RepresentationContainer
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.field_content_production_technique import \
+    CollectionBasedTechnique, FieldContentProductionTechnique
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
+from orange_cb_recsys.content_analyzer.information_processor.preprocessing_cache import PreprocessingCache, \
+    preprocessor_chain_signature
 from orange_cb_recsys.content_analyzer.memory_interfaces.memory_interfaces import InformationInterface
+from orange_cb_recsys.content_analyzer.raw_information_source import RawInformationSource, MaterializedSource
 from orange_cb_recsys.utils.const import logger
 from orange_cb_recsys.utils.id_merger import id_merger
 from orange_cb_recsys.utils.const import progbar
+from orange_cb_recsys.utils.content_cache import ContentCache
+from orange_cb_recsys.utils.json_exporter import ContentsJSONExporter
+from orange_cb_recsys.utils.manifest import CatalogManifest, load_manifest
+from orange_cb_recsys.utils.serialization import serialize, deserialize, content_file_path
 
 
 class ContentAnalyzer:
@@ -48,35 +62,181 @@ class ContentAnalyzer:
         except ValueError as e:
             raise e
 
-        # creates the directory where the data will be serialized and overwrites it if it already exists
         output_path = self.__config.output_directory
-        if os.path.exists(output_path):
-            shutil.rmtree(output_path)
-        os.mkdir(output_path)
+
+        # in incremental mode, only the raw contents whose fingerprint differs from the one of the content previously
+        # produced are processed (positions is None if every raw content has to be processed)
+        fingerprints = None
+        previous_manifest = None
+        positions = None
+        deleted_ids = None
+        drift = 0.0
+        if self.__config.incremental:
+            fingerprints = self.__compute_fingerprints()
+            previous_manifest = self.__load_incremental_manifest()
+
+        if previous_manifest is not None:
+            positions = [position for position, content_id in enumerate(fingerprints)
+                         if previous_manifest.get_fingerprint(content_id) != fingerprints[content_id]]
+            deleted_ids = [content_id for content_id in previous_manifest.content_ids
+                           if content_id not in fingerprints]
+            drift = previous_manifest.drift + \
+                (len(positions) + len(deleted_ids)) / max(len(previous_manifest), 1)
+            # the unchanged contents produced by collection based techniques are produced again only when the
+            # collection has changed too much since the last time every content was produced
+            if drift > self.__config.drift_threshold and self.__has_collection_based_technique():
+                logger.info("The catalog drifted past the threshold, every content will be processed")
+                positions = None
+                deleted_ids = None
+                drift = 0.0
+            else:
+                logger.info("Processing %d new or modified contents and deleting %d contents",
+                            len(positions), len(deleted_ids))
+
+        if positions is None:
+            # creates the directory where the data will be serialized and overwrites it if it already exists
+            if os.path.exists(output_path):
+                shutil.rmtree(output_path)
+            os.mkdir(output_path)
+        else:
+            for content_id in deleted_ids:
+                os.remove(os.path.join(output_path, previous_manifest.get_file_name(content_id)))
+        # contents previously loaded from the output directory are not valid anymore
+        ContentCache.get_instance().invalidate(output_path)
 
         contents_producer = ContentsProducer.get_instance()
         contents_producer.set_config(self.__config)
-        created_contents = contents_producer.create_contents()
 
-        if self.__config.export_json:
-            json_path = os.path.join(self.__config.output_directory, 'contents.json')
-            with open(json_path, "w") as data:
-                json.dump(created_contents, data, cls=ContentEncoder, indent=4)
+        # when the contents are updated incrementally the json file is written at the end, since it has to contain
+        # the unchanged contents as well
+        json_exporter = None
+        if self.__config.export_json and positions is None:
+            json_exporter = self.__create_json_exporter()
+
+        store_writer = None
+        manifest = None
+        if self.__config.columnar_store:
+            store_writer = ColumnarStoreWriter(self.__config.output_directory)
+        else:
+            manifest = CatalogManifest(drift=drift)
+
+        # the contents are serialized (and exported) as soon as each chunk is created, so that only the contents of a
+        # single chunk are kept in memory
+        try:
+            for contents_chunk in contents_producer.create_contents_chunks(
+                    self.__config.chunk_size, positions, deleted_ids):
+                for content in progbar(contents_chunk, prefix="Serializing contents: "):
+                    if json_exporter is not None:
+                        json_exporter.export(content)
+
+                    if store_writer is not None:
+                        store_writer.add_content(content)
+                    else:
+                        path = self.__serialize_content(content)
+                        fingerprint = fingerprints[content.content_id] if fingerprints is not None else None
+                        manifest.add(content.content_id, os.path.basename(path), os.path.getsize(path),
+                                     list(content.field_dict.keys()), fingerprint)
+        finally:
+            if json_exporter is not None:
+                json_exporter.close()
+
+        if store_writer is not None:
+            store_writer.close()
+        else:
+            if positions is not None:
+                manifest = self.__merge_manifests(fingerprints, previous_manifest, manifest)
+                if self.__config.export_json:
+                    self.__export_serialized_json(manifest)
+            manifest.save(self.__config.output_directory)
+
+    def __compute_fingerprints(self) -> Dict[str, str]:
+        """
+        Computes the fingerprint of each raw content of the source, which is the hash of the data of the raw content
+        and of the configs applied to it (compared by their repr, since the configs can't be serialized)
+
+        Returns:
+            fingerprints (Dict[str, str]): the key is the id of a content and the value its fingerprint, the keys are
+                in the same order of the raw contents in the source
+        """
+        configs_signature = [repr(self.__config.id), self.__config.codec]
+        for field_name in self.__config.get_field_name_list():
+            for field_config in self.__config.get_configs_list(field_name):
+                configs_signature.extend([field_name, repr(field_config), repr(field_config.content_technique),
+                                          repr(field_config.preprocessing), repr(field_config.memory_interface)])
+        for exogenous_config in self.__config.exogenous_representation_list:
+            configs_signature.extend([repr(exogenous_config), repr(exogenous_config.exogenous_technique)])
+        # the default repr of the objects contains their memory address, which changes at each execution
+        configs_signature = re.sub(r' at 0x[0-9a-fA-F]+', '', json.dumps(configs_signature))
+
+        fingerprints = {}
+        for raw_content in self.__config.source:
+            fingerprint = hashlib.sha1(configs_signature.encode())
+            fingerprint.update(json.dumps(raw_content, sort_keys=True, default=str).encode())
+            fingerprints[id_merger(raw_content, self.__config.id)] = fingerprint.hexdigest()
+
+        return fingerprints
+
+    def __load_incremental_manifest(self) -> Union[CatalogManifest, None]:
+        """
+        Returns the manifest of the contents in the output directory if they were produced by an incremental analysis
+        (so each of them has a fingerprint), None otherwise
+        """
+        if not os.path.isdir(self.__config.output_directory):
+            return None
+
+        manifest = load_manifest(self.__config.output_directory)
+        if manifest is None or any(manifest.get_fingerprint(content_id) is None
+                                   for content_id in manifest.content_ids):
+            return None
+        return manifest
+
+    def __has_collection_based_technique(self) -> bool:
+        return any(isinstance(field_config.content_technique, CollectionBasedTechnique)
+                   for field_name in self.__config.get_field_name_list()
+                   for field_config in self.__config.get_configs_list(field_name))
 
-        for content in progbar(created_contents, prefix="Serializing contents: "):
-            self.__serialize_content(content)
+    @staticmethod
+    def __merge_manifests(fingerprints: Dict[str, str], previous_manifest: CatalogManifest,
+                          updated_manifest: CatalogManifest) -> CatalogManifest:
+        """
+        Creates the manifest of the contents after an incremental analysis, taking the entries of the contents
+        produced by the analysis from the updated_manifest and the ones of the unchanged contents from the
+        previous_manifest. The contents are kept in the same order of the source
+        """
+        manifest = CatalogManifest(drift=updated_manifest.drift)
+        for content_id in fingerprints:
+            source_manifest = updated_manifest if content_id in updated_manifest else previous_manifest
+            manifest.add(content_id, source_manifest.get_file_name(content_id), source_manifest.get_size(content_id),
+                         source_manifest.get_fields(content_id), source_manifest.get_fingerprint(content_id))
+        return manifest
+
+    def __create_json_exporter(self) -> ContentsJSONExporter:
+        return ContentsJSONExporter(self.__config.output_directory, self.__config.json_format,
+                                    self.__config.pretty_json)
+
+    def __export_serialized_json(self, manifest: CatalogManifest):
+        """
+        Exports every content in the manifest, loading them from the output directory one at a time
+        """
+        with self.__create_json_exporter() as json_exporter:
+            for content_id in manifest.content_ids:
+                json_exporter.export(
+                    deserialize(os.path.join(self.__config.output_directory, manifest.get_file_name(content_id))))
 
-    def __serialize_content(self, content: Content):
+    def __serialize_content(self, content: Content) -> str:
         """
         This method serializes a specific content in the output directory defined by the content analyzer config
         Args:
             content (Content): content instance that will be serialized
+
+        Returns:
+            path (str): path of the file where the content has been serialized
         """
 
         file_name = re.sub(r'[^\w\s]', '', content.content_id)
-        path = os.path.join(self.__config.output_directory, file_name + '.xz')
-        with lzma.open(path, 'wb') as f:
-            pickle.dump(content, f)
+        path = content_file_path(self.__config.output_directory, file_name, self.__config.codec)
+        serialize(content, path, self.__config.codec)
+        return path
 
     def __check_field_dict(self):
         """
@@ -112,6 +272,34 @@ class ContentAnalyzer:
         return msg
 
 
+def _produce_content(technique: FieldContentProductionTechnique, field_name: str,
+                     preprocessor_list: List[InformationProcessor],
+                     source: RawInformationSource) -> List[FieldRepresentation]:
+    """
+    Produces the representations of a field with the technique passed as argument. Used by the ContentsProducer to
+    run the techniques in a pool of processes
+    """
+    return technique.produce_content(field_name, preprocessor_list, source)
+
+
+class _SourceChunk(RawInformationSource):
+    """
+    Source containing a chunk of the raw contents of another source, kept in memory
+
+    Args:
+        raw_contents (List[dict]): raw contents in the chunk
+    """
+
+    def __init__(self, raw_contents: List[dict]):
+        self.__raw_contents = raw_contents
+
+    def __iter__(self):
+        yield from self.__raw_contents
+
+    def __len__(self):
+        return len(self.__raw_contents)
+
+
 class ContentsProducer:
     """
     Singleton class which encapsulates the creation process of the items,
@@ -139,6 +327,10 @@ class ContentsProducer:
         # if a memory interface has an already defined directory, the memory interface associated to said directory
         # will be considered instead
         self.__memory_interfaces: Dict[InformationInterface] = {}
+        # cache of the preprocessed data shared by the field configs of the same field with the same preprocessing,
+        # the key is the field name and the value is the set of signatures of said preprocessing lists
+        self.__preprocessing_cache: Union[PreprocessingCache, None] = None
+        self.__shared_preprocessing: Dict[str, set] = {}
         # Virtually private constructor.
         if ContentsProducer.__instance is not None:
             raise Exception("This class is a singleton!")
@@ -153,12 +345,231 @@ class ContentsProducer:
         Returns:
             contents_list (List[Content]): list of contents created by the method
         """
+        contents_list = []
+        for contents_chunk in self.create_contents_chunks():
+            contents_list.extend(contents_chunk)
+
+        return contents_list
+
+    def create_contents_chunks(self, chunk_size: int = None, positions: List[int] = None,
+                               deleted_ids: List[str] = None) -> Iterator[List[Content]]:
+        """
+        Creates the contents based on the information defined in the Content Analyzer's config, chunk by chunk.
+        The raw contents are read from the source chunk_size at a time and each chunk of contents is yielded as
+        soon as it is created (and indexed in the memory interfaces), so that only one chunk has to be kept in memory.
+        If chunk_size is None, the whole source is processed as a single chunk
+
+        The techniques that need the entire collection (CollectionBasedTechnique) compute their global statistics
+        on the whole source before the first chunk is processed, then produce the representations of each chunk
+        from said statistics
+
+        If positions is defined, only the raw contents in said positions of the source are processed (this is used
+        by the incremental analysis): the memory interfaces are not recreated, the documents of the processed contents
+        replace the ones with the same content_id and the documents of the contents in deleted_ids are deleted
+
+        Args:
+            chunk_size (int): maximum number of contents in each chunk
+            positions (List[int]): positions in the source of the raw contents to process, if None every raw content
+                is processed
+            deleted_ids (List[str]): ids of the contents whose documents will be deleted from the memory interfaces
+        Returns:
+            contents_chunks (Iterator[List[Content]]): iterator over the lists of contents created
+        """
         if self.__config is None:
             raise Exception("You must set a config with set_config()")
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("The chunk size must be a positive number!")
 
-        # will store the contents and is the variable that will be returned by the method
-        contents_list = []
+        # for each field the list of tuples (field_config, memory_interface, index_field_name), where the
+        # memory_interface and the index_field_name are None if the representation is not stored in a memory interface
+        field_configs = {}
+        for field_name in self.__config.get_field_name_list():
+            field_configs[field_name] = []
+            for repr_number, field_config in enumerate(self.__config.get_configs_list(field_name)):
+                memory_interface = None
+                index_field_name = None
+                if field_config.memory_interface is not None:
+                    memory_interface = field_config.memory_interface
+                    # if the index for the directory in the config hasn't been defined yet in the contents producer,
+                    # the index associated to the field config that is being processed is added to the
+                    # contents producer's memory interfaces list, and will be used for the future field configs with
+                    # an assigned memory interface that has the same directory.
+                    # This means that only the index defined in the first FieldConfig that has one will actually be used
+                    if memory_interface not in self.__memory_interfaces.values():
+                        self.__memory_interfaces[memory_interface.directory] = memory_interface
+                    else:
+                        memory_interface = self.__memory_interfaces[memory_interface.directory]
+
+                    # the 0 after the Plot field name is used to define the representation number associated with
+                    # the Plot field since it's possible to store multiple Plot fields in the index
+                    if field_config.id is not None:
+                        index_field_name = "{}#{}#{}".format(field_name, str(repr_number), field_config.id)
+                    else:
+                        index_field_name = "{}#{}".format(field_name, str(repr_number))
+
+                field_configs[field_name].append((field_config, memory_interface, index_field_name))
+
+        self.__init_preprocessing_cache()
+
+        # when the source is split in chunks (or only some of its raw contents are processed), the collection based
+        # techniques are fitted on the whole source first
+        refactored = chunk_size is not None or positions is not None
+        if refactored:
+            for field_name in field_configs:
+                for field_config, _, _ in field_configs[field_name]:
+                    if isinstance(field_config.content_technique, CollectionBasedTechnique):
+                        logger.info("Computing collection statistics for field: %s", field_name)
+                        with self.__preprocessing_scope(field_name, field_config):
+                            field_config.content_technique.dataset_refactor(
+                                self.__config.source.project([field_name]), field_name,
+                                field_config.preprocessing)
+
+        # the representations of the fields are produced by a pool of processes, while the memory interfaces are
+        # written only by this process
+        executor = None
+        if self.__config.n_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.__config.n_workers)
+
+        update = positions is not None
+        for memory_interface in self.__memory_interfaces.values():
+            memory_interface.init_writing(not update)
+            if deleted_ids is not None:
+                for content_id in deleted_ids:
+                    memory_interface.delete_content(content_id)
+        writing = True
+
+        try:
+            for chunk_source, chunk_positions in self.__split_source(chunk_size, positions):
+                contents_chunk, index_representations_dict = \
+                    self.__create_chunk(chunk_source, chunk_positions, field_configs, refactored, executor)
+
+                if not writing:
+                    for memory_interface in self.__memory_interfaces.values():
+                        memory_interface.init_writing(False)
+                    writing = True
+
+                # the data to be indexed is serialized inside of the memory interfaces as soon as the chunk is created
+                # for each created content, a new entry in each index will be created
+                # the entry will be in the following form: {"content_id": id, "Plot#0": "...", "Plot#1": "...", ...}
+                for memory_interface in self.__memory_interfaces.values():
+                    for i in range(0, len(contents_chunk)):
+                        memory_interface.new_content()
+                        memory_interface.new_field("content_id", contents_chunk[i].content_id)
+                        index_representations = index_representations_dict[memory_interface]
+                        for index_field_name in index_representations.keys():
+                            memory_interface.new_field(
+                                index_field_name, str(index_representations[index_field_name][i].value))
+                        if update:
+                            memory_interface.update_content()
+                        else:
+                            memory_interface.serialize_content()
+
+                # the indexes are committed after each chunk, so that the IndexField representations of the chunk can
+                # be read before the following chunks are created
+                for memory_interface in self.__memory_interfaces.values():
+                    memory_interface.stop_writing()
+                writing = False
+
+                yield contents_chunk
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+            if writing:
+                for memory_interface in self.__memory_interfaces.values():
+                    memory_interface.stop_writing()
+            self.__memory_interfaces.clear()
+
+            if refactored:
+                for field_name in field_configs:
+                    for field_config, _, _ in field_configs[field_name]:
+                        if isinstance(field_config.content_technique, CollectionBasedTechnique):
+                            field_config.content_technique.delete_refactored()
+
+            if self.__preprocessing_cache is not None:
+                self.__preprocessing_cache.close()
+                self.__preprocessing_cache = None
+
+    def __init_preprocessing_cache(self):
+        """
+        Creates the cache of the preprocessed data if more field configs of a field have the same preprocessing list
+        (and the cache is enabled in the config)
+        """
+        self.__preprocessing_cache = None
+        self.__shared_preprocessing = {}
+        if self.__config.preprocessing_cache_budget is None:
+            return
+
+        for field_name in self.__config.get_field_name_list():
+            signatures = Counter(preprocessor_chain_signature(field_config.preprocessing)
+                                 for field_config in self.__config.get_configs_list(field_name)
+                                 if len(field_config.preprocessing) != 0)
+            shared_signatures = {signature for signature, count in signatures.items() if count > 1}
+            if len(shared_signatures) != 0:
+                self.__shared_preprocessing[field_name] = shared_signatures
+
+        if len(self.__shared_preprocessing) != 0:
+            self.__preprocessing_cache = PreprocessingCache(self.__config.preprocessing_cache_budget)
+
+    def __preprocessing_scope(self, field_name: str, field_config: FieldConfig, positions: List[int] = None):
+        """
+        Returns the scope of the preprocessing cache in which the field config must produce its representations of
+        the contents in the positions passed as argument (every content of the source if None), or a context that
+        does nothing if the preprocessing of the field config is not shared with other field configs
+        """
+        if field_name in self.__shared_preprocessing and \
+                preprocessor_chain_signature(field_config.preprocessing) in self.__shared_preprocessing[field_name]:
+            return self.__preprocessing_cache.scope(field_name, positions)
+        return nullcontext()
+
+    def __split_source(self, chunk_size: int = None,
+                       positions: List[int] = None) -> Iterator[Tuple[RawInformationSource, List[int]]]:
+        """
+        Splits the raw contents of the source of the config in chunks of chunk_size raw contents, keeping only the
+        raw contents in the positions passed as argument (if defined). For each chunk, the positions of its raw
+        contents in the source are yielded along with it. If both chunk_size and positions are None the source itself
+        is the only chunk (and its positions are None)
+        """
+        if chunk_size is None and positions is None:
+            yield self.__config.source, None
+        else:
+            selected_positions = set(positions) if positions is not None else None
+            chunk = []
+            chunk_positions = []
+            for position, raw_content in enumerate(self.__config.source):
+                if selected_positions is not None and position not in selected_positions:
+                    continue
+                chunk.append(raw_content)
+                chunk_positions.append(position)
+                if len(chunk) == chunk_size:
+                    yield _SourceChunk(chunk), chunk_positions
+                    chunk = []
+                    chunk_positions = []
+            if len(chunk) != 0:
+                yield _SourceChunk(chunk), chunk_positions
+
+    def __create_chunk(self, chunk_source: RawInformationSource, positions: Union[List[int], None],
+                       field_configs: Dict[str, list], refactored: bool,
+                       executor: Executor = None) -> Tuple[List[Content], dict]:
+        """
+        Creates the contents for the raw contents in the chunk_source
+
+        Args:
+            chunk_source (RawInformationSource): source containing the raw contents of the chunk
+            positions (List[int]): positions in the whole source of the raw contents in the chunk, None if the chunk
+                is the whole source
+            field_configs (Dict[str, list]): for each field, the list of tuples
+                (field_config, memory_interface, index_field_name)
+            refactored (bool): if True the chunk is only a part of the source, so the collection based techniques
+                produce the representations using the statistics computed on the whole source
+            executor (Executor): if defined, the representations of each field config are produced concurrently by
+                the executor
 
+        Returns:
+            contents_list (List[Content]): contents created for the chunk
+            index_representations_dict (dict): representations of the chunk that will be kept in the indexes, in the
+                form { memory_interface: {'Plot#0': [FieldRepr for content1, FieldRepr for content2, ...]}}
+        """
         # two lists are instantiated, one for the configuration names (given by the user) and one for the exogenous
         # properties representations. These lists will maintain the data for the content creation. This is done
         # because otherwise it would be necessary to append directly to the content. But in the Content class
@@ -167,59 +578,72 @@ class ContentsProducer:
         exo_properties = []
 
         for ex_config in self.__config.exogenous_representation_list:
-            lod_properties = ex_config.exogenous_technique.get_properties(self.__config.source)
+            lod_properties = ex_config.exogenous_technique.get_properties(chunk_source)
             exo_config_names.append(ex_config.id)
             exo_properties.append(lod_properties)
 
-        # this dictionary will store any representation list that will be kept in one of the the index
-        # the elements will be in the form:
-        #   { memory_interface: {'Plot_0': [FieldRepr for content1, FieldRepr for content2, ...]}}
-        # the 0 after the Plot field name is used to define the representation number associated with the Plot field
-        # since it's possible to store multiple Plot fields in the index
-        index_representations_dict = {}
+        # construct each id from the list of the fields that compound id
+        content_ids = [id_merger(raw_content, self.__config.id)
+                       for raw_content in chunk_source.project(self.__config.id)]
+        if positions is None:
+            positions = list(range(0, len(content_ids)))
+        # the documents of an index updated incrementally change position, so they are referred to by their id
+        index_ids = content_ids if self.__config.incremental else positions
+
+        # the productions of the representations of the field configs are independent from each other, so they are
+        # all submitted to the executor before collecting the results in order. The collection based techniques that
+        # already computed the statistics of the whole source just retrieve the representations, so they are not
+        # submitted
+        productions = {}
+        if executor is not None:
+            # the views of a MaterializedSource are sent to the processes with the columns they need only
+            raw_contents_source = None
+            if not isinstance(chunk_source, MaterializedSource):
+                raw_contents_source = _SourceChunk(list(chunk_source))
+            for field_name in field_configs:
+                field_source = raw_contents_source
+                if field_source is None:
+                    field_source = chunk_source.project([field_name])
+                for repr_number, (field_config, _, _) in enumerate(field_configs[field_name]):
+                    technique = field_config.content_technique
+                    if not (refactored and isinstance(technique, CollectionBasedTechnique)):
+                        productions[(field_name, repr_number)] = executor.submit(
+                            _produce_content, technique, field_name, field_config.preprocessing, field_source)
+
+        index_representations_dict = {memory_interface: {} for memory_interface in self.__memory_interfaces.values()}
         field_representations_dict = {}
-        for field_name in self.__config.get_field_name_list():
+        for field_name in field_configs:
             logger.info("Processing field: %s", field_name)
             # stores the field representation for the field name
             results = []
             # stores the field config ids for the field name
             field_config_ids = []
-            for repr_number, field_config in enumerate(self.__config.get_configs_list(field_name)):
+            for repr_number, (field_config, memory_interface, index_field_name) in \
+                    enumerate(field_configs[field_name]):
                 field_config_ids.append(field_config.id)
 
                 # technique_result is a list of field representation produced by the content technique
                 # each field repr in the list will refer to a content
-                # technique_result[0] -> contents_list[0]
-                technique_result = field_config.content_technique.produce_content(
-                    field_name, field_config.preprocessing, self.__config.source)
-
-                if field_config.memory_interface is not None:
-                    memory_interface = field_config.memory_interface
-                    # if the index for the directory in the config hasn't been defined yet in the contents producer,
-                    # the index associated to the field config that is being processed is added to the
-                    # contents producer's memory interfaces list, and will be used for the future field configs with
-                    # an assigned memory interface that has the same directory.
-                    # This means that only the index defined in the first FieldConfig that has one will actually be used
-                    if memory_interface not in self.__memory_interfaces.values():
-                        self.__memory_interfaces[memory_interface.directory] = memory_interface
-                        index_representations_dict[memory_interface] = {}
-                    else:
-                        memory_interface = self.__memory_interfaces[memory_interface.directory]
+                # technique_result[0] -> raw_contents[0]
+                technique = field_config.content_technique
+                if refactored and isinstance(technique, CollectionBasedTechnique):
+                    technique_result = technique.produce_batch_repr(positions)
+                elif (field_name, repr_number) in productions:
+                    technique_result = productions[(field_name, repr_number)].result()
+                else:
+                    with self.__preprocessing_scope(field_name, field_config, positions):
+                        technique_result = technique.produce_content(
+                            field_name, field_config.preprocessing, chunk_source.project([field_name]))
 
-                    if field_config.id is not None:
-                        index_field_name = "{}#{}#{}".format(field_name, str(repr_number), field_config.id)
-                    else:
-                        index_field_name = "{}#{}".format(field_name, str(repr_number))
+                technique_result = self.__convert_embeddings(field_config, technique_result)
 
+                if memory_interface is not None:
                     index_representations_dict[memory_interface][index_field_name] = technique_result
-                    result = []
 
                     # in order to refer to the representation that will be stored in the index, an IndexField repr will
                     # be added to each content (and it will contain all the necessary information to retrieve the data
                     # from the index)
-                    for i in range(0, len(list(self.__config.source))):
-                        result.append(
-                            IndexField(index_field_name, i, memory_interface))
+                    result = [IndexField(index_field_name, index_id, memory_interface) for index_id in index_ids]
                 else:
                     result = technique_result
 
@@ -227,10 +651,9 @@ class ContentsProducer:
 
             field_representations_dict[field_name] = {'results': results, 'ids': field_config_ids}
 
+        contents_list = []
         # each representation is added to the corresponding content
-        for i, raw_content in enumerate(self.__config.source):
-            # construct id from the list of the fields that compound id
-            content_id = id_merger(raw_content, self.__config.id)
+        for i, content_id in enumerate(content_ids):
             content = Content(content_id)
 
             # retrieves the exogenous representations associated with the content
@@ -249,23 +672,30 @@ class ContentsProducer:
 
             contents_list.append(content)
 
-        # after the contents creation process, the data to be indexed will be serialized inside of the memory interfaces
-        # for each created content, a new entry in each index will be created
-        # the entry will be in the following form: {"content_id": id, "Plot_0": "...", "Plot_1": "...", ...}
-        if len(self.__memory_interfaces) != 0:
-            for memory_interface in self.__memory_interfaces.values():
-                memory_interface.init_writing(True)
-                for i in range(0, len(contents_list)):
-                    memory_interface.new_content()
-                    memory_interface.new_field("content_id", contents_list[i].content_id)
-                    for field_name in index_representations_dict[memory_interface].keys():
-                        memory_interface.new_field(
-                            field_name, str(index_representations_dict[memory_interface][field_name][i].value))
-                    memory_interface.serialize_content()
-                memory_interface.stop_writing()
-            self.__memory_interfaces.clear()
+        return contents_list, index_representations_dict
 
-        return contents_list
+    @staticmethod
+    def __convert_embeddings(field_config: FieldConfig, representations: List[FieldRepresentation]) \
+            -> List[FieldRepresentation]:
+        """
+        Combines the embeddings produced by the field config with its embedding_combiner (if defined) and stores
+        them with its embedding_precision. The other representations are returned as they are
+        """
+        precision = field_config.embedding_precision
+        combiner = field_config.embedding_combiner
+        if precision == 'float64' and combiner is None:
+            return representations
+
+        converted_representations = []
+        for representation in representations:
+            if isinstance(representation, EmbeddingField) and not isinstance(representation, QuantizedEmbeddingField):
+                embedding_array = representation.value
+                if combiner is not None and embedding_array.ndim > 1:
+                    embedding_array = combiner.combine(embedding_array)
+                representation = create_embedding_field(embedding_array, precision)
+            converted_representations.append(representation)
+
+        return converted_representations
 
     def __str__(self):
         return "ContentsProducer"
@@ -1 +1,8 @@
-from .content import Content
\ No newline at end of file
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+_exports = {
+    'Content': '.content',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -0,0 +1,598 @@
+import json
+import os
+import pickle
+import shutil
+from typing import Dict, List, Union, Any
+
+import numpy as np
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, FieldRepresentation, \
+    FeaturesBagField, EmbeddingField, SimpleField, SparseFeaturesBagField, Vocabulary
+from orange_cb_recsys.content_analyzer.content_representation.representation_container import \
+    RepresentationContainer
+
+# name of the sub directory of the output directory where the columnar store is serialized
+STORE_DIRECTORY = 'columnar_store'
+STORE_METADATA = 'metadata.json'
+
+
+def is_columnar_store(directory: str) -> bool:
+    """
+    Checks if the directory passed as argument contains contents serialized in a columnar store
+
+    Args:
+        directory (str): path of the directory where the contents have been serialized
+    """
+    return os.path.isfile(os.path.join(directory, STORE_DIRECTORY, STORE_METADATA))
+
+
+class _ColumnWriter:
+    """
+    Class that appends the representations of a single (field, representation) pair, or of a single exogenous
+    representation, to the files of its column. Only the offsets of each content are kept in memory, the data
+    itself is written to disk as soon as it is added.
+
+    There are five kind of columns:
+
+        'embedding': EmbeddingField values, stored as a float matrix (one or more rows for each content), float32 if
+            the first value added is float32 (as the quantized embeddings, which are stored dequantized) and float64
+            otherwise
+        'sparse_bag': SparseFeaturesBagField values, stored as CSR arrays (with float32 scores) against the
+            vocabulary shared by the representations
+        'bag': FeaturesBagField values with numeric scores, stored as CSR arrays against a column vocabulary. If a
+            representation without numeric scores is added later, the column falls back to the 'object' kind
+        'simple': SimpleField values, stored as pickled values in an offsets+bytes blob
+        'object': any other representation, stored as pickled objects in an offsets+bytes blob
+
+    Args:
+        directory (str): directory of the store
+        column_name (str): name of the column, used as prefix for the column files
+        kind (str): kind of the column
+    """
+
+    def __init__(self, directory: str, column_name: str, kind: str):
+        self.__directory = directory
+        self.__column_name = column_name
+        self.__kind = kind
+
+        # offsets[i] is the position where the data of the i-th content starts, the last value is where the data
+        # of the last content ends
+        self.__offsets = [0]
+        self.__ndims = []
+        self.__dim = None
+        self.__dtype = None
+        self.__vocabulary: Dict[str, int] = {}
+        self.__shared_vocabulary: Vocabulary = None
+
+        self.__data_file = open(self.__path('data'), 'wb')
+        self.__indices_file = open(self.__path('indices'), 'wb') if kind in ('bag', 'sparse_bag') else None
+
+    @property
+    def kind(self) -> str:
+        return self.__kind
+
+    def __path(self, suffix: str) -> str:
+        return os.path.join(self.__directory, '{}.{}'.format(self.__column_name, suffix))
+
+    @staticmethod
+    def infer_kind(representation: Any) -> str:
+        """
+        Defines the kind of column that will be used to store the representations of the same type of the one passed
+        as argument
+        """
+        if isinstance(representation, EmbeddingField) and isinstance(representation.value, np.ndarray) \
+                and representation.value.ndim in (1, 2):
+            return 'embedding'
+        elif isinstance(representation, SparseFeaturesBagField):
+            return 'sparse_bag'
+        elif _ColumnWriter.__is_numeric_bag(representation):
+            return 'bag'
+        elif type(representation) is SimpleField:
+            return 'simple'
+        return 'object'
+
+    @staticmethod
+    def __is_numeric_bag(representation: Any) -> bool:
+        return isinstance(representation, FeaturesBagField) and \
+            all(isinstance(score, (int, float, np.number)) for score in representation.value.values())
+
+    def append(self, representation: Any):
+        if self.__kind == 'bag' and not self.__is_numeric_bag(representation):
+            self.__fall_back_to_object()
+
+        if self.__kind == 'embedding':
+            self.__append_embedding(representation)
+        elif self.__kind == 'sparse_bag':
+            self.__append_sparse_bag(representation)
+        elif self.__kind == 'bag':
+            self.__append_bag(representation)
+        elif self.__kind == 'simple':
+            self.__append_bytes(pickle.dumps(representation.value))
+        else:
+            self.__append_bytes(pickle.dumps(representation))
+
+    def __append_embedding(self, representation: EmbeddingField):
+        if self.__dtype is None:
+            self.__dtype = np.float32 if representation.value.dtype == np.float32 else np.float64
+        array = np.asarray(representation.value, dtype=self.__dtype)
+        self.__ndims.append(array.ndim)
+        matrix = np.atleast_2d(array)
+        if self.__dim is None:
+            self.__dim = matrix.shape[1]
+        elif matrix.shape[1] != self.__dim:
+            raise ValueError("Embeddings of column {} must have the same vector size! Expected {}, found {}"
+                             .format(self.__column_name, self.__dim, matrix.shape[1]))
+
+        self.__data_file.write(np.ascontiguousarray(matrix).tobytes())
+        self.__offsets.append(self.__offsets[-1] + matrix.shape[0])
+
+    def __append_sparse_bag(self, representation: SparseFeaturesBagField):
+        if self.__shared_vocabulary is None:
+            self.__shared_vocabulary = representation.vocabulary
+        elif representation.vocabulary != self.__shared_vocabulary:
+            raise ValueError("Sparse bags of column {} must have the same vocabulary!".format(self.__column_name))
+
+        self.__indices_file.write(representation.term_ids.tobytes())
+        self.__data_file.write(representation.scores.tobytes())
+        self.__offsets.append(self.__offsets[-1] + len(representation.term_ids))
+
+    def __append_bag(self, representation: FeaturesBagField):
+        indices = []
+        scores = []
+        for term, score in representation.value.items():
+            if term not in self.__vocabulary:
+                self.__vocabulary[term] = len(self.__vocabulary)
+            indices.append(self.__vocabulary[term])
+            scores.append(float(score))
+
+        self.__indices_file.write(np.array(indices, dtype=np.int32).tobytes())
+        self.__data_file.write(np.array(scores, dtype=np.float64).tobytes())
+        self.__offsets.append(self.__offsets[-1] + len(indices))
+
+    def __append_bytes(self, data: bytes):
+        self.__data_file.write(data)
+        self.__offsets.append(self.__offsets[-1] + len(data))
+
+    def __fall_back_to_object(self):
+        """
+        Turns the 'bag' column into an 'object' column, since the kind was inferred from the first representation
+        added and a later one doesn't have numeric scores. The bags already written are read back and pickled
+        """
+        self.__data_file.close()
+        self.__indices_file.close()
+        terms = list(self.__vocabulary.keys())
+        indices = np.fromfile(self.__path('indices'), dtype=np.int32)
+        data = np.fromfile(self.__path('data'), dtype=np.float64)
+        offsets = self.__offsets
+        os.remove(self.__path('indices'))
+
+        self.__kind = 'object'
+        self.__indices_file = None
+        self.__vocabulary = {}
+        self.__offsets = [0]
+        self.__data_file = open(self.__path('data'), 'wb')
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            bag = FeaturesBagField({terms[index]: float(score)
+                                    for index, score in zip(indices[start:end], data[start:end])})
+            self.__append_bytes(pickle.dumps(bag))
+
+    def close(self) -> dict:
+        """
+        Closes the column files and saves the offsets (and the vocabulary for 'bag' columns)
+
+        Returns:
+            column_metadata (dict): metadata that the reader needs in order to interpret the column files
+        """
+        self.__data_file.close()
+        if self.__indices_file is not None:
+            self.__indices_file.close()
+
+        np.save(self.__path('offsets.npy'), np.array(self.__offsets, dtype=np.int64))
+
+        column_metadata = {'kind': self.__kind}
+        if self.__kind == 'embedding':
+            np.save(self.__path('ndims.npy'), np.array(self.__ndims, dtype=np.int8))
+            column_metadata['dim'] = self.__dim
+            column_metadata['dtype'] = np.dtype(self.__dtype if self.__dtype is not None else np.float64).name
+        elif self.__kind == 'bag':
+            with open(self.__path('vocabulary.json'), 'w') as f:
+                json.dump(list(self.__vocabulary.keys()), f)
+        elif self.__kind == 'sparse_bag':
+            with open(self.__path('vocabulary.json'), 'w') as f:
+                json.dump(self.__shared_vocabulary.terms if self.__shared_vocabulary is not None else [], f)
+
+        return column_metadata
+
+
+class ColumnarStoreWriter:
+    """
+    Class that serializes contents in a columnar store. Instead of pickling each content in its own file, each
+    field representation (and each exogenous representation) of the contents is stored in a column:
+
+        dense embeddings are stored as a float matrix that the reader can memory-map
+        bag of words are stored as CSR arrays (indptr, indices, data) with a vocabulary for the column (the one
+            shared by the representations, for the SparseFeaturesBagField)
+        simple fields are stored as an offsets+bytes blob
+
+    Every content added to the store must have the same fields and representations of the first one added, which is
+    always the case for the contents produced by the ContentAnalyzer
+
+    The store is created in the 'columnar_store' sub directory of the directory passed as argument
+
+    Args:
+        directory (str): directory where the store will be created
+    """
+
+    def __init__(self, directory: str):
+        self.__directory = os.path.join(directory, STORE_DIRECTORY)
+        if os.path.exists(self.__directory):
+            shutil.rmtree(self.__directory)
+        os.makedirs(self.__directory)
+
+        self.__content_ids: List[str] = []
+        # layout of the fields, it will be in the following form:
+        #   {'Plot': [{'internal_id': 0, 'external_id': 'tfidf', 'column': 'c0'}, ...], ...}
+        self.__fields_layout: Dict[str, List[dict]] = None
+        self.__exogenous_layout: List[dict] = None
+        self.__columns: Dict[str, _ColumnWriter] = {}
+
+    def __init_layout(self, content: Content):
+        self.__fields_layout = {}
+        for field_name in content.field_dict:
+            self.__fields_layout[field_name] = self.__container_layout(content.get_field(field_name))
+        self.__exogenous_layout = self.__container_layout(content.exogenous_rep_container)
+
+    def __container_layout(self, container: RepresentationContainer) -> List[dict]:
+        layout = []
+        for row in container:
+            column_name = 'c{}'.format(len(self.__columns))
+            kind = _ColumnWriter.infer_kind(row['representation'])
+            self.__columns[column_name] = _ColumnWriter(self.__directory, column_name, kind)
+
+            external_id = row['external_id'] if isinstance(row['external_id'], str) else None
+            layout.append({'internal_id': int(row['internal_id']), 'external_id': external_id,
+                           'column': column_name})
+        return layout
+
+    def add_content(self, content: Content):
+        """
+        Appends each representation of the content passed as argument to its column
+
+        Args:
+            content (Content): content to add to the store
+        """
+        if self.__fields_layout is None:
+            self.__init_layout(content)
+
+        for field_name, field_layout in self.__fields_layout.items():
+            container = content.get_field(field_name)
+            representations = container.get_representations()
+            if len(representations) != len(field_layout):
+                raise ValueError("Content {} has a different number of representations for the field {}"
+                                 .format(content.content_id, field_name))
+            for column_layout, representation in zip(field_layout, representations):
+                self.__columns[column_layout['column']].append(representation)
+
+        exogenous_representations = content.exogenous_rep_container.get_representations()
+        if len(exogenous_representations) != len(self.__exogenous_layout):
+            raise ValueError("Content {} has a different number of exogenous representations"
+                             .format(content.content_id))
+        for column_layout, representation in zip(self.__exogenous_layout, exogenous_representations):
+            self.__columns[column_layout['column']].append(representation)
+
+        self.__content_ids.append(content.content_id)
+
+    def close(self):
+        """
+        Closes every column and writes the metadata of the store. The store can't be read before this method is
+        called
+        """
+        columns_metadata = {name: column.close() for name, column in self.__columns.items()}
+
+        metadata = {'content_ids': self.__content_ids,
+                    'fields': self.__fields_layout if self.__fields_layout is not None else {},
+                    'exogenous': self.__exogenous_layout if self.__exogenous_layout is not None else [],
+                    'columns': columns_metadata}
+
+        with open(os.path.join(self.__directory, STORE_METADATA), 'w') as f:
+            json.dump(metadata, f)
+
+
+class ColumnarContentStore:
+    """
+    Reader for contents serialized with the ColumnarStoreWriter. Only the metadata of the store is loaded when the
+    reader is created, each column is opened (and memory-mapped, when possible) the first time one of its
+    representations is requested. Single representations can be retrieved without deserializing the whole content.
+
+    Args:
+        directory (str): directory where the contents were serialized (the one containing the 'columnar_store'
+            sub directory)
+    """
+
+    def __init__(self, directory: str):
+        self.__directory = os.path.join(directory, STORE_DIRECTORY)
+
+        with open(os.path.join(self.__directory, STORE_METADATA)) as f:
+            metadata = json.load(f)
+
+        self.__content_ids: List[str] = metadata['content_ids']
+        self.__positions: Dict[str, int] = {content_id: i for i, content_id in enumerate(self.__content_ids)}
+        self.__fields_layout: Dict[str, List[dict]] = metadata['fields']
+        self.__exogenous_layout: List[dict] = metadata['exogenous']
+        self.__columns_metadata: Dict[str, dict] = metadata['columns']
+        self.__columns: Dict[str, dict] = {}
+
+    @property
+    def content_ids(self) -> List[str]:
+        """
+        Getter for the ids of the contents in the store, in the order in which they were serialized
+        """
+        return self.__content_ids
+
+    @property
+    def field_names(self) -> List[str]:
+        return list(self.__fields_layout.keys())
+
+    def __contains__(self, content_id: str):
+        return content_id in self.__positions
+
+    def __len__(self):
+        return len(self.__content_ids)
+
+    def __path(self, column_name: str, suffix: str) -> str:
+        return os.path.join(self.__directory, '{}.{}'.format(column_name, suffix))
+
+    def __open_column(self, column_name: str) -> dict:
+        if column_name not in self.__columns:
+            column_metadata = self.__columns_metadata[column_name]
+            kind = column_metadata['kind']
+            column = {'kind': kind, 'offsets': np.load(self.__path(column_name, 'offsets.npy'))}
+
+            if kind == 'embedding':
+                column['ndims'] = np.load(self.__path(column_name, 'ndims.npy'))
+                # the stores written before the float32 columns were added don't have the dtype
+                column['data'] = self.__memmap(column_name, 'data', np.dtype(column_metadata.get('dtype', 'float64')),
+                                               column_metadata['dim'])
+            elif kind == 'bag':
+                with open(self.__path(column_name, 'vocabulary.json')) as f:
+                    column['vocabulary'] = json.load(f)
+                column['indices'] = self.__memmap(column_name, 'indices', np.int32)
+                column['data'] = self.__memmap(column_name, 'data', np.float64)
+            elif kind == 'sparse_bag':
+                with open(self.__path(column_name, 'vocabulary.json')) as f:
+                    column['vocabulary'] = Vocabulary(json.load(f))
+                column['indices'] = self.__memmap(column_name, 'indices', np.int32)
+                column['data'] = self.__memmap(column_name, 'data', np.float32)
+            else:
+                column['data'] = self.__memmap(column_name, 'data', np.uint8)
+
+            self.__columns[column_name] = column
+
+        return self.__columns[column_name]
+
+    def __memmap(self, column_name: str, suffix: str, dtype, dim: int = None) -> np.ndarray:
+        path = self.__path(column_name, suffix)
+        # numpy can't memory-map empty files
+        if os.path.getsize(path) == 0:
+            array = np.empty(0, dtype=dtype)
+        else:
+            array = np.memmap(path, dtype=dtype, mode='r')
+        if dim is not None:
+            array = array.reshape(-1, dim)
+        return array
+
+    def __read(self, column_name: str, position: int):
+        column = self.__open_column(column_name)
+        start = column['offsets'][position]
+        end = column['offsets'][position + 1]
+
+        if column['kind'] == 'embedding':
+            matrix = column['data'][start:end]
+            return EmbeddingField(matrix[0] if column['ndims'][position] == 1 else matrix)
+        elif column['kind'] == 'sparse_bag':
+            return SparseFeaturesBagField(column['indices'][start:end], column['data'][start:end],
+                                          column['vocabulary'])
+        elif column['kind'] == 'bag':
+            vocabulary = column['vocabulary']
+            return FeaturesBagField({vocabulary[index]: float(score) for index, score
+                                     in zip(column['indices'][start:end], column['data'][start:end])})
+        elif column['kind'] == 'simple':
+            return SimpleField(pickle.loads(column['data'][start:end].tobytes()))
+        else:
+            return pickle.loads(column['data'][start:end].tobytes())
+
+    @staticmethod
+    def __find_column(layout: List[dict], representation_id: Union[int, str]) -> str:
+        """
+        Finds the column associated to the representation id in the layout. As for the RepresentationContainer, if
+        the id is an integer it refers to the internal id, if it is a string it refers to the external id
+        """
+        if isinstance(representation_id, int):
+            try:
+                return layout[representation_id]['column']
+            except IndexError:
+                raise KeyError(representation_id)
+        for column_layout in layout:
+            if column_layout['external_id'] == representation_id:
+                return column_layout['column']
+        raise KeyError(representation_id)
+
+    def __position(self, content_id: str) -> int:
+        try:
+            return self.__positions[content_id]
+        except KeyError:
+            raise KeyError("Content {} not found in the store".format(content_id))
+
+    def get_field_representation(self, content_id: str, field_name: str,
+                                 representation_id: Union[int, str]) -> FieldRepresentation:
+        """
+        Reads a single field representation of a content, without reading any other representation
+
+        Args:
+            content_id (str): id of the content
+            field_name (str): field from which the representation will be read
+            representation_id (Union[int, str]): id of the representation (either the internal or external id)
+        """
+        column_name = self.__find_column(self.__fields_layout[field_name], representation_id)
+        return self.__read(column_name, self.__position(content_id))
+
+    def get_exogenous_representation(self, content_id: str, representation_id: Union[int, str]):
+        """
+        Reads a single exogenous representation of a content, without reading any other representation
+
+        Args:
+            content_id (str): id of the content
+            representation_id (Union[int, str]): id of the representation (either the internal or external id)
+        """
+        column_name = self.__find_column(self.__exogenous_layout, representation_id)
+        return self.__read(column_name, self.__position(content_id))
+
+    def get_field(self, content_id: str, field_name: str) -> RepresentationContainer:
+        """
+        Reads every representation of a field of a content and returns them in a RepresentationContainer
+        """
+        position = self.__position(content_id)
+        layout = self.__fields_layout[field_name]
+        return RepresentationContainer([self.__read(column_layout['column'], position) for column_layout in layout],
+                                       [column_layout['external_id'] for column_layout in layout])
+
+    def get_exogenous_container(self, content_id: str) -> RepresentationContainer:
+        """
+        Reads every exogenous representation of a content and returns them in a RepresentationContainer
+        """
+        position = self.__position(content_id)
+        layout = self.__exogenous_layout
+        return RepresentationContainer([self.__read(column_layout['column'], position) for column_layout in layout],
+                                       [column_layout['external_id'] for column_layout in layout])
+
+    def load_content(self, content_id: str, item_field: dict = None) -> Union['StoredContent', None]:
+        """
+        Returns a StoredContent for the content_id passed as argument, or None if the content is not in the store.
+        If item_field is passed, only the representations in it are read, otherwise no representation is read until
+        it is requested
+
+        Args:
+            content_id (str): id of the content
+            item_field (dict): dict where the key is the name of a field and the value is the representation (or the
+                list of representations) of said field to read, in the same form used by the content based algorithms
+        """
+        if content_id not in self.__positions:
+            return None
+        content = StoredContent(content_id, self)
+        if item_field is not None:
+            content.load_representations(item_field)
+        return content
+
+
+class StoredContent(Content):
+    """
+    Content backed by a ColumnarContentStore. The representations are read from the store only when they are
+    requested, so that algorithms needing a single representation of a single field don't pay for the others.
+    Each representation read is kept in the content, so it is read only once.
+    The whole content is read only if methods that need every representation (such as field_dict) are called.
+
+    Args:
+        content_id (str): id of the content
+        store (ColumnarContentStore): store where the content representations are serialized
+    """
+
+    def __init__(self, content_id: str, store: ColumnarContentStore):
+        super().__init__(content_id)
+        self.__store = store
+        self.__materialized = False
+        # representations already read from the store, the key is the tuple (field name, representation id) for
+        # the field representations and (None, representation id) for the exogenous representations
+        self.__loaded_representations = {}
+
+    def __materialize(self):
+        if not self.__materialized:
+            for field_name in self.__store.field_names:
+                super().append_field(field_name, self.__store.get_field(self.content_id, field_name))
+            container = self.__store.get_exogenous_container(self.content_id)
+            super().append_exogenous_representation(container.get_representations(),
+                                                    container.get_external_index())
+            self.__materialized = True
+            self.__loaded_representations = {}
+
+    def load_representations(self, item_field: dict):
+        """
+        Reads from the store the representations defined in the item_field passed as argument, without reading
+        any other representation of the content
+
+        Args:
+            item_field (dict): dict where the key is the name of a field and the value is the representation (or the
+                list of representations) of said field to read
+        """
+        for field_name, representation_ids in item_field.items():
+            if not isinstance(representation_ids, list):
+                representation_ids = [representation_ids]
+            for representation_id in representation_ids:
+                self.get_field_representation(field_name, representation_id)
+
+    @property
+    def field_dict(self):
+        self.__materialize()
+        return super().field_dict
+
+    @property
+    def exogenous_rep_container(self):
+        self.__materialize()
+        return super().exogenous_rep_container
+
+    def get_field(self, field_name: str) -> RepresentationContainer:
+        self.__materialize()
+        return super().get_field(field_name)
+
+    def get_field_representation(self, field_name: str, representation_id: Union[int, str]) -> FieldRepresentation:
+        if self.__materialized:
+            return super().get_field_representation(field_name, representation_id)
+        key = (field_name, representation_id)
+        if key not in self.__loaded_representations:
+            self.__loaded_representations[key] = \
+                self.__store.get_field_representation(self.content_id, field_name, representation_id)
+        return self.__loaded_representations[key]
+
+    def get_exogenous_representation(self, exo_name: Union[int, str]):
+        if self.__materialized:
+            return super().get_exogenous_representation(exo_name)
+        key = (None, exo_name)
+        if key not in self.__loaded_representations:
+            self.__loaded_representations[key] = self.__store.get_exogenous_representation(self.content_id, exo_name)
+        return self.__loaded_representations[key]
+
+    def append_field(self, field_name: str, field: RepresentationContainer):
+        self.__materialize()
+        super().append_field(field_name, field)
+
+    def remove_field(self, field_name: str):
+        self.__materialize()
+        super().remove_field(field_name)
+
+    def append_field_representation(self, field_name: str, representation, representation_id=None):
+        self.__materialize()
+        super().append_field_representation(field_name, representation, representation_id)
+
+    def remove_field_representation(self, field_name: str, representation_id: Union[int, str]):
+        self.__materialize()
+        super().remove_field_representation(field_name, representation_id)
+
+    def append_exogenous_representation(self, exogenous_properties, exo_name=None):
+        self.__materialize()
+        super().append_exogenous_representation(exogenous_properties, exo_name)
+
+    def remove_exogenous_representation(self, exo_name: Union[str, int]):
+        self.__materialize()
+        super().remove_exogenous_representation(exo_name)
+
+    def __str__(self):
+        self.__materialize()
+        return super().__str__()
+
+    def __eq__(self, other):
+        self.__materialize()
+        if isinstance(other, StoredContent):
+            other.__materialize()
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return super().__hash__()
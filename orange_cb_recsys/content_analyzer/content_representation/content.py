@@ -1,7 +1,9 @@
+import hashlib
 from abc import ABC, abstractmethod
 from typing import Dict, Union, List
 import numpy as np
 import json
+from scipy import sparse
 
 from orange_cb_recsys.content_analyzer.content_representation.representation_container import RepresentationContainer
 from orange_cb_recsys.content_analyzer.memory_interfaces.memory_interfaces import InformationInterface
@@ -11,11 +13,29 @@ class FieldRepresentation(ABC):
     """
     Abstract class that generalizes the concept of "field representation",
     a field representation is a semantic way to represent a field of an item.
+
+    The field representations define __slots__, since a catalog holds a lot of them. The representations pickled
+    before the __slots__ were defined (whose attributes are stored in a dict) are still loaded by __setstate__
     """
+    __slots__ = ()
 
     def __init__(self):
         pass
 
+    def __setstate__(self, state):
+        # the state of an object with __slots__ is the tuple (dict of the attributes, dict of the slots), while the
+        # state of the representations pickled before the __slots__ were defined is the dict of the attributes
+        if isinstance(state, tuple):
+            attributes = {}
+            for state_dict in state:
+                if state_dict is not None:
+                    attributes.update(state_dict)
+        else:
+            attributes = state
+
+        for name, value in attributes.items():
+            object.__setattr__(self, name, value)
+
     @abstractmethod
     def __str__(self):
         raise NotImplementedError
@@ -38,6 +58,7 @@ class FeaturesBagField(FieldRepresentation):
     Args:
         features (dict<str, object>): the dictionary where features are stored
     """
+    __slots__ = ('__features',)
 
     def __init__(self, features: Dict[str, object] = None):
         super().__init__()
@@ -59,7 +80,122 @@ class FeaturesBagField(FieldRepresentation):
         return str(self.__features)
 
     def __eq__(self, other):
-        return self.__features == other.__features
+        return self.value == other.value
+
+
+class Vocabulary:
+    """
+    Vocabulary of the terms of a field, where the id of each term is its position in the list of terms.
+    A vocabulary is shared by the SparseFeaturesBagField of every content of a catalog: since it defines a shared_id
+    it's a SharedObject, so it's serialized only once in the 'shared' directory next to the contents
+
+    Args:
+        terms (list): terms of the vocabulary
+    """
+
+    def __init__(self, terms: List[str]):
+        self.__terms = list(terms)
+        self.__term_ids = {term: term_id for term_id, term in enumerate(self.__terms)}
+        self.__shared_id = hashlib.sha1(json.dumps(self.__terms).encode('utf-8')).hexdigest()
+
+    @property
+    def terms(self) -> List[str]:
+        return self.__terms
+
+    @property
+    def shared_id(self) -> str:
+        """
+        Hash of the terms of the vocabulary
+        """
+        return self.__shared_id
+
+    def get_term_id(self, term: str) -> Union[int, None]:
+        """
+        Returns the id of the term passed as argument, None if the term is not in the vocabulary
+        """
+        return self.__term_ids.get(term)
+
+    def __getitem__(self, term_id: int) -> str:
+        return self.__terms[term_id]
+
+    def __contains__(self, term: str):
+        return term in self.__term_ids
+
+    def __len__(self):
+        return len(self.__terms)
+
+    def __eq__(self, other):
+        return isinstance(other, Vocabulary) and self.__shared_id == other.__shared_id
+
+    def __hash__(self):
+        return hash(self.__shared_id)
+
+    def __str__(self):
+        return "Vocabulary"
+
+    def __repr__(self):
+        return "< Vocabulary: terms = " + str(len(self.__terms)) + "; id = " + self.__shared_id + " >"
+
+
+class SparseFeaturesBagField(FeaturesBagField):
+    """
+    Bag of features stored as the ids of the features in a Vocabulary shared by all the contents, and their float32
+    scores. It's produced by the tf-idf techniques that compute the tf-idf matrix of the whole field.
+
+    The value of the field is still the dict <feature, score>, but it's built every time it's requested: the content
+    based algorithms use the sparse row returned by to_sparse_row() instead, so that no dict is ever built
+
+    Args:
+        term_ids (np.ndarray): ids of the features in the vocabulary
+        scores (np.ndarray): scores of the features, in the same order of the term_ids
+        vocabulary (Vocabulary): vocabulary of the field
+    """
+    __slots__ = ('__term_ids', '__scores', '__vocabulary')
+
+    def __init__(self, term_ids: np.ndarray, scores: np.ndarray, vocabulary: Vocabulary):
+        FieldRepresentation.__init__(self)
+        if len(term_ids) != len(scores):
+            raise ValueError("The number of term ids and the number of scores must be the same")
+        self.__term_ids = np.asarray(term_ids, dtype=np.int32)
+        self.__scores = np.asarray(scores, dtype=np.float32)
+        self.__vocabulary = vocabulary
+
+    @property
+    def value(self) -> Dict[str, float]:
+        """
+        Get the features dict
+
+        Returns:
+            features (dict<str, float>): the features dict
+        """
+        return {self.__vocabulary[term_id]: float(score) for term_id, score in zip(self.__term_ids, self.__scores)}
+
+    @property
+    def term_ids(self) -> np.ndarray:
+        return self.__term_ids
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self.__scores
+
+    @property
+    def vocabulary(self) -> Vocabulary:
+        return self.__vocabulary
+
+    def to_sparse_row(self) -> sparse.csr_matrix:
+        """
+        Returns the features as a sparse row with a column for each term of the vocabulary
+        """
+        return sparse.csr_matrix((self.__scores, self.__term_ids, [0, len(self.__term_ids)]),
+                                 shape=(1, len(self.__vocabulary)))
+
+    def __str__(self):
+        return str(self.value)
+
+    def __eq__(self, other):
+        if isinstance(other, SparseFeaturesBagField) and self.__vocabulary == other.__vocabulary:
+            return np.array_equal(self.__term_ids, other.__term_ids) and np.array_equal(self.__scores, other.__scores)
+        return self.value == other.value
 
 
 class SimpleField(FieldRepresentation):
@@ -69,6 +205,7 @@ class SimpleField(FieldRepresentation):
     Args:
         value (str): string representing the value of the field
     """
+    __slots__ = ('__value',)
 
     def __init__(self, value: object = None):
         super().__init__()
@@ -102,6 +239,7 @@ class EmbeddingField(FieldRepresentation):
         embedding_array (np.ndarray): embeddings array,
             it can be of different shapes according to the granularity of the technique
     """
+    __slots__ = ('__embedding_array',)
 
     def __init__(self, embedding_array: np.ndarray):
         super().__init__()
@@ -115,7 +253,87 @@ class EmbeddingField(FieldRepresentation):
         return str(self.__embedding_array)
 
     def __eq__(self, other):
-        return self.__embedding_array == other.__embedding_array
+        return np.array_equal(self.value, other.value)
+
+
+class QuantizedEmbeddingField(EmbeddingField):
+    """
+    Class for embeddings stored as int8 codes with a float32 scale for each row (each vector) of the embedding.
+    The value of the field is dequantized (as float32) every time it's requested, so that the full precision
+    embedding is kept in memory only while it's used.
+
+    The maximum error of each dequantized value is half the scale of its row, where the scale is the maximum absolute
+    value of the row divided by 127
+
+    Args:
+        codes (np.ndarray): int8 codes of the embedding, with the same shape of the embedding
+        scales (np.ndarray): float32 scale of each row of the codes (a single scale if the embedding is a vector)
+    """
+    __slots__ = ('__codes', '__scales')
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray):
+        FieldRepresentation.__init__(self)
+        self.__codes = np.asarray(codes, dtype=np.int8)
+        self.__scales = np.asarray(scales, dtype=np.float32).reshape(-1)
+        if len(self.__scales) != len(np.atleast_2d(self.__codes)):
+            raise ValueError("There must be a scale for each row of the codes")
+
+    @classmethod
+    def quantize(cls, embedding_array: np.ndarray) -> 'QuantizedEmbeddingField':
+        """
+        Quantizes the embedding passed as argument, computing the scale of each of its rows
+        """
+        embedding_array = np.asarray(embedding_array, dtype=np.float64)
+        matrix = np.atleast_2d(embedding_array)
+        if matrix.shape[1] == 0:
+            scales = np.zeros(matrix.shape[0])
+        else:
+            scales = np.abs(matrix).max(axis=1) / 127
+        # the rows with only zeros are kept as zeros
+        divisors = np.where(scales == 0, 1, scales)
+        codes = np.rint(matrix / divisors[:, np.newaxis]).astype(np.int8)
+        return cls(codes.reshape(embedding_array.shape), scales)
+
+    @property
+    def value(self) -> np.ndarray:
+        if self.__codes.ndim == 1:
+            return self.__codes.astype(np.float32) * self.__scales[0]
+        return self.__codes.astype(np.float32) * self.__scales[:, np.newaxis]
+
+    @property
+    def codes(self) -> np.ndarray:
+        return self.__codes
+
+    @property
+    def scales(self) -> np.ndarray:
+        return self.__scales
+
+    def __str__(self):
+        return str(self.value)
+
+
+# precisions in which the embeddings can be stored
+EMBEDDING_PRECISIONS = ('float64', 'float32', 'int8')
+
+
+def create_embedding_field(embedding_array: np.ndarray, precision: str = 'float64') -> EmbeddingField:
+    """
+    Creates the representation storing the embedding passed as argument with the precision passed as argument:
+
+        'float64': EmbeddingField with a float64 array
+        'float32': EmbeddingField with a float32 array
+        'int8': QuantizedEmbeddingField with int8 codes and a float32 scale for each row
+
+    Args:
+        embedding_array (np.ndarray): embedding to store
+        precision (str): precision of the stored embedding, one of EMBEDDING_PRECISIONS
+    """
+    if precision == 'int8':
+        return QuantizedEmbeddingField.quantize(embedding_array)
+    elif precision in EMBEDDING_PRECISIONS:
+        return EmbeddingField(np.asarray(embedding_array, dtype=precision))
+    raise ValueError("Precision {} is not available! Available precisions are: {}".format(
+        precision, list(EMBEDDING_PRECISIONS)))
 
 
 class IndexField(FieldRepresentation):
@@ -126,11 +344,13 @@ class IndexField(FieldRepresentation):
     Args:
         field_name (str): field's field_name located in the index
             N.B. : it might differ from the original field_name, for example "Plot" might be "Plot_0"
-        index_id (int): position of the content in the index
+        index_id (Union[str, int]): position of the content in the index, or its id if the index is updated
+            incrementally (since the positions of the documents change when the index is updated)
         index (InformationInterface): index from which the data will be retrieved
     """
+    __slots__ = ('__field_name', '__index_id', '__index')
 
-    def __init__(self, field_name: str, index_id: int, index: InformationInterface):
+    def __init__(self, field_name: str, index_id: Union[str, int], index: InformationInterface):
         super().__init__()
         self.__field_name = field_name
         self.__index_id = index_id
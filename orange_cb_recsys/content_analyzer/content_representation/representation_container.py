@@ -1,3 +1,6 @@
+import math
+
+import numpy as np
 import pandas as pd
 from typing import List, Any, Union, Iterator, Dict
 
@@ -5,33 +8,35 @@ from typing import List, Any, Union, Iterator, Dict
 class RepresentationContainer:
     """
     Class that stores a generic representation. This is used in the project for storing the representations and
-    ids for both the field and exogenous representations of the contents. In order to store the data, the class handles
-    a dataframe with 1 column ('representation') and 2 indexes ('internal_id' and 'external_id').
-    The dataframe is in the following form
+    ids for both the field and exogenous representations of the contents. In order to store the data, the class keeps
+    3 parallel lists ('internal_id', 'external_id' and 'representation'), which can be seen as the following table
 
-                                            representation
-                    internal_id external_id
-                    0           'test'      FieldRepresentation instance
-                    1           NaN         FieldRepresentation instance
-                    2           'test2'     FieldRepresentation instance
+                    internal_id external_id     representation
+                    0           'test'          FieldRepresentation instance
+                    1           NaN             FieldRepresentation instance
+                    2           'test2'         FieldRepresentation instance
 
 
-    The index 'internal_id' is used to store the id automatically assigned by the framework to the representation.
-    This default id is an integer and the column will always be in the form: [0, 1, 2, 3, ...]
+    The 'internal_id' list is used to store the id automatically assigned by the framework to the representation.
+    This default id is an integer and the list will always be in the form: [0, 1, 2, 3, ...]
 
-    The index 'external_id' is used to store the optional id that the user can assign to the representation.
+    The 'external_id' list is used to store the optional id that the user can assign to the representation.
     If the user didn't define an external_id for the representation it will be set to NaN and it will be
     accessible using the internal_id only.
-    The 'external_id' is a string and the column will always be in the form: ['test', NaN, 'test2', 'test3', ...]
+    The 'external_id' is a string and the list will always be in the form: ['test', NaN, 'test2', 'test3', ...]
 
     Both 'internal_id' and 'external_id' contain unique values, meaning that there can't be duplicates in the
-    columns (except for NaN)
+    lists (except for NaN). A dictionary maps each external_id to its position, so that the representations can be
+    accessed by external_id without scanning the lists
 
-    The column 'representation' is used to store the instances of the representations for the content,
+    The 'representation' list is used to store the instances of the representations for the content,
     It can store both instances of FieldRepresentation or ExogenousRepresentation (not both at the same time obviously,
-    the column has to contain FieldRepresentation or ExogenousRepresentation only)
-    By using an index value either integer (referring to 'internal_id') or string (referring to 'external_id') it's
-    possible to access the corresponding representation
+    the list has to contain FieldRepresentation or ExogenousRepresentation only)
+    By using an index value either integer (referring to the position of the representation) or string (referring
+    to 'external_id') it's possible to access the corresponding representation
+
+    The containers pickled by the previous versions of the framework (which stored the data in a pandas DataFrame)
+    are converted when they are loaded
 
     Args:
         external_id_list (Union[List[Union[str, None]], Union[str, None]]): list containing the user defined ids for the
@@ -43,6 +48,7 @@ class RepresentationContainer:
 
     internal_id_list is not required as an argument because it will be automatically created by the class
     """
+    __slots__ = ('__internal_ids', '__external_ids', '__representations', '__external_positions')
 
     def __init__(self, representation_list: Union[List[Any], Any] = None,
                  external_id_list: Union[List[Union[str, None]], Union[str, None]] = None):
@@ -59,36 +65,45 @@ class RepresentationContainer:
         if len(representation_list) != len(external_id_list):
             raise ValueError("Representation and external_id lists must have the same length")
 
-        self.__dataframe = pd.DataFrame({'external_id': external_id_list, 'representation': representation_list})
-        self.__dataframe['internal_id'] = self.__dataframe.index
-        self.__dataframe.set_index(['internal_id', 'external_id'], inplace=True)
+        self.__set_data(list(range(0, len(representation_list))), external_id_list, representation_list)
+
+    def __set_data(self, internal_ids: List[int], external_ids: List[Union[str, None]], representations: List[Any]):
+        self.__internal_ids: List[int] = internal_ids
+        # the missing external ids are stored as NaN, as it happened when the container used a DataFrame
+        self.__external_ids: List[Union[str, float]] = [np.nan if _is_missing(external_id) else external_id
+                                                        for external_id in external_ids]
+        self.__representations: List[Any] = representations
+        self.__index_external_ids()
+
+    def __index_external_ids(self):
+        self.__external_positions: Dict[str, int] = {external_id: position for position, external_id
+                                                     in enumerate(self.__external_ids)
+                                                     if isinstance(external_id, str)}
 
     def get_internal_index(self) -> List[int]:
         """
-        Returns a list containing the values in the 'internal_id' index
+        Returns a list containing the values in the 'internal_id' list
         """
-        return list(self.__dataframe.index.get_level_values('internal_id'))
+        return list(self.__internal_ids)
 
     def get_external_index(self) -> List[Union[str, None]]:
         """
-        Returns a list containing the values in the 'external_id' index
+        Returns a list containing the values in the 'external_id' list
         """
-        return list(self.__dataframe.index.get_level_values('external_id'))
+        return list(self.__external_ids)
 
     def get_representations(self) -> List[Any]:
         """
-        Returns a list containing the values in the 'representations' column
+        Returns a list containing the values in the 'representations' list
         """
-        return list(self.__dataframe['representation'])
+        return list(self.__representations)
 
     def append(self, representation: Union[List[Any], Any],
                external_id: Union[List[Union[str, None]], Union[str, None]]):
         """
         Method used to append a list of representations (or a single representation) and their list of
-        external_ids (or a single external_id) to the main dataframe. In order to do so, a new dataframe is created
-        for the arguments passed by the user and it will be appended to the original dataframe. The logic behind the
-        creation of the dataframe is the same as the constructor, with only one difference: the internal_id index is
-        generated from the original dataframe one (so that the internal_ids are consecutive).
+        external_ids (or a single external_id) to the container. The internal_ids of the new representations follow
+        the last internal_id in the container (so that the internal_ids are consecutive).
 
         Args:
             external_id (Union[List[Union[str, None]], Union[str, None]]): list containing the user defined ids for the
@@ -106,62 +121,98 @@ class RepresentationContainer:
         if len(representation) != len(external_id):
             raise ValueError("Representation and external_id lists must have the same length")
 
-        if len(self.get_internal_index()) == 0:
+        if len(self.__internal_ids) == 0:
             next_internal_id = 0
         else:
-            next_internal_id = self.__dataframe.index.get_level_values('internal_id')[-1] + 1
-        new_dataframe = pd.DataFrame({'external_id': external_id, 'representation': representation})
-        new_dataframe['internal_id'] = list(range(next_internal_id, len(representation) + next_internal_id))
-        new_dataframe.set_index(['internal_id', 'external_id'], inplace=True)
+            next_internal_id = self.__internal_ids[-1] + 1
 
-        self.__dataframe = self.__dataframe.append(new_dataframe)
+        for i, (new_representation, new_external_id) in enumerate(zip(representation, external_id)):
+            if isinstance(new_external_id, str):
+                self.__external_positions[new_external_id] = len(self.__representations)
+            self.__internal_ids.append(next_internal_id + i)
+            self.__external_ids.append(np.nan if _is_missing(new_external_id) else new_external_id)
+            self.__representations.append(new_representation)
 
     def pop(self, id: Union[str, int]):
         """
-        Remove a specific row from the dataframe identified by the external or internal id passed as an argument.
-        The representation corresponding to the selected row is also returned (in case it's needed).
+        Remove a specific representation from the container identified by the external or internal id passed as an
+        argument. The removed representation is also returned (in case it's needed).
 
         Args:
-            id(Union[str, int]): used to access the row to remove from the dataframe. If it is an integer, it means
-                it refers to the internal_id index, if it is a string, it means that it refers to the external_id index
+            id(Union[str, int]): used to access the representation to remove. If it is an integer, it means
+                it refers to the internal_id, if it is a string, it means that it refers to the external_id
 
         Returns:
-            removed_representation (Any): representation corresponding to the removed row
+            removed_representation (Any): removed representation
         """
         removed_representation = self[id]
         if isinstance(id, int):
-            self.__dataframe = self.__dataframe.drop(id, level=0)
-        elif isinstance(id, str):
-            self.__dataframe = self.__dataframe.drop(id, level=1)
+            try:
+                position = self.__internal_ids.index(id)
+            except ValueError:
+                raise KeyError(id)
+        else:
+            position = self.__external_positions[id]
+
+        del self.__internal_ids[position]
+        del self.__external_ids[position]
+        del self.__representations[position]
+        self.__index_external_ids()
         return removed_representation
 
     def __getitem__(self, item: Union[str, int]):
         """
         Access a specific representation using an index value. The index value can be either string or integer,
-        if it is an integer, it means that it is referring to the 'internal_id' index, otherwise if it is a string,
-        it means that it is referring to the 'external_id' index.
+        if it is an integer, it means that it is referring to the position of the representation, otherwise if it is
+        a string, it means that it is referring to the 'external_id'.
 
         Args:
-            item (Union[str, int]): value used to refer to a specific representation by accessing the index columns
+            item (Union[str, int]): value used to refer to a specific representation
         """
         if isinstance(item, int):
-            return self.__dataframe.iloc[item]['representation']
+            return self.__representations[item]
         elif isinstance(item, str):
-            return self.__dataframe.loc(axis=0)[pd.IndexSlice[:, item]]['representation'].item()
+            return self.__representations[self.__external_positions[item]]
 
     def __iter__(self) -> Iterator[Dict]:
         for internal_index, external_index, representation in \
-                zip(self.get_internal_index(), self.get_external_index(), self.get_representations()):
+                zip(self.__internal_ids, self.__external_ids, self.__representations):
             yield {'internal_id': internal_index, 'external_id': external_index, 'representation': representation}
 
     def __len__(self):
-        return len(self.get_internal_index())
+        return len(self.__internal_ids)
 
     def __eq__(self, other):
-        return self.__dataframe.equals(other.__dataframe)
+        return self.__internal_ids == other.__internal_ids \
+            and [None if _is_missing(external_id) else external_id for external_id in self.__external_ids] == \
+            [None if _is_missing(external_id) else external_id for external_id in other.__external_ids] \
+            and self.__representations == other.__representations
+
+    def __getstate__(self):
+        return self.__internal_ids, self.__external_ids, self.__representations
+
+    def __setstate__(self, state):
+        # the containers pickled by the previous versions stored a dict with a DataFrame indexed by
+        # ('internal_id', 'external_id'), with a single 'representation' column
+        if isinstance(state, dict):
+            dataframe = state['_RepresentationContainer__dataframe']
+            state = (list(dataframe.index.get_level_values('internal_id')),
+                     list(dataframe.index.get_level_values('external_id')),
+                     list(dataframe['representation']))
+        internal_ids, external_ids, representations = state
+        self.__set_data([int(internal_id) for internal_id in internal_ids], external_ids, list(representations))
 
     def __str__(self):
-        return str(self.__dataframe)
+        dataframe = pd.DataFrame({'internal_id': self.__internal_ids, 'external_id': self.__external_ids,
+                                  'representation': self.__representations})
+        return str(dataframe.set_index(['internal_id', 'external_id']))
 
     def __repr__(self):
         return str(self)
+
+
+def _is_missing(external_id) -> bool:
+    """
+    Returns True if the external id passed as argument is not defined (None or NaN)
+    """
+    return external_id is None or (isinstance(external_id, float) and math.isnan(external_id))
@@ -1,5 +1,27 @@
-from . import embedding_learner
-from . import embedding_loader
+from orange_cb_recsys.utils.lazy_import import lazy_exports
 
-from .embedding_learner import *
-from .embedding_loader import *
+# gensim, sentence_transformers and wikipedia2vec are imported only when a learner or a loader is first accessed
+_exports = {
+    'GensimDoc2Vec': '.embedding_learner',
+    'GensimFastText': '.embedding_learner',
+    'GensimLatentSemanticAnalysis': '.embedding_learner',
+    'GensimRandomIndexing': '.embedding_learner',
+    'GensimWord2Vec': '.embedding_learner',
+
+    'Gensim': '.embedding_loader',
+    'Sbert': '.embedding_loader',
+    'Wikipedia2VecLoader': '.embedding_loader',
+
+    # modules of the learners and of the loaders, reachable from this package too
+    'doc2vec': '.embedding_learner',
+    'fasttext': '.embedding_learner',
+    'latent_semantic_analysis': '.embedding_learner',
+    'random_indexing': '.embedding_learner',
+    'word2vec': '.embedding_learner',
+    'gensim': '.embedding_loader',
+    'sbert': '.embedding_loader',
+    'wiki2vec_loader': '.embedding_loader',
+}
+
+__all__ = [name for name in _exports if not name.islower()]
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
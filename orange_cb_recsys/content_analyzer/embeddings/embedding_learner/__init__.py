@@ -1,5 +1,13 @@
-from .doc2vec import GensimDoc2Vec
-from .fasttext import GensimFastText
-from .latent_semantic_analysis import GensimLatentSemanticAnalysis
-from .random_indexing import GensimRandomIndexing
-from .word2vec import GensimWord2Vec
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+# gensim is imported only when a learner is first accessed
+_exports = {
+    'GensimDoc2Vec': '.doc2vec',
+    'GensimFastText': '.fasttext',
+    'GensimLatentSemanticAnalysis': '.latent_semantic_analysis',
+    'GensimRandomIndexing': '.random_indexing',
+    'GensimWord2Vec': '.word2vec',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -6,6 +6,8 @@ import numpy as np
 from orange_cb_recsys.content_analyzer.embeddings.embedding_source import \
     EmbeddingSource
 from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
+from orange_cb_recsys.content_analyzer.information_processor.parallel_processing import process_documents, \
+    check_preprocessing_parameters, DEFAULT_CHUNK_SIZE
 from orange_cb_recsys.content_analyzer.raw_information_source import RawInformationSource
 from orange_cb_recsys.utils.check_tokenization import check_tokenized, tokenize_in_sentences, check_not_tokenized
 from orange_cb_recsys.utils.const import logger
@@ -54,6 +56,9 @@ class EmbeddingLearner(EmbeddingSource):
 
         kwargs: arguments that you would pass to any of the models if using them from their original library (for
             example, you can pass "workers=4, min_count=1" to the FastText model)
+
+    The documents of the corpus are preprocessed by preprocessing_workers processes, preprocessing_chunk_size
+    documents at a time. By default they are preprocessed one at a time by the current process
     """
     def __init__(self, file_path: str, auto_save: bool, extension: str, **kwargs):
         # adds the extension related to the learner if the user didn't pass it
@@ -64,11 +69,37 @@ class EmbeddingLearner(EmbeddingSource):
 
         self.__auto_save = auto_save
         self.__additional_parameters = kwargs
+        self.__preprocessing_workers = 1
+        self.__preprocessing_chunk_size = DEFAULT_CHUNK_SIZE
 
     @property
     def additional_parameters(self):
         return self.__additional_parameters
 
+    @property
+    def preprocessing_workers(self) -> int:
+        """
+        Number of processes preprocessing the documents of the corpus
+        """
+        return self.__preprocessing_workers
+
+    @preprocessing_workers.setter
+    def preprocessing_workers(self, preprocessing_workers: int):
+        check_preprocessing_parameters(preprocessing_workers, self.__preprocessing_chunk_size)
+        self.__preprocessing_workers = preprocessing_workers
+
+    @property
+    def preprocessing_chunk_size(self) -> int:
+        """
+        Number of documents sent at once to a preprocessing process
+        """
+        return self.__preprocessing_chunk_size
+
+    @preprocessing_chunk_size.setter
+    def preprocessing_chunk_size(self, preprocessing_chunk_size: int):
+        check_preprocessing_parameters(self.__preprocessing_workers, preprocessing_chunk_size)
+        self.__preprocessing_chunk_size = preprocessing_chunk_size
+
     @abstractmethod
     def load_model(self):
         raise NotImplementedError
@@ -123,16 +154,19 @@ class EmbeddingLearner(EmbeddingSource):
         Returns:
             corpus (list): List of processed data
         """
+        def extract_documents():
+            # iter the source
+            for i, doc in enumerate(source):
+                logger.info("Document %d", i)
+                doc_data = ""
+                for field_name in field_list:
+                    doc_data += " " + doc[field_name].lower()
+                yield doc_data
+
         corpus = []
-        # iter the source
-        for i, doc in enumerate(source):
-            logger.info("Document %d", i)
-            doc_data = ""
-            for field_name in field_list:
-                # apply preprocessing and save the data in the list
-                doc_data += " " + doc[field_name].lower()
-            for preprocessor in preprocessor_list:
-                doc_data = preprocessor.process(doc_data)
+        # apply preprocessing and save the data in the list
+        for doc_data in process_documents(extract_documents(), preprocessor_list, self.__preprocessing_workers,
+                                          self.__preprocessing_chunk_size):
             corpus.append(self.process_data_granularity(doc_data))
         return corpus
 
@@ -1,3 +1,11 @@
-from .gensim import Gensim
-from .sbert import Sbert
-from .wiki2vec_loader import Wikipedia2VecLoader
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+# gensim, sentence_transformers and wikipedia2vec are imported only when the loader using them is first accessed
+_exports = {
+    'Gensim': '.gensim',
+    'Sbert': '.sbert',
+    'Wikipedia2VecLoader': '.wiki2vec_loader',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -2,6 +2,7 @@ from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.embedding_loa
 
 import gensim.downloader as downloader
 import numpy as np
+from typing import List
 
 
 class Gensim(WordEmbeddingLoader):
@@ -21,6 +22,24 @@ class Gensim(WordEmbeddingLoader):
     def get_embedding(self, word: str) -> np.ndarray:
         return self.model[word]
 
+    def get_embeddings(self, words: List[str]) -> np.ndarray:
+        """
+        Retrieves the vectors of all the words with a single lookup in the vectors matrix of the model, the rows of
+        the words that are not in the vocabulary are filled with 0
+        """
+        if hasattr(self.model, 'key_to_index'):
+            indices = [self.model.key_to_index.get(word, -1) for word in words]
+        else:
+            # gensim < 4 maps each word to its Vocab object, which keeps the row of the word
+            vocab = self.model.vocab
+            indices = [vocab[word].index if word in vocab else -1 for word in words]
+        indices = np.array(indices, dtype=np.int64)
+        in_vocabulary = indices != -1
+
+        embedding_matrix = np.zeros(shape=(len(words), self.get_vector_size()))
+        embedding_matrix[in_vocabulary] = self.model.vectors[indices[in_vocabulary]]
+        return embedding_matrix
+
     def load_model(self):
         # if the reference isn't in the possible models, FileNotFoundError is raised
         if self.reference in downloader.info()['models']:
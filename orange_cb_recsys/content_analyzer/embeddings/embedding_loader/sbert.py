@@ -2,6 +2,7 @@ from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.embedding_loa
 
 from sentence_transformers import SentenceTransformer
 import numpy as np
+from typing import List
 
 
 class Sbert(SentenceEmbeddingLoader):
@@ -11,10 +12,16 @@ class Sbert(SentenceEmbeddingLoader):
     Args:
         model_name_or_file_path (str): name of the embeddings model to download or path where the model is stored
             locally
+        batch_size (int): number of sentences encoded by the model at once
     """
 
-    def __init__(self, model_name_or_file_path: str = 'paraphrase-distilroberta-base-v1'):
+    def __init__(self, model_name_or_file_path: str = 'paraphrase-distilroberta-base-v1', batch_size: int = 32):
         super().__init__(model_name_or_file_path)
+        self.__batch_size = batch_size
+
+    @property
+    def batch_size(self) -> int:
+        return self.__batch_size
 
     def load_model(self):
         try:
@@ -28,6 +35,13 @@ class Sbert(SentenceEmbeddingLoader):
     def get_embedding(self, sentence: str) -> np.ndarray:
         return self.model.encode(sentence, show_progress_bar=False)
 
+    def get_embeddings(self, sentences: List[str]) -> np.ndarray:
+        """
+        Encodes all the sentences with a single call to the model, which processes them in batches of batch_size
+        """
+        return np.asarray(self.model.encode(sentences, batch_size=self.batch_size, show_progress_bar=False),
+                          dtype=np.float64)
+
     def __str__(self):
         return "Sbert"
 
@@ -72,6 +72,60 @@ class EmbeddingSource(ABC):
 
         return embedding_matrix
 
+    def load_batch(self, texts: List[List[str]]) -> List[np.ndarray]:
+        """
+        Function that extracts from the embeddings model the embedding matrix of each text passed as argument, in
+        the same way as the load function does for a single text. The vectors of the data of all the texts are
+        retrieved with a single call to get_embeddings (and the data that appears more than once is retrieved only
+        once), so that the sources able to process many data at once can do so
+
+        Args:
+            texts (List[List[str]]): list of texts from which the embedding matrices will be extracted
+
+        Returns:
+            embedding_matrices (List[np.ndarray]): list with the embedding matrix of each text
+        """
+        # position of each distinct data in the matrix returned by get_embeddings
+        data_positions = {}
+        for text in texts:
+            for data in text:
+                data_positions.setdefault(data.lower(), len(data_positions))
+
+        embeddings = self.get_embeddings(list(data_positions.keys())) if len(data_positions) != 0 else None
+
+        embedding_matrices = []
+        for text in texts:
+            if len(text) > 0:
+                embedding_matrices.append(embeddings[[data_positions[data.lower()] for data in text]])
+            else:
+                # If the text is empty (eg. "") then the embedding matrix is a matrix
+                # with 1 row filled with zeros
+                embedding_matrices.append(np.zeros(shape=(1, self.get_vector_size())))
+
+        return embedding_matrices
+
+    def get_embeddings(self, data_list: List[str]) -> np.ndarray:
+        """
+        Method to return the embedding vectors of the data passed as argument, one row for each data. If the model
+        can't return a vector for some data, the corresponding row is filled with 0.
+        By default get_embedding is called for each data, the sources that can retrieve many vectors at once
+        should override this method
+
+        Args:
+            data_list (List[str]): data whose embedding vectors will be returned
+
+        Returns:
+            embedding_matrix (np.ndarray): matrix with a row for each data
+        """
+        embedding_matrix = np.ndarray(shape=(len(data_list), self.get_vector_size()))
+        for i, data in enumerate(data_list):
+            try:
+                embedding_matrix[i, :] = self.get_embedding(data)
+            except KeyError:
+                embedding_matrix[i, :] = np.zeros(self.get_vector_size())
+
+        return embedding_matrix
+
     @abstractmethod
     def load_model(self):
         """
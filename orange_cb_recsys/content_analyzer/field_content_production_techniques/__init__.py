@@ -1,6 +1,22 @@
-from . import embedding_technique
+from orange_cb_recsys.utils.lazy_import import lazy_exports
 
-from .embedding_technique import *
-from .tf_idf import WhooshTfIdf, SkLearnTfIdf
-from .field_content_production_technique import OriginalData, DefaultTechnique
-from .synset_document_frequency import PyWSDSynsetDocumentFrequency
+# sklearn, whoosh and pywsd are imported only when the technique using them is first accessed
+_exports = {
+    'Centroid': '.embedding_technique',
+    'Sum': '.embedding_technique',
+    'WordEmbeddingTechnique': '.embedding_technique',
+    'SentenceEmbeddingTechnique': '.embedding_technique',
+    'DocumentEmbeddingTechnique': '.embedding_technique',
+    'FromWordsSentenceEmbeddingTechnique': '.embedding_technique',
+    'FromSentencesDocumentEmbeddingTechnique': '.embedding_technique',
+    'FromWordsDocumentEmbeddingTechnique': '.embedding_technique',
+
+    'WhooshTfIdf': '.tf_idf',
+    'SkLearnTfIdf': '.tf_idf',
+    'OriginalData': '.field_content_production_technique',
+    'DefaultTechnique': '.field_content_production_technique',
+    'PyWSDSynsetDocumentFrequency': '.synset_document_frequency',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -1,3 +1,15 @@
-from .combining_technique import Centroid, Sum
-from .embedding_technique import WordEmbeddingTechnique, SentenceEmbeddingTechnique, DocumentEmbeddingTechnique, \
-    FromWordsSentenceEmbeddingTechnique, FromSentencesDocumentEmbeddingTechnique, FromWordsDocumentEmbeddingTechnique
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+_exports = {
+    'Centroid': '.combining_technique',
+    'Sum': '.combining_technique',
+    'WordEmbeddingTechnique': '.embedding_technique',
+    'SentenceEmbeddingTechnique': '.embedding_technique',
+    'DocumentEmbeddingTechnique': '.embedding_technique',
+    'FromWordsSentenceEmbeddingTechnique': '.embedding_technique',
+    'FromSentencesDocumentEmbeddingTechnique': '.embedding_technique',
+    'FromWordsDocumentEmbeddingTechnique': '.embedding_technique',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -82,8 +82,6 @@ class EmbeddingTechnique(SingleContentTechnique):
 
     def produce_content(self, field_name: str, preprocessor_list: List[InformationProcessor],
                         source: RawInformationSource) -> List[FieldRepresentation]:
-        representation_list: List[FieldRepresentation] = []
-
         # if the embedding source is an EmbeddingLearner (meaning it can be trained) and the source has no model
         # the source is trained
         if isinstance(self.__embedding_source, EmbeddingLearner) and self.__embedding_source.model is None:
@@ -93,14 +91,7 @@ class EmbeddingTechnique(SingleContentTechnique):
                            "and the data will be processed with %s" % (field_name, preprocessor_list))
             self.__embedding_source.fit(source, [field_name], preprocessor_list)
 
-        # it iterates over all contents contained in the source in order to retrieve the raw data
-        # the data contained in the field_name is processed using each information processor in the processor_list
-        # the data is passed to the method that will create the single representation
-        for content_data in source:
-            processed_data = self.process_data(content_data[field_name], preprocessor_list)
-            representation_list.append(self.produce_single_repr(processed_data))
-
-        return representation_list
+        return super().produce_content(field_name, preprocessor_list, source)
 
     @abstractmethod
     def produce_single_repr(self, field_data: Union[List[str], str]) -> EmbeddingField:
@@ -144,6 +135,14 @@ class StandardEmbeddingTechnique(EmbeddingTechnique):
     def produce_single_repr(self, field_data: Union[List[str], str]) -> EmbeddingField:
         return EmbeddingField(self.embedding_source.load(self.process_data_granularity(field_data)))
 
+    def produce_batch_repr(self, field_data_list: List[Union[List[str], str]]) -> List[EmbeddingField]:
+        """
+        Loads the embedding matrices of the whole batch from the embedding source at once
+        """
+        embedding_matrices = self.embedding_source.load_batch(
+            [self.process_data_granularity(field_data) for field_data in field_data_list])
+        return [EmbeddingField(embedding_matrix) for embedding_matrix in embedding_matrices]
+
     @abstractmethod
     def process_data_granularity(self, field_data: Union[List[str], str]) -> List[str]:
         raise NotImplementedError
@@ -286,6 +285,27 @@ class CombiningSentenceEmbeddingTechnique(CombiningEmbeddingTechnique):
 
         return EmbeddingField(sentences_embeddings)
 
+    def produce_batch_repr(self, field_data_list: List[Union[List[str], str]]) -> List[EmbeddingField]:
+        """
+        Loads the embedding matrices of the sentences of the whole batch from the embedding source at once, then
+        combines each of them
+        """
+        # the sentences of each field data are processed together, keeping track of how many sentences each one has
+        sentences_list = [tokenize_in_sentences(field_data) for field_data in field_data_list]
+        sentence_matrices = self.embedding_source.load_batch(
+            [self.process_data_granularity(sentence) for sentences in sentences_list for sentence in sentences])
+
+        representation_list = []
+        position = 0
+        for sentences in sentences_list:
+            sentences_embeddings = np.ndarray(shape=(len(sentences), self.embedding_source.get_vector_size()))
+            for i in range(0, len(sentences)):
+                sentences_embeddings[i, :] = self.combining_technique.combine(sentence_matrices[position + i])
+            position += len(sentences)
+            representation_list.append(EmbeddingField(sentences_embeddings))
+
+        return representation_list
+
     @abstractmethod
     def process_data_granularity(self, field_data: Union[List[str], str]) -> List[str]:
         raise NotImplementedError
@@ -337,6 +357,14 @@ class CombiningDocumentEmbeddingTechnique(CombiningEmbeddingTechnique):
         doc_matrix = self.embedding_source.load(self.process_data_granularity(check_not_tokenized(field_data)))
         return EmbeddingField(self.combining_technique.combine(doc_matrix))
 
+    def produce_batch_repr(self, field_data_list: List[Union[List[str], str]]) -> List[EmbeddingField]:
+        """
+        Loads the embedding matrices of the whole batch from the embedding source at once, then combines each of them
+        """
+        doc_matrices = self.embedding_source.load_batch(
+            [self.process_data_granularity(check_not_tokenized(field_data)) for field_data in field_data_list])
+        return [EmbeddingField(self.combining_technique.combine(doc_matrix)) for doc_matrix in doc_matrices]
+
     @abstractmethod
     def process_data_granularity(self, data: Union[List[str], str]) -> List[str]:
         raise NotImplementedError
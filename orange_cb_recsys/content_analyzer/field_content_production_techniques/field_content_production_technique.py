@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Union, Callable
+from collections import Counter
+from typing import List, Union, Callable, Dict, Tuple, Iterable, Iterator
 
 import numpy as np
 import json
@@ -7,6 +8,9 @@ import json
 from orange_cb_recsys.content_analyzer.content_representation.content import FieldRepresentation, FeaturesBagField, \
     EmbeddingField, SimpleField
 from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
+from orange_cb_recsys.content_analyzer.information_processor.parallel_processing import process_documents, \
+    check_preprocessing_parameters, DEFAULT_CHUNK_SIZE
+from orange_cb_recsys.content_analyzer.information_processor.preprocessing_cache import get_preprocessing_scope
 from orange_cb_recsys.content_analyzer.raw_information_source import RawInformationSource
 from orange_cb_recsys.utils.check_tokenization import check_not_tokenized
 
@@ -18,10 +22,15 @@ class FieldContentProductionTechnique(ABC):
 
     The FieldContentProductionTechnique creates, for each given content's raw data, the field's representation for a
     specific field
+
+    The raw data of the contents is preprocessed by preprocessing_workers processes, preprocessing_chunk_size contents
+    at a time (see process_data_iter). By default it's preprocessed one content at a time by the current process
     """
 
     def __init__(self):
         self.__lang = "EN"
+        self.__preprocessing_workers = 1
+        self.__preprocessing_chunk_size = DEFAULT_CHUNK_SIZE
 
     @property
     def lang(self):
@@ -31,6 +40,30 @@ class FieldContentProductionTechnique(ABC):
     def lang(self, lang: str):
         self.__lang = lang
 
+    @property
+    def preprocessing_workers(self) -> int:
+        """
+        Number of processes preprocessing the raw data of the contents
+        """
+        return self.__preprocessing_workers
+
+    @preprocessing_workers.setter
+    def preprocessing_workers(self, preprocessing_workers: int):
+        check_preprocessing_parameters(preprocessing_workers, self.__preprocessing_chunk_size)
+        self.__preprocessing_workers = preprocessing_workers
+
+    @property
+    def preprocessing_chunk_size(self) -> int:
+        """
+        Number of contents sent at once to a preprocessing process
+        """
+        return self.__preprocessing_chunk_size
+
+    @preprocessing_chunk_size.setter
+    def preprocessing_chunk_size(self, preprocessing_chunk_size: int):
+        check_preprocessing_parameters(self.__preprocessing_workers, preprocessing_chunk_size)
+        self.__preprocessing_chunk_size = preprocessing_chunk_size
+
     @staticmethod
     def process_data(data: str, preprocessor_list: List[InformationProcessor]) -> Union[List[str], str]:
         """
@@ -51,6 +84,30 @@ class FieldContentProductionTechnique(ABC):
 
         return processed_data
 
+    def process_data_iter(self, data_iterable: Iterable[str],
+                          preprocessor_list: List[InformationProcessor]) -> Iterator[Union[List[str], str]]:
+        """
+        Processes each data in the iterable as process_data would do, yielding the processed data in the same order.
+        If preprocessing_workers is greater than 1, the data is processed in parallel by a pool of processes (so the
+        preprocessors must be picklable).
+
+        Inside a scope of a PreprocessingCache (opened by the ContentsProducer when more field configs of a field
+        share the same preprocessor list) the data already preprocessed is retrieved from the cache instead
+
+        Args:
+            data_iterable (Iterable[str]): data of the contents, for example the data of a field for each raw content
+                of a source
+            preprocessor_list (List[InformationProcessor]): list of preprocessors to apply to each data
+        """
+        def process(data: Iterable[str]) -> Iterator[Union[List[str], str]]:
+            return process_documents(data, preprocessor_list, self.__preprocessing_workers,
+                                     self.__preprocessing_chunk_size)
+
+        scope = get_preprocessing_scope()
+        if scope is None or len(preprocessor_list) == 0:
+            return process(data_iterable)
+        return scope.process(data_iterable, preprocessor_list, process)
+
     @abstractmethod
     def produce_content(self, field_name: str, preprocessor_list: List[InformationProcessor],
                         source: RawInformationSource) -> List[FieldRepresentation]:
@@ -101,10 +158,30 @@ class SingleContentTechnique(FieldContentProductionTechnique):
     Technique specialized in the production of representations that don't need any external information in order
     to be processed. This type of technique only considers the raw data within the content's field to create
     the complex representation
+
+    The representations are produced batch_size contents at a time by the produce_batch_repr method, so that the
+    techniques that can process many contents at once (for example by encoding them with a single call to a model)
+    can do so. By default produce_batch_repr just calls produce_single_repr for each content
     """
 
+    DEFAULT_BATCH_SIZE = 128
+
     def __init__(self):
         super().__init__()
+        self.__batch_size = SingleContentTechnique.DEFAULT_BATCH_SIZE
+
+    @property
+    def batch_size(self) -> int:
+        """
+        Number of contents whose representations are produced at once by the produce_batch_repr method
+        """
+        return self.__batch_size
+
+    @batch_size.setter
+    def batch_size(self, batch_size: int):
+        if batch_size <= 0:
+            raise ValueError("The batch size must be a positive number!")
+        self.__batch_size = batch_size
 
     def produce_content(self, field_name: str, preprocessor_list: List[InformationProcessor],
                         source: RawInformationSource) -> List[FieldRepresentation]:
@@ -118,13 +195,33 @@ class SingleContentTechnique(FieldContentProductionTechnique):
 
         # it iterates over all contents contained in the source in order to retrieve the raw data
         # the data contained in the field_name is processed using each information processor in the processor_list
-        # the data is passed to the method that will create the single representation
-        for content_data in source:
-            processed_data = self.process_data(content_data[field_name], preprocessor_list)
-            representation_list.append(self.produce_single_repr(processed_data))
+        # the data is passed, a batch at a time, to the method that will create the representations
+        batch = []
+        for processed_data in self.process_data_iter((content_data[field_name] for content_data in source),
+                                                     preprocessor_list):
+            batch.append(processed_data)
+            if len(batch) == self.__batch_size:
+                representation_list.extend(self.produce_batch_repr(batch))
+                batch = []
+        if len(batch) != 0:
+            representation_list.extend(self.produce_batch_repr(batch))
 
         return representation_list
 
+    def produce_batch_repr(self, field_data_list: List[Union[List[str], str]]) -> List[FieldRepresentation]:
+        """
+        This method creates the FieldRepresentation of each field data in the list passed as argument. The techniques
+        that can produce many representations more efficiently than one at a time should override it
+
+        Args:
+            field_data_list (List[Union[List[str], str]]): data contained in a specific field for each content of
+                the batch
+
+        Returns:
+            List[FieldRepresentation]: complex representations created using the field data, in the same order
+        """
+        return [self.produce_single_repr(field_data) for field_data in field_data_list]
+
     @abstractmethod
     def produce_single_repr(self, field_data: Union[List[str], str]) -> FieldRepresentation:
         """
@@ -145,6 +242,9 @@ class CollectionBasedTechnique(FieldContentProductionTechnique):
     Technique specialized in the production of representations that are in need of the entire collection in order
     to be processed. This type of technique performs a refactoring operation on the original dataset,
     so that each content in the collection is modified accordingly to the technique's needs
+
+    The representations of the refactored dataset are produced by the produce_batch_repr method, which by default
+    just calls produce_single_repr for each content position
     """
 
     def __init__(self):
@@ -163,18 +263,29 @@ class CollectionBasedTechnique(FieldContentProductionTechnique):
         # in this phase the data is also processed using the preprocessor_list
         dataset_len = self.dataset_refactor(source, field_name, preprocessor_list)
 
-        representation_list: List[FieldRepresentation] = []
-
-        # produces the representation, retrieving it from the dataset given the content's position in the refactored
-        # dataset
-        for i in range(0, dataset_len):
-            representation_list.append(self.produce_single_repr(i))
+        # produces the representations, retrieving them from the dataset given the contents' positions in the
+        # refactored dataset
+        representation_list = self.produce_batch_repr(list(range(0, dataset_len)))
 
         # once the operation is complete the refactored collection is deleted
         self.delete_refactored()
 
         return representation_list
 
+    def produce_batch_repr(self, content_positions: List[int]) -> List[FieldRepresentation]:
+        """
+        This method creates the FieldRepresentation of each content position in the list passed as argument, retrieving
+        them from the refactored dataset. The techniques that can retrieve many representations more efficiently than
+        one at a time should override it
+
+        Args:
+            content_positions (List[int]): positions of the contents in the refactored dataset
+
+        Returns:
+            List[FieldRepresentation]: representations of the contents, in the same order of the positions
+        """
+        return [self.produce_single_repr(content_position) for content_position in content_positions]
+
     @abstractmethod
     def produce_single_repr(self, content_position: int) -> FieldRepresentation:
         """
@@ -215,6 +326,47 @@ class CollectionBasedTechnique(FieldContentProductionTechnique):
         """
         raise NotImplementedError
 
+    @property
+    def supports_collection_statistics(self) -> bool:
+        """
+        True if the technique implements compute_collection_statistics, merge_collection_statistics and
+        set_collection_statistics, so that it can be used on a collection split in shards (see
+        ShardedContentAnalyzer). By default the collection based techniques can't
+        """
+        return False
+
+    def compute_collection_statistics(self, information_source: RawInformationSource, field_name: str,
+                                      preprocessor_list: List[InformationProcessor]):
+        """
+        Computes the statistics of the collection needed by the technique on the raw contents of the source. Used
+        when the collection is split in shards (see ShardedContentAnalyzer): the statistics of each shard are merged
+        with merge_collection_statistics and the result is set with set_collection_statistics, so that the
+        representations of the contents of each shard are produced with the statistics of the whole collection.
+        Only the techniques whose supports_collection_statistics property is True implement it, the others raise a
+        ValueError
+
+        Args:
+            information_source (RawInformationSource): source containing the raw data of the contents
+            field_name (str): field on which the statistics are computed
+            preprocessor_list (List[InformationProcessor]): list of preproccesors applied to the data in the field_name
+        """
+        raise ValueError("The technique {} can't be used on a collection split in shards!".format(self))
+
+    def merge_collection_statistics(self, statistics_list: list):
+        """
+        Merges the statistics computed by compute_collection_statistics on disjoint parts of the collection, returning
+        the statistics of the whole collection
+        """
+        raise ValueError("The technique {} can't be used on a collection split in shards!".format(self))
+
+    def set_collection_statistics(self, statistics):
+        """
+        Sets the statistics of the collection (returned by merge_collection_statistics) used by dataset_refactor in
+        place of the ones of the source it's called on. If statistics is None, the statistics of the source are used
+        again
+        """
+        raise ValueError("The technique {} can't be used on a collection split in shards!".format(self))
+
 
 class OriginalData(FieldContentProductionTechnique):
     """
@@ -238,8 +390,8 @@ class OriginalData(FieldContentProductionTechnique):
 
         representation_list: List[SimpleField] = []
 
-        for content_data in source:
-            processed_data = self.process_data(content_data[field_name], preprocessor_list)
+        for processed_data in self.process_data_iter((content_data[field_name] for content_data in source),
+                                                     preprocessor_list):
             representation_list.append(SimpleField(self.__dtype(check_not_tokenized(processed_data))))
 
         return representation_list
@@ -261,19 +413,18 @@ class DefaultTechnique(FieldContentProductionTechnique):
         """
         representation_list: List[FieldRepresentation] = []
 
-        for content_data in source:
-            # if a preprocessor is specified, then surely we must import the field data as a string,
-            # there's no other option
-            if len(preprocessor_list) != 0:
-                representation = SimpleField(check_not_tokenized(self.process_data(str(content_data[field_name]),
-                                                                                   preprocessor_list)))
+        # if a preprocessor is specified, then surely we must import the field data as a string,
+        # there's no other option
+        if len(preprocessor_list) != 0:
+            for processed_data in self.process_data_iter((str(content_data[field_name]) for content_data in source),
+                                                         preprocessor_list):
+                representation_list.append(SimpleField(check_not_tokenized(processed_data)))
 
-            # If a preprocessor isn't specified, well maybe it is a complex representation:
-            # let's decode what kind of complex representation it is and import it accordingly.
-            else:
-                representation = self.__decode_field_data(str(content_data[field_name]))
-
-            representation_list.append(representation)
+        # If a preprocessor isn't specified, well maybe it is a complex representation:
+        # let's decode what kind of complex representation it is and import it accordingly.
+        else:
+            for content_data in source:
+                representation_list.append(self.__decode_field_data(str(content_data[field_name])))
 
         return representation_list
 
@@ -327,11 +478,39 @@ class DefaultTechnique(FieldContentProductionTechnique):
 
 class TfIdfTechnique(CollectionBasedTechnique):
     """
-    Abstract class that generalizes the implementations that produce a Bag of words with tf-idf metric
+    Abstract class that generalizes the implementations that produce a Bag of words with tf-idf metric.
+
+    The statistics of the collection used by the tf-idf techniques are the tuple (number of documents, number of
+    documents containing each term), so the statistics of the shards of a collection are merged by summing them
     """
 
     def __init__(self):
         super().__init__()
+        self.__collection_statistics: Union[Tuple[int, Dict[str, int]], None] = None
+
+    @property
+    def supports_collection_statistics(self) -> bool:
+        return True
+
+    @property
+    def collection_statistics(self) -> Union[Tuple[int, Dict[str, int]], None]:
+        """
+        Statistics of the whole collection set with set_collection_statistics, None if the statistics are computed on
+        the source passed to dataset_refactor
+        """
+        return self.__collection_statistics
+
+    def merge_collection_statistics(self, statistics_list: List[Tuple[int, Dict[str, int]]]) \
+            -> Tuple[int, Dict[str, int]]:
+        doc_count = 0
+        doc_frequencies = Counter()
+        for shard_doc_count, shard_doc_frequencies in statistics_list:
+            doc_count += shard_doc_count
+            doc_frequencies.update(shard_doc_frequencies)
+        return doc_count, dict(doc_frequencies)
+
+    def set_collection_statistics(self, statistics: Union[Tuple[int, Dict[str, int]], None]):
+        self.__collection_statistics = statistics
 
     @abstractmethod
     def produce_single_repr(self, content_id: str):
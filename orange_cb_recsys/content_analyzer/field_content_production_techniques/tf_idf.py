@@ -1,7 +1,13 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from typing import List
+import tempfile
+from numbers import Integral
 
-from orange_cb_recsys.content_analyzer.content_representation.content import FeaturesBagField
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+from typing import Dict, List, Tuple, Union
+
+from orange_cb_recsys.content_analyzer.content_representation.content import FeaturesBagField, \
+    SparseFeaturesBagField, Vocabulary
 from orange_cb_recsys.content_analyzer.field_content_production_techniques.\
     field_content_production_technique import TfIdfTechnique
 from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
@@ -12,27 +18,83 @@ from orange_cb_recsys.utils.check_tokenization import check_tokenized, check_not
 
 class SkLearnTfIdf(TfIdfTechnique):
     """
-    Tf-idf computed using the sklearn library
+    Tf-idf computed using the sklearn library. The representations produced are SparseFeaturesBagField, which refer
+    to the vocabulary of the field instead of storing the terms.
+
+    The tf-idf matrix is kept in CSR format and the representations are read directly from its indptr, indices and
+    data arrays, all the rows in a single pass when the representations are produced in batch (see
+    produce_batch_repr).
+
+    The size of the vocabulary can be controlled with the parameters of the sklearn TfidfVectorizer, the
+    representations store the scores as float32 whatever the dtype of the matrix.
+
+    Args:
+        min_df (Union[int, float]): the terms contained in fewer documents (or in a smaller proportion of documents,
+            if it's a float) are ignored
+        max_df (Union[int, float]): the terms contained in more documents (or in a greater proportion of documents,
+            if it's a float) are ignored
+        max_features (int): if not None, only the max_features terms with the highest frequency in the corpus are
+            kept. It can't be used when the collection is split in shards
+        dtype (Union[type, str]): type of the tf-idf matrix computed while the field is produced, for example
+            np.float32 to halve its memory. It doesn't change the representations: their scores are cast to float32
+            even when the matrix is float64, so they are rounded to float32 precision in any case
     """
-    def __init__(self):
+    def __init__(self, min_df: Union[int, float] = 1, max_df: Union[int, float] = 1.0, max_features: int = None,
+                 dtype: Union[type, str] = np.float64):
         super().__init__()
+        self.__min_df = min_df
+        self.__max_df = max_df
+        self.__max_features = max_features
+        self.__dtype = np.dtype(dtype).type
         self.__corpus = []
         self.__tfidf_matrix = None
-        self.__feature_names = None
+        self.__vocabulary = None
 
-    def produce_single_repr(self, content_position: int) -> FeaturesBagField:
+    @property
+    def min_df(self) -> Union[int, float]:
+        return self.__min_df
+
+    @property
+    def max_df(self) -> Union[int, float]:
+        return self.__max_df
+
+    @property
+    def max_features(self) -> Union[int, None]:
+        return self.__max_features
+
+    @property
+    def dtype(self) -> type:
+        return self.__dtype
+
+    @property
+    def supports_collection_statistics(self) -> bool:
+        # the most frequent terms of the collection can't be known from the document frequencies of its shards
+        return self.__max_features is None
+
+    def produce_single_repr(self, content_position: int) -> SparseFeaturesBagField:
         """
         Retrieves the tf-idf values, for terms in document in the defined content_position,
         from the pre-computed word - document matrix.
         """
-        feature_index = self.__tfidf_matrix[content_position, :].nonzero()[1]
-        tfidf_scores = zip(feature_index, [self.__tfidf_matrix[content_position, x] for x in feature_index])
+        return self.produce_batch_repr([content_position])[0]
 
-        features = {}
-        for word, score in [(self.__feature_names[i], score) for (i, score) in tfidf_scores]:
-            features[word] = score
+    def produce_batch_repr(self, content_positions: List[int]) -> List[SparseFeaturesBagField]:
+        """
+        Retrieves the tf-idf values of the documents in the content positions, slicing the arrays of the CSR
+        matrix instead of indexing the matrix for each document
+        """
+        indptr = self.__tfidf_matrix.indptr
+        indices = self.__tfidf_matrix.indices
+        data = self.__tfidf_matrix.data
+        vocabulary = self.__vocabulary
 
-        return FeaturesBagField(features)
+        representations = []
+        for content_position in content_positions:
+            start, end = indptr[content_position], indptr[content_position + 1]
+            # the slices are copied, so that the representations don't keep the whole matrix in memory
+            representations.append(SparseFeaturesBagField(indices[start:end].copy(), data[start:end].copy(),
+                                                          vocabulary))
+        return representations
 
     def dataset_refactor(self, information_source: RawInformationSource, field_name: str,
                          preprocessor_list: List[InformationProcessor]) -> int:
@@ -40,49 +102,125 @@ class SkLearnTfIdf(TfIdfTechnique):
         Creates a corpus structure, a list of string where each string is a document.
         Then calls TfIdfVectorizer on this collection, obtaining term-document tf-idf matrix, the corpus is then deleted
         """
-        self.__corpus = []
+        self.__corpus = self.__build_corpus(information_source, field_name, preprocessor_list)
+
+        if self.collection_statistics is not None:
+            tfidf_matrix, terms = self.__collection_tfidf(self.__corpus)
+        else:
+            tf_vectorizer = TfidfVectorizer(sublinear_tf=True, min_df=self.__min_df, max_df=self.__max_df,
+                                            max_features=self.__max_features, dtype=self.__dtype)
+            tfidf_matrix = tf_vectorizer.fit_transform(self.__corpus)
+            terms = tf_vectorizer.get_feature_names_out().tolist()
+
+        del self.__corpus
 
-        for raw_content in information_source:
-            processed_field_data = self.process_data(raw_content[field_name], preprocessor_list)
+        # the matrix is converted once, so that the rows are read directly from its arrays
+        self.__tfidf_matrix = tfidf_matrix.tocsr()
+        self.__vocabulary = Vocabulary(terms)
 
+        return self.__tfidf_matrix.shape[0]
+
+    def __build_corpus(self, information_source: RawInformationSource, field_name: str,
+                       preprocessor_list: List[InformationProcessor]) -> List[str]:
+        corpus = []
+        for processed_field_data in self.process_data_iter(
+                (raw_content[field_name] for raw_content in information_source), preprocessor_list):
             processed_field_data = check_not_tokenized(processed_field_data)
-            self.__corpus.append(processed_field_data)
+            corpus.append(processed_field_data)
+        return corpus
+
+    def __collection_tfidf(self, corpus: List[str]):
+        """
+        Computes the tf-idf matrix of the corpus as TfidfVectorizer(sublinear_tf=True) would do, but with the idf of
+        the collection statistics, returning the matrix and the terms of its columns
+        """
+        doc_count, doc_frequencies = self.collection_statistics
+        # the terms are pruned as the TfidfVectorizer does, the document frequencies are the ones of the collection
+        max_doc_count = self.__max_df if isinstance(self.__max_df, Integral) else self.__max_df * doc_count
+        min_doc_count = self.__min_df if isinstance(self.__min_df, Integral) else self.__min_df * doc_count
+        terms = sorted(term for term, frequency in doc_frequencies.items()
+                       if min_doc_count <= frequency <= max_doc_count)
+        tfidf_matrix = CountVectorizer(vocabulary=terms).transform(corpus).astype(self.__dtype)
 
-        tf_vectorizer = TfidfVectorizer(sublinear_tf=True)
-        self.__tfidf_matrix = tf_vectorizer.fit_transform(self.__corpus)
+        tfidf_matrix.data = np.log(tfidf_matrix.data) + 1
+        frequencies = np.array([doc_frequencies[term] for term in terms], dtype=self.__dtype)
+        idf = np.log((1 + doc_count) / (1 + frequencies)) + 1
+        tfidf_matrix = tfidf_matrix.multiply(idf).tocsr()
 
-        del self.__corpus
+        return normalize(tfidf_matrix), terms
 
-        self.__feature_names = tf_vectorizer.get_feature_names()
+    def compute_collection_statistics(self, information_source: RawInformationSource, field_name: str,
+                                      preprocessor_list: List[InformationProcessor]) -> Tuple[int, Dict[str, int]]:
+        if not self.supports_collection_statistics:
+            raise ValueError("The technique {} can't be used on a collection split in shards when max_features is "
+                             "set!".format(self))
+        corpus = self.__build_corpus(information_source, field_name, preprocessor_list)
+        if len(corpus) == 0:
+            return 0, {}
 
-        return self.__tfidf_matrix.shape[0]
+        count_vectorizer = CountVectorizer()
+        try:
+            count_matrix = count_vectorizer.fit_transform(corpus).tocsc()
+        except ValueError:
+            # the documents of the shard contain only stop words
+            return len(corpus), {}
+
+        frequencies = np.diff(count_matrix.indptr)
+        doc_frequencies = {term: int(frequencies[column])
+                           for term, column in count_vectorizer.vocabulary_.items()}
+        return len(corpus), doc_frequencies
 
     def delete_refactored(self):
         del self.__tfidf_matrix
-        del self.__feature_names
+        del self.__vocabulary
 
     def __str__(self):
         return "SkLearnTfIdf"
 
     def __repr__(self):
-        return "< SkLearnTfIdf >"
+        return "< SkLearnTfIdf: min_df = " + str(self.__min_df) + "; max_df = " + str(self.__max_df) + \
+               "; max_features = " + str(self.__max_features) + "; dtype = " + self.__dtype.__name__ + " >"
 
 
 class WhooshTfIdf(TfIdfTechnique):
     """
     Class that produces a Bag of words with tf-idf metric using Whoosh
+
+    The processed data is saved in a temporary index, from which the representations of all the contents are then
+    retrieved in a single pass (see KeywordIndex.get_tf_idf_batch). The index can be kept in memory instead of in a
+    directory created under the current directory, which avoids the disk round-trips when the field data of the
+    collection fits in memory
+
+    Args:
+        in_memory (bool): if True, the temporary index is kept in memory
     """
 
-    def __init__(self):
+    def __init__(self, in_memory: bool = False):
         super().__init__()
+        self.__in_memory = in_memory
         self.__index = KeywordIndex('./frequency-index')
         self.__field_name = None
 
+    @property
+    def in_memory(self) -> bool:
+        return self.__in_memory
+
     def produce_single_repr(self, content_position: int) -> FeaturesBagField:
         """
         Retrieves the tf-idf value directly from the index
         """
-        return FeaturesBagField(self.__index.get_tf_idf(self.__field_name, content_position))
+        return self.produce_batch_repr([content_position])[0]
+
+    def produce_batch_repr(self, content_positions: List[int]) -> List[FeaturesBagField]:
+        """
+        Retrieves the tf-idf values of the contents in the content positions directly from the index, reading it
+        only once
+        """
+        doc_count, doc_frequencies = None, None
+        if self.collection_statistics is not None:
+            doc_count, doc_frequencies = self.collection_statistics
+        return [FeaturesBagField(words_bag) for words_bag in
+                self.__index.get_tf_idf_batch(self.__field_name, content_positions, doc_count, doc_frequencies)]
 
     def dataset_refactor(self, information_source: RawInformationSource, field_name: str,
                          preprocessor_list: List[InformationProcessor]):
@@ -90,13 +228,17 @@ class WhooshTfIdf(TfIdfTechnique):
         Saves the processed data in a index that will be used for frequency calculation
         """
         self.__field_name = field_name
-        self.__index = KeywordIndex('./' + field_name)
+        if self.__in_memory:
+            self.__index = KeywordIndex(field_name + '-frequency-index', in_memory=True)
+        else:
+            # each refactored dataset has its own directory, so that more techniques can refactor the same field at
+            # the same time (for example when the fields are processed by the ContentsProducer in parallel)
+            self.__index = KeywordIndex(tempfile.mkdtemp(prefix=field_name + '_', dir='.'))
         self.__index.init_writing(True)
         dataset_len = 0
-        for raw_content in information_source:
+        for processed_field_data in self.process_data_iter(
+                (raw_content[field_name] for raw_content in information_source), preprocessor_list):
             self.__index.new_content()
-            processed_field_data = self.process_data(raw_content[field_name], preprocessor_list)
-
             processed_field_data = check_tokenized(processed_field_data)
             self.__index.new_field(field_name, processed_field_data)
             self.__index.serialize_content()
@@ -106,6 +248,16 @@ class WhooshTfIdf(TfIdfTechnique):
 
         return dataset_len
 
+    def compute_collection_statistics(self, information_source: RawInformationSource, field_name: str,
+                                      preprocessor_list: List[InformationProcessor]) -> Tuple[int, Dict[str, int]]:
+        doc_count = self.dataset_refactor(information_source, field_name, preprocessor_list)
+        try:
+            if doc_count == 0:
+                return 0, {}
+            return self.__index.get_doc_frequencies(field_name)
+        finally:
+            self.delete_refactored()
+
     def delete_refactored(self):
         self.__index.delete()
 
@@ -113,4 +265,4 @@ class WhooshTfIdf(TfIdfTechnique):
         return "WhooshTfIdf"
 
     def __repr__(self):
-        return "< WhooshTfIdf >"
+        return "< WhooshTfIdf: in_memory = " + str(self.__in_memory) + " >"
@@ -1 +1,9 @@
-from .nlp import NLTK
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+# nltk is imported only when NLTK is first accessed
+_exports = {
+    'NLTK': '.nlp',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
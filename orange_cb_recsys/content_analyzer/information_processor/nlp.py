@@ -1,4 +1,5 @@
-from typing import List
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Set, Union
 
 import nltk
 
@@ -9,34 +10,43 @@ from nltk.corpus import wordnet
 from nltk.stem.snowball import SnowballStemmer
 
 from orange_cb_recsys.content_analyzer.information_processor.information_processor import NLP
-from orange_cb_recsys.utils.check_tokenization import check_not_tokenized
+from orange_cb_recsys.utils.check_tokenization import check_not_tokenized, check_nltk_resource
+
+# nltk resources used by the NLTK preprocessor, in the form (resource path, package downloaded if it's missing)
+NLTK_RESOURCES = [('corpora/stopwords', 'stopwords'), ('punkt', 'punkt'),
+                  ('averaged_perceptron_tagger', 'averaged_perceptron_tagger'), ('wordnet', 'wordnet'),
+                  ('maxent_ne_chunker', 'maxent_ne_chunker'), ('words', 'words')]
+
+
+class _MemoCache:
+    """
+    Bounded memo of the results of a function, the entries are evicted in least recently used order when their
+    number exceeds max_entries
+    """
+
+    def __init__(self, max_entries: int):
+        self.__max_entries = max_entries
+        self.__entries = OrderedDict()
+
+    def get(self, key: Hashable):
+        """
+        Returns the value memoized for the key, None if the key is not in the memo
+        """
+        value = self.__entries.get(key)
+        if value is not None:
+            self.__entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value):
+        self.__entries[key] = value
+        if len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.__entries)
 
 
 class NLTK(NLP):
-    try:
-        nltk.data.find('corpora/stopwords')
-    except LookupError:
-        nltk.download('stopwords')
-    try:
-        nltk.data.find('punkt')
-    except LookupError:
-        nltk.download('punkt')
-    try:
-        nltk.data.find('averaged_perceptron_tagger')
-    except LookupError:
-        nltk.download('averaged_perceptron_tagger')
-    try:
-        nltk.data.find('wordnet')
-    except LookupError:
-        nltk.download('wordnet')
-    try:
-        nltk.data.find('maxent_ne_chunker')
-    except LookupError:
-        nltk.download('maxent_ne_chunker')
-    try:
-        nltk.data.find('words')
-    except LookupError:
-        nltk.download('words')
     """
     Interface to the NLTK library for natural language processing features
 
@@ -46,7 +56,13 @@ class NLTK(NLP):
         lemmatization (bool): Whether you want to perform lemmatization
         strip_multiple_whitespaces (bool): Whether you want to remove multiple whitespaces
         url_tagging (bool): Whether you want to tag the urls in the text and to replace with "<URL>"
+
+    The stop words, the stemmer and the lemmatizer are created once per instance, the first time they are needed,
+    and the stems, the lemmas and the part of speech tags of the words are memoized (up to MEMO_MAX_ENTRIES
+    entries each), since the same words occur in many documents
     """
+    MEMO_MAX_ENTRIES = 100000
+
     def __init__(self, stopwords_removal: bool = False,
                  stemming: bool = False,
                  lemmatization: bool = False,
@@ -74,6 +90,26 @@ class NLTK(NLP):
                          strip_multiple_whitespaces, url_tagging)
 
         self.__full_lang_code = lang
+        self.__init_resources()
+
+    def __init_resources(self):
+        self.__stop_words: Union[Set[str], None] = None
+        self.__stemmer: Union[SnowballStemmer, None] = None
+        self.__lemmatizer: Union[WordNetLemmatizer, None] = None
+        self.__stem_memo = _MemoCache(self.MEMO_MAX_ENTRIES)
+        self.__lemma_memo = _MemoCache(self.MEMO_MAX_ENTRIES)
+        self.__pos_memo = _MemoCache(self.MEMO_MAX_ENTRIES)
+
+    def __getstate__(self):
+        # the resources and the memos are created again by each process the instance is sent to
+        state = self.__dict__.copy()
+        for attribute in ['__stop_words', '__stemmer', '__lemmatizer', '__stem_memo', '__lemma_memo', '__pos_memo']:
+            del state['_NLTK' + attribute]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__init_resources()
 
     def __str__(self):
         return "NLTK"
@@ -118,7 +154,9 @@ class NLTK(NLP):
         Returns:
             filtered_sentence (List<str>): list of words from the text, without the stopwords
         """
-        stop_words = set(stopwords.words(self.__full_lang_code))
+        if self.__stop_words is None:
+            self.__stop_words = set(stopwords.words(self.__full_lang_code))
+        stop_words = self.__stop_words
 
         filtered_sentence = []
         for word_token in text:
@@ -137,16 +175,43 @@ class NLTK(NLP):
         Returns:
             stemmed_text (List<str>): List of the fords from the text, reduced to their stem version
         """
-        stemmer = SnowballStemmer(language=self.__full_lang_code)
+        if self.__stemmer is None:
+            self.__stemmer = SnowballStemmer(language=self.__full_lang_code)
 
         stemmed_text = []
         for word in text:
-            stemmed_text.append(stemmer.stem(word))
+            stem = self.__stem_memo.get(word)
+            if stem is None:
+                stem = self.__stemmer.stem(word)
+                self.__stem_memo.put(word, stem)
+            stemmed_text.append(stem)
 
         return stemmed_text
 
-    @staticmethod
-    def __lemmatization_operation(text) -> List[str]:
+    def __get_wordnet_pos(self, text: List[str]) -> Dict[str, str]:
+        """
+        Maps each word of the text to the first character of its POS tag that lemmatize() accepts.
+        Each word is tagged on its own, as a sentence of a single word, so that the tag of a word doesn't depend on
+        the document: the words not memoized yet are tagged with a single call to the tagger
+        """
+        tag_dict = {"J": wordnet.ADJ,
+                    "N": wordnet.NOUN,
+                    "V": wordnet.VERB,
+                    "R": wordnet.ADV}
+
+        word_pos = {}
+        for word in text:
+            if word not in word_pos:
+                word_pos[word] = self.__pos_memo.get(word)
+        untagged = [word for word in word_pos if word_pos[word] is None]
+        if len(untagged) != 0:
+            for tagged_word in nltk.pos_tag_sents([[word] for word in untagged]):
+                word, tag = tagged_word[0]
+                word_pos[word] = tag_dict.get(tag[0].upper(), wordnet.NOUN)
+                self.__pos_memo.put(word, word_pos[word])
+        return word_pos
+
+    def __lemmatization_operation(self, text) -> List[str]:
         """
         Execute lemmatization on input text
 
@@ -156,22 +221,18 @@ class NLTK(NLP):
         Returns:
             lemmatized_text (List<str>): List of the fords from the text, reduced to their lemmatized version
         """
-        def get_wordnet_pos(word):
-            """
-            Map POS tag to first character lemmatize() accepts
-            """
-            tag = nltk.pos_tag([word])[0][1][0].upper()
-            tag_dict = {"J": wordnet.ADJ,
-                        "N": wordnet.NOUN,
-                        "V": wordnet.VERB,
-                        "R": wordnet.ADV}
-
-            return tag_dict.get(tag, wordnet.NOUN)
-
-        lemmatizer = WordNetLemmatizer()
+        if self.__lemmatizer is None:
+            self.__lemmatizer = WordNetLemmatizer()
+
+        word_pos = self.__get_wordnet_pos(text)
         lemmatized_text = []
         for word in text:
-            lemmatized_text.append(lemmatizer.lemmatize(word, get_wordnet_pos(word)))
+            key = (word, word_pos[word])
+            lemma = self.__lemma_memo.get(key)
+            if lemma is None:
+                lemma = self.__lemmatizer.lemmatize(word, word_pos[word])
+                self.__lemma_memo.put(key, lemma)
+            lemmatized_text.append(lemma)
         return lemmatized_text
 
     def __named_entity_recognition_operation(self, text) -> nltk.tree.Tree:
@@ -248,6 +309,8 @@ class NLTK(NLP):
         return text
 
     def process(self, field_data) -> List[str]:
+        for resource_path, package in NLTK_RESOURCES:
+            check_nltk_resource(resource_path, package)
         field_data = check_not_tokenized(field_data)
         if self.strip_multiple_whitespaces:
             field_data = self.__strip_multiple_whitespaces_operation(field_data)
@@ -0,0 +1,76 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Union
+
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
+
+DEFAULT_CHUNK_SIZE = 64
+
+# preprocessor list of the current worker process, set once by the initializer of the pool
+_worker_preprocessor_list: List[InformationProcessor] = []
+
+
+def _init_worker(preprocessor_list: List[InformationProcessor]):
+    global _worker_preprocessor_list
+    _worker_preprocessor_list = preprocessor_list
+
+
+def _apply_preprocessors(data, preprocessor_list: List[InformationProcessor]) -> Union[List[str], str]:
+    for preprocessor in preprocessor_list:
+        data = preprocessor.process(data)
+    return data
+
+
+def _process_chunk(chunk: list) -> list:
+    return [_apply_preprocessors(data, _worker_preprocessor_list) for data in chunk]
+
+
+def check_preprocessing_parameters(n_workers: int, chunk_size: int):
+    """
+    Raises a ValueError if the number of workers or the chunk size of the parallel preprocessing are not valid
+    """
+    if n_workers < 1:
+        raise ValueError("The number of preprocessing workers must be a positive number!")
+    if chunk_size < 1:
+        raise ValueError("The preprocessing chunk size must be a positive number!")
+
+
+def process_documents(documents: Iterable, preprocessor_list: List[InformationProcessor], n_workers: int = 1,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Union[List[str], str]]:
+    """
+    Applies the preprocessor list to each document, yielding the processed documents in the same order of the
+    documents passed as argument.
+
+    If n_workers is greater than 1 the documents are processed by a pool of n_workers processes, chunk_size documents
+    at a time. The preprocessor list is sent to each worker once, when the pool is created, instead of once for each
+    document (so the preprocessors must be picklable). Only a few chunks for each worker are submitted ahead of the
+    ones being yielded, so the documents can be a lazy iterable whose size doesn't fit in memory
+
+    Args:
+        documents (Iterable): raw data of the documents to process
+        preprocessor_list (List[InformationProcessor]): preprocessors applied, in order, to each document
+        n_workers (int): number of processes preprocessing the documents
+        chunk_size (int): number of documents sent at once to a worker
+    """
+    check_preprocessing_parameters(n_workers, chunk_size)
+
+    # without preprocessors there's nothing worth sending to the workers
+    if n_workers == 1 or len(preprocessor_list) == 0:
+        for data in documents:
+            yield _apply_preprocessors(data, preprocessor_list)
+        return
+
+    documents = iter(documents)
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(preprocessor_list,)) as executor:
+        pending = deque()
+        while True:
+            chunk = list(islice(documents, chunk_size))
+            if len(chunk) == 0:
+                break
+            pending.append(executor.submit(_process_chunk, chunk))
+            if len(pending) > 2 * n_workers:
+                yield from pending.popleft().result()
+        while len(pending) != 0:
+            yield from pending.popleft().result()
@@ -0,0 +1,267 @@
+import os
+import pickle
+import re
+import shutil
+import sys
+import tempfile
+import weakref
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Union
+
+import numpy as np
+
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
+
+# scope of the cache used by the preprocessing of the current process, set by PreprocessingCache.scope
+_active_scope: Union['_PreprocessingScope', None] = None
+
+# marks the keys not in the cache, since None could be a preprocessed value
+_MISSING = object()
+
+# tag of the values stored as token ids and of the ones stored as they are
+_TOKENS = 0
+_OBJECT = 1
+
+
+def preprocessor_chain_signature(preprocessor_list: List[InformationProcessor]) -> str:
+    """
+    Returns a canonical signature of the preprocessor list, equal for two lists that process the data in the same
+    way. The signature of each preprocessor is made of its class, its repr and its attributes with a simple value
+    (the attributes keeping resources or memos, which don't change the result, are ignored)
+    """
+    signatures = []
+    for preprocessor in preprocessor_list:
+        attributes = sorted((name, repr(value)) for name, value in vars(preprocessor).items()
+                            if isinstance(value, (str, int, float, bool, type(None))))
+        # the memory address in the default repr of the objects would change the signature of equal preprocessors
+        preprocessor_repr = re.sub(r' at 0x[0-9a-fA-F]+', '', repr(preprocessor))
+        signatures.append(repr((type(preprocessor).__module__, type(preprocessor).__qualname__, preprocessor_repr,
+                                attributes)))
+    return "[" + ", ".join(signatures) + "]"
+
+
+def get_preprocessing_scope() -> Union['_PreprocessingScope', None]:
+    """
+    Returns the scope of the cache that the preprocessing of the current process must use, None if the preprocessed
+    data is not cached
+    """
+    return _active_scope
+
+
+class PreprocessingCache:
+    """
+    Cache of the preprocessed data of the contents, used during a content analysis so that the field configs of the
+    same field with the same preprocessor list (for example NLTK with lemmatization feeding both a tf-idf and an
+    embedding technique) preprocess the raw data only once. Each preprocessed data is identified by the tuple
+    (field name, signature of the preprocessor list, position of the content in the source).
+
+    The preprocessed data which is a list of tokens is stored as an array of token ids, each distinct token being
+    kept only once. The entries are kept in memory as long as their size is below memory_budget, the oldest entries
+    are then moved in a file of the directory passed as argument (a temporary directory if None, deleted with the
+    cache) and read back when requested.
+
+    The techniques use the cache through process_data_iter, only while a scope of the cache is active (see the scope
+    method)
+
+    Args:
+        memory_budget (int): maximum size in bytes of the entries kept in memory (the tokens themselves are not
+            counted)
+        directory (str): directory where the entries are stored if they don't fit in the memory budget
+    """
+
+    BLOCK_SIZE = 1024
+
+    def __init__(self, memory_budget: int = 256 * 1024 ** 2, directory: str = None):
+        if memory_budget < 0:
+            raise ValueError("The memory budget can't be negative!")
+        self.__memory_budget = memory_budget
+        self.__directory = directory
+
+        # ids of the tokens and tokens of each id
+        self.__token_ids: Dict[str, int] = {}
+        self.__tokens: List[str] = []
+        # entries in memory, in insertion order, and their size
+        self.__entries: Dict[Hashable, tuple] = {}
+        self.__entry_sizes: Dict[Hashable, int] = {}
+        self.__memory_size = 0
+        # offset in the file of the entries on disk
+        self.__offsets: Dict[Hashable, int] = {}
+        self.__file = None
+
+    @property
+    def on_disk(self) -> bool:
+        """
+        True if some entries have been moved on disk since they didn't fit in the memory budget
+        """
+        return len(self.__offsets) != 0
+
+    def __len__(self):
+        return len(self.__entries) + len(self.__offsets)
+
+    def __encode(self, value) -> tuple:
+        if isinstance(value, list) and all(isinstance(token, str) for token in value):
+            token_ids = self.__token_ids
+            ids = np.empty(len(value), dtype=np.int32)
+            for i, token in enumerate(value):
+                token_id = token_ids.get(token)
+                if token_id is None:
+                    token_id = len(self.__tokens)
+                    token_ids[token] = token_id
+                    self.__tokens.append(sys.intern(token))
+                ids[i] = token_id
+            return _TOKENS, ids
+        return _OBJECT, value
+
+    def __decode(self, entry: tuple):
+        tag, data = entry
+        if tag == _TOKENS:
+            tokens = self.__tokens
+            return [tokens[token_id] for token_id in data.tolist()]
+        return data
+
+    @staticmethod
+    def __entry_size(entry: tuple) -> int:
+        tag, data = entry
+        if tag == _TOKENS:
+            return sys.getsizeof(data)
+        return len(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+    def get(self, key: Hashable, default=None):
+        """
+        Returns the preprocessed data of the key (the tuple (field name, signature, position)), default if the key
+        is not in the cache. Each call returns a new list of tokens
+        """
+        entry = self.__entries.get(key)
+        if entry is None:
+            offset = self.__offsets.get(key)
+            if offset is None:
+                return default
+            self.__file.seek(offset)
+            entry = pickle.load(self.__file)
+        return self.__decode(entry)
+
+    def put(self, key: Hashable, value):
+        """
+        Stores the preprocessed data of the key (the tuple (field name, signature, position))
+        """
+        entry = self.__encode(value)
+        self.__discard(key)
+        self.__entries[key] = entry
+        self.__entry_sizes[key] = self.__entry_size(entry)
+        self.__memory_size += self.__entry_sizes[key]
+        if self.__memory_size > self.__memory_budget:
+            self.__spill()
+
+    def __discard(self, key: Hashable):
+        if key in self.__entries:
+            del self.__entries[key]
+            self.__memory_size -= self.__entry_sizes.pop(key)
+        self.__offsets.pop(key, None)
+
+    def __spill(self):
+        """
+        Moves the oldest entries on disk until the size of the entries in memory is within the memory budget
+        """
+        if self.__file is None:
+            if self.__directory is None:
+                self.__directory = tempfile.mkdtemp(prefix='preprocessing_cache_')
+                weakref.finalize(self, shutil.rmtree, self.__directory, True)
+            else:
+                os.makedirs(self.__directory, exist_ok=True)
+            entries_file = open(os.path.join(self.__directory, 'entries.bin'), 'w+b')
+            weakref.finalize(self, entries_file.close)
+            self.__file = entries_file
+
+        self.__file.seek(0, os.SEEK_END)
+        while self.__memory_size > self.__memory_budget:
+            key = next(iter(self.__entries))
+            self.__offsets[key] = self.__file.tell()
+            pickle.dump(self.__entries.pop(key), self.__file, pickle.HIGHEST_PROTOCOL)
+            self.__memory_size -= self.__entry_sizes.pop(key)
+        self.__file.flush()
+
+    def close(self):
+        """
+        Empties the cache, removing the file of the entries on disk
+        """
+        self.__entries.clear()
+        self.__entry_sizes.clear()
+        self.__offsets.clear()
+        self.__token_ids.clear()
+        self.__tokens.clear()
+        self.__memory_size = 0
+        if self.__file is not None:
+            self.__file.close()
+            os.remove(self.__file.name)
+            self.__file = None
+
+    @contextmanager
+    def scope(self, field_name: str, positions: List[int] = None):
+        """
+        Context manager in which the preprocessing of the current process (done by process_data_iter) uses the cache
+        for the data of the field passed as argument. The i-th data preprocessed in the scope is the data of the
+        content in the i-th of the positions passed as argument (in the i-th position if positions is None)
+
+        Args:
+            field_name (str): name of the field whose data is preprocessed in the scope
+            positions (List[int]): positions in the source of the contents whose data is preprocessed
+        """
+        global _active_scope
+        previous_scope = _active_scope
+        _active_scope = _PreprocessingScope(self, field_name, positions)
+        try:
+            yield _active_scope
+        finally:
+            _active_scope = previous_scope
+
+    def __str__(self):
+        return "PreprocessingCache"
+
+    def __repr__(self):
+        return "< PreprocessingCache: memory_budget = " + str(self.__memory_budget) + "; entries = " + \
+               str(len(self)) + " >"
+
+
+class _PreprocessingScope:
+    """
+    Scope of a PreprocessingCache for the data of a field, see PreprocessingCache.scope
+    """
+
+    def __init__(self, cache: PreprocessingCache, field_name: str, positions: Union[List[int], None]):
+        self.__cache = cache
+        self.__field_name = field_name
+        self.__positions = positions
+
+    def process(self, data_iterable: Iterable, preprocessor_list: List[InformationProcessor],
+                process_function: Callable[[Iterable], Iterator]) -> Iterator:
+        """
+        Yields the preprocessed data of each data in the iterable, in the same order. The data in the cache is
+        retrieved, the other data is preprocessed (a block at a time) with the process_function and cached
+
+        Args:
+            data_iterable (Iterable): data of the field for each content
+            preprocessor_list (List[InformationProcessor]): preprocessors applied to the data
+            process_function (Callable): function that preprocesses an iterable of data with the preprocessor list,
+                yielding the results in order
+        """
+        signature = preprocessor_chain_signature(preprocessor_list)
+        data_iterator = iter(data_iterable)
+        start = 0
+        while True:
+            block = list(islice(data_iterator, PreprocessingCache.BLOCK_SIZE))
+            if len(block) == 0:
+                break
+
+            keys = [(self.__field_name, signature,
+                     self.__positions[start + i] if self.__positions is not None else start + i)
+                    for i in range(len(block))]
+            results = [self.__cache.get(key, _MISSING) for key in keys]
+            missing = [i for i, result in enumerate(results) if result is _MISSING]
+            if len(missing) != 0:
+                for i, processed_data in zip(missing, process_function(block[i] for i in missing)):
+                    self.__cache.put(keys[i], processed_data)
+                    results[i] = processed_data
+
+            yield from results
+            start += len(block)
@@ -1 +1,10 @@
-from .text_interface import KeywordIndex, SearchIndex
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+# whoosh is imported only when an index is first accessed
+_exports = {
+    'KeywordIndex': '.text_interface',
+    'SearchIndex': '.text_interface',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -47,6 +47,24 @@ class InformationInterface(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def update_content(self):
+        """
+        Add to the serialized collection the current item, replacing the item with the same content_id if it was
+        already serialized
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_content(self, content_id: str):
+        """
+        Removes from the serialized collection the item with the content_id passed as argument
+
+        Args:
+            content_id (str): id of the content to remove
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def init_writing(self, delete_old: bool = False):
         """
@@ -104,6 +122,14 @@ class ImageInterface(InformationInterface):
     def serialize_content(self):
         raise NotImplementedError
 
+    @abstractmethod
+    def update_content(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_content(self, content_id: str):
+        raise NotImplementedError
+
     @abstractmethod
     def init_writing(self, delete_old: bool = False):
         raise NotImplementedError
@@ -134,6 +160,14 @@ class AudioInterface(InformationInterface):
     def serialize_content(self):
         raise NotImplementedError
 
+    @abstractmethod
+    def update_content(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_content(self, content_id: str):
+        raise NotImplementedError
+
     @abstractmethod
     def init_writing(self, delete_old: bool = False):
         raise NotImplementedError
@@ -163,6 +197,14 @@ class TextInterface(InformationInterface):
     def serialize_content(self):
         raise NotImplementedError
 
+    @abstractmethod
+    def update_content(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_content(self, content_id: str):
+        raise NotImplementedError
+
     @abstractmethod
     def init_writing(self, delete_old: bool = False):
         raise NotImplementedError
@@ -1,13 +1,14 @@
 import os
 
 from whoosh.analysis import SimpleAnalyzer
-from whoosh.fields import Schema, TEXT, KEYWORD
+from whoosh.filedb.filestore import RamStorage
+from whoosh.fields import Schema, TEXT, KEYWORD, ID
 from whoosh.index import create_in, open_dir
 from whoosh.formats import Frequency
 from whoosh.qparser import QueryParser, OrGroup, FieldsPlugin
 from whoosh.query import Term, Or
 from whoosh.scoring import TF_IDF, BM25F
-from typing import Union
+from typing import Dict, List, Tuple, Union
 
 from orange_cb_recsys.content_analyzer.memory_interfaces.memory_interfaces import TextInterface
 import math
@@ -19,17 +20,61 @@ class IndexInterface(TextInterface):
     Abstract class that takes care of serializing and deserializing text in an indexed structure
     using the Whoosh library
 
+    The index can also be kept in memory (in a Whoosh RamStorage) instead of in the directory, for the short lived
+    indexes that are deleted once they are read (such as the one of the WhooshTfIdf technique): in this case the
+    directory is just the name of the index, and the index is not kept when the interface is pickled
+
     Args:
         directory (str): Path of the directory where the content will be serialized
+        in_memory (bool): if True, the index is kept in memory instead of in the directory
     """
 
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, in_memory: bool = False):
         super().__init__(directory)
+        self.__in_memory = in_memory
+        self.__ram_storage = None  # storage of the index if it's kept in memory
         self.__doc = None  # document that is currently being created and will be added to the index
         self.__writer = None  # index writer
         self.__doc_index = 0  # current position the document will have in the index once it is serialized
         self.__schema_changed = False  # true if the schema has been changed, false otherwise
 
+    @property
+    def in_memory(self) -> bool:
+        return self.__in_memory
+
+    def __getstate__(self):
+        # the in memory index can't be pickled
+        state = self.__dict__.copy()
+        state['_IndexInterface__ram_storage'] = None
+        return state
+
+    def __index_exists(self) -> bool:
+        if self.__in_memory:
+            return self.__ram_storage is not None
+        return os.path.exists(self.directory)
+
+    def __create_index(self):
+        """
+        Creates an empty index, replacing the one that already exists
+        """
+        self.delete()
+        if self.__in_memory:
+            self.__ram_storage = RamStorage()
+            return self.__ram_storage.create_index(Schema())
+        os.mkdir(self.directory)
+        return create_in(self.directory, Schema())
+
+    def __open_index(self):
+        if self.__in_memory:
+            return self.__ram_storage.open_index()
+        return open_dir(self.directory)
+
+    def delete(self):
+        if self.__in_memory:
+            self.__ram_storage = None
+        else:
+            super().delete()
+
     @property
     @abc.abstractmethod
     def schema_type(self):
@@ -49,19 +94,12 @@ class IndexInterface(TextInterface):
             delete_old (bool): if True, the index that was in the same directory is destroyed and replaced;
                 if False, the index is simply opened
         """
-        if os.path.exists(self.directory):
-            if delete_old:
-                self.delete()
-                os.mkdir(self.directory)
-                ix = create_in(self.directory, Schema())
-                self.__writer = ix.writer()
-            else:
-                ix = open_dir(self.directory)
-                self.__writer = ix.writer()
-                self.__doc_index = self.__writer.reader().doc_count()
+        if self.__index_exists() and not delete_old:
+            ix = self.__open_index()
+            self.__writer = ix.writer()
+            self.__doc_index = self.__writer.reader().doc_count()
         else:
-            os.mkdir(self.directory)
-            ix = create_in(self.directory, Schema())
+            ix = self.__create_index()
             self.__writer = ix.writer()
 
     def new_content(self):
@@ -80,8 +118,13 @@ class IndexInterface(TextInterface):
             field_name (str): Name of the new field
             field_data: Data to put into the field
         """
-        if field_name not in open_dir(self.directory).schema.names():
-            self.__writer.add_field(field_name, self.schema_type)
+        # the schema of the writer includes the fields added since the index was opened, so the index isn't opened
+        # again for each field
+        if field_name not in self.__writer.schema.names():
+            # the content_id is stored as a single unique term, so that the documents can be updated and deleted
+            # by their id
+            field_type = ID(stored=True, unique=True) if field_name == "content_id" else self.schema_type
+            self.__writer.add_field(field_name, field_type)
             self.__schema_changed = True
         self.__doc[field_name] = field_data
 
@@ -91,20 +134,44 @@ class IndexInterface(TextInterface):
         before adding the document to the index. Once the document is indexed, it can be deleted from the IndexInterface
         and the document position in the index is returned
         """
-        if self.__schema_changed:
-            self.__writer.commit()
-            self.__writer = open_dir(self.directory).writer()
-            self.__schema_changed = False
+        self.__commit_schema()
         self.__writer.add_document(**self.__doc)
         del self.__doc
         self.__doc_index += 1
         return self.__doc_index - 1
 
+    def update_content(self):
+        """
+        Serializes the content in the index, replacing the document with the same content_id if it was already
+        indexed. Since the replaced document is deleted and the new one is added at the end of the index, the
+        positions of the documents change, so the updated documents should be retrieved by their content_id
+        """
+        self.__commit_schema()
+        self.__writer.update_document(**self.__doc)
+        del self.__doc
+
+    def delete_content(self, content_id: str):
+        """
+        Deletes from the index the document with the content_id passed as argument
+        """
+        self.__writer.delete_by_term("content_id", content_id)
+
+    def __commit_schema(self):
+        """
+        If the schema changed, commits the changes to the schema so that the documents with the new fields can be added
+        """
+        if self.__schema_changed:
+            self.__writer.commit(merge=False)
+            self.__writer = self.__open_index().writer()
+            self.__schema_changed = False
+
     def stop_writing(self):
         """
-        Stops the index writer and commits the operations
+        Stops the index writer and commits the operations.
+        The segments are not merged, since Whoosh would move the documents of the merged segments after the ones
+        added by the writer, changing their position in the index (which is used by the IndexField representations)
         """
-        self.__writer.commit()
+        self.__writer.commit(merge=False)
         del self.__writer
 
     def get_field(self, field_name: str, content_id: Union[str, int]) -> str:
@@ -119,7 +186,7 @@ class IndexInterface(TextInterface):
         Returns:
             result: data contained in the field of the content
         """
-        ix = open_dir(self.directory)
+        ix = self.__open_index()
         with ix.searcher() as searcher:
             if isinstance(content_id, str):
                 query = Term("content_id", content_id)
@@ -156,7 +223,7 @@ class IndexInterface(TextInterface):
                 external dictionary
                 items_score is the score given to the item for the query by the index searcher
         """
-        ix = open_dir(self.directory)
+        ix = self.__open_index()
         with ix.searcher(weighting=TF_IDF if classic_similarity else BM25F) as searcher:
             candidate_query_list = None
             mask_query_list = None
@@ -199,22 +266,39 @@ class IndexInterface(TextInterface):
                 results[content_id]["score"] = hit.score
             return results
 
-    def get_tf_idf(self, field_name: str, content_id: Union[str, int]):
+    def get_doc_frequencies(self, field_name: str) -> Tuple[int, Dict[str, int]]:
+        """
+        Returns the number of documents in the index and, for each term in the field passed as argument, the number
+        of documents containing it
+        """
+        ix = self.__open_index()
+        with ix.searcher() as searcher:
+            reader = searcher.reader()
+            doc_frequencies = {term: reader.doc_frequency(field_name, term)
+                               for term in reader.field_terms(field_name)}
+            return searcher.doc_count(), doc_frequencies
+
+    def get_tf_idf(self, field_name: str, content_id: Union[str, int], doc_count: int = None,
+                   doc_frequencies: Dict[str, int] = None):
         """
         Calculates the tf-idf for the words contained in the field of the content whose id
         is content_id (if it is a string) or in the given position (if it is an integer).
         The tf-idf computation formula is: tf-idf = (1 + log10(tf)) * log10(idf)
 
+        If doc_count and doc_frequencies are defined, the idf is computed with them instead of the ones of the index
+        (for example when the index contains only a shard of the collection, see get_doc_frequencies)
+
         Args:
             field_name (str): Name of the field containing the words for which calculate the tf-idf
             content_id (Union[str, int]): either the position or Id of the content that contains the specified field
+            doc_count (int): number of documents in the collection
+            doc_frequencies (Dict[str, int]): number of documents of the collection containing each term
 
         Returns:
              words_bag (Dict <str, float>): Dictionary whose keys are the words contained in the field,
                 and the corresponding values are the tf-idf values
         """
-        ix = open_dir(self.directory)
-        words_bag = {}
+        ix = self.__open_index()
         with ix.searcher() as searcher:
             if isinstance(content_id, str):
                 query = Term("content_id", content_id)
@@ -222,15 +306,56 @@ class IndexInterface(TextInterface):
             elif isinstance(content_id, int):
                 doc_num = content_id
 
-            # if the document has the field == "" (length == 0) then the bag of word is empty
-            if len(searcher.ixreader.stored_fields(doc_num)[field_name]) > 0:
-                # retrieves the frequency vector (used for tf)
-                list_with_freq = [term_with_freq for term_with_freq
-                                  in searcher.vector(doc_num, field_name).items_as("frequency")]
-                for term, freq in list_with_freq:
-                    tf = 1 + math.log10(freq)
-                    idf = math.log10(searcher.doc_count()/searcher.doc_frequency(field_name, term))
-                    words_bag[term] = tf*idf
+            return self.__tf_idf(searcher.reader(), field_name, doc_num, doc_count, doc_frequencies, {})
+
+    def get_tf_idf_batch(self, field_name: str, positions: List[int], doc_count: int = None,
+                         doc_frequencies: Dict[str, int] = None) -> List[Dict[str, float]]:
+        """
+        Calculates the tf-idf for the words contained in the field of the contents in the given positions, as
+        get_tf_idf does for a single content. The index is opened once and a single reader walks the term vectors of
+        every document, the frequency of each term in the index being retrieved only the first time it's needed
+
+        Args:
+            field_name (str): Name of the field containing the words for which calculate the tf-idf
+            positions (List[int]): positions of the contents in the index
+            doc_count (int): number of documents in the collection
+            doc_frequencies (Dict[str, int]): number of documents of the collection containing each term
+
+        Returns:
+             words_bags (List[Dict <str, float>]): the words bag of each content, in the same order of the positions
+        """
+        ix = self.__open_index()
+        with ix.reader() as reader:
+            index_doc_frequencies = {}
+            return [self.__tf_idf(reader, field_name, position, doc_count, doc_frequencies, index_doc_frequencies)
+                    for position in positions]
+
+    @staticmethod
+    def __tf_idf(reader, field_name: str, doc_num: int, doc_count: Union[int, None],
+                 doc_frequencies: Union[Dict[str, int], None], index_doc_frequencies: Dict[str, int]) \
+            -> Dict[str, float]:
+        """
+        Computes the tf-idf of the words in the field of the document with the reader passed as argument. The
+        frequencies of the terms in the index are cached in index_doc_frequencies
+        """
+        words_bag = {}
+        # if the document has the field == "" (length == 0) then there's no frequency vector and the bag of word is
+        # empty
+        if reader.has_vector(doc_num, field_name):
+            if doc_frequencies is None:
+                doc_count = reader.doc_count()
+            # retrieves the frequency vector (used for tf)
+            for term, freq in reader.vector(doc_num, field_name).items_as("frequency"):
+                tf = 1 + math.log10(freq)
+                if doc_frequencies is not None:
+                    idf = math.log10(doc_count/doc_frequencies[term])
+                else:
+                    term_frequency = index_doc_frequencies.get(term)
+                    if term_frequency is None:
+                        term_frequency = reader.doc_frequency(field_name, term)
+                        index_doc_frequencies[term] = term_frequency
+                    idf = math.log10(doc_count/term_frequency)
+                words_bag[term] = tf*idf
         return words_bag
 
 
@@ -241,8 +366,8 @@ class KeywordIndex(IndexInterface):
     "content_id" field data containing white spaces
     """
 
-    def __init__(self, directory: str):
-        super().__init__(directory)
+    def __init__(self, directory: str, in_memory: bool = False):
+        super().__init__(directory, in_memory)
 
     @property
     def schema_type(self):
@@ -261,8 +386,8 @@ class SearchIndex(IndexInterface):
     much as the original as possible
     """
 
-    def __init__(self, directory: str):
-        super().__init__(directory)
+    def __init__(self, directory: str, in_memory: bool = False):
+        super().__init__(directory, in_memory)
 
     @property
     def schema_type(self):
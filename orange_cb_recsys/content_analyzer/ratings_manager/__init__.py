@@ -1,3 +1,11 @@
-from .rating_processor import NumberNormalizer
-from .ratings_importer import RatingsImporter
-from .sentiment_analysis import TextBlobSentimentAnalysis
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+# textblob is imported only when TextBlobSentimentAnalysis is first accessed
+_exports = {
+    'NumberNormalizer': '.rating_processor',
+    'RatingsImporter': '.ratings_importer',
+    'TextBlobSentimentAnalysis': '.sentiment_analysis',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
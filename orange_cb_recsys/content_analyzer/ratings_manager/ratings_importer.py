@@ -73,32 +73,24 @@ class RatingsImporter:
     @Handler_ScoreNotFloat
     def import_ratings(self) -> pd.DataFrame:
         """
-        Imports the ratings from the source and stores in a dataframe
+        Imports the ratings from the source and stores in a dataframe. The source is read in batches (see
+        RawInformationSource.iter_batches) and the columns are extracted from each batch as a whole
 
         Returns:
             ratings_frame: pd.DataFrame
         """
-        ratings_frame = {'from_id': [], 'to_id': [], 'score': [], 'timestamp': []}
-        for row in progbar(list(self.__source), prefix="Importing ratings:"):
+        columns = {'from_id': self.from_id_column, 'to_id': self.to_id_column, 'score': self.score_column}
+        if self.timestamp_column:
+            columns['timestamp'] = self.timestamp_column
 
-            ratings_frame['from_id'].append(self._get_field_data(self.from_id_column, row))
-
-            ratings_frame['to_id'].append(self._get_field_data(self.to_id_column, row))
-
-            if self.timestamp_column:
-                ratings_frame['timestamp'].append(self._get_field_data(self.timestamp_column, row))
-
-            ratings_frame['score'].append(self._get_field_data(self.score_column, row))
-
-        if len(ratings_frame['timestamp']) == 0:
-            del ratings_frame['timestamp']
+        ratings_frame = self.__import_columns(columns, "Importing ratings:")
 
         if self.score_processor:
-            ratings_frame['score'] = self.score_processor.fit(ratings_frame['score'])
+            ratings_frame['score'] = self.score_processor.fit(list(ratings_frame['score']))
         else:
-            ratings_frame['score'] = [float(score) for score in ratings_frame['score']]
+            ratings_frame['score'] = ratings_frame['score'].astype(float)
 
-        self.rating_frame = pd.DataFrame(ratings_frame)
+        self.rating_frame = ratings_frame
         return self.rating_frame
 
     def imported_ratings_to_csv(self, output_directory: str = '.', file_name: str = 'ratings_frame', overwrite: bool = False):
@@ -109,36 +101,51 @@ class RatingsImporter:
 
     @Handler_ScoreNotFloat
     def add_score_column(self, score_column: Union[str, int], column_name: str, score_processor: RatingProcessor = None):
-        col_to_add = []
-        for row in progbar(list(self.__source), prefix="Adding column {}:".format(column_name)):
-
-            col_to_add.append(self._get_field_data(score_column, row))
+        col_to_add = self.__import_columns({column_name: score_column},
+                                           "Adding column {}:".format(column_name))[column_name]
 
         if score_processor:
-            col_to_add = score_processor.fit(col_to_add)
+            col_to_add = score_processor.fit(list(col_to_add))
         else:
-            col_to_add = [float(score) for score in col_to_add]
+            col_to_add = col_to_add.astype(float).to_numpy()
 
         self.rating_frame[column_name] = col_to_add
 
         return self.rating_frame
 
+    def __import_columns(self, columns: Dict[str, Union[str, int]], prefix: str) -> pd.DataFrame:
+        """
+        Reads the source in batches and returns a DataFrame with the columns of the source passed as argument, in
+        the form {name of the column in the DataFrame: name or index of the column in the source}. The values are
+        converted to strings
+        """
+        frames = []
+        for batch in progbar(self.__source.iter_batches(), prefix=prefix):
+            frames.append(pd.DataFrame({name: self._get_column_data(column, batch).to_numpy()
+                                        for name, column in columns.items()}))
+
+        if len(frames) == 0:
+            return pd.DataFrame({name: pd.Series([], dtype=object) for name in columns})
+        return pd.concat(frames, ignore_index=True)
+
     @staticmethod
-    def _get_field_data(field_name: Union[str, int], row: Dict):
+    def _get_column_data(field_name: Union[str, int], batch: pd.DataFrame) -> pd.Series:
         try:
             if isinstance(field_name, str):
-                data = row[field_name]
+                data = batch[field_name]
             else:
-                row_keys = list(row.keys())
-                key = row_keys[field_name]
-                data = row[key]
+                data = batch.iloc[:, field_name]
 
         except KeyError:
             raise KeyError("Column {} not found in the raw source".format(field_name))
         except IndexError:
             raise IndexError("Column index {} not present in the raw source".format(field_name))
 
-        return str(data)
+        # the batches built from dicts have a NaN where a raw content doesn't have the field
+        if data.isna().any():
+            raise KeyError("Column {} not found in the raw source".format(field_name))
+
+        return data.astype(str)
 
     @staticmethod
     def _get_valid_filename(output_directory: str, filename: str, format: str, overwrite: bool):
@@ -1,10 +1,22 @@
+import copy
 import csv
+import io
+import itertools
+import locale
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import weakref
 from abc import ABC, abstractmethod
 
 import json
-from typing import Dict, Iterator
+from typing import Callable, Dict, Iterator, List, Union
 
 import mysql.connector
+import pandas as pd
 
 
 class RawInformationSource(ABC):
@@ -21,33 +33,230 @@ class RawInformationSource(ABC):
         """
         raise NotImplementedError
 
+    def iter_batches(self, batch_size: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Iter on the raw contents of the source batch_size at a time, each batch is a DataFrame with a row for each
+        raw content and a column for each field. The sources that can parse many raw contents at once (like the csv
+        and dat files) override this method, by default the batches are built from the dicts yielded by __iter__
+        """
+        batch = []
+        for raw_content in self:
+            batch.append(raw_content)
+            if len(batch) == batch_size:
+                yield pd.DataFrame.from_records(batch)
+                batch = []
+        if len(batch) != 0:
+            yield pd.DataFrame.from_records(batch)
+
+    @property
+    def supports_sharding(self) -> bool:
+        """
+        True if the source can be split in shards with the shard method. By default the sources can't be split, the
+        ones reading a file line by line can
+        """
+        return False
+
+    def shard(self, shard_index: int, shard_count: int) -> 'RawInformationSource':
+        """
+        Returns the source containing only the shard_index-th of shard_count disjoint shards of the raw contents of
+        this source, so that the shards can be processed separately (see ShardedContentAnalyzer). Only the sources
+        whose supports_sharding property is True can be split in shards, the others raise a ValueError
+        """
+        raise ValueError("The source {} can't be split in shards!".format(self))
+
+    def project(self, field_names: List[str]) -> 'RawInformationSource':
+        """
+        Returns a source with the same raw contents, where only the fields passed as argument are needed. The
+        sources that can read some fields without reading the others (for example the columns of a database) return
+        a source reading only said fields, the others return themselves
+        """
+        return self
+
+
+def _check_shard(shard_index: int, shard_count: int):
+    if shard_count < 1:
+        raise ValueError("The number of shards must be a positive number!")
+    if not 0 <= shard_index < shard_count:
+        raise ValueError("The shard index must be between 0 and {}!".format(shard_count - 1))
+
+
+def _iter_shard_lines(file_path: str, shard_index: int, shard_count: int, skip_first_line: bool = False) \
+        -> Iterator[bytes]:
+    """
+    Yields the lines of the file in the shard_index-th of shard_count shards. The file is split in shard_count byte
+    ranges of the same size and each line belongs to the range where it starts, so that the shards are disjoint and
+    aligned to the lines without reading the file before the range. If skip_first_line is True, the first line of
+    the file (for example a header) isn't yielded
+    """
+    size = os.path.getsize(file_path)
+    start = size * shard_index // shard_count
+    end = size * (shard_index + 1) // shard_count
+    with open(file_path, 'rb') as f:
+        if start > 0:
+            # the line containing the byte before the range belongs to a previous shard
+            f.seek(start - 1)
+            f.readline()
+        elif skip_first_line:
+            f.readline()
+
+        while f.tell() < end:
+            line = f.readline()
+            if len(line) == 0:
+                break
+            yield line
+
 
 class DATFile(RawInformationSource):
     """
     Class for the data acquisition from a DAT file
 
+    The file can be split in shard_count shards by byte ranges (see the shard method), the source will read only
+    the lines in the shard_index-th shard
+
     Args:
         file_path (str)
+        shard_index (int): index of the shard of the file to read
+        shard_count (int): number of shards in which the file is split
     """
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, shard_index: int = 0, shard_count: int = 1):
+        _check_shard(shard_index, shard_count)
         self.__file_path = file_path
+        self.__shard_index = shard_index
+        self.__shard_count = shard_count
+
+    @property
+    def supports_sharding(self) -> bool:
+        return True
+
+    def shard(self, shard_index: int, shard_count: int) -> 'DATFile':
+        return DATFile(self.__file_path, shard_index, shard_count)
+
+    def __lines(self) -> Iterator[str]:
+        if self.__shard_count == 1:
+            with open(self.__file_path) as f:
+                yield from f
+        else:
+            # the shard is read in binary, the lines are decoded as open would do
+            encoding = locale.getpreferredencoding(False)
+            for line in _iter_shard_lines(self.__file_path, self.__shard_index, self.__shard_count):
+                yield line.decode(encoding)
 
     def __iter__(self) -> Iterator[Dict[str, str]]:
-        with open(self.__file_path) as f:
-            for line in f:
-                line_dict = {}
-                fields = line.split('::')
-                for i, field in enumerate(fields):
-                    field = field.strip("\n\t\r")
-                    line_dict[str(i)] = field
+        for line in self.__lines():
+            line_dict = {}
+            fields = line.split('::')
+            for i, field in enumerate(fields):
+                field = field.strip("\n\t\r")
+                line_dict[str(i)] = field
+
+            yield line_dict
 
-                yield line_dict
+    def iter_batches(self, batch_size: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Reads the file batch_size lines at a time, each batch is parsed as a whole by the pandas csv parser (every
+        value is kept as a string, like in the dicts yielded by __iter__)
+        """
+        lines_iterator = self.__lines()
+        while True:
+            lines = list(itertools.islice(lines_iterator, batch_size))
+            if len(lines) == 0:
+                break
+            yield self.__parse_lines(lines)
+
+    @staticmethod
+    def __parse_lines(lines: List[str]) -> pd.DataFrame:
+        text = ''.join(lines)
+        try:
+            # the csv parser only supports single char separators, so '::' is replaced by a control char
+            batch = pd.read_csv(io.StringIO(text.replace('::', '\x1f')), sep='\x1f', header=None, dtype=str,
+                                na_filter=False, quoting=csv.QUOTE_NONE, skip_blank_lines=False)
+        except pd.errors.ParserError:
+            # the lines have a different number of fields
+            batch = pd.DataFrame.from_records([line.split('::') for line in lines])
+            if batch.shape[1] > 0:
+                batch = batch.apply(lambda column: column.str.strip("\n\t\r"))
+        else:
+            if '\t' in text or '\r' in text:
+                batch = batch.apply(lambda column: column.str.strip("\n\t\r"))
+        batch.columns = [str(i) for i in range(batch.shape[1])]
+        return batch
+
+
+def _iter_json_array(json_file, chunk_size: int = 65536) -> Iterator[Dict[str, str]]:
+    """
+    Parses the json array in the file passed as argument one element at a time, reading the file in chunks of
+    chunk_size characters, so that only the element being parsed (and the current chunk) are kept in memory. The
+    numbers are parsed as strings.
+
+    If the file doesn't contain a json array, the whole document is parsed and iterated as json.load would do
+    """
+    decoder = json.JSONDecoder(parse_int=str, parse_float=str)
+    whitespace = ' \t\n\r'
+
+    buffer = json_file.read(chunk_size)
+    eof = len(buffer) == 0
+    pos = 0
+
+    def read_more() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = json_file.read(chunk_size)
+        eof = len(chunk) == 0
+        if not eof:
+            # the part already parsed is dropped
+            buffer = buffer[pos:] + chunk
+            pos = 0
+        return not eof
+
+    def next_char() -> str:
+        # skips the whitespaces and returns the first char after them ('' at the end of the file)
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in whitespace:
+                pos += 1
+            if pos < len(buffer) or not read_more():
+                return buffer[pos] if pos < len(buffer) else ''
+
+    if next_char() != '[':
+        # not an array, the document can't be parsed incrementally
+        buffer += json_file.read()
+        for element in decoder.decode(buffer[pos:]):
+            yield element
+        return
+
+    pos += 1
+    if next_char() == ']':
+        return
+
+    while True:
+        next_char()
+        try:
+            element, end = decoder.raw_decode(buffer, pos)
+            # a number may continue in the next chunk, the element is complete only if it's followed by a delimiter
+            if (end == len(buffer) or buffer[end] not in whitespace + ',]') and read_more():
+                continue
+        except json.JSONDecodeError:
+            # the element may continue in the next chunk
+            if read_more():
+                continue
+            raise
+        pos = end
+        yield element
+
+        separator = next_char()
+        if separator == ']':
+            return
+        if separator != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+        pos += 1
 
 
 class JSONFile(RawInformationSource):
     """
-    Class for the data acquisition from a json file
+    Class for the data acquisition from a json file containing an array of contents. The array is parsed one content
+    at a time, so the file is never loaded in memory as a whole
 
     Args:
         file_path (str)
@@ -60,26 +269,103 @@ class JSONFile(RawInformationSource):
 
     def __iter__(self) -> Iterator[Dict[str, str]]:
         with open(self.__file_path, 'r') as j:
-            all_lines = json.load(j, parse_int=str, parse_float=str)
-            for line in all_lines:
+            for line in _iter_json_array(j):
                 yield line
 
 
+class JSONLinesFile(RawInformationSource):
+    """
+    Class for the data acquisition from a JSON Lines file, where each line contains a json object representing a
+    content. The empty lines are skipped
+
+    The file can be split in shard_count shards by byte ranges (see the shard method), the source will read only
+    the lines in the shard_index-th shard
+
+    Args:
+        file_path (str)
+        shard_index (int): index of the shard of the file to read
+        shard_count (int): number of shards in which the file is split
+    """
+
+    def __init__(self, file_path: str, shard_index: int = 0, shard_count: int = 1):
+        _check_shard(shard_index, shard_count)
+        self.__file_path = file_path
+        self.__shard_index = shard_index
+        self.__shard_count = shard_count
+
+    @property
+    def supports_sharding(self) -> bool:
+        return True
+
+    def shard(self, shard_index: int, shard_count: int) -> 'JSONLinesFile':
+        return JSONLinesFile(self.__file_path, shard_index, shard_count)
+
+    def __lines(self) -> Iterator[str]:
+        if self.__shard_count == 1:
+            with open(self.__file_path, 'r') as j:
+                yield from j
+        else:
+            encoding = locale.getpreferredencoding(False)
+            for line in _iter_shard_lines(self.__file_path, self.__shard_index, self.__shard_count):
+                yield line.decode(encoding)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for line in self.__lines():
+            if line.strip():
+                yield json.loads(line, parse_int=str, parse_float=str)
+
+
 class CSVFile(RawInformationSource):
     """
     Abstract class for the data acquisition from a csv file
 
+    The file can be split in shard_count shards by byte ranges (see the shard method), the source will read only
+    the rows in the shard_index-th shard. The shards are aligned to the lines of the file, so a file with values
+    spanning multiple lines can't be split in shards
+
     Args:
         file_path (str)
+        has_header (bool): if True the first line of the file contains the names of the fields, otherwise the fields
+            are named with their position
+        shard_index (int): index of the shard of the file to read
+        shard_count (int): number of shards in which the file is split
     """
 
-    def __init__(self, file_path: str, has_header: bool = True):
+    def __init__(self, file_path: str, has_header: bool = True, shard_index: int = 0, shard_count: int = 1):
         """
         """
+        _check_shard(shard_index, shard_count)
         self.__file_path = file_path
         self.__has_header = has_header
+        self.__shard_index = shard_index
+        self.__shard_count = shard_count
+
+    @property
+    def supports_sharding(self) -> bool:
+        return True
+
+    def shard(self, shard_index: int, shard_count: int) -> 'CSVFile':
+        return CSVFile(self.__file_path, self.__has_header, shard_index, shard_count)
+
+    def __field_names(self) -> List[str]:
+        # the names of the fields are in the first line of the file, which is only in the first shard
+        with open(self.__file_path, newline='', encoding='utf-8-sig') as csv_file:
+            first_row = next(csv.reader(csv_file, quoting=csv.QUOTE_MINIMAL), [])
+        if self.__has_header:
+            return first_row
+        return [str(i) for i in range(len(first_row))]
+
+    def __shard_lines(self) -> Iterator[str]:
+        for line in _iter_shard_lines(self.__file_path, self.__shard_index, self.__shard_count,
+                                      skip_first_line=self.__has_header):
+            yield line.decode('utf-8-sig')
 
     def __iter__(self) -> Iterator[Dict[str, str]]:
+        if self.__shard_count != 1:
+            yield from csv.DictReader(self.__shard_lines(), fieldnames=self.__field_names(),
+                                      quoting=csv.QUOTE_MINIMAL)
+            return
+
         with open(self.__file_path, newline='', encoding='utf-8-sig') as csv_file:
             if self.__has_header:
                 reader = csv.DictReader(csv_file, quoting=csv.QUOTE_MINIMAL)
@@ -91,10 +377,105 @@ class CSVFile(RawInformationSource):
             for line in reader:
                 yield line
 
+    def iter_batches(self, batch_size: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Reads the file batch_size rows at a time with the pandas csv parser (every value is kept as a string, like
+        in the dicts yielded by __iter__)
+        """
+        if self.__shard_count != 1:
+            field_names = self.__field_names()
+            lines_iterator = self.__shard_lines()
+            while True:
+                lines = list(itertools.islice(lines_iterator, batch_size))
+                if len(lines) == 0:
+                    break
+                yield pd.read_csv(io.StringIO(''.join(lines)), header=None, names=field_names, dtype=str,
+                                  na_filter=False, quoting=csv.QUOTE_MINIMAL)
+            return
+
+        try:
+            reader = pd.read_csv(self.__file_path, chunksize=batch_size, dtype=str, na_filter=False,
+                                 encoding='utf-8-sig', header=0 if self.__has_header else None,
+                                 quoting=csv.QUOTE_MINIMAL)
+        except pd.errors.EmptyDataError:
+            return
+
+        with reader:
+            for batch in reader:
+                if not self.__has_header:
+                    batch.columns = [str(i) for i in range(batch.shape[1])]
+                yield batch
+
+
+class _ConnectionPool:
+    """
+    Pool of connections created by the connection_factory. At most pool_size idle connections are kept, if every
+    connection is in use when one is requested a new connection is created (and closed when released if the pool is
+    already full), so that nested iterations of the same source never wait for each other
+
+    Args:
+        connection_factory (Callable): function with no arguments returning a DB-API 2.0 connection
+        pool_size (int): maximum number of idle connections kept
+    """
+
+    def __init__(self, connection_factory: Callable, pool_size: int):
+        self.__connection_factory = connection_factory
+        self.__pool_size = pool_size
+        self.__idle_connections = []
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Returns an idle connection of the pool (or a new one if there aren't any), the connection is reserved until
+        it's released
+        """
+        with self.__lock:
+            if len(self.__idle_connections) != 0:
+                return self.__idle_connections.pop()
+        return self.__connection_factory()
+
+    def release(self, connection):
+        """
+        Gives back a connection returned by acquire, so that it can be reused
+        """
+        with self.__lock:
+            if len(self.__idle_connections) < self.__pool_size:
+                self.__idle_connections.append(connection)
+                return
+        connection.close()
+
+    def peek(self):
+        """
+        Returns an idle connection without reserving it
+        """
+        connection = self.acquire()
+        self.release(connection)
+        return connection
+
+    def close(self):
+        with self.__lock:
+            idle_connections = self.__idle_connections
+            self.__idle_connections = []
+        for connection in idle_connections:
+            connection.close()
+
 
 class SQLDatabase(RawInformationSource):
     """
-    Abstract class for the data acquisition from a SQL Database
+    Class for the data acquisition from a SQL Database. Each row of the table is a raw content, whose keys are the
+    names of the columns
+
+    The rows are fetched batch_size at a time with an unbuffered cursor, so that the whole table is never kept in
+    memory. Only the columns in fields are selected (every column if fields is None) and the ContentAnalyzer selects
+    only the columns each technique needs, using the project method. The rows can be filtered with a where
+    condition (with placeholders for the parameters, in the paramstyle of the driver) and limited to the first limit
+    rows.
+
+    Each iteration uses its own connection, taken from a pool that keeps up to pool_size connections open. The
+    connections are created by connection_factory, a function with no arguments returning a DB-API 2.0 connection.
+    If it's None, the connections are opened with mysql.connector using host, username, password and
+    database_name. The source can be pickled (for example to be sent to the processes of the ContentAnalyzer) if
+    the connection_factory can, the connections are not pickled
 
     Args:
         host (str): host ip of the sql server
@@ -102,28 +483,59 @@ class SQLDatabase(RawInformationSource):
         password (str): password for the access
         database_name (str): name of database
         table_name (str): name of the database table where data is stored
+        fields (List[str]): columns of the table to retrieve, if None every column is retrieved
+        where (str): condition the rows must satisfy, in SQL
+        parameters (tuple): values of the placeholders in the where condition
+        limit (int): maximum number of rows to retrieve
+        batch_size (int): number of rows fetched at a time
+        pool_size (int): maximum number of idle connections kept open
+        connection_factory (Callable): function returning a new connection, if None a MySQL connection is opened
     """
 
     def __init__(self, host: str,
                  username: str,
                  password: str,
                  database_name: str,
-                 table_name: str):
+                 table_name: str,
+                 fields: List[str] = None,
+                 where: str = None,
+                 parameters: tuple = (),
+                 limit: int = None,
+                 batch_size: int = 1000,
+                 pool_size: int = 2,
+                 connection_factory: Callable = None):
         super().__init__()
+        if batch_size <= 0:
+            raise ValueError("The batch size must be a positive number!")
+        if pool_size <= 0:
+            raise ValueError("The pool size must be a positive number!")
+        if limit is not None and limit < 0:
+            raise ValueError("The limit can't be a negative number!")
+
         self.__host: str = host
         self.__username: str = username
         self.__password: str = password
         self.__database_name: str = database_name
         self.__table_name: str = table_name
-
-        conn = mysql.connector.connect(host=self.__host,
+        self.__fields: List[str] = list(fields) if fields is not None else None
+        self.__where: str = where
+        self.__parameters: tuple = tuple(parameters)
+        self.__limit: int = limit
+        self.__batch_size: int = batch_size
+        self.__pool_size: int = pool_size
+        self.__connection_factory: Callable = connection_factory
+
+        self.__pool = _ConnectionPool(self.__connect, self.__pool_size)
+        # the connection is opened immediately, so that wrong credentials are reported when the source is created
+        self.__pool.peek()
+
+    def __connect(self):
+        if self.__connection_factory is not None:
+            return self.__connection_factory()
+        return mysql.connector.connect(host=self.__host,
                                        user=self.__username,
-                                       password=self.__password)
-        cursor = conn.cursor()
-        query = """USE """ + self.__database_name + """;"""
-        cursor.execute(query)
-        conn.commit()
-        self.__conn = conn
+                                       password=self.__password,
+                                       database=self.__database_name)
 
     @property
     def host(self) -> str:
@@ -145,9 +557,28 @@ class SQLDatabase(RawInformationSource):
     def table_name(self) -> str:
         return self.__table_name
 
+    @property
+    def fields(self) -> List[str]:
+        return self.__fields
+
+    @property
+    def where(self) -> str:
+        return self.__where
+
+    @property
+    def limit(self) -> int:
+        return self.__limit
+
+    @property
+    def batch_size(self) -> int:
+        return self.__batch_size
+
     @property
     def conn(self):
-        return self.__conn
+        """
+        Idle connection of the pool
+        """
+        return self.__pool.peek()
 
     @host.setter
     def host(self, host: str):
@@ -171,11 +602,278 @@ class SQLDatabase(RawInformationSource):
 
     @conn.setter
     def conn(self, conn):
-        self.__conn = conn
+        # the connection replaces the ones in the pool
+        self.__pool.close()
+        self.__pool.release(conn)
+
+    def project(self, field_names: List[str]) -> RawInformationSource:
+        """
+        Returns a copy of the source selecting only the columns passed as argument (among the fields of the source,
+        if defined). The copy shares the connection pool of the source
+        """
+        projected = copy.copy(self)
+        projected.__fields = [field for field in field_names if self.__fields is None or field in self.__fields]
+        # the pool is not copied with the rest of the state, like when the source is pickled
+        projected.__pool = self.__pool
+        return projected
+
+    def __query(self) -> str:
+        def quote(identifier: str) -> str:
+            return '`' + identifier.replace('`', '``') + '`'
+
+        columns = '*' if self.__fields is None else ', '.join(quote(field) for field in self.__fields)
+        query = "SELECT " + columns + " FROM " + quote(self.__table_name)
+        if self.__where is not None:
+            query += " WHERE " + self.__where
+        if self.__limit is not None:
+            query += " LIMIT " + str(int(self.__limit))
+        return query + ";"
 
     def __iter__(self) -> Iterator[Dict[str, str]]:
-        cursor = self.conn.cursor(dictionary=True)
-        query = """SELECT * FROM """ + self.table_name + """;"""
-        cursor.execute(query)
-        for result in cursor:
-            yield result
+        connection = self.__pool.acquire()
+        cursor = None
+        reusable = False
+        try:
+            cursor = connection.cursor()
+            if self.__parameters:
+                cursor.execute(self.__query(), self.__parameters)
+            else:
+                cursor.execute(self.__query())
+            column_names = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(self.__batch_size)
+                if len(rows) == 0:
+                    break
+                for row in rows:
+                    yield dict(zip(column_names, row))
+            reusable = True
+        finally:
+            # an unbuffered cursor whose rows weren't all read can't be closed reliably, so its connection is dropped
+            try:
+                if cursor is not None:
+                    cursor.close()
+            except Exception:
+                reusable = False
+            if reusable:
+                self.__pool.release(connection)
+            else:
+                connection.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_SQLDatabase__pool']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__pool = _ConnectionPool(self.__connect, self.__pool_size)
+
+    def __str__(self):
+        return "SQLDatabase"
+
+    def __repr__(self):
+        return "< SQLDatabase: table_name = " + str(self.__table_name) + "; fields = " + str(self.__fields) + \
+               "; where = " + str(self.__where) + "; limit = " + str(self.__limit) + " >"
+
+
+class _ColumnsView(RawInformationSource):
+    """
+    Source containing some of the columns of a MaterializedSource, each raw content yielded contains only the fields
+    of said columns (among the ones the original raw content had). The view is picklable and only the columns it
+    contains are pickled with it (or the paths of their files, if the columns are stored on disk)
+
+    Args:
+        layouts (List[tuple]): the fields of the raw contents, each raw content has one of these layouts
+        layout_column (Union[list, str]): index in layouts of the layout of each raw content
+        columns (Dict[str, Union[list, str]]): values of each field, None for the raw contents without said field
+        on_disk (bool): if True the columns are the paths of the files where the columns are stored in blocks
+    """
+
+    def __init__(self, layouts: List[tuple], layout_column: Union[list, str],
+                 columns: Dict[str, Union[list, str]], on_disk: bool):
+        self.__layouts = layouts
+        self.__layout_column = layout_column
+        self.__columns = columns
+        self.__on_disk = on_disk
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        # the fields of each layout that are in the view, in the same order of the raw content
+        layout_fields = [[field for field in layout if field in self.__columns] for layout in self.__layouts]
+        for layouts, columns in self.__iter_blocks():
+            for i, layout in enumerate(layouts):
+                yield {field: columns[field][i] for field in layout_fields[layout]}
+
+    def __iter_blocks(self) -> Iterator[tuple]:
+        if not self.__on_disk:
+            yield self.__layout_column, self.__columns
+            return
+
+        files = {}
+        try:
+            layout_file = open(self.__layout_column, 'rb')
+            files = {field: open(path, 'rb') for field, path in self.__columns.items()}
+            # the blocks of the columns cover the same raw contents, so they are read together
+            while True:
+                try:
+                    layouts = pickle.load(layout_file)
+                except EOFError:
+                    return
+                yield layouts, {field: pickle.load(file) for field, file in files.items()}
+        finally:
+            layout_file.close()
+            for file in files.values():
+                file.close()
+
+
+def _estimate_size(value) -> int:
+    # rough size in bytes of a raw value, the nested values (lists, dicts) are estimated by their repr
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return sys.getsizeof(value)
+    return sys.getsizeof(value) + len(repr(value))
+
+
+class MaterializedSource(RawInformationSource):
+    """
+    Wrapper of a source that reads it only once, storing its raw contents as columns (one for each field). The
+    ContentAnalyzer iterates the source several times (for each field config, for the exogenous techniques, for the
+    ids of the contents...), with this wrapper only the first iteration parses the wrapped source, the following
+    ones read the stored columns. The ContentAnalyzer also reads only the columns of the fields each technique needs,
+    using the project method.
+
+    The columns are kept in memory as long as their estimated size is below memory_budget, otherwise they are moved
+    in files of the directory passed as argument (a temporary directory if None, deleted with the source) and read
+    one block at a time, so that at most memory_budget bytes of raw data are kept in memory.
+
+    The wrapped source is read the first time the raw contents are requested, any change of the wrapped source after
+    that is ignored
+
+    Args:
+        source (RawInformationSource): source to read only once
+        memory_budget (int): maximum size in bytes of the raw data kept in memory
+        directory (str): directory where the columns are stored if they don't fit in the memory budget
+    """
+
+    def __init__(self, source: RawInformationSource, memory_budget: int = 256 * 1024 ** 2, directory: str = None):
+        if memory_budget <= 0:
+            raise ValueError("The memory budget must be a positive number!")
+        self.__source = source
+        self.__memory_budget = memory_budget
+        self.__directory = directory
+
+        self.__materialized = False
+        self.__length = 0
+        # the fields of the raw contents, each raw content has one of these layouts
+        self.__layouts: List[tuple] = []
+        # index in layouts of the layout of each raw content and values of each field (None for the raw contents
+        # without said field). When the columns are on disk, these are the paths of the files storing them
+        self.__layout_column: Union[list, str] = []
+        self.__columns: Dict[str, Union[list, str]] = {}
+        self.__on_disk = False
+        # number of raw contents in each block written on disk
+        self.__block_sizes: List[int] = []
+
+    @property
+    def source(self) -> RawInformationSource:
+        return self.__source
+
+    @property
+    def on_disk(self) -> bool:
+        """
+        True if the columns have been moved on disk since they didn't fit in the memory budget
+        """
+        self.__materialize()
+        return self.__on_disk
+
+    def __materialize(self):
+        if self.__materialized:
+            return
+
+        layout_ids = {}
+        layout_column = []
+        columns: Dict[str, list] = {}
+        size = 0
+        for raw_content in self.__source:
+            layout = tuple(raw_content.keys())
+            if layout not in layout_ids:
+                layout_ids[layout] = len(self.__layouts)
+                self.__layouts.append(layout)
+                for field in layout:
+                    if field not in columns:
+                        # the raw contents already read don't have the field
+                        columns[field] = [None] * len(layout_column)
+            layout_column.append(layout_ids[layout])
+
+            for field, column in columns.items():
+                value = raw_content.get(field)
+                column.append(value)
+                size += _estimate_size(value)
+            self.__length += 1
+
+            if size > self.__memory_budget:
+                self.__write_block(layout_column, columns)
+                layout_column = []
+                columns = {field: [] for field in columns}
+                size = 0
+
+        if self.__on_disk:
+            if len(layout_column) != 0:
+                self.__write_block(layout_column, columns)
+        else:
+            self.__layout_column = layout_column
+            self.__columns = columns
+        self.__materialized = True
+
+    def __write_block(self, layout_column: list, columns: Dict[str, list]):
+        """
+        Appends a block of raw contents to the files of the columns, creating them if needed
+        """
+        if not self.__on_disk:
+            if self.__directory is None:
+                self.__directory = tempfile.mkdtemp(prefix='materialized_source_')
+                weakref.finalize(self, shutil.rmtree, self.__directory, True)
+            else:
+                os.makedirs(self.__directory, exist_ok=True)
+            self.__layout_column = os.path.join(self.__directory, 'layouts.col')
+            open(self.__layout_column, 'wb').close()
+            self.__on_disk = True
+
+        with open(self.__layout_column, 'ab') as f:
+            pickle.dump(layout_column, f, pickle.HIGHEST_PROTOCOL)
+
+        for field, column in columns.items():
+            if field not in self.__columns:
+                path = os.path.join(self.__directory, 'c{}.col'.format(len(self.__columns)))
+                # the blocks already written don't have the field
+                with open(path, 'wb') as f:
+                    for block_size in self.__block_sizes:
+                        pickle.dump([None] * block_size, f, pickle.HIGHEST_PROTOCOL)
+                self.__columns[field] = path
+            with open(self.__columns[field], 'ab') as f:
+                pickle.dump(column, f, pickle.HIGHEST_PROTOCOL)
+
+        self.__block_sizes.append(len(layout_column))
+
+    def project(self, field_names: List[str]) -> RawInformationSource:
+        """
+        Returns a source whose raw contents only contain the fields passed as argument (if the raw contents of the
+        wrapped source have them), reading only the columns of said fields
+        """
+        self.__materialize()
+        return _ColumnsView(self.__layouts, self.__layout_column,
+                            {field: self.__columns[field] for field in field_names if field in self.__columns},
+                            self.__on_disk)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        self.__materialize()
+        yield from _ColumnsView(self.__layouts, self.__layout_column, self.__columns, self.__on_disk)
+
+    def __len__(self):
+        self.__materialize()
+        return self.__length
+
+    def __str__(self):
+        return "MaterializedSource"
+
+    def __repr__(self):
+        return "< MaterializedSource: source = " + str(self.__source) + "; memory_budget = " + \
+               str(self.__memory_budget) + " >"
@@ -0,0 +1,203 @@
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from orange_cb_recsys.content_analyzer.config import ContentAnalyzerConfig
+from orange_cb_recsys.content_analyzer.content_analyzer_main import ContentAnalyzer
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.field_content_production_technique import \
+    CollectionBasedTechnique
+from orange_cb_recsys.utils.const import logger
+from orange_cb_recsys.utils.content_cache import ContentCache
+from orange_cb_recsys.utils.json_exporter import ContentsJSONExporter
+from orange_cb_recsys.utils.manifest import CatalogManifest, load_manifest
+from orange_cb_recsys.utils.serialization import deserialize, SHARED_DIRECTORY
+
+
+def _collection_based_configs(config: ContentAnalyzerConfig) -> List[Tuple[str, int, CollectionBasedTechnique]]:
+    """
+    Returns the tuples (field name, position of the field config, technique) of the field configs of the config
+    whose technique needs the statistics of the whole collection
+    """
+    return [(field_name, position, field_config.content_technique)
+            for field_name in config.get_field_name_list()
+            for position, field_config in enumerate(config.get_configs_list(field_name))
+            if isinstance(field_config.content_technique, CollectionBasedTechnique)]
+
+
+def _collection_statistics(config: ContentAnalyzerConfig, shard_index: int, shard_count: int) -> Dict[tuple, object]:
+    """
+    Computes the statistics of the shard_index-th shard of the source for each collection based technique of the
+    config, the key of each statistics is the tuple (field name, position of the field config)
+    """
+    source = config.source.shard(shard_index, shard_count)
+    statistics = {}
+    for field_name, position, technique in _collection_based_configs(config):
+        field_config = list(config.get_configs_list(field_name))[position]
+        statistics[(field_name, position)] = technique.compute_collection_statistics(
+            source.project([field_name]), field_name, field_config.preprocessing)
+    return statistics
+
+
+def _analyze_shard(config: ContentAnalyzerConfig, shard_index: int, shard_count: int, output_directory: str):
+    """
+    Produces and serializes the contents of the shard_index-th shard of the source in the output_directory
+    """
+    ContentAnalyzer(config.shard(shard_index, shard_count, output_directory)).fit()
+
+
+class ShardedContentAnalyzer:
+    """
+    Class that produces the contents of a config splitting its source in shards (see RawInformationSource.shard)
+    which are processed by different processes, so that the contents of a large source are produced in parallel.
+
+    The collection based techniques (such as the tf-idf techniques) need the statistics of the whole collection, so
+    the contents are produced in two passes: first the statistics of each shard are computed in parallel and merged
+    (with the merge_collection_statistics method of each technique), then each shard is produced in parallel by a
+    ContentAnalyzer using the merged statistics. The contents produced are the same that the ContentAnalyzer would
+    produce on the whole source, and they are serialized in the output directory of the config with a single
+    manifest (listing the contents in the order of the shards).
+
+    The memory interfaces, the columnar store and the incremental analysis are not available, since they need a
+    single writer for the whole collection
+
+    Args:
+        config (ContentAnalyzerConfig): configuration of the contents to produce, its source must be shardable
+        shard_count (int): number of shards in which the source is split
+        n_processes (int): number of processes producing the shards, if None it's the minimum between shard_count and
+            the number of cpus. If 1, the shards are produced one after the other by the current process
+    """
+
+    def __init__(self, config: ContentAnalyzerConfig, shard_count: int, n_processes: int = None):
+        if shard_count < 1:
+            raise ValueError("The number of shards must be a positive number!")
+        if n_processes is None:
+            n_processes = min(shard_count, os.cpu_count() or 1)
+        if n_processes < 1:
+            raise ValueError("The number of processes must be a positive number!")
+
+        self.__config: ContentAnalyzerConfig = config
+        self.__shard_count: int = shard_count
+        self.__n_processes: int = n_processes
+
+    @property
+    def shard_count(self) -> int:
+        return self.__shard_count
+
+    @property
+    def n_processes(self) -> int:
+        return self.__n_processes
+
+    def fit(self):
+        """
+        Produces the contents of every shard and serializes them in the output directory of the config, which is
+        overwritten if it already exists
+        """
+        self.__check_config()
+
+        output_path = self.__config.output_directory
+        if os.path.exists(output_path):
+            shutil.rmtree(output_path)
+        os.mkdir(output_path)
+        ContentCache.get_instance().invalidate(output_path)
+
+        shard_directories = [os.path.join(output_path, 'shard_{}'.format(shard_index))
+                             for shard_index in range(self.__shard_count)]
+
+        techniques = _collection_based_configs(self.__config)
+        executor = None
+        if self.__n_processes > 1:
+            executor = ProcessPoolExecutor(max_workers=self.__n_processes)
+        try:
+            if len(techniques) != 0:
+                logger.info("Computing the collection statistics of %d shards", self.__shard_count)
+                shards_statistics = self.__run(executor, _collection_statistics,
+                                               [(self.__config, shard_index, self.__shard_count)
+                                                for shard_index in range(self.__shard_count)])
+                for field_name, position, technique in techniques:
+                    technique.set_collection_statistics(technique.merge_collection_statistics(
+                        [statistics[(field_name, position)] for statistics in shards_statistics]))
+
+            logger.info("Producing the contents of %d shards", self.__shard_count)
+            self.__run(executor, _analyze_shard,
+                       [(self.__config, shard_index, self.__shard_count, shard_directories[shard_index])
+                        for shard_index in range(self.__shard_count)])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            for field_name, position, technique in techniques:
+                technique.set_collection_statistics(None)
+
+        manifest = self.__merge_shards(shard_directories)
+        if self.__config.export_json:
+            with ContentsJSONExporter(output_path, self.__config.json_format,
+                                      self.__config.pretty_json) as json_exporter:
+                for content_id in manifest.content_ids:
+                    json_exporter.export(deserialize(os.path.join(output_path, manifest.get_file_name(content_id))))
+        manifest.save(output_path)
+
+    @staticmethod
+    def __run(executor: ProcessPoolExecutor, function, arguments_list: List[tuple]) -> list:
+        """
+        Calls the function with each tuple of arguments, concurrently if the executor is defined, and returns the
+        results in the same order of the arguments
+        """
+        if executor is None:
+            return [function(*arguments) for arguments in arguments_list]
+        futures = [executor.submit(function, *arguments) for arguments in arguments_list]
+        return [future.result() for future in futures]
+
+    def __merge_shards(self, shard_directories: List[str]) -> CatalogManifest:
+        """
+        Moves the contents serialized in the directory of each shard, and the shared objects they refer to, to the
+        output directory, removing the shard directories, and returns the manifest of all the contents
+        """
+        output_path = self.__config.output_directory
+        output_shared_directory = os.path.join(output_path, SHARED_DIRECTORY)
+        manifest = CatalogManifest()
+        for shard_directory in shard_directories:
+            shard_manifest = load_manifest(shard_directory)
+            for content_id in shard_manifest.content_ids:
+                file_name = shard_manifest.get_file_name(content_id)
+                os.replace(os.path.join(shard_directory, file_name), os.path.join(output_path, file_name))
+                manifest.add(content_id, file_name, shard_manifest.get_size(content_id),
+                             shard_manifest.get_fields(content_id))
+
+            shard_shared_directory = os.path.join(shard_directory, SHARED_DIRECTORY)
+            if os.path.isdir(shard_shared_directory):
+                os.makedirs(output_shared_directory, exist_ok=True)
+                for file_name in os.listdir(shard_shared_directory):
+                    # the shared id identifies the content of the object, so an object already moved by another
+                    # shard is the same object
+                    if not os.path.exists(os.path.join(output_shared_directory, file_name)):
+                        os.replace(os.path.join(shard_shared_directory, file_name),
+                                   os.path.join(output_shared_directory, file_name))
+            shutil.rmtree(shard_directory)
+        return manifest
+
+    def __check_config(self):
+        """
+        Raises a ValueError if the source can't be split in shards, if a collection based technique can't be used on
+        a collection split in shards or if the config uses a feature that is not available with a sharded source
+        """
+        if not self.__config.source.supports_sharding:
+            raise ValueError("The source {} can't be split in shards!".format(self.__config.source))
+        for field_name, position, technique in _collection_based_configs(self.__config):
+            if not technique.supports_collection_statistics:
+                raise ValueError("The technique {} of the field {} can't be used on a collection split in shards!"
+                                 .format(technique, field_name))
+        if self.__config.incremental:
+            raise ValueError("The incremental analysis is not available with a sharded source!")
+        if self.__config.columnar_store:
+            raise ValueError("The columnar store is not available with a sharded source!")
+        for field_name in self.__config.get_field_name_list():
+            for field_config in self.__config.get_configs_list(field_name):
+                if field_config.memory_interface is not None:
+                    raise ValueError("The memory interfaces are not available with a sharded source!")
+
+    def __str__(self):
+        return "ShardedContentAnalyzer"
+
+    def __repr__(self):
+        return "< ShardedContentAnalyzer: config = " + str(self.__config) + "; shard_count = " + \
+               str(self.__shard_count) + "; n_processes = " + str(self.__n_processes) + " >"
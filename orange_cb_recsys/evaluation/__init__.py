@@ -1,8 +1,44 @@
-from . import eval_pipeline_modules
-from . import metrics
-from . import partitioning_techniques
-
-from .eval_pipeline_modules import *
-from .metrics import *
-from .partitioning_techniques import *
-from .eval_model import EvalModel
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+# sklearn and matplotlib are imported only when the metric or the partitioning using them is first accessed
+_exports = {
+    'TestRatingsMethodology': '.eval_pipeline_modules',
+    'TestItemsMethodology': '.eval_pipeline_modules',
+    'TrainingItemsMethodology': '.eval_pipeline_modules',
+    'AllItemsMethodology': '.eval_pipeline_modules',
+    'PartitionModule': '.eval_pipeline_modules',
+    'Split': '.eval_pipeline_modules',
+    'PredictionCalculator': '.eval_pipeline_modules',
+    'MetricCalculator': '.eval_pipeline_modules',
+
+    'Precision': '.metrics',
+    'PrecisionAtK': '.metrics',
+    'RPrecision': '.metrics',
+    'Recall': '.metrics',
+    'RecallAtK': '.metrics',
+    'FMeasure': '.metrics',
+    'FMeasureAtK': '.metrics',
+    'MAE': '.metrics',
+    'MSE': '.metrics',
+    'RMSE': '.metrics',
+    'GiniIndex': '.metrics',
+    'DeltaGap': '.metrics',
+    'PredictionCoverage': '.metrics',
+    'CatalogCoverage': '.metrics',
+    'PopProfileVsRecs': '.metrics',
+    'PopRecsCorrelation': '.metrics',
+    'LongTailDistr': '.metrics',
+    'NDCG': '.metrics',
+    'NDCGAtK': '.metrics',
+    'MRR': '.metrics',
+    'MRRAtK': '.metrics',
+    'Correlation': '.metrics',
+
+    'KFoldPartitioning': '.partitioning_techniques',
+    'HoldOutPartitioning': '.partitioning_techniques',
+
+    'EvalModel': '.eval_model',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
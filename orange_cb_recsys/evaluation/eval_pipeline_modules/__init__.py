@@ -1,5 +1,15 @@
-from .methodology import TestRatingsMethodology, TestItemsMethodology, TrainingItemsMethodology,\
-    AllItemsMethodology
-from .partition_module import PartitionModule, Split
-from .prediction_calculator import PredictionCalculator
-from .metric_evaluator import MetricCalculator
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+_exports = {
+    'TestRatingsMethodology': '.methodology',
+    'TestItemsMethodology': '.methodology',
+    'TrainingItemsMethodology': '.methodology',
+    'AllItemsMethodology': '.methodology',
+    'PartitionModule': '.partition_module',
+    'Split': '.partition_module',
+    'PredictionCalculator': '.prediction_calculator',
+    'MetricCalculator': '.metric_evaluator',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -1,6 +1,30 @@
-from .classification_metrics import Precision, PrecisionAtK, RPrecision, Recall, RecallAtK, \
-    FMeasure, FMeasureAtK
-from .error_metrics import MAE, MSE, RMSE
-from .fairness_metrics import GiniIndex, DeltaGap, PredictionCoverage, CatalogCoverage
-from .plot_metrics import PopProfileVsRecs, PopRecsCorrelation, LongTailDistr
-from .ranking_metrics import NDCG, NDCGAtK, MRR, MRRAtK, Correlation
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+# sklearn and matplotlib are imported only when the metric using them is first accessed
+_exports = {
+    'Precision': '.classification_metrics',
+    'PrecisionAtK': '.classification_metrics',
+    'RPrecision': '.classification_metrics',
+    'Recall': '.classification_metrics',
+    'RecallAtK': '.classification_metrics',
+    'FMeasure': '.classification_metrics',
+    'FMeasureAtK': '.classification_metrics',
+    'MAE': '.error_metrics',
+    'MSE': '.error_metrics',
+    'RMSE': '.error_metrics',
+    'GiniIndex': '.fairness_metrics',
+    'DeltaGap': '.fairness_metrics',
+    'PredictionCoverage': '.fairness_metrics',
+    'CatalogCoverage': '.fairness_metrics',
+    'PopProfileVsRecs': '.plot_metrics',
+    'PopRecsCorrelation': '.plot_metrics',
+    'LongTailDistr': '.plot_metrics',
+    'NDCG': '.ranking_metrics',
+    'NDCGAtK': '.ranking_metrics',
+    'MRR': '.ranking_metrics',
+    'MRRAtK': '.ranking_metrics',
+    'Correlation': '.ranking_metrics',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
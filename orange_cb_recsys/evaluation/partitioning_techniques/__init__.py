@@ -1 +1,10 @@
-from .partitioning import KFoldPartitioning, HoldOutPartitioning
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+# sklearn is imported only when a partitioning is first accessed
+_exports = {
+    'KFoldPartitioning': '.partitioning',
+    'HoldOutPartitioning': '.partitioning',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -1,8 +1,41 @@
-from . import content_based_algorithm
-from . import graph_based_algorithm
-from . import graphs
-
-from .content_based_algorithm import *
-from .graph_based_algorithm import *
-from .graphs import *
-from .recsys import ContentBasedRS, GraphBasedRS
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+# sklearn and networkx are imported only when the algorithm or the graph using them is first accessed
+_exports = {
+    'CentroidVector': '.content_based_algorithm',
+    'CosineSimilarity': '.content_based_algorithm',
+    'ClassifierRecommender': '.content_based_algorithm',
+    'SkSVC': '.content_based_algorithm',
+    'SkKNN': '.content_based_algorithm',
+    'SkRandomForest': '.content_based_algorithm',
+    'SkLogisticRegression': '.content_based_algorithm',
+    'SkDecisionTree': '.content_based_algorithm',
+    'SkGaussianProcess': '.content_based_algorithm',
+    'IndexQuery': '.content_based_algorithm',
+    'LinearPredictor': '.content_based_algorithm',
+    'SkLinearRegression': '.content_based_algorithm',
+    'SkRidge': '.content_based_algorithm',
+    'SkBayesianRidge': '.content_based_algorithm',
+    'SkSGDRegressor': '.content_based_algorithm',
+    'SkARDRegression': '.content_based_algorithm',
+    'SkHuberRegressor': '.content_based_algorithm',
+    'SkPassiveAggressiveRegressor': '.content_based_algorithm',
+
+    'NXPageRank': '.graph_based_algorithm',
+    'NXTopKPageRank': '.graph_based_algorithm',
+    'NXTopKDegreeCentrality': '.graph_based_algorithm',
+    'NXTopKEigenVectorCentrality': '.graph_based_algorithm',
+
+    'NXBipartiteGraph': '.graphs',
+    'NXTripartiteGraph': '.graphs',
+    'NXFullGraph': '.graphs',
+    'UserNode': '.graphs',
+    'ItemNode': '.graphs',
+    'PropertyNode': '.graphs',
+
+    'ContentBasedRS': '.recsys',
+    'GraphBasedRS': '.recsys',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
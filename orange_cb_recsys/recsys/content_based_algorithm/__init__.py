@@ -1,9 +1,25 @@
-from . import centroid_vector
-from . import classifier
-from . import index_query
-from . import regressor
+from orange_cb_recsys.utils.lazy_import import lazy_exports
 
-from .centroid_vector import *
-from .classifier import *
-from .index_query import *
-from .regressor import *
+_exports = {
+    'CentroidVector': '.centroid_vector',
+    'CosineSimilarity': '.centroid_vector',
+    'ClassifierRecommender': '.classifier',
+    'SkSVC': '.classifier',
+    'SkKNN': '.classifier',
+    'SkRandomForest': '.classifier',
+    'SkLogisticRegression': '.classifier',
+    'SkDecisionTree': '.classifier',
+    'SkGaussianProcess': '.classifier',
+    'IndexQuery': '.index_query',
+    'LinearPredictor': '.regressor',
+    'SkLinearRegression': '.regressor',
+    'SkRidge': '.regressor',
+    'SkBayesianRidge': '.regressor',
+    'SkSGDRegressor': '.regressor',
+    'SkARDRegression': '.regressor',
+    'SkHuberRegressor': '.regressor',
+    'SkPassiveAggressiveRegressor': '.regressor',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
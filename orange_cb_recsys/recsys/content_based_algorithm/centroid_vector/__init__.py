@@ -1,2 +1,9 @@
-from .centroid_vector import CentroidVector
-from .similarities import CosineSimilarity
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+_exports = {
+    'CentroidVector': '.centroid_vector',
+    'CosineSimilarity': '.similarities',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -10,8 +10,7 @@ import pandas as pd
 import numpy as np
 
 from orange_cb_recsys.utils.const import recsys_logger
-from orange_cb_recsys.utils.load_content import get_unrated_items, get_rated_items, \
-    get_chosen_items
+from orange_cb_recsys.utils.load_content import get_rated_items
 
 
 class CentroidVector(ContentBasedAlgorithm):
@@ -50,7 +49,7 @@ class CentroidVector(ContentBasedAlgorithm):
             items_directory (str): path of the directory where the items are stored
         """
         # Load rated items from the path
-        rated_items = get_rated_items(items_directory, user_ratings)
+        rated_items = get_rated_items(items_directory, user_ratings, self.item_field)
 
         recsys_logger.info("Processing rated items")
         # If threshold wasn't passed in the constructor, then we take the mean rating
@@ -94,7 +93,7 @@ class CentroidVector(ContentBasedAlgorithm):
         positive_rated_features = list(self.__positive_rated_dict.values())
 
         positive_rated_features_fused = self.fuse_representations(positive_rated_features, self.__embedding_combiner)
-        self.__centroid = np.array(positive_rated_features_fused).mean(axis=0)
+        self.__centroid = np.asarray(positive_rated_features_fused.mean(axis=0)).flatten()
 
     def predict(self, user_ratings: pd.DataFrame, items_directory: str,
                 filter_list: List[str] = None) -> pd.DataFrame:
@@ -137,25 +136,16 @@ class CentroidVector(ContentBasedAlgorithm):
             pd.DataFrame: DataFrame containing one column with the items name,
                 one column with the rating predicted, sorted in descending order by the 'rating' column
         """
-        # Load items to predict
-        if filter_list is None:
-            items_to_predict = get_unrated_items(items_directory, user_ratings)
-        else:
-            items_to_predict = get_chosen_items(items_directory, filter_list)
-
-        # Extract features of the items to predict
-        id_items_to_predict = []
-        features_items_to_predict = []
-        for item in items_to_predict:
-            if item is not None:
-                id_items_to_predict.append(item.content_id)
-                features_items_to_predict.append(self.extract_features_item(item))
+        # Load and fuse the features of the items to predict
+        id_items_to_predict, features_fused = self._fuse_items_to_predict(user_ratings, items_directory, filter_list,
+                                                                          self.__embedding_combiner)
 
         recsys_logger.info("Calculating rank")
         if len(id_items_to_predict) > 0:
-            # Calculate predictions, they are the similarity of the new items with the centroid vector
-            features_fused = self.fuse_representations(features_items_to_predict, self.__embedding_combiner)
-            similarities = [self.__similarity.perform(self.__centroid, item) for item in features_fused]
+            # Calculate predictions, they are the similarity of the new items with the centroid vector.
+            # The features are sparse, so only the row of the item compared is densified
+            similarities = [self.__similarity.perform(self.__centroid, item.toarray().flatten())
+                            for item in features_fused]
         else:
             similarities = []
 
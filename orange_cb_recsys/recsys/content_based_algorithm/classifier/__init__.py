@@ -1,2 +1,14 @@
-from .classifier_recommender import ClassifierRecommender
-from .classifiers import SkSVC, SkKNN, SkRandomForest, SkLogisticRegression, SkDecisionTree, SkGaussianProcess
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+_exports = {
+    'ClassifierRecommender': '.classifier_recommender',
+    'SkSVC': '.classifiers',
+    'SkKNN': '.classifiers',
+    'SkRandomForest': '.classifiers',
+    'SkLogisticRegression': '.classifiers',
+    'SkDecisionTree': '.classifiers',
+    'SkGaussianProcess': '.classifiers',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
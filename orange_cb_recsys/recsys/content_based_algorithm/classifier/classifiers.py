@@ -1,5 +1,7 @@
 from abc import ABC
 
+import numpy as np
+from scipy import sparse
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.gaussian_process import GaussianProcessClassifier
 from sklearn.linear_model import LogisticRegression
@@ -7,14 +9,20 @@ from sklearn.neighbors import KNeighborsClassifier
 from sklearn.svm import SVC
 from sklearn.tree import DecisionTreeClassifier
 
+from orange_cb_recsys.recsys.content_based_algorithm.feature_store import dense_batches
+
 
 class Classifier(ABC):
     """
     Abstract class for Classifiers
+
+    The training data and the data to predict are sparse matrices: the classifiers that don't accept them
+    (accepts_sparse = False) receive the training data densified and the data to predict densified in batches of rows
     """
 
-    def __init__(self, classifier):
+    def __init__(self, classifier, accepts_sparse: bool = True):
         self.__classifier = classifier
+        self.__accepts_sparse = accepts_sparse
 
     @property
     def classifier(self):
@@ -37,6 +45,9 @@ class Classifier(ABC):
             X (list): list containing Training data.
             Y (list): list containing Training targets.
         """
+        if not self.__accepts_sparse and sparse.issparse(X):
+            # the training data has a row for each rated item only
+            X = X.toarray()
         self.classifier.fit(X, Y)
 
     def predict_proba(self, X_pred: list):
@@ -52,6 +63,8 @@ class Classifier(ABC):
         Args:
             X_pred (list): list containing data to predict.
         """
+        if not self.__accepts_sparse and sparse.issparse(X_pred):
+            return np.vstack([self.classifier.predict_proba(batch) for batch in dense_batches(X_pred)])
         return self.classifier.predict_proba(X_pred)
 
 
@@ -105,8 +118,9 @@ class SkKNN(Classifier):
         """
         # If the user did not pass a custom n_neighbor the algorithm tries to fix the error
         # if n_samples < n_neighbors
-        if self.classifier.n_neighbors == 5 and len(X) < self.classifier.n_neighbors:
-            self.classifier.n_neighbors = len(X)
+        n_samples = X.shape[0] if sparse.issparse(X) else len(X)
+        if self.classifier.n_neighbors == 5 and n_samples < self.classifier.n_neighbors:
+            self.classifier.n_neighbors = n_samples
 
         super().fit(X, Y)
 
@@ -172,7 +186,7 @@ class SkGaussianProcess(Classifier):
     def __init__(self, *args, **kwargs):
 
         clf = GaussianProcessClassifier(*args, **kwargs)
-        super().__init__(clf)
+        super().__init__(clf, accepts_sparse=False)
 
     def __str__(self):
         return "SkGaussianProcess"
@@ -1,5 +1,5 @@
 import abc
-from typing import List
+from typing import List, Tuple
 import pandas as pd
 from scipy import sparse
 from sklearn.exceptions import NotFittedError
@@ -10,8 +10,11 @@ import numpy as np
 from orange_cb_recsys.content_analyzer.field_content_production_techniques.embedding_technique.combining_technique import \
     CombiningTechnique
 from orange_cb_recsys.recsys.algorithm import Algorithm
+from orange_cb_recsys.recsys.content_based_algorithm.feature_store import extract_item_features, \
+    fuse_item_features, get_feature_store, vocabulary_projection
 
-from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, SparseFeaturesBagField
+from orange_cb_recsys.utils.load_content import get_unrated_items, get_chosen_items
 
 
 class ContentBasedAlgorithm(Algorithm):
@@ -37,9 +40,11 @@ class ContentBasedAlgorithm(Algorithm):
         self.item_field: dict = self._bracket_representation(item_field)
         self.threshold: float = threshold
         self.__transformer = None
+        self.__projection = None
 
     def _set_transformer(self):
         self.__transformer = DictVectorizer(sparse=True, sort=False)
+        self.__projection = None
 
     @staticmethod
     def _bracket_representation(item_field: dict):
@@ -81,6 +86,9 @@ class ContentBasedAlgorithm(Algorithm):
             only the representation with the '0' id for the field 'Plot' and both the representations
             with '0' and '1' id for the field 'Genre'
 
+        The SparseFeaturesBagField representations are extracted as they are, the others are extracted as their
+        value
+
         Args:
             item (Content): item loaded of which we need to extract its feature
 
@@ -89,13 +97,7 @@ class ContentBasedAlgorithm(Algorithm):
         """
         item_bag_list = []
         if item is not None:
-            for field in self.item_field:
-                field_representations = self.item_field[field]
-
-                for representation in field_representations:
-                    item_bag_list.append(
-                        item.get_field_representation(field, representation).value
-                    )
+            item_bag_list = extract_item_features(item, self.item_field)
 
         return item_bag_list
 
@@ -103,70 +105,132 @@ class ContentBasedAlgorithm(Algorithm):
         """
         Transform the X passed vectorizing if X contains dicts and merging
         multiple representations in a single one for every item in X.
+        The SparseFeaturesBagField representations are vectorized like the dicts: the terms of the rated items are
+        fitted by the transformer, and the rows with a column for each term of the vocabulary are projected on its
+        columns, so that no dict is built for the items to predict.
         So if X = [
                     [dict, arr, arr]
                         ...
                     [dict, arr, arr]
                 ]
         where every sublist contains multiple representation for a single item,
-        the function returns:
-        X = [
-                arr,
-                ...
-                arr
-            ]
-        Where every row is the fused representation for the item
+        the function returns a sparse matrix where every row is the fused representation for the item
 
         Args:
             X (list): list that contains representations of the items
 
         Returns:
-            X fused and vectorized
+            X fused and vectorized, as a csr matrix
         """
         if self.__transformer is None:
             raise ValueError("Transformer not set! Every CB Algorithm must call the method _set_transformer()"
                              " in its fit() method")
 
-        if any(not isinstance(rep, dict) and not isinstance(rep, np.ndarray) and not isinstance(rep, float) for rep in X[0]):
+        if any(not isinstance(rep, dict) and not isinstance(rep, np.ndarray) and not isinstance(rep, float)
+               and not isinstance(rep, SparseFeaturesBagField) for rep in X[0]):
             raise ValueError("You can only use representations of type: {numeric, embedding, tfidf}")
 
         # We check if there are dicts as representation in the first element of X,
         # since the representations are the same for all elements in X we can check
         # for dicts only in one element
-        need_vectorizer = any(isinstance(rep, dict) for rep in X[0])
+        need_vectorizer = any(isinstance(rep, (dict, SparseFeaturesBagField)) for rep in X[0])
 
         if need_vectorizer:
             # IF the transformer is not fitted then we are training the model
             try:
                 check_is_fitted(self.__transformer)
             except NotFittedError:
-                X_dicts = [rep for item in X for rep in item if isinstance(rep, dict)]
+                # the dicts of the rated items only are built, to fit their terms
+                X_dicts = [rep if isinstance(rep, dict) else rep.value
+                           for item in X for rep in item if isinstance(rep, (dict, SparseFeaturesBagField))]
                 self.__transformer.fit(X_dicts)
+                self.__projection = self.__build_projection(X[0], embedding_combiner)
 
         # In every case, we transform the input
-        X_vectorized_sparse = []
-        for sublist in X:
-            single_sparse = sparse.csr_matrix((1, 0))
-            for item in sublist:
-                if need_vectorizer and isinstance(item, dict):
-                    vector = self.__transformer.transform(item)
-                    single_sparse = sparse.hstack((single_sparse, vector), format='csr')
-                elif isinstance(item, np.ndarray):
-                    if item.ndim > 1:
-                        item = embedding_combiner.combine(item)
-
-                    item_sparse = sparse.csr_matrix(item)
-                    single_sparse = sparse.hstack((single_sparse, item_sparse), format='csr')
-                else:
-                    # it's a float
-                    item_sparse = sparse.csr_matrix(item)
-                    single_sparse = sparse.hstack((single_sparse, item_sparse), format='csr')
-
-            X_vectorized_sparse.append(single_sparse)
-
-        X_dense = [x.toarray().flatten() for x in X_vectorized_sparse]
-
-        return X_dense
+        X_vectorized_sparse = sparse.vstack([fuse_item_features(sublist, embedding_combiner, self.__transformer)
+                                             for sublist in X], format='csr')
+
+        return self._project_features(X_vectorized_sparse)
+
+    def __build_projection(self, item_features: list, embedding_combiner: CombiningTechnique):
+        """
+        Builds the matrix projecting the fused features (where the SparseFeaturesBagField have a column for each term
+        of their vocabulary) on the columns of the fitted transformer, the other representations are kept as they are.
+        None is returned if there is no SparseFeaturesBagField to project
+        """
+        if not any(isinstance(rep, SparseFeaturesBagField) for rep in item_features):
+            return None
+
+        blocks = []
+        for rep in item_features:
+            if isinstance(rep, SparseFeaturesBagField):
+                blocks.append(vocabulary_projection(rep.vocabulary, self.__transformer))
+            else:
+                width = fuse_item_features([rep], embedding_combiner, self.__transformer).shape[1]
+                blocks.append(sparse.identity(width, format='csr'))
+
+        return sparse.block_diag(blocks, format='csr')
+
+    def _project_features(self, fused_features: sparse.csr_matrix) -> sparse.csr_matrix:
+        """
+        Projects the fused features of the items on the columns of the fitted transformer, so that the
+        SparseFeaturesBagField have a column only for the terms of the rated items (as the dicts do)
+        """
+        if self.__projection is None:
+            return fused_features
+        return sparse.csr_matrix(fused_features @ self.__projection)
+
+    def _fuse_items_to_predict(self, user_ratings: pd.DataFrame, items_directory: str, filter_list: List[str],
+                               embedding_combiner: CombiningTechnique) -> Tuple[List[str], sparse.csr_matrix]:
+        """
+        Retrieves the fused features of the items to predict: all the items not rated by the user, or only the ones
+        in filter_list if it's passed.
+
+        If the items can have an ItemFeatureStore for the item_field and embedding_combiner (so if all the
+        representations fused are catalog wide), the features are sliced from the store shared by every user and
+        projected on the columns of the transformer.
+        Otherwise the items are loaded and their features are fused with fuse_representations. In both cases the
+        transformer must have been fitted
+
+        Args:
+            user_ratings (pd.DataFrame): DataFrame containing ratings of a single user
+            items_directory (str): path of the directory where the items are stored
+            filter_list (list): list of the items to predict, if None all unrated items will be predicted
+            embedding_combiner (CombiningTechnique): technique combining the matrix embeddings
+
+        Returns:
+            id_items_to_predict (List[str]): ids of the items to predict
+            fused_features (sparse.csr_matrix): fused features of the items to predict, one row for each item
+        """
+        feature_store = get_feature_store(items_directory, self.item_field, embedding_combiner)
+        if feature_store is not None:
+            if filter_list is None:
+                rated_items_id = set(user_ratings.to_id)
+                id_items_to_predict = [item_id for item_id in feature_store.content_ids
+                                       if item_id not in rated_items_id]
+            else:
+                id_items_to_predict = [item_id for item_id in filter_list if item_id in feature_store]
+            return id_items_to_predict, self._project_features(feature_store.get_features(id_items_to_predict))
+
+        # Load items to predict
+        if filter_list is None:
+            items_to_predict = get_unrated_items(items_directory, user_ratings, self.item_field)
+        else:
+            items_to_predict = get_chosen_items(items_directory, filter_list, self.item_field)
+
+        # Extract features of the items to predict
+        id_items_to_predict = []
+        features_items_to_predict = []
+        for item in items_to_predict:
+            if item is not None:
+                id_items_to_predict.append(item.content_id)
+                features_items_to_predict.append(self.extract_features_item(item))
+
+        fused_features = []
+        if len(id_items_to_predict) > 0:
+            fused_features = self.fuse_representations(features_items_to_predict, embedding_combiner)
+
+        return id_items_to_predict, fused_features
 
     @abc.abstractmethod
     def process_rated(self, user_ratings: pd.DataFrame, items_directory: str):
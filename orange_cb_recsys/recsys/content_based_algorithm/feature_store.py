@@ -0,0 +1,287 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Iterator, List, Union
+
+import numpy as np
+from scipy import sparse
+
+from orange_cb_recsys.content_analyzer.content_representation.columnar_store import STORE_DIRECTORY, STORE_METADATA
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, SparseFeaturesBagField, \
+    Vocabulary
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.embedding_technique.combining_technique \
+    import CombiningTechnique
+from orange_cb_recsys.utils.const import recsys_logger
+from orange_cb_recsys.utils.load_content import get_columnar_store, load_content_instance
+from orange_cb_recsys.utils.manifest import load_manifest, MANIFEST_FILE
+
+# sub directory of the items directory where the feature stores are persisted
+FEATURE_STORE_DIRECTORY = 'feature_store'
+
+# number of rows densified at a time for the models that don't accept sparse matrices
+DENSE_BATCH_SIZE = 1024
+
+# feature stores already loaded, the key is the tuple (absolute path of the items directory, feature store key) and
+# the value is the tuple (modification time of the file listing the items, feature store or None if the items
+# can't have a feature store)
+_loaded_feature_stores: Dict[tuple, tuple] = {}
+
+
+def extract_item_features(item: Content, item_field: dict) -> list:
+    """
+    Extracts the representations of the item defined by item_field (in the form {field_name: [ids]}). The
+    SparseFeaturesBagField representations are extracted as they are, so that their vocabulary is kept, the others
+    are extracted as their value
+    """
+    item_features = []
+    for field in item_field:
+        for representation_id in item_field[field]:
+            representation = item.get_field_representation(field, representation_id)
+            if isinstance(representation, SparseFeaturesBagField):
+                item_features.append(representation)
+            else:
+                item_features.append(representation.value)
+    return item_features
+
+
+def fuse_item_features(item_features: list, embedding_combiner: CombiningTechnique,
+                       vectorizer=None) -> sparse.csr_matrix:
+    """
+    Fuses the features of a single item (extracted with extract_item_features) in a single sparse row: the matrix
+    embeddings are combined with the embedding_combiner, the dicts are transformed with the (fitted) vectorizer and
+    the SparseFeaturesBagField are converted to sparse rows with a column for each term of their vocabulary
+    """
+    single_sparse = sparse.csr_matrix((1, 0))
+    for item in item_features:
+        if isinstance(item, dict):
+            vector = vectorizer.transform(item)
+            single_sparse = sparse.hstack((single_sparse, vector), format='csr')
+        elif isinstance(item, SparseFeaturesBagField):
+            single_sparse = sparse.hstack((single_sparse, item.to_sparse_row()), format='csr')
+        elif isinstance(item, np.ndarray):
+            if item.ndim > 1:
+                item = embedding_combiner.combine(item)
+
+            item_sparse = sparse.csr_matrix(item)
+            single_sparse = sparse.hstack((single_sparse, item_sparse), format='csr')
+        else:
+            # it's a float
+            item_sparse = sparse.csr_matrix(item)
+            single_sparse = sparse.hstack((single_sparse, item_sparse), format='csr')
+
+    return single_sparse
+
+
+def is_catalog_feature(feature) -> bool:
+    """
+    Checks if a feature extracted with extract_item_features can be fused without fitting anything on the items of
+    a single user, so that it can be fused once for the whole catalog. The dicts can't, since their columns are
+    defined by the DictVectorizer fitted on the items rated by the user. The SparseFeaturesBagField are fused with a
+    column for each term of their vocabulary, the columns are projected on the terms of the rated items afterwards
+    (see vocabulary_projection)
+    """
+    return isinstance(feature, (np.ndarray, float, SparseFeaturesBagField))
+
+
+def vocabulary_projection(vocabulary: Vocabulary, vectorizer) -> sparse.csr_matrix:
+    """
+    Returns the sparse matrix projecting the rows with a column for each term of the vocabulary on the columns of the
+    fitted DictVectorizer: the product of a row and the matrix is the row that the vectorizer would return for the
+    dict of the row, so the terms not seen by the vectorizer are dropped
+
+    Args:
+        vocabulary (Vocabulary): vocabulary of the columns of the rows to project
+        vectorizer (DictVectorizer): fitted vectorizer
+    """
+    term_ids = []
+    columns = []
+    for term, column in vectorizer.vocabulary_.items():
+        term_id = vocabulary.get_term_id(term)
+        if term_id is not None:
+            term_ids.append(term_id)
+            columns.append(column)
+    return sparse.csr_matrix((np.ones(len(columns)), (term_ids, columns)),
+                             shape=(len(vocabulary), len(vectorizer.vocabulary_)))
+
+
+def dense_batches(matrix: sparse.csr_matrix, batch_size: int = DENSE_BATCH_SIZE) -> Iterator[np.ndarray]:
+    """
+    Yields the rows of the sparse matrix as dense arrays of at most batch_size rows, for the models that don't accept
+    sparse matrices
+    """
+    for start in range(0, matrix.shape[0], batch_size):
+        yield matrix[start:start + batch_size].toarray()
+
+
+class ItemFeatureStore:
+    """
+    Class that keeps the fused features of every item of a catalog, for a specific item_field and embedding
+    combiner. The features of each item are a row of a single (sparse) matrix, so the features of the items to rank
+    are retrieved by slicing the matrix instead of loading and fusing each item for each user.
+
+    The feature stores are built with get_feature_store, which persists them in the 'feature_store' sub directory
+    of the items directory
+
+    Args:
+        content_ids (List[str]): ids of the items, the i-th id is the id of the item in the i-th row of the matrix
+        matrix (sparse.csr_matrix): fused features of the items
+    """
+
+    def __init__(self, content_ids: List[str], matrix: sparse.csr_matrix):
+        self.__content_ids = list(content_ids)
+        self.__rows = {content_id: row for row, content_id in enumerate(self.__content_ids)}
+        self.__matrix = sparse.csr_matrix(matrix)
+
+    @property
+    def content_ids(self) -> List[str]:
+        """
+        Getter for the ids of the items in the store, in the order of the rows of the matrix
+        """
+        return self.__content_ids
+
+    @property
+    def matrix(self) -> sparse.csr_matrix:
+        return self.__matrix
+
+    def __contains__(self, content_id: str):
+        return content_id in self.__rows
+
+    def __len__(self):
+        return len(self.__content_ids)
+
+    def get_features(self, content_ids: List[str]) -> sparse.csr_matrix:
+        """
+        Returns the fused features of the items passed as argument as a sparse matrix, one row for each item (in the
+        same order)
+
+        Args:
+            content_ids (List[str]): ids of the items, they must be in the store
+        """
+        rows = [self.__rows[content_id] for content_id in content_ids]
+        return self.__matrix[rows]
+
+    def save(self, path: str):
+        """
+        Saves the store in the file passed as argument (a npz archive)
+        """
+        matrix = self.__matrix
+        # the file is written in a temporary file and then renamed, so that a partially written store is never read
+        temp_path = path + '.tmp.npz'
+        np.savez(temp_path, content_ids=np.array(self.__content_ids, dtype=str), data=matrix.data,
+                 indices=matrix.indices, indptr=matrix.indptr, shape=np.array(matrix.shape))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'ItemFeatureStore':
+        """
+        Loads a store saved with the save method
+        """
+        with np.load(path) as archive:
+            matrix = sparse.csr_matrix((archive['data'], archive['indices'], archive['indptr']),
+                                       shape=tuple(archive['shape']))
+            return cls([str(content_id) for content_id in archive['content_ids']], matrix)
+
+    def __str__(self):
+        return "ItemFeatureStore"
+
+    def __repr__(self):
+        return "< ItemFeatureStore: items = " + str(len(self.__content_ids)) + "; features = " + \
+               str(self.__matrix.shape[1]) + " >"
+
+
+def _feature_store_key(item_field: dict, embedding_combiner: CombiningTechnique) -> str:
+    # the memory address in the default repr of the objects would change the key at every run
+    combiner_signature = re.sub(r' at 0x[0-9a-fA-F]+', '', repr(embedding_combiner))
+    signature = json.dumps([item_field, type(embedding_combiner).__name__, combiner_signature], sort_keys=True,
+                           default=str)
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+
+def _catalog_source(items_directory: str) -> Union[tuple, None]:
+    """
+    Returns the tuple (ids of the items, path of the file listing them) for the items directory, None if the items
+    are not listed by a manifest or a columnar store
+    """
+    store = get_columnar_store(items_directory)
+    if store is not None:
+        return store.content_ids, os.path.join(items_directory, STORE_DIRECTORY, STORE_METADATA)
+    manifest = load_manifest(items_directory)
+    if manifest is not None:
+        return manifest.content_ids, os.path.join(items_directory, MANIFEST_FILE)
+    return None
+
+
+def _build_feature_store(items_directory: str, content_ids: List[str], item_field: dict,
+                         embedding_combiner: CombiningTechnique) -> Union[ItemFeatureStore, None]:
+    rows = []
+    for content_id in content_ids:
+        item = load_content_instance(items_directory, content_id, item_field)
+        # the catalogs whose items don't all have the representations can't have a feature store
+        if item is None:
+            return None
+        try:
+            item_features = extract_item_features(item, item_field)
+        except KeyError:
+            return None
+        if not all(is_catalog_feature(feature) for feature in item_features):
+            return None
+        rows.append(fuse_item_features(item_features, embedding_combiner))
+
+    if len(rows) == 0:
+        return ItemFeatureStore([], sparse.csr_matrix((0, 0)))
+    return ItemFeatureStore(content_ids, sparse.vstack(rows, format='csr'))
+
+
+def get_feature_store(items_directory: str, item_field: dict,
+                      embedding_combiner: CombiningTechnique) -> Union[ItemFeatureStore, None]:
+    """
+    Returns the ItemFeatureStore of the items in the directory for the item_field and embedding_combiner passed as
+    argument. The store is built (loading every item) the first time it's requested and persisted in the
+    'feature_store' sub directory of the items directory, so it's loaded from disk by the following runs. A store is
+    rebuilt if the items have been serialized again after it was built.
+
+    None is returned (and the features must be fused per user) if the items directory doesn't have a manifest or a
+    columnar store, or if some of the representations in item_field need a vectorizer fitted on the items rated by
+    the user (the FeaturesBagField with a dict value)
+
+    Args:
+        items_directory (str): directory where the items are stored
+        item_field (dict): representations of the items that will be fused, in the form {field_name: [ids]}
+        embedding_combiner (CombiningTechnique): technique combining the matrix embeddings
+    """
+    catalog_source = _catalog_source(items_directory)
+    if catalog_source is None:
+        return None
+    content_ids, source_path = catalog_source
+
+    key = _feature_store_key(item_field, embedding_combiner)
+    # the source modification time is part of the name of the file, so that the stores of items serialized again
+    # are not loaded
+    source_mtime = os.path.getmtime(source_path)
+    path = os.path.join(items_directory, FEATURE_STORE_DIRECTORY, '{}_{}.npz'.format(key, repr(source_mtime)))
+
+    memory_key = (os.path.abspath(items_directory), key)
+    cached = _loaded_feature_stores.get(memory_key)
+    if cached is not None and cached[0] == source_mtime:
+        return cached[1]
+
+    if os.path.isfile(path):
+        feature_store = ItemFeatureStore.load(path)
+    else:
+        recsys_logger.info("Building the feature store of the items in {}".format(items_directory))
+        feature_store = _build_feature_store(items_directory, content_ids, item_field, embedding_combiner)
+        if feature_store is not None:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                feature_store.save(path)
+                # the stores built for a previous serialization of the items are removed
+                for file_name in os.listdir(os.path.dirname(path)):
+                    if file_name.startswith(key + '_') and file_name != os.path.basename(path):
+                        os.remove(os.path.join(os.path.dirname(path), file_name))
+            except OSError:
+                # the items directory may be read only, the store is kept only in memory
+                recsys_logger.warning("The feature store can't be saved in {}".format(items_directory))
+
+    _loaded_feature_stores[memory_key] = (source_mtime, feature_store)
+    return feature_store
@@ -1 +1,8 @@
-from .index_query import IndexQuery
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+_exports = {
+    'IndexQuery': '.index_query',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -1,3 +1,15 @@
-from .linear_predictor import LinearPredictor
-from .regressors import SkLinearRegression, SkRidge, SkBayesianRidge, SkSGDRegressor, SkARDRegression,\
-    SkHuberRegressor, SkPassiveAggressiveRegressor
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+_exports = {
+    'LinearPredictor': '.linear_predictor',
+    'SkLinearRegression': '.regressors',
+    'SkRidge': '.regressors',
+    'SkBayesianRidge': '.regressors',
+    'SkSGDRegressor': '.regressors',
+    'SkARDRegression': '.regressors',
+    'SkHuberRegressor': '.regressors',
+    'SkPassiveAggressiveRegressor': '.regressors',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -5,8 +5,7 @@ from orange_cb_recsys.content_analyzer.field_content_production_techniques.embed
     CombiningTechnique, Centroid
 from orange_cb_recsys.recsys.content_based_algorithm.exceptions import NoRatedItems, EmptyUserRatings
 from orange_cb_recsys.recsys.content_based_algorithm.regressor.regressors import Regressor
-from orange_cb_recsys.utils.load_content import get_rated_items, get_unrated_items, \
-    get_chosen_items
+from orange_cb_recsys.utils.load_content import get_rated_items
 import pandas as pd
 
 
@@ -86,7 +85,7 @@ class LinearPredictor(ContentBasedAlgorithm):
             items_directory (str): path of the directory where the items are stored
         """
         # Load rated items from the path
-        rated_items = get_rated_items(items_directory, user_ratings)
+        rated_items = get_rated_items(items_directory, user_ratings, self.item_field)
 
         # Assign label and extract features from the rated items
         labels = []
@@ -150,26 +149,12 @@ class LinearPredictor(ContentBasedAlgorithm):
             pd.DataFrame: DataFrame containing one column with the items name,
                 one column with the score predicted
         """
-        # Load items to predict
-        if filter_list is None:
-            items_to_predict = get_unrated_items(items_directory, user_ratings)
-        else:
-            items_to_predict = get_chosen_items(items_directory, filter_list)
-
-        # Extract features of the items to predict
-        id_items_to_predict = []
-        features_items_to_predict = []
-        for item in items_to_predict:
-            if item is not None:
-                # raises AttributeError if items are not present locally
-                id_items_to_predict.append(item.content_id)
-                features_items_to_predict.append(self.extract_features_item(item))
+        # Load and fuse the features of the items to predict
+        id_items_to_predict, fused_features_items_to_pred = self._fuse_items_to_predict(
+            user_ratings, items_directory, filter_list, self.__embedding_combiner)
 
         recsys_logger.info("Calculating score predictions")
         if len(id_items_to_predict) > 0:
-            # Fuse the input if there are dicts, multiple representation, etc.
-            fused_features_items_to_pred = self.fuse_representations(features_items_to_predict, self.__embedding_combiner)
-
             score_labels = self.__regressor.predict(fused_features_items_to_pred)
         else:
             score_labels = []
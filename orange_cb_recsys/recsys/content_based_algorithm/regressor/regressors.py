@@ -1,12 +1,16 @@
 from abc import ABC
 from typing import Union
 
+import numpy as np
+from scipy import sparse
 from sklearn.linear_model._base import LinearModel as SKLinearModel
 from sklearn.linear_model._stochastic_gradient import BaseSGDRegressor
 
 from sklearn.linear_model import LinearRegression, BayesianRidge, Ridge, SGDRegressor, ARDRegression, \
     HuberRegressor, PassiveAggressiveRegressor
 
+from orange_cb_recsys.recsys.content_based_algorithm.feature_store import dense_batches
+
 
 class Regressor(ABC):
     """
@@ -14,10 +18,14 @@ class Regressor(ABC):
 
     The only concrete method is transform(). It has an abstract fit() method and an abstract
     predict_proba() method.
+
+    The training data and the data to predict are sparse matrices: the models that don't accept them
+    (accepts_sparse = False) receive the training data densified and the data to predict densified in batches of rows
     """
 
-    def __init__(self, model: Union[SKLinearModel, BaseSGDRegressor]):
+    def __init__(self, model: Union[SKLinearModel, BaseSGDRegressor], accepts_sparse: bool = True):
         self.__model = model
+        self.__accepts_sparse = accepts_sparse
 
     def fit(self, X: list, Y: list = None):
         """
@@ -36,6 +44,9 @@ class Regressor(ABC):
             X (list): list containing Training data.
             Y (list): list containing Training targets.
         """
+        if not self.__accepts_sparse and sparse.issparse(X):
+            # the training data has a row for each rated item only
+            X = X.toarray()
         self.__model = self.__model.fit(X, Y)
 
     def predict(self, X_pred: list):
@@ -51,6 +62,8 @@ class Regressor(ABC):
         Args:
             X_pred (list): list containing data to predict.
         """
+        if not self.__accepts_sparse and sparse.issparse(X_pred):
+            return np.concatenate([self.__model.predict(batch) for batch in dense_batches(X_pred)])
         return self.__model.predict(X_pred)
 
 
@@ -79,7 +92,7 @@ class SkBayesianRidge(Regressor):
     def __init__(self, *args, **kwargs):
         model = BayesianRidge(*args, **kwargs)
 
-        super().__init__(model)
+        super().__init__(model, accepts_sparse=False)
 
     def __str__(self):
         return "SkBayesianRidge"
@@ -98,7 +111,7 @@ class SkARDRegression(Regressor):
     def __init__(self, *args, **kwargs):
 
         model = ARDRegression(*args, **kwargs)
-        super().__init__(model)
+        super().__init__(model, accepts_sparse=False)
 
     def __str__(self):
         return "SkARDRegression"
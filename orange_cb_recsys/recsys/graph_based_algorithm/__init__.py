@@ -1,5 +1,11 @@
-from . import page_rank
+from orange_cb_recsys.utils.lazy_import import lazy_exports
 
-from .page_rank import *
-from .feature_selection import *
+_exports = {
+    'NXPageRank': '.page_rank',
+    'NXTopKPageRank': '.feature_selection',
+    'NXTopKDegreeCentrality': '.feature_selection',
+    'NXTopKEigenVectorCentrality': '.feature_selection',
+}
 
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -1 +1,10 @@
-from .feature_selection import NXTopKPageRank, NXTopKDegreeCentrality, NXTopKEigenVectorCentrality
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+_exports = {
+    'NXTopKPageRank': '.feature_selection',
+    'NXTopKDegreeCentrality': '.feature_selection',
+    'NXTopKEigenVectorCentrality': '.feature_selection',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -1 +1,8 @@
-from .nx_page_rank import NXPageRank
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+_exports = {
+    'NXPageRank': '.nx_page_rank',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
@@ -1,4 +1,14 @@
-from .nx_bipartite_graphs import NXBipartiteGraph
-from .nx_tripartite_graphs import NXTripartiteGraph
-from .nx_full_graphs import NXFullGraph
-from .graph import UserNode, ItemNode, PropertyNode
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+# networkx is imported only when a graph is first accessed
+_exports = {
+    'NXBipartiteGraph': '.nx_bipartite_graphs',
+    'NXTripartiteGraph': '.nx_tripartite_graphs',
+    'NXFullGraph': '.nx_full_graphs',
+    'UserNode': '.graph',
+    'ItemNode': '.graph',
+    'PropertyNode': '.graph',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
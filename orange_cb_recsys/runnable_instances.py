@@ -1,4 +1,5 @@
 from typing import List, Type
+import importlib
 import lzma
 import pickle
 import os
@@ -48,6 +49,26 @@ base_classes: List[Type] = [
     EvalModel, Metric, MetricCalculator, Partitioning, Methodology, Split, PartitionModule
 ]
 
+"""
+Packages whose public classes are imported lazily (see utils/lazy_import.py), they're imported by get_classes so
+that all the implemented subclasses of the base classes are defined
+"""
+implementation_packages: List[str] = [
+    'orange_cb_recsys.content_analyzer', 'orange_cb_recsys.content_analyzer.embeddings',
+    'orange_cb_recsys.recsys', 'orange_cb_recsys.evaluation'
+]
+
+
+def load_implementations():
+    """
+    Imports every public class of the implementation_packages, together with the heavy dependencies of their
+    modules. Until they are imported, the subclasses of the base classes defined in their modules are not found
+    """
+    for package_name in implementation_packages:
+        package = importlib.import_module(package_name)
+        for name in package.__all__:
+            getattr(package, name)
+
 
 def get_classes():
     """
@@ -71,6 +92,8 @@ def get_classes():
     If a class isn't abstract and has subclasses, both the class itself and the subclasses will be added to the
     dictionary
     """
+    load_implementations()
+
     classes_dict = {}
 
     for base_cls in base_classes:
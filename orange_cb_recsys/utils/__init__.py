@@ -1 +1,8 @@
-from .load_content import load_content_instance
+from orange_cb_recsys.utils.lazy_import import lazy_exports
+
+_exports = {
+    'load_content_instance': '.load_content',
+}
+
+__all__ = list(_exports)
+__getattr__, __dir__ = lazy_exports(__name__, _exports)
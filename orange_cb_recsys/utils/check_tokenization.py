@@ -1,19 +1,37 @@
 from typing import Union, List
-from nltk import RegexpTokenizer, data, download, sent_tokenize
 
-try:
-    data.find('punkt')
-except LookupError:
-    download('punkt')
+# nltk resources already looked up by the current process
+_checked_resources = set()
+
+# tokenizer used by check_tokenized, created the first time a text is tokenized
+_tokenizer = None
+
+
+def check_nltk_resource(resource_path: str, package: str):
+    """
+    Looks for the nltk resource and downloads its package if it's missing. Each resource is looked up only the
+    first time it's needed by the process, instead of when the modules using it are imported
+    """
+    if resource_path not in _checked_resources:
+        from nltk import data, download
+        try:
+            data.find(resource_path)
+        except LookupError:
+            download(package)
+        _checked_resources.add(resource_path)
 
 
 def check_tokenized(text):
     """
     Tokenizes a text
     """
+    global _tokenizer
     if type(text) is str:
-        tokenizer = RegexpTokenizer('[\w<>$€]+')
-        text = tokenizer.tokenize(text)
+        if _tokenizer is None:
+            # nltk takes a while to import, so it's imported only when it's needed
+            from nltk import RegexpTokenizer
+            _tokenizer = RegexpTokenizer('[\w<>$€]+')
+        text = _tokenizer.tokenize(text)
 
     return text
 
@@ -32,5 +50,7 @@ def tokenize_in_sentences(text: Union[List[str], str]):
     """
     Tokenizes a text into sentences
     """
+    from nltk import sent_tokenize
+    check_nltk_resource('punkt', 'punkt')
 
     return sent_tokenize(check_not_tokenized(text))
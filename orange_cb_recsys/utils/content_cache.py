@@ -0,0 +1,136 @@
+import os
+from collections import OrderedDict
+from typing import Callable, Union
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content
+
+
+class ContentCache:
+    """
+    Singleton class which keeps in memory the contents most recently loaded from disk, so that the same content
+    requested many times (for example by the recommender for every user in every fold of an evaluation) is
+    deserialized only once.
+
+    Each cached content is identified by the absolute path of its directory and by its id. The entries are evicted
+    in least recently used order when the number of cached contents exceeds max_entries. A cached content is
+    considered stale (and reloaded) if the file it was loaded from has been modified after it was cached.
+
+    Keep in mind that the cached contents are shared: a content returned by the cache is the same object
+    returned to any other caller that requested it
+    """
+    __instance = None
+
+    DEFAULT_MAX_ENTRIES = 10000
+
+    @staticmethod
+    def get_instance():
+        """
+        returns the singleton instance
+        Returns:
+            ContentCache: instance
+        """
+        # Static access method
+        if ContentCache.__instance is None:
+            ContentCache.__instance = ContentCache()
+        return ContentCache.__instance
+
+    def __init__(self):
+        self.__max_entries = ContentCache.DEFAULT_MAX_ENTRIES
+        # the key is the tuple (directory absolute path, content id), the value is the tuple
+        # (modification time of the file the content was loaded from, content)
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        # Virtually private constructor.
+        if ContentCache.__instance is not None:
+            raise Exception("This class is a singleton!")
+        ContentCache.__instance = self
+
+    @property
+    def max_entries(self) -> int:
+        """
+        Maximum number of contents kept in the cache. If set to 0 the cache is disabled
+        """
+        return self.__max_entries
+
+    @max_entries.setter
+    def max_entries(self, max_entries: int):
+        if max_entries < 0:
+            raise ValueError("The number of entries of the cache can't be negative")
+        self.__max_entries = max_entries
+        self.__evict()
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __evict(self):
+        while len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+
+    def get(self, directory: str, content_id: str, source_path: Union[str, None],
+            load: Callable[[], Union[Content, None]]) -> Union[Content, None]:
+        """
+        Returns the content identified by directory and content_id. If it's not in the cache (or if the file it was
+        loaded from has been modified) it is loaded using the load function passed as argument and cached.
+        Contents that can't be found (so the load function returns None) are never cached
+
+        Args:
+            directory (str): directory where the content is stored
+            content_id (str): id of the content
+            source_path (str): file from which the content is loaded, used to check if the cached content is stale.
+                None if there's no file for the content
+            load (Callable): function with no arguments that loads the content from disk
+        """
+        key = (os.path.abspath(directory), content_id)
+
+        try:
+            modification_time = os.path.getmtime(source_path) if source_path is not None else None
+        except OSError:
+            modification_time = None
+
+        entry = self.__entries.get(key)
+        if entry is not None and modification_time is not None and entry[0] == modification_time:
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+            return entry[1]
+
+        self.__misses += 1
+        content = load()
+        if content is not None and modification_time is not None and self.__max_entries > 0:
+            self.__entries[key] = (modification_time, content)
+            self.__entries.move_to_end(key)
+            self.__evict()
+        else:
+            self.__entries.pop(key, None)
+
+        return content
+
+    def invalidate(self, directory: str = None):
+        """
+        Removes contents from the cache. If a directory is passed as argument only the contents of that directory
+        are removed, otherwise the whole cache is emptied
+
+        Args:
+            directory (str): directory whose contents will be removed from the cache
+        """
+        if directory is None:
+            self.__entries.clear()
+        else:
+            directory = os.path.abspath(directory)
+            for key in [key for key in self.__entries if key[0] == directory]:
+                del self.__entries[key]
+
+    def reset_stats(self):
+        """
+        Resets the hit and miss counters
+        """
+        self.__hits = 0
+        self.__misses = 0
@@ -0,0 +1,98 @@
+import json
+import os
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, ContentEncoder
+
+# name of the file where the contents are exported, for each format
+JSON_FILES = {
+    'json': 'contents.json',
+    'jsonl': 'contents.jsonl',
+}
+
+
+def check_json_format(json_format: str):
+    """
+    Raises a ValueError if the format passed as argument is not one of the formats available for the export
+    """
+    if json_format not in JSON_FILES:
+        raise ValueError("Format {} is not available! Available formats are: {}".format(
+            json_format, list(JSON_FILES.keys())))
+
+
+class ContentsJSONExporter:
+    """
+    Class that exports the contents in a file one at a time, so that only the content being exported has to be kept
+    in memory (and the contents can be exported while they are being serialized). Two formats are available:
+
+        'json': the file contains a json array of contents. If pretty is True, the array is indented as json.dump
+            with indent=4 would do, otherwise each content is written in a single line without spaces
+        'jsonl': the file is in the JSON Lines format, each line contains a content (the pretty option is ignored)
+
+    The exporter can be used as a context manager, the file is closed (and the json array terminated) when exiting
+    the context
+
+    Args:
+        directory (str): directory where the file (named 'contents.json' or 'contents.jsonl' depending on the format)
+            will be created
+        json_format (str): format of the file, 'json' or 'jsonl'
+        pretty (bool): if True, the contents in the json array are indented
+    """
+
+    def __init__(self, directory: str, json_format: str = 'json', pretty: bool = True):
+        check_json_format(json_format)
+        self.__json_format = json_format
+        self.__pretty = pretty and json_format == 'json'
+        self.__path = os.path.join(directory, JSON_FILES[json_format])
+        self.__n_exported = 0
+
+        self.__file = open(self.__path, 'w')
+        if self.__json_format == 'json':
+            self.__file.write("[")
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def n_exported(self) -> int:
+        return self.__n_exported
+
+    def export(self, content: Content):
+        """
+        Appends the content passed as argument to the file
+        """
+        if self.__json_format == 'jsonl':
+            self.__file.write(json.dumps(content, cls=ContentEncoder, separators=(',', ':')))
+            self.__file.write("\n")
+        elif self.__pretty:
+            json_content = json.dumps(content, cls=ContentEncoder, indent=4)
+            self.__file.write(",\n" if self.__n_exported != 0 else "\n")
+            self.__file.write("\n".join("    " + line for line in json_content.split("\n")))
+        else:
+            self.__file.write(",\n" if self.__n_exported != 0 else "\n")
+            self.__file.write(json.dumps(content, cls=ContentEncoder, separators=(',', ':')))
+
+        self.__n_exported += 1
+
+    def close(self):
+        """
+        Terminates the json array (if the format is 'json') and closes the file
+        """
+        if self.__file.closed:
+            return
+
+        if self.__json_format == 'json':
+            self.__file.write("\n]" if self.__n_exported != 0 else "]")
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __str__(self):
+        return "ContentsJSONExporter"
+
+    def __repr__(self):
+        return "< ContentsJSONExporter: path = " + self.__path + "; pretty = " + str(self.__pretty) + " >"
@@ -0,0 +1,43 @@
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package_name: str, exports: Dict[str, str]) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Returns the module level __getattr__ and __dir__ functions of a package whose public names are imported only
+    when they are accessed for the first time, so that importing the package doesn't import the heavy optional
+    dependencies (gensim, sentence_transformers, sklearn, ...) of the modules defining them.
+
+    The name is retrieved from the module it's mapped to in exports (a module path relative to the package) and
+    stored in the package, so __getattr__ is called only once for each name. The sub modules and sub packages of the
+    package are imported on first access as well.
+
+    Usage in the __init__ module of a package:
+
+        __all__ = ['Gensim', 'Sbert']
+        __getattr__, __dir__ = lazy_exports(__name__, {'Gensim': '.gensim', 'Sbert': '.sbert'})
+
+    Args:
+        package_name (str): name of the package (its __name__)
+        exports (Dict[str, str]): public names of the package, each mapped to the module which defines it
+    """
+
+    def __getattr__(name: str):
+        package = importlib.import_module(package_name)
+        if name in exports:
+            value = getattr(importlib.import_module(exports[name], package_name), name)
+        else:
+            try:
+                value = importlib.import_module('.' + name, package_name)
+            except ModuleNotFoundError as e:
+                # only the missing sub module is reported as a missing attribute, not a missing dependency of it
+                if e.name != package_name + '.' + name:
+                    raise
+                raise AttributeError("module {!r} has no attribute {!r}".format(package_name, name)) from None
+        setattr(package, name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(importlib.import_module(package_name))) | set(exports))
+
+    return __getattr__, __dir__
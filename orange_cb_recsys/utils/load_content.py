@@ -1,45 +1,101 @@
-import lzma
 import os
-import pickle
 import re
-from typing import List
+from typing import List, Union
 import pandas as pd
 
 from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.columnar_store import ColumnarContentStore, \
+    is_columnar_store, STORE_DIRECTORY, STORE_METADATA
 from orange_cb_recsys.utils.const import utils_logger
+from orange_cb_recsys.utils.content_cache import ContentCache
+from orange_cb_recsys.utils.manifest import load_manifest
+from orange_cb_recsys.utils.serialization import deserialize, find_content_file
 
+# columnar stores already opened, the key is the absolute path of the directory and the value is a tuple
+# (modification time of the store metadata, store) so that a store rewritten by the ContentAnalyzer is reopened
+_opened_stores = {}
 
-def load_content_instance(directory: str, content_id: str) -> Content:
+
+def get_columnar_store(directory: str) -> Union[ColumnarContentStore, None]:
     """
-    Loads a serialized content
+    Returns the columnar store serialized in the directory passed as argument, or None if the contents in the directory
+    were not serialized in a columnar store. Each store is opened only once
+
+    Args:
+        directory (str): Path to the directory in which the contents are stored
+    """
+    if not is_columnar_store(directory):
+        return None
+
+    key = os.path.abspath(directory)
+    modification_time = os.path.getmtime(os.path.join(directory, STORE_DIRECTORY, STORE_METADATA))
+    if key not in _opened_stores or _opened_stores[key][0] != modification_time:
+        _opened_stores[key] = (modification_time, ColumnarContentStore(directory))
+
+    return _opened_stores[key][1]
+
+
+def load_content_instance(directory: str, content_id: str, item_field: dict = None) -> Content:
+    """
+    Loads a serialized content, whatever the codec used for serializing it was. The contents loaded are kept in the
+    ContentCache, so a content already loaded is not deserialized again.
+
+    If the contents are serialized in a columnar store and item_field is passed, only the representations in
+    item_field are read from the store (the others are read only if they are requested). Contents serialized in
+    single files are always loaded entirely
     Args:
         directory (str): Path to the directory in which the content is stored
         content_id (str): Id of the content to load
+        item_field (dict): representations of the content that will be used, in the form {field_name: [ids]}
 
     Returns:
         content (Content)
     """
-    try:
-        content_filename = os.path.join(directory, '{}.xz'.format(content_id))
-        with lzma.open(content_filename, "rb") as content_file:
-            content = pickle.load(content_file)
-    except FileNotFoundError:
-        content = None
-
-    return content
-
-
-def get_unrated_items(items_directory: str, ratings: pd.DataFrame) -> List[Content]:
+    store = get_columnar_store(directory)
+    if store is not None:
+        source_path = os.path.join(directory, STORE_DIRECTORY, STORE_METADATA)
+        content = ContentCache.get_instance().get(directory, content_id, source_path,
+                                                  lambda: store.load_content(content_id))
+        if content is not None and item_field is not None:
+            content.load_representations(item_field)
+        return content
+
+    manifest = load_manifest(directory)
+    if manifest is not None:
+        file_name = manifest.get_file_name(content_id)
+        content_filename = os.path.join(directory, file_name) if file_name is not None else None
+    else:
+        content_filename = find_content_file(directory, content_id)
+
+    return ContentCache.get_instance().get(directory, content_id, content_filename,
+                                           lambda: deserialize(content_filename) if content_filename else None)
+
+
+def get_unrated_items(items_directory: str, ratings: pd.DataFrame, item_field: dict = None) -> List[Content]:
     """
     Gets the items that a user has not rated
 
     Args:
         items_directory (str): Path to the items directory
         ratings (pd.DataFrame): Ratings of a user
+        item_field (dict): representations of the items that will be used, in the form {field_name: [ids]}
 
     Returns:
         unrated_items (List<Content>): List of items that the user has not rated
     """
+    store = get_columnar_store(items_directory)
+    if store is not None:
+        rated_items_id_list = set(ratings.to_id)
+        unrated_items_id_list = [item_id for item_id in store.content_ids if item_id not in rated_items_id_list]
+        utils_logger.info("Loading {} unrated items".format(len(unrated_items_id_list)))
+        return [load_content_instance(items_directory, item_id, item_field) for item_id in unrated_items_id_list]
+
+    manifest = load_manifest(items_directory)
+    if manifest is not None:
+        rated_items_id_list = set(ratings.to_id)
+        unrated_items_id_list = [item_id for item_id in manifest.content_ids if item_id not in rated_items_id_list]
+        utils_logger.info("Loading {} unrated items".format(len(unrated_items_id_list)))
+        return [load_content_instance(items_directory, item_id, item_field) for item_id in unrated_items_id_list]
 
     directory_filename_list = [os.path.splitext(filename)[0]
                                for filename in os.listdir(items_directory)
@@ -53,28 +109,39 @@ def get_unrated_items(items_directory: str, ratings: pd.DataFrame) -> List[Conte
     filename_list = [item_id for item_id in directory_filename_list if
                      item_id not in rated_items_filename_list]
 
-    intersection = [x for x in filename_list if x in directory_filename_list]
-    filename_list = intersection
-
     utils_logger.info("Loading {} unrated items".format(len(filename_list)))
     unrated_items = [
-        load_content_instance(items_directory, item_id)
+        load_content_instance(items_directory, item_id, item_field)
         for item_id in filename_list]
 
     return unrated_items
 
 
-def get_rated_items(items_directory: str, ratings: pd.DataFrame) -> List[Content]:
+def get_rated_items(items_directory: str, ratings: pd.DataFrame, item_field: dict = None) -> List[Content]:
     """
     Gets the items that a user not rated
 
     Args:
         items_directory (str): Path to the items directory
         ratings (pd.DataFrame): Ratings of the user
+        item_field (dict): representations of the items that will be used, in the form {field_name: [ids]}
 
     Returns:
         unrated_items (List<Content>): List of items that the user has rated
     """
+    store = get_columnar_store(items_directory)
+    if store is not None:
+        rated_items_id_list = sorted(item_id for item_id in set(ratings.to_id) if item_id in store)
+        utils_logger.info("Loading {} rated items".format(len(rated_items_id_list)))
+        return [load_content_instance(items_directory, item_id, item_field) for item_id in rated_items_id_list]
+
+    manifest = load_manifest(items_directory)
+    if manifest is not None:
+        # the items are sorted by the name of their file, as it's done when the directory is listed
+        rated_items_id_list = sorted((item_id for item_id in set(ratings.to_id) if item_id in manifest),
+                                     key=manifest.get_file_name)
+        utils_logger.info("Loading {} rated items".format(len(rated_items_id_list)))
+        return [load_content_instance(items_directory, item_id, item_field) for item_id in rated_items_id_list]
 
     directory_filename_list = [os.path.splitext(filename)[0]
                                for filename in os.listdir(items_directory)
@@ -88,21 +155,18 @@ def get_rated_items(items_directory: str, ratings: pd.DataFrame) -> List[Content
     filename_list = [item_id for item_id in directory_filename_list if
                      item_id in rated_items_filename_list]
 
-    intersection = [x for x in filename_list if x in directory_filename_list]
-    filename_list = intersection
-
     filename_list.sort()
     utils_logger.info("Loading {} rated items".format(len(filename_list)))
     rated_items = [
-        load_content_instance(items_directory, item_id)
+        load_content_instance(items_directory, item_id, item_field)
         for item_id in filename_list]
 
     return rated_items
 
 
-def get_chosen_items(items_directory: str, items_chosen: List[str]):
+def get_chosen_items(items_directory: str, items_chosen: List[str], item_field: dict = None):
     utils_logger.info("Loading {} chosen items".format(len(items_chosen)))
-    items_loaded = [load_content_instance(items_directory, item_id)
+    items_loaded = [load_content_instance(items_directory, item_id, item_field)
                     for item_id in items_chosen]
     return items_loaded
 
@@ -116,13 +180,22 @@ def remove_not_existent_items(ratings, items_directory: str):
         ratings (pd.DataFrame): Ratings of the user
         items_directory (str): Path to the directory in which the items are stored
     """
+    store = get_columnar_store(items_directory)
+    if store is not None:
+        return ratings[ratings["to_id"].isin(store.content_ids)]
+
+    manifest = load_manifest(items_directory)
+    if manifest is not None:
+        return ratings[ratings["to_id"].isin(manifest.content_ids)]
+
     directory_filename_list = [os.path.splitext(filename)[0]
                                for filename in os.listdir(items_directory)
                                if filename != 'search_index']
 
     rated_items_filename_list = set([re.sub(r'[^\w\s]', '', item_id) for item_id in ratings.to_id])
 
-    intersection = [x for x in rated_items_filename_list if x in directory_filename_list]
+    directory_filename_set = set(directory_filename_list)
+    intersection = [x for x in rated_items_filename_list if x in directory_filename_set]
     ratings = ratings[ratings["to_id"].isin(intersection)]
 
     return ratings
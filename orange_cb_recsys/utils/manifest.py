@@ -0,0 +1,154 @@
+import json
+import os
+from typing import Dict, List, Union
+
+# name of the file where the manifest of the serialized contents is stored
+MANIFEST_FILE = 'manifest.json'
+
+# manifests already loaded, the key is the absolute path of the directory and the value is a tuple
+# (modification time of the manifest file, manifest) so that a manifest rewritten by the ContentAnalyzer is reloaded
+_loaded_manifests = {}
+
+
+class CatalogManifest:
+    """
+    Class that keeps the index of the contents serialized in a directory. For each content the manifest stores:
+
+        the content id
+        the name of the file where the content is serialized (the content id without punctuation plus the extension
+            of the codec used)
+        the size in bytes of said file
+        the names of the fields of the content
+        the fingerprint of the raw content and of the configs from which the content was produced (only if the
+            contents were produced by an incremental ContentAnalyzer)
+
+    The manifest also stores the drift of the catalog, which is the fraction of the contents that have been added,
+    modified or deleted by incremental analyses since the last time the whole catalog was processed.
+
+    The manifest is written by the ContentAnalyzer once every content has been serialized, so that the functions
+    loading contents can find them (or know that they don't exist) without listing the directory.
+
+    Args:
+        entries (List[dict]): list of dicts, one for each content, with keys 'content_id', 'file_name', 'size',
+            'fields' and optionally 'fingerprint'
+        drift (float): fraction of the catalog changed by incremental analyses since the last complete analysis
+    """
+
+    def __init__(self, entries: List[dict] = None, drift: float = 0.0):
+        if entries is None:
+            entries = []
+
+        self.__drift = drift
+        self.__entries: Dict[str, dict] = {}
+        # maps the name of the file without extension to the content id, since some functions refer to the contents
+        # with the name of their file
+        self.__file_stems: Dict[str, str] = {}
+        for entry in entries:
+            self.add(entry['content_id'], entry['file_name'], entry['size'], entry['fields'],
+                     entry.get('fingerprint'))
+
+    @property
+    def drift(self) -> float:
+        """
+        Fraction of the catalog added, modified or deleted by incremental analyses since the last complete analysis
+        """
+        return self.__drift
+
+    @drift.setter
+    def drift(self, drift: float):
+        self.__drift = drift
+
+    @property
+    def content_ids(self) -> List[str]:
+        """
+        Getter for the ids of the contents in the manifest, in the order in which they were serialized
+        """
+        return list(self.__entries.keys())
+
+    def __contains__(self, content_id: str):
+        return content_id in self.__entries or content_id in self.__file_stems
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __entry(self, content_id: str) -> Union[dict, None]:
+        entry = self.__entries.get(content_id)
+        if entry is None and content_id in self.__file_stems:
+            entry = self.__entries[self.__file_stems[content_id]]
+        return entry
+
+    def add(self, content_id: str, file_name: str, size: int, fields: List[str], fingerprint: str = None):
+        """
+        Adds a content to the manifest. If the content is already in the manifest, its entry is replaced
+
+        Args:
+            content_id (str): id of the content
+            file_name (str): name of the file (with extension) where the content is serialized
+            size (int): size in bytes of the file where the content is serialized
+            fields (List[str]): names of the fields of the content
+            fingerprint (str): fingerprint of the raw content and of the configs from which the content was produced
+        """
+        entry = {'content_id': content_id, 'file_name': file_name, 'size': size, 'fields': list(fields)}
+        if fingerprint is not None:
+            entry['fingerprint'] = fingerprint
+        self.__entries[content_id] = entry
+        self.__file_stems[os.path.splitext(file_name)[0]] = content_id
+
+    def get_file_name(self, content_id: str) -> Union[str, None]:
+        """
+        Returns the name of the file where the content is serialized, None if the content is not in the manifest.
+        The content can be referred to both with its id and with the name of its file without extension
+        """
+        entry = self.__entry(content_id)
+        return entry['file_name'] if entry is not None else None
+
+    def get_size(self, content_id: str) -> Union[int, None]:
+        entry = self.__entry(content_id)
+        return entry['size'] if entry is not None else None
+
+    def get_fields(self, content_id: str) -> Union[List[str], None]:
+        entry = self.__entry(content_id)
+        return entry['fields'] if entry is not None else None
+
+    def get_fingerprint(self, content_id: str) -> Union[str, None]:
+        """
+        Returns the fingerprint of the content, None if the content is not in the manifest or if it was produced
+        without fingerprint
+        """
+        entry = self.__entry(content_id)
+        return entry.get('fingerprint') if entry is not None else None
+
+    def save(self, directory: str):
+        """
+        Writes the manifest in the directory passed as argument
+        """
+        with open(os.path.join(directory, MANIFEST_FILE), 'w') as f:
+            json.dump({'drift': self.__drift, 'contents': list(self.__entries.values())}, f)
+
+
+def load_manifest(directory: str) -> Union[CatalogManifest, None]:
+    """
+    Returns the manifest of the contents serialized in the directory passed as argument, or None if the directory
+    doesn't have a manifest (for example because it was created by a previous version of the framework).
+    Each manifest is read only once
+
+    Args:
+        directory (str): Path to the directory in which the contents are stored
+    """
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.isfile(path):
+        return None
+
+    key = os.path.abspath(directory)
+    modification_time = os.path.getmtime(path)
+    if key not in _loaded_manifests or _loaded_manifests[key][0] != modification_time:
+        with open(path) as f:
+            data = json.load(f)
+        # the first manifests were a plain list of entries
+        if isinstance(data, list):
+            manifest = CatalogManifest(data)
+        else:
+            manifest = CatalogManifest(data['contents'], data['drift'])
+        _loaded_manifests[key] = (modification_time, manifest)
+
+    return _loaded_manifests[key][1]
@@ -0,0 +1,338 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import pickle
+import shutil
+import struct
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+# optional codecs, used only if the corresponding package is installed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# the protocol 5 (python >= 3.8) allows to serialize the numpy arrays out-of-band
+PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+OUT_OF_BAND = PICKLE_PROTOCOL >= 5
+
+# header of the files (or of the decompressed stream) serialized with out-of-band buffers
+FRAME_MAGIC = b'OCBRSF\x00\x01'
+# buffers smaller than this threshold are kept in-band, since the frame overhead is not worth it
+MIN_OUT_OF_BAND_SIZE = 1024
+# each out-of-band buffer starts at an offset multiple of this value, so that the numpy arrays are aligned
+BUFFER_ALIGNMENT = 64
+
+# sub directory of the directory of a serialized file where the shared objects it refers to are stored
+SHARED_DIRECTORY = 'shared'
+
+# shared objects already loaded, the key is the tuple (absolute path of the shared directory, shared id). Since the
+# shared id identifies the content of the object, a loaded object never becomes stale
+_loaded_shared_objects: Dict[Tuple[str, str], Any] = {}
+
+# magic numbers of the compressed formats
+_GZIP_MAGIC = b'\x1f\x8b'
+_BZ2_MAGIC = b'BZh'
+_XZ_MAGIC = b'\xfd7zXZ\x00'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+_LZ4_MAGIC = b'\x04\x22\x4d\x18'
+
+
+class _Codec:
+    """
+    Class that stores how a codec opens files for reading and writing
+
+    Args:
+        name (str): name of the codec
+        extension (str): extension of the files written with the codec
+        magic (bytes): first bytes of the files written with the codec, None if the codec doesn't have a header
+        open_file (Callable): function that, given a path and a mode ('rb' or 'wb'), returns a file object
+    """
+
+    def __init__(self, name: str, extension: str, magic: Union[bytes, None], open_file: Callable):
+        self.name = name
+        self.extension = extension
+        self.magic = magic
+        self.open_file = open_file
+
+
+class SharedObject(ABC):
+    """
+    Abstract class for the objects referenced by many serialized objects (for example the vocabulary of a field,
+    referenced by every content of a catalog). When an object referring to a SharedObject is serialized, the
+    SharedObject is stored only once in the 'shared' sub directory of the directory of the serialized file, and the
+    serialized object only keeps its id. When the objects referring to it are deserialized, the SharedObject is
+    loaded only once and shared by all of them.
+    The legacy codecs don't use the shared directory: the SharedObjects are pickled with each object referring to
+    them, so that every file can still be read on its own with pickle.load.
+
+    The shared id must identify the content of the object: two shared objects with the same id must be equal.
+    Every class defining the shared_id property is considered a SharedObject, even if it doesn't inherit from this
+    class, so that the classes of the content representations don't have to import the utils package
+    """
+
+    @property
+    @abstractmethod
+    def shared_id(self) -> str:
+        raise NotImplementedError
+
+    @classmethod
+    def __subclasshook__(cls, subclass):
+        if cls is SharedObject:
+            return isinstance(getattr(subclass, 'shared_id', None), property) or NotImplemented
+        return NotImplemented
+
+
+class _Pickler(pickle.Pickler):
+    """
+    Pickler that stores the SharedObjects in the shared directory of the directory passed as argument
+    """
+
+    def __init__(self, file, directory: str, **kwargs):
+        super().__init__(file, protocol=PICKLE_PROTOCOL, **kwargs)
+        self.__directory = directory
+
+    def persistent_id(self, obj):
+        if isinstance(obj, SharedObject):
+            _save_shared_object(obj, self.__directory)
+            return obj.shared_id
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """
+    Unpickler that loads the SharedObjects from the shared directory of the directory passed as argument
+    """
+
+    def __init__(self, file, directory: str, **kwargs):
+        super().__init__(file, **kwargs)
+        self.__directory = directory
+
+    def persistent_load(self, pid):
+        return _load_shared_object(self.__directory, pid)
+
+
+def _save_shared_object(obj: SharedObject, directory: str):
+    """
+    Stores the SharedObject in the shared directory of the directory passed as argument, unless it is already there
+    """
+    shared_directory = os.path.join(directory, SHARED_DIRECTORY)
+    path = os.path.join(shared_directory, obj.shared_id + '.pkl')
+    if not os.path.isfile(path):
+        os.makedirs(shared_directory, exist_ok=True)
+        # the object is written in a temporary file and then renamed, so that a partially written file is never read
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            pickle.dump(obj, f, protocol=PICKLE_PROTOCOL)
+        os.replace(temp_path, path)
+        _loaded_shared_objects[(os.path.abspath(shared_directory), obj.shared_id)] = obj
+
+
+def _load_shared_object(directory: str, shared_id: str) -> SharedObject:
+    shared_directory = os.path.join(directory, SHARED_DIRECTORY)
+    key = (os.path.abspath(shared_directory), shared_id)
+    if key not in _loaded_shared_objects:
+        path = os.path.join(shared_directory, shared_id + '.pkl')
+        if not os.path.isfile(path):
+            raise FileNotFoundError("Shared object {} not found in {}".format(shared_id, shared_directory))
+        with open(path, 'rb') as f:
+            _loaded_shared_objects[key] = pickle.load(f)
+    return _loaded_shared_objects[key]
+
+
+def _open_zstd(path: str, mode: str):
+    if mode == 'rb':
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+
+
+CODECS: Dict[str, _Codec] = {
+    'none': _Codec('none', '.pkl', None, open),
+    'gzip': _Codec('gzip', '.gz', _GZIP_MAGIC, lambda path, mode: gzip.open(path, mode, compresslevel=6)),
+    'bz2': _Codec('bz2', '.bz2', _BZ2_MAGIC, bz2.open),
+    'lzma': _Codec('lzma', '.xz', _XZ_MAGIC, lzma.open),
+}
+if zstandard is not None:
+    CODECS['zstd'] = _Codec('zstd', '.zst', _ZSTD_MAGIC, _open_zstd)
+if lz4_frame is not None:
+    CODECS['lz4'] = _Codec('lz4', '.lz4', _LZ4_MAGIC, lz4_frame.open)
+
+# the lzma codec writes a single plain pickle stream, so that the directories serialized with it can be read as the
+# ones serialized by the previous versions of the framework (lzma.open followed by pickle.load)
+LEGACY_CODECS = {'lzma'}
+
+
+def available_codecs() -> List[str]:
+    """
+    Returns the names of the codecs that can be used in this environment
+    """
+    return list(CODECS.keys())
+
+
+def check_codec(codec: str):
+    """
+    Raises a ValueError if the codec passed as argument can't be used in this environment
+    """
+    if codec not in CODECS:
+        raise ValueError("Codec {} is not available! Available codecs are: {}".format(codec, available_codecs()))
+
+
+def content_file_path(directory: str, file_name: str, codec: str) -> str:
+    """
+    Returns the path of the file where the content with the file_name passed as argument is serialized with the codec
+    """
+    return os.path.join(directory, file_name + CODECS[codec].extension)
+
+
+def find_content_file(directory: str, file_name: str) -> Union[str, None]:
+    """
+    Finds the file where a content is serialized, whatever the codec used for serializing it was. The codecs are
+    tried in the order in which they are defined, so the legacy '.xz' files are found first
+
+    Returns:
+        path (str): path of the file or None if the content is not serialized in the directory
+    """
+    for codec in CODECS.values():
+        path = os.path.join(directory, file_name + codec.extension)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _write_frame(file, obj: Any, directory: str):
+    """
+    Writes the object passed as argument in the following frame:
+
+        FRAME_MAGIC | number of buffers | length of the pickle | length of each buffer | pickle | buffers
+
+    where each buffer is padded so that it starts at an offset multiple of BUFFER_ALIGNMENT
+    """
+    buffers = []
+
+    def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+        if buffer.raw().nbytes < MIN_OUT_OF_BAND_SIZE:
+            return True
+        buffers.append(buffer)
+        return False
+
+    stream = io.BytesIO()
+    _Pickler(stream, directory, buffer_callback=buffer_callback).dump(obj)
+    data = stream.getbuffer()
+    raw_buffers = [buffer.raw() for buffer in buffers]
+
+    header = FRAME_MAGIC + struct.pack('<IQ', len(raw_buffers), len(data)) + \
+        struct.pack('<{}Q'.format(len(raw_buffers)), *(raw.nbytes for raw in raw_buffers))
+    file.write(header)
+    file.write(data)
+
+    offset = len(header) + len(data)
+    for raw in raw_buffers:
+        padding = -offset % BUFFER_ALIGNMENT
+        file.write(b'\x00' * padding)
+        file.write(raw)
+        offset += padding + raw.nbytes
+
+
+def _read_frame(payload: memoryview, directory: str) -> Any:
+    """
+    Reads an object written with _write_frame. The out-of-band buffers are slices of the payload, so the numpy arrays
+    of the object are not copied
+    """
+    offset = len(FRAME_MAGIC)
+    n_buffers, data_length = struct.unpack_from('<IQ', payload, offset)
+    offset += struct.calcsize('<IQ')
+    buffer_lengths = struct.unpack_from('<{}Q'.format(n_buffers), payload, offset)
+    offset += struct.calcsize('<{}Q'.format(n_buffers))
+
+    data = payload[offset:offset + data_length]
+    offset += data_length
+
+    buffers = []
+    for length in buffer_lengths:
+        offset += -offset % BUFFER_ALIGNMENT
+        buffers.append(payload[offset:offset + length])
+        offset += length
+
+    return _Unpickler(io.BytesIO(data), directory, buffers=buffers).load()
+
+
+def serialize(obj: Any, path: str, codec: str = 'lzma'):
+    """
+    Serializes an object in the file passed as argument, compressing it with the codec passed as argument.
+    Unless a legacy codec is used, the numpy arrays (and any other object supporting the pickle protocol 5) are
+    serialized out-of-band, so that they can be loaded without being copied.
+    The SharedObjects referred by the object are stored in the 'shared' sub directory of the directory of the file,
+    except with the legacy codecs which pickle them with the object
+
+    Args:
+        obj (Any): object to serialize
+        path (str): path of the file where the object will be serialized
+        codec (str): name of the codec used to compress the file
+    """
+    check_codec(codec)
+    directory = os.path.dirname(path)
+    with CODECS[codec].open_file(path, 'wb') as f:
+        if codec in LEGACY_CODECS:
+            pickle.dump(obj, f, protocol=PICKLE_PROTOCOL)
+        elif not OUT_OF_BAND:
+            _Pickler(f, directory).dump(obj)
+        else:
+            _write_frame(f, obj, directory)
+
+
+def detect_codec(path: str) -> str:
+    """
+    Detects the codec used to write a file by reading its first bytes
+    """
+    with open(path, 'rb') as f:
+        header = f.read(8)
+
+    for codec in CODECS.values():
+        if codec.magic is not None and header.startswith(codec.magic):
+            return codec.name
+    for magic, name in [(_ZSTD_MAGIC, 'zstd'), (_LZ4_MAGIC, 'lz4')]:
+        if header.startswith(magic):
+            raise ValueError("File {} was compressed with {}, which is not installed".format(path, name))
+    return 'none'
+
+
+def deserialize(path: str) -> Any:
+    """
+    Loads an object serialized with the serialize function (or a plain pickle compressed with one of the available
+    codecs). The codec is detected from the header of the file, so the extension of the file is not considered
+
+    Args:
+        path (str): path of the file to load
+    """
+    codec = detect_codec(path)
+    directory = os.path.dirname(path)
+
+    if codec == 'none':
+        payload = bytearray(os.path.getsize(path))
+        with open(path, 'rb') as f:
+            f.readinto(payload)
+        stream = None
+        payload = memoryview(payload)
+    else:
+        # the decompressed stream is kept in a writable buffer, so that the arrays loaded from it are writable
+        stream = io.BytesIO()
+        with CODECS[codec].open_file(path, 'rb') as f:
+            shutil.copyfileobj(f, stream)
+        stream.seek(0)
+        payload = stream.getbuffer()
+
+    if payload[:len(FRAME_MAGIC)] == FRAME_MAGIC:
+        return _read_frame(payload, directory)
+    if stream is None:
+        return _Unpickler(io.BytesIO(payload), directory).load()
+    # the stream can't be read while its buffer is exported
+    payload.release()
+    return _Unpickler(stream, directory).load()
@@ -0,0 +1,202 @@
+import os
+import shutil
+from unittest import TestCase
+
+import numpy as np
+
+from orange_cb_recsys.content_analyzer.content_representation.columnar_store import ColumnarStoreWriter, \
+    ColumnarContentStore, StoredContent, is_columnar_store
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, FeaturesBagField, \
+    SimpleField, EmbeddingField, PropertiesDict, SparseFeaturesBagField, Vocabulary, QuantizedEmbeddingField
+from orange_cb_recsys.content_analyzer.content_representation.representation_container import \
+    RepresentationContainer
+
+
+def create_content(content_id: str, i: int) -> Content:
+    content = Content(content_id)
+    content.append_field("Title", RepresentationContainer(
+        [SimpleField("title {}".format(i)),
+         FeaturesBagField({"word{}".format(i): 0.5, "common": float(i)})],
+        ["original", None]))
+    content.append_field("Plot", RepresentationContainer(
+        [EmbeddingField(np.full(3, i, dtype=float)),
+         EmbeddingField(np.full((i + 1, 2), i, dtype=float))],
+        ["doc", "word"]))
+    content.append_exogenous_representation(PropertiesDict({"director": "director {}".format(i)}), "dbpedia")
+    return content
+
+
+class TestColumnarStore(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.directory = 'columnar_store_test'
+        os.makedirs(cls.directory, exist_ok=True)
+
+        cls.contents = [create_content("tt{}".format(i), i) for i in range(5)]
+        writer = ColumnarStoreWriter(cls.directory)
+        for content in cls.contents:
+            writer.add_content(content)
+        writer.close()
+
+    def test_is_columnar_store(self):
+        self.assertTrue(is_columnar_store(self.directory))
+        self.assertFalse(is_columnar_store('not_existent'))
+
+    def test_get_field_representation(self):
+        store = ColumnarContentStore(self.directory)
+
+        self.assertEqual(len(store), 5)
+        self.assertEqual(store.content_ids, ["tt0", "tt1", "tt2", "tt3", "tt4"])
+        self.assertIn("tt3", store)
+        self.assertNotIn("tt9", store)
+
+        title = store.get_field_representation("tt3", "Title", "original")
+        self.assertIsInstance(title, SimpleField)
+        self.assertEqual(title.value, "title 3")
+
+        bag = store.get_field_representation("tt3", "Title", 1)
+        self.assertIsInstance(bag, FeaturesBagField)
+        self.assertEqual(bag.value, {"word3": 0.5, "common": 3.0})
+
+        doc_embedding = store.get_field_representation("tt3", "Plot", "doc")
+        self.assertIsInstance(doc_embedding, EmbeddingField)
+        self.assertEqual(doc_embedding.value.shape, (3,))
+        np.testing.assert_array_equal(doc_embedding.value, np.full(3, 3))
+
+        word_embedding = store.get_field_representation("tt3", "Plot", "word")
+        self.assertEqual(word_embedding.value.shape, (4, 2))
+        np.testing.assert_array_equal(word_embedding.value, np.full((4, 2), 3))
+
+        exo = store.get_exogenous_representation("tt2", "dbpedia")
+        self.assertEqual(exo.value, {"director": "director 2"})
+
+        with self.assertRaises(KeyError):
+            store.get_field_representation("tt3", "Plot", "not_existent")
+
+        with self.assertRaises(KeyError):
+            store.get_field_representation("tt9", "Plot", "doc")
+
+    def test_load_content(self):
+        store = ColumnarContentStore(self.directory)
+
+        self.assertIsNone(store.load_content("tt9"))
+
+        content = store.load_content("tt1")
+        self.assertIsInstance(content, StoredContent)
+        self.assertEqual(content.content_id, "tt1")
+        self.assertEqual(content.get_field_representation("Title", 0).value, "title 1")
+        self.assertEqual(content.get_exogenous_representation(0).value, {"director": "director 1"})
+
+        # the whole content is read only when it's needed
+        self.assertEqual(list(content.field_dict.keys()), ["Title", "Plot"])
+        self.assertEqual(len(content.get_field("Plot")), 2)
+        self.assertEqual(content.exogenous_rep_container.get_external_index(), ["dbpedia"])
+        self.assertEqual(content.get_field_representation("Title", "original").value, "title 1")
+
+    def test_load_projected_content(self):
+        directory = self.directory + '_projected'
+        writer = ColumnarStoreWriter(directory)
+        for content in self.contents:
+            writer.add_content(content)
+        writer.close()
+
+        # the column of the 'doc' representation of the 'Plot' field is removed, the contents can still be loaded
+        # if said representation is not requested
+        os.remove(os.path.join(directory, 'columnar_store', 'c2.data'))
+        store = ColumnarContentStore(directory)
+
+        content = store.load_content("tt1", {"Title": "original", "Plot": ["word"]})
+        self.assertEqual(content.get_field_representation("Title", "original").value, "title 1")
+        self.assertIs(content.get_field_representation("Plot", "word"),
+                      content.get_field_representation("Plot", "word"))
+
+        with self.assertRaises(FileNotFoundError):
+            content.get_field_representation("Plot", "doc")
+
+        shutil.rmtree(directory)
+
+    def test_different_layout(self):
+        writer = ColumnarStoreWriter(self.directory + '_error')
+        writer.add_content(create_content("tt0", 0))
+
+        content = create_content("tt1", 1)
+        content.remove_field_representation("Title", "original")
+        with self.assertRaises(ValueError):
+            writer.add_content(content)
+
+        writer.close()
+        shutil.rmtree(self.directory + '_error')
+
+    def test_sparse_bag(self):
+        directory = self.directory + '_sparse'
+        vocabulary = Vocabulary(['apple', 'banana', 'cherry'])
+        writer = ColumnarStoreWriter(directory)
+        for i in range(3):
+            content = Content("tt{}".format(i))
+            content.append_field_representation("Plot", SparseFeaturesBagField([i], [0.5], vocabulary), "tfidf")
+            writer.add_content(content)
+
+        content = Content("tt3")
+        content.append_field_representation("Plot", SparseFeaturesBagField([0], [0.5], Vocabulary(['other'])),
+                                            "tfidf")
+        with self.assertRaises(ValueError):
+            writer.add_content(content)
+        writer.close()
+
+        store = ColumnarContentStore(directory)
+        bag = store.get_field_representation("tt1", "Plot", "tfidf")
+        self.assertIsInstance(bag, SparseFeaturesBagField)
+        self.assertEqual({"banana": 0.5}, bag.value)
+        self.assertEqual(vocabulary, bag.vocabulary)
+        self.assertIs(bag.vocabulary, store.get_field_representation("tt2", "Plot", "tfidf").vocabulary)
+
+        shutil.rmtree(directory)
+
+    def test_bag_fall_back_to_object(self):
+        directory = self.directory + '_bag'
+        writer = ColumnarStoreWriter(directory)
+        bags = [FeaturesBagField({"word": 0.5, "common": 1}), FeaturesBagField({"common": 2.0}),
+                FeaturesBagField({"word": "not numeric"}), FeaturesBagField({"other": 3.0})]
+        for i, bag in enumerate(bags):
+            content = Content("tt{}".format(i))
+            content.append_field_representation("Plot", bag, "bag")
+            writer.add_content(content)
+        writer.close()
+
+        # the column is inferred from the first bag, the bag with a string score turns it into an object column
+        store = ColumnarContentStore(directory)
+        for i, bag in enumerate(bags):
+            result = store.get_field_representation("tt{}".format(i), "Plot", "bag")
+            self.assertIsInstance(result, FeaturesBagField)
+            self.assertEqual(bag.value, result.value)
+        self.assertFalse(any(file_name.endswith('.indices') for file_name in
+                             os.listdir(os.path.join(directory, 'columnar_store'))))
+
+        shutil.rmtree(directory)
+
+    def test_float32_embedding(self):
+        directory = self.directory + '_float32'
+        writer = ColumnarStoreWriter(directory)
+        for i in range(3):
+            content = Content("tt{}".format(i))
+            content.append_field_representation("Plot", EmbeddingField(np.full(3, i, dtype=np.float32)), "float32")
+            content.append_field_representation("Plot", QuantizedEmbeddingField.quantize(np.full((2, 3), i)), "int8")
+            writer.add_content(content)
+        writer.close()
+
+        store = ColumnarContentStore(directory)
+        float32_embedding = store.get_field_representation("tt2", "Plot", "float32").value
+        self.assertEqual(np.float32, float32_embedding.dtype)
+        np.testing.assert_array_equal(np.full(3, 2), float32_embedding)
+
+        # the quantized embeddings are stored dequantized
+        int8_embedding = store.get_field_representation("tt2", "Plot", "int8").value
+        self.assertEqual(np.float32, int8_embedding.dtype)
+        np.testing.assert_allclose(np.full((2, 3), 2), int8_embedding)
+
+        shutil.rmtree(directory)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(cls.directory)
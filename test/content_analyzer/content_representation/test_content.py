@@ -1,6 +1,11 @@
+import pickle
 from unittest import TestCase
 
-from orange_cb_recsys.content_analyzer.content_representation.content import Content, PropertiesDict, FeaturesBagField
+import numpy as np
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, PropertiesDict, \
+    FeaturesBagField, SparseFeaturesBagField, Vocabulary, EmbeddingField, QuantizedEmbeddingField, \
+    create_embedding_field
 from orange_cb_recsys.content_analyzer.content_representation.representation_container import RepresentationContainer
 
 
@@ -104,3 +109,72 @@ class TestContent(TestCase):
         self.assertEqual(len(content3.exogenous_rep_container), 2)
         self.assertEqual(content3.get_exogenous_representation(0).value, content_exo_repr.value)
         self.assertEqual(content3.get_exogenous_representation(1).value, content_exo_repr2.value)
+
+
+class TestSparseFeaturesBagField(TestCase):
+    def test_sparse_features_bag(self):
+        vocabulary = Vocabulary(['apple', 'banana', 'cherry'])
+        self.assertEqual(3, len(vocabulary))
+        self.assertEqual(1, vocabulary.get_term_id('banana'))
+        self.assertIsNone(vocabulary.get_term_id('not_existent'))
+        self.assertEqual('cherry', vocabulary[2])
+        self.assertEqual(Vocabulary(['apple', 'banana', 'cherry']), vocabulary)
+        self.assertNotEqual(Vocabulary(['banana', 'apple', 'cherry']).shared_id, vocabulary.shared_id)
+
+        bag = SparseFeaturesBagField([2, 0], [0.5, 0.25], vocabulary)
+        self.assertEqual(np.float32, bag.scores.dtype)
+        self.assertEqual(np.int32, bag.term_ids.dtype)
+
+        # the value is still the dict <feature, score>
+        self.assertEqual({'cherry': 0.5, 'apple': 0.25}, bag.value)
+        self.assertEqual(FeaturesBagField({'cherry': 0.5, 'apple': 0.25}), bag)
+        self.assertEqual(bag, FeaturesBagField({'cherry': 0.5, 'apple': 0.25}))
+        self.assertEqual(SparseFeaturesBagField([2, 0], [0.5, 0.25], Vocabulary(vocabulary.terms)), bag)
+
+        row = bag.to_sparse_row()
+        self.assertEqual((1, 3), row.shape)
+        np.testing.assert_array_equal(np.array([[0.25, 0, 0.5]], dtype=np.float32), row.toarray())
+
+        with self.assertRaises(ValueError):
+            SparseFeaturesBagField([2, 0], [0.5], vocabulary)
+
+
+class TestQuantizedEmbeddingField(TestCase):
+    def test_quantize(self):
+        matrix = np.array([[1.0, -0.5, 0.0], [0.0, 0.0, 0.0], [-254.0, 3.0, 127.0]])
+        quantized = QuantizedEmbeddingField.quantize(matrix)
+
+        self.assertEqual(np.int8, quantized.codes.dtype)
+        self.assertEqual((3, 3), quantized.codes.shape)
+        np.testing.assert_array_equal([-127, 2, 64], quantized.codes[2])
+        np.testing.assert_array_equal([0, 0, 0], quantized.codes[1])
+
+        # the error of each value is at most half the scale of its row
+        value = quantized.value
+        self.assertEqual(np.float32, value.dtype)
+        self.assertTrue(np.all(np.abs(value - matrix) <= quantized.scales[:, np.newaxis] / 2 + 1e-6))
+
+        vector = QuantizedEmbeddingField.quantize(np.array([0.5, -1.0]))
+        self.assertEqual((2,), vector.value.shape)
+        np.testing.assert_allclose([0.5, -1.0], vector.value, atol=0.5 / 127)
+
+        empty = QuantizedEmbeddingField.quantize(np.zeros((0, 3)))
+        self.assertEqual((0, 3), empty.value.shape)
+
+        loaded = pickle.loads(pickle.dumps(quantized))
+        np.testing.assert_array_equal(quantized.codes, loaded.codes)
+        self.assertEqual(quantized, loaded)
+
+        with self.assertRaises(ValueError):
+            QuantizedEmbeddingField(np.zeros((2, 3)), np.ones(3))
+
+    def test_create_embedding_field(self):
+        matrix = np.array([[1.0, -0.5], [0.25, 2.0]])
+
+        self.assertEqual(np.float64, create_embedding_field(matrix).value.dtype)
+        self.assertEqual(np.float32, create_embedding_field(matrix, 'float32').value.dtype)
+        self.assertIsInstance(create_embedding_field(matrix, 'int8'), QuantizedEmbeddingField)
+        self.assertEqual(EmbeddingField(matrix), create_embedding_field(matrix, 'float32'))
+
+        with self.assertRaises(ValueError):
+            create_embedding_field(matrix, 'float16')
@@ -1,7 +1,13 @@
+import os
+import pickle
 from unittest import TestCase
 import numpy as np
 
+from orange_cb_recsys.content_analyzer.content_representation.content import FeaturesBagField, SimpleField, \
+    EmbeddingField
 from orange_cb_recsys.content_analyzer.content_representation.representation_container import RepresentationContainer
+from orange_cb_recsys.utils.const import root_path
+from orange_cb_recsys.utils.serialization import deserialize
 
 
 class TestRepresentationContainer(TestCase):
@@ -60,3 +66,36 @@ class TestRepresentationContainer(TestCase):
         # Check that the iterator gives an error since there aren't any items left
         with self.assertRaises(StopIteration):
             next(it)
+
+    def test_pickle(self):
+        rep_container = RepresentationContainer([SimpleField('value'), FeaturesBagField({'word': 0.5}),
+                                                 EmbeddingField(np.ones(3))], ['test1', None, 'test3'])
+
+        # the container and the representations don't have a __dict__, but can be serialized
+        self.assertFalse(hasattr(rep_container, '__dict__'))
+        self.assertFalse(hasattr(rep_container[0], '__dict__'))
+
+        loaded = pickle.loads(pickle.dumps(rep_container))
+        self.assertEqual(rep_container, loaded)
+        self.assertEqual('value', loaded['test1'].value)
+        self.assertEqual({'word': 0.5}, loaded[1].value)
+        np.testing.assert_array_equal(np.ones(3), loaded['test3'].value)
+
+        loaded.append(SimpleField('new'), 'test4')
+        self.assertEqual([0, 1, 2, 3], loaded.get_internal_index())
+
+    def test_load_legacy(self):
+        # contents serialized when the container wrapped a DataFrame
+        content = deserialize(os.path.join(root_path, 'contents', 'movies_codified', 'tt0112281.xz'))
+
+        plot = content.get_field('Plot')
+        self.assertEqual([0, 1, 2, 3], plot.get_internal_index())
+        self.assertEqual(['tfidf', 'embedding', 'index_original', 'index_preprocessed'], plot.get_external_index())
+        self.assertIsInstance(plot['tfidf'], FeaturesBagField)
+        self.assertIsInstance(plot['embedding'].value, np.ndarray)
+
+        genre = content.get_field('Genre')
+        self.assertIs(np.nan, genre.get_external_index()[3])
+
+        year = content.get_field('Year')
+        self.assertIsInstance(year['int'], SimpleField)
@@ -47,3 +47,22 @@ class TestGensimDownloader(TestEmbeddingSource):
 
         self.assertWordEmbeddingMatches(source, result[0], "title")
         self.assertWordEmbeddingMatches(source, result[1], "plot")
+
+    def test_get_embeddings(self):
+        vectors = np.array([[1, 2], [3, 4]], dtype=np.float32)
+
+        # gensim >= 4 maps the words to their rows with key_to_index
+        model = Mock(spec=['key_to_index', 'vectors', 'vector_size'], key_to_index={'title': 0, 'plot': 1},
+                     vectors=vectors, vector_size=2)
+        with mock.patch('gensim.downloader.info', return_value={'models': 'glove-twitter-25'}):
+            with mock.patch('gensim.downloader.load', return_value=model):
+                source = Gensim('glove-twitter-25')
+        np.testing.assert_array_equal([[3, 4], [0, 0], [1, 2]], source.get_embeddings(['plot', 'missing', 'title']))
+
+        # gensim 3 maps them to Vocab objects with vocab
+        model = Mock(spec=['vocab', 'vectors', 'vector_size'], vocab={'title': Mock(index=0), 'plot': Mock(index=1)},
+                     vectors=vectors, vector_size=2)
+        with mock.patch('gensim.downloader.info', return_value={'models': 'glove-twitter-25'}):
+            with mock.patch('gensim.downloader.load', return_value=model):
+                source = Gensim('glove-twitter-25')
+        np.testing.assert_array_equal([[3, 4], [0, 0], [1, 2]], source.get_embeddings(['plot', 'missing', 'title']))
@@ -1,6 +1,9 @@
 from unittest import TestCase
 import os
 
+import numpy as np
+from gensim.models import KeyedVectors
+
 from orange_cb_recsys.content_analyzer.content_representation.content import EmbeddingField
 from orange_cb_recsys.content_analyzer.embeddings.embedding_learner import GensimFastText
 from orange_cb_recsys.content_analyzer.field_content_production_techniques.embedding_technique import \
@@ -78,3 +81,54 @@ class TestEmbeddingTechnique(TestCase):
 
         with self.assertRaises(FileNotFoundError):
             WordEmbeddingTechnique(Gensim('not_existing_model'))
+
+
+class LocalGensim(Gensim):
+    """
+    Gensim loader whose model is built in memory instead of being downloaded
+    """
+
+    def load_model(self):
+        model = KeyedVectors(vector_size=3)
+        model.add_vectors(['the', 'toy', 'story', 'jumanji'],
+                          np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1], [1, 1, 1]], dtype=np.float32))
+        return model
+
+
+class TestBatchRepr(TestCase):
+    def test_load_batch(self):
+        source = LocalGensim()
+        texts = [['The', 'toy', 'unknown'], [], ['jumanji', 'toy']]
+        for text, embedding_matrix in zip(texts, source.load_batch(texts)):
+            expected = np.ndarray(shape=(max(len(text), 1), 3))
+            if len(text) == 0:
+                expected[0, :] = 0
+            for i, word in enumerate(text):
+                try:
+                    expected[i, :] = source.get_embedding(word.lower())
+                except KeyError:
+                    expected[i, :] = 0
+            np.testing.assert_array_equal(embedding_matrix, expected)
+            np.testing.assert_array_equal(embedding_matrix, source.load(text))
+
+    def test_produce_batch_repr(self):
+        field_data_list = ["Toy Story", "Jumanji", "", "the story of the unknown toy"]
+        for technique in [WordEmbeddingTechnique(LocalGensim()),
+                          FromWordsDocumentEmbeddingTechnique(LocalGensim(), Centroid())]:
+            batch = technique.produce_batch_repr(field_data_list)
+            self.assertEqual(len(batch), len(field_data_list))
+            for field_data, representation in zip(field_data_list, batch):
+                np.testing.assert_array_equal(representation.value, technique.produce_single_repr(field_data).value)
+
+    def test_batch_size(self):
+        technique = FromWordsDocumentEmbeddingTechnique(LocalGensim(), Centroid())
+        expected = technique.produce_content("Title", [], JSONFile(file_path))
+
+        technique.batch_size = 3
+        embedding_list = technique.produce_content("Title", [], JSONFile(file_path))
+        self.assertEqual(len(embedding_list), 20)
+        for representation, expected_representation in zip(embedding_list, expected):
+            np.testing.assert_array_equal(representation.value, expected_representation.value)
+
+        with self.assertRaises(ValueError):
+            technique.batch_size = 0
@@ -2,6 +2,7 @@ import json
 from unittest import TestCase
 import os
 
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import TextProcessor
 from orange_cb_recsys.content_analyzer.information_processor.nlp import NLTK
 from orange_cb_recsys.content_analyzer.content_representation.content import SimpleField
 from orange_cb_recsys.content_analyzer.field_content_production_techniques.field_content_production_technique import \
@@ -12,6 +13,12 @@ THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 file_path = os.path.join(THIS_DIR, "../../../datasets/movies_info_reduced.json")
 
 
+class UpperProcessor(TextProcessor):
+
+    def process(self, field_data):
+        return field_data.upper()
+
+
 class TestOriginalData(TestCase):
     @classmethod
     def setUpClass(cls) -> None:
@@ -25,6 +32,22 @@ class TestOriginalData(TestCase):
         self.assertEqual(len(data_list), 20)
         self.assertIsInstance(data_list[0], SimpleField)
 
+    def test_produce_content_parallel_preprocessing(self):
+        technique = OriginalData()
+        expected = technique.produce_content("Title", [UpperProcessor()], JSONFile(file_path))
+
+        technique.preprocessing_workers = 2
+        technique.preprocessing_chunk_size = 3
+        data_list = technique.produce_content("Title", [UpperProcessor()], JSONFile(file_path))
+
+        self.assertEqual([data.value for data in expected], [data.value for data in data_list])
+        self.assertEqual("JUMANJI", data_list[0].value)
+
+        with self.assertRaises(ValueError):
+            technique.preprocessing_workers = 0
+        with self.assertRaises(ValueError):
+            technique.preprocessing_chunk_size = 0
+
     def test_produce_content_dtype_specified(self):
         technique = OriginalData(dtype=int)
 
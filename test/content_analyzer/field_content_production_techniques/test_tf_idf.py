@@ -1,14 +1,38 @@
+import json
 from unittest import TestCase
 import os
 
-from orange_cb_recsys.content_analyzer.content_representation.content import FeaturesBagField
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from orange_cb_recsys.content_analyzer.content_representation.content import FeaturesBagField, \
+    SparseFeaturesBagField
 from orange_cb_recsys.content_analyzer.field_content_production_techniques.tf_idf import WhooshTfIdf, SkLearnTfIdf
-from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile, JSONLinesFile
 
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 file_path = os.path.join(THIS_DIR, "../../../datasets/movies_info_reduced.json")
 
 
+def create_shards(jsonl_path: str, shard_count: int) -> list:
+    with open(jsonl_path, 'w') as f:
+        for raw_content in JSONFile(file_path):
+            f.write(json.dumps(raw_content) + '\n')
+    return [JSONLinesFile(jsonl_path, shard_index, shard_count) for shard_index in range(shard_count)]
+
+
+def produce_sharded(technique, shards: list) -> list:
+    """
+    Produces the representations of the Plot field of each shard with the statistics of the whole collection
+    """
+    technique.set_collection_statistics(technique.merge_collection_statistics(
+        [technique.compute_collection_statistics(shard, "Plot", []) for shard in shards]))
+    representations = [representation for shard in shards
+                       for representation in technique.produce_content("Plot", [], shard)]
+    technique.set_collection_statistics(None)
+    return representations
+
+
 class TestWhooshTfIdf(TestCase):
     def test_produce_content(self):
         technique = WhooshTfIdf()
@@ -18,6 +42,42 @@ class TestWhooshTfIdf(TestCase):
         self.assertEqual(len(features_bag_list), 20)
         self.assertIsInstance(features_bag_list[0], FeaturesBagField)
 
+    def test_in_memory(self):
+        expected = WhooshTfIdf().produce_content("Plot", [], JSONFile(file_path))
+
+        technique = WhooshTfIdf(in_memory=True)
+        directories = set(os.listdir('.'))
+        result = technique.produce_content("Plot", [], JSONFile(file_path))
+        self.assertEqual(directories, set(os.listdir('.')))
+        self.assertEqual([bag.value for bag in expected], [bag.value for bag in result])
+
+    def test_produce_batch_repr(self):
+        technique = WhooshTfIdf()
+        dataset_len = technique.dataset_refactor(JSONFile(file_path), "Plot", [])
+        try:
+            batch = technique.produce_batch_repr(list(range(dataset_len)))
+            self.assertEqual(dataset_len, len(batch))
+            for position in [0, 5, dataset_len - 1]:
+                self.assertEqual(technique.produce_single_repr(position).value, batch[position].value)
+        finally:
+            technique.delete_refactored()
+
+    def test_collection_statistics(self):
+        jsonl_path = 'tf_idf_whoosh_shards.jsonl'
+        shards = create_shards(jsonl_path, 3)
+        technique = WhooshTfIdf()
+
+        expected = technique.produce_content("Plot", [], JSONFile(file_path))
+        result = produce_sharded(technique, shards)
+        self.assertIsNone(technique.collection_statistics)
+
+        self.assertEqual(len(expected), len(result))
+        for expected_bag, bag in zip(expected, result):
+            self.assertEqual(expected_bag.value.keys(), bag.value.keys())
+            for term in expected_bag.value:
+                self.assertAlmostEqual(expected_bag.value[term], bag.value[term])
+        os.remove(jsonl_path)
+
 
 class TestSkLearnTfIdf(TestCase):
 
@@ -28,3 +88,75 @@ class TestSkLearnTfIdf(TestCase):
 
         self.assertEqual(len(features_bag_list), 20)
         self.assertIsInstance(features_bag_list[0], FeaturesBagField)
+
+    def test_collection_statistics(self):
+        jsonl_path = 'tf_idf_sklearn_shards.jsonl'
+        shards = create_shards(jsonl_path, 3)
+        technique = SkLearnTfIdf()
+
+        result = produce_sharded(technique, shards)
+
+        # same values of the tf-idf computed on the whole collection
+        vectorizer = TfidfVectorizer(sublinear_tf=True)
+        matrix = vectorizer.fit_transform([raw_content["Plot"] for raw_content in JSONFile(file_path)])
+        terms = {column: term for term, column in vectorizer.vocabulary_.items()}
+        self.assertEqual(matrix.shape[0], len(result))
+        for row, bag in enumerate(result):
+            expected = {terms[column]: value for column, value in zip(matrix[row].indices, matrix[row].data)}
+            self.assertEqual(expected.keys(), bag.value.keys())
+            for term in expected:
+                self.assertAlmostEqual(expected[term], bag.value[term])
+        os.remove(jsonl_path)
+
+    def test_produce_batch_repr(self):
+        technique = SkLearnTfIdf()
+        dataset_len = technique.dataset_refactor(JSONFile(file_path), "Plot", [])
+
+        batch = technique.produce_batch_repr(list(range(dataset_len)))
+        self.assertEqual(dataset_len, len(batch))
+        self.assertIsInstance(batch[0], SparseFeaturesBagField)
+        for position in [0, 7, dataset_len - 1]:
+            self.assertEqual(technique.produce_single_repr(position), batch[position])
+        self.assertEqual([batch[3], batch[1]], technique.produce_batch_repr([3, 1]))
+
+        vectorizer = TfidfVectorizer(sublinear_tf=True)
+        matrix = vectorizer.fit_transform([raw_content["Plot"] for raw_content in JSONFile(file_path)])
+        terms = {column: term for term, column in vectorizer.vocabulary_.items()}
+        for row, bag in enumerate(batch):
+            expected = {terms[column]: value for column, value in zip(matrix[row].indices, matrix[row].data)}
+            self.assertEqual(expected.keys(), bag.value.keys())
+            for term in expected:
+                self.assertAlmostEqual(expected[term], bag.value[term], places=6)
+        technique.delete_refactored()
+
+    def test_vectorizer_parameters(self):
+        full_result = SkLearnTfIdf().produce_content("Plot", [], JSONFile(file_path))
+        full_vocabulary = full_result[0].vocabulary
+        # the scores are stored as float32 whatever the dtype of the matrix
+        self.assertTrue(all(bag.scores.dtype == np.float32 for bag in full_result))
+
+        technique = SkLearnTfIdf(min_df=2, max_df=0.9, dtype='float32')
+        self.assertIs(np.float32, technique.dtype)
+        result = technique.produce_content("Plot", [], JSONFile(file_path))
+        self.assertLess(len(result[0].vocabulary), len(full_vocabulary))
+
+        result = SkLearnTfIdf(max_features=10).produce_content("Plot", [], JSONFile(file_path))
+        self.assertEqual(10, len(result[0].vocabulary))
+        self.assertTrue(all(len(bag.term_ids) <= 10 for bag in result))
+
+        # the terms are pruned with the document frequencies of the whole collection when it's split in shards
+        jsonl_path = 'tf_idf_sklearn_parameters_shards.jsonl'
+        shards = create_shards(jsonl_path, 3)
+        expected = SkLearnTfIdf(min_df=2, max_df=0.9).produce_content("Plot", [], JSONFile(file_path))
+        result = produce_sharded(SkLearnTfIdf(min_df=2, max_df=0.9), shards)
+        self.assertEqual(expected[0].vocabulary.terms, result[0].vocabulary.terms)
+        for expected_bag, bag in zip(expected, result):
+            self.assertEqual(expected_bag.value.keys(), bag.value.keys())
+            for term in expected_bag.value:
+                self.assertAlmostEqual(expected_bag.value[term], bag.value[term], places=6)
+
+        self.assertTrue(SkLearnTfIdf().supports_collection_statistics)
+        self.assertFalse(SkLearnTfIdf(max_features=10).supports_collection_statistics)
+        with self.assertRaises(ValueError):
+            SkLearnTfIdf(max_features=10).compute_collection_statistics(shards[0], "Plot", [])
+        os.remove(jsonl_path)
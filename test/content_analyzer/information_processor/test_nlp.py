@@ -1,3 +1,4 @@
+import pickle
 from unittest import TestCase
 
 from nltk import Tree
@@ -68,3 +69,15 @@ class TestNLTK(TestCase):
 
         self.assertEqual(result,
                          Tree('S', [Tree('PERSON', [('Facebook', 'NNP')]), ('was', 'VBD'), ('fined', 'VBN'), ('by', 'IN'), Tree('PERSON', [('Hewlett', 'NNP'), ('Packard', 'NNP')]), ('for', 'IN'), ('spending', 'VBG'), ('100€', 'CD'), ('to', 'TO'), ('buy', 'VB'), Tree('PERSON', [('Cristiano', 'NNP'), ('Ronaldo', 'NNP')]), ('from', 'IN'), Tree('GPE', [('Juventus', 'NNP')])]))
+
+    def test_process_memoized(self):
+        nltka = NLTK(stopwords_removal=True, stemming=True, lemmatization=True)
+        text = "The striped bats are hanging on their feet, the bats are striped"
+        expected = ["strip", "bat", "hang", "foot", ",", "bat", "strip"]
+
+        # the memoized stems, lemmas and tags give the same results of the first time the words are processed
+        self.assertEqual(expected, nltka.process(text))
+        self.assertEqual(expected, nltka.process(text))
+
+        # the resources and the memos are not pickled, the unpickled instance creates its own
+        self.assertEqual(expected, pickle.loads(pickle.dumps(nltka)).process(text))
@@ -0,0 +1,45 @@
+import os
+from unittest import TestCase
+
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import TextProcessor
+from orange_cb_recsys.content_analyzer.information_processor.parallel_processing import process_documents
+
+
+class PidProcessor(TextProcessor):
+    """
+    Appends the pid of the process processing the text
+    """
+
+    def process(self, field_data):
+        return field_data + " " + str(os.getpid())
+
+
+class UpperProcessor(TextProcessor):
+
+    def process(self, field_data):
+        return field_data.upper()
+
+
+class TestProcessDocuments(TestCase):
+
+    def test_process_documents(self):
+        documents = ["document {}".format(i) for i in range(50)]
+        preprocessor_list = [UpperProcessor(), PidProcessor()]
+
+        # the documents are yielded in order, whatever the number of workers and the chunk size
+        processed = list(process_documents(documents, preprocessor_list))
+        self.assertEqual(["DOCUMENT {} {}".format(i, os.getpid()) for i in range(50)], processed)
+
+        processed = list(process_documents(iter(documents), preprocessor_list, n_workers=2, chunk_size=3))
+        self.assertEqual(["DOCUMENT {}".format(i) for i in range(50)],
+                         [document.rsplit(" ", 1)[0] for document in processed])
+        self.assertNotIn(str(os.getpid()), {document.rsplit(" ", 1)[1] for document in processed})
+
+        # without preprocessors the documents are not sent to the workers
+        self.assertEqual(documents, list(process_documents(documents, [], n_workers=2)))
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            list(process_documents(["document"], [UpperProcessor()], n_workers=0))
+        with self.assertRaises(ValueError):
+            list(process_documents(["document"], [UpperProcessor()], n_workers=2, chunk_size=0))
@@ -0,0 +1,93 @@
+import os
+from unittest import TestCase
+
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import TextProcessor
+from orange_cb_recsys.content_analyzer.information_processor.preprocessing_cache import PreprocessingCache, \
+    preprocessor_chain_signature, get_preprocessing_scope
+
+
+class CountingTokenizer(TextProcessor):
+    """
+    Splits the text in lowercase tokens, counting the texts processed
+    """
+
+    def __init__(self, lowercase: bool = True):
+        super().__init__()
+        self.lowercase = lowercase
+        self.calls = []
+
+    def process(self, field_data):
+        self.calls.append(field_data)
+        return field_data.lower().split() if self.lowercase else field_data.split()
+
+
+class TestPreprocessingCache(TestCase):
+
+    def test_get_put(self):
+        cache = PreprocessingCache()
+        cache.put(("Plot", "signature", 0), ["a", "b", "a"])
+        cache.put(("Plot", "signature", 1), "not tokenized")
+
+        self.assertEqual(["a", "b", "a"], cache.get(("Plot", "signature", 0)))
+        self.assertEqual("not tokenized", cache.get(("Plot", "signature", 1)))
+        self.assertIsNone(cache.get(("Plot", "signature", 2)))
+        self.assertEqual(2, len(cache))
+
+        # each call returns a new list, the cached tokens can't be modified
+        cache.get(("Plot", "signature", 0)).append("c")
+        self.assertEqual(["a", "b", "a"], cache.get(("Plot", "signature", 0)))
+        cache.close()
+        self.assertEqual(0, len(cache))
+
+    def test_spill(self):
+        directory = 'preprocessing_cache_test'
+        cache = PreprocessingCache(memory_budget=1000, directory=directory)
+        documents = [["token{}".format(i % 7)] * (i + 1) for i in range(50)]
+        for i, document in enumerate(documents):
+            cache.put(("Plot", "signature", i), document)
+
+        self.assertTrue(cache.on_disk)
+        self.assertTrue(os.path.isfile(os.path.join(directory, 'entries.bin')))
+        self.assertEqual(documents, [cache.get(("Plot", "signature", i)) for i in range(50)])
+
+        # an entry on disk replaced by a new one
+        cache.put(("Plot", "signature", 0), ["replaced"])
+        self.assertEqual(["replaced"], cache.get(("Plot", "signature", 0)))
+
+        cache.close()
+        self.assertFalse(os.path.isfile(os.path.join(directory, 'entries.bin')))
+        os.rmdir(directory)
+
+        with self.assertRaises(ValueError):
+            PreprocessingCache(memory_budget=-1)
+
+    def test_signature(self):
+        self.assertEqual(preprocessor_chain_signature([CountingTokenizer()]),
+                         preprocessor_chain_signature([CountingTokenizer()]))
+        self.assertNotEqual(preprocessor_chain_signature([CountingTokenizer()]),
+                            preprocessor_chain_signature([CountingTokenizer(lowercase=False)]))
+        self.assertNotEqual(preprocessor_chain_signature([CountingTokenizer()]),
+                            preprocessor_chain_signature([CountingTokenizer(), CountingTokenizer()]))
+
+    def test_scope(self):
+        cache = PreprocessingCache()
+        tokenizer = CountingTokenizer()
+        documents = ["Document {}".format(i) for i in range(10)]
+
+        def process(data):
+            return (tokenizer.process(document) for document in data)
+
+        self.assertIsNone(get_preprocessing_scope())
+        with cache.scope("Plot", list(range(0, 20, 2))) as scope:
+            self.assertIs(scope, get_preprocessing_scope())
+            first = list(scope.process(documents, [tokenizer], process))
+        self.assertIsNone(get_preprocessing_scope())
+
+        # only the contents not preprocessed yet are processed, in the positions of the scope
+        with cache.scope("Plot", list(range(0, 40, 4))) as scope:
+            second = list(scope.process(["Document {}".format(i) for i in range(0, 20, 2)], [tokenizer], process))
+
+        self.assertEqual([["document", str(i)] for i in range(10)], first)
+        self.assertEqual([["document", str(i)] for i in range(0, 20, 2)], second)
+        self.assertEqual(documents + ["Document {}".format(i) for i in range(10, 20, 2)], tokenizer.calls)
+        cache.close()
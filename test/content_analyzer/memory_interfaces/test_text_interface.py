@@ -1,3 +1,5 @@
+import os
+import pickle
 from unittest import TestCase
 
 from orange_cb_recsys.content_analyzer.memory_interfaces import KeywordIndex, SearchIndex
@@ -118,6 +120,66 @@ class TestIndexInterface(TestCase):
         finally:
             index.delete()
 
+    def test_get_tfidf_batch(self):
+        index = KeywordIndex("./keyword_batch")
+        try:
+            index.init_writing()
+            for content_id, field_data in enumerate([["this", "is", "a", "test"], ["another", "test", "test"], ""]):
+                index.new_content()
+                index.new_field("content_id", str(content_id))
+                index.new_field("test1", field_data)
+                index.serialize_content()
+            index.stop_writing()
+
+            # same words bags of get_tf_idf, in the order of the positions
+            result = index.get_tf_idf_batch("test1", [2, 0, 1])
+            self.assertEqual([index.get_tf_idf("test1", position) for position in [2, 0, 1]], result)
+            self.assertEqual({}, result[0])
+            # three documents, two of them contain "test"
+            self.assertAlmostEqual((1 + 0.30103) * 0.17609, result[2]["test"], places=5)
+
+            # the idf computed with the statistics of a whole collection
+            result = index.get_tf_idf_batch("test1", [1], 10, {"another": 5, "test": 2})
+            self.assertAlmostEqual(0.30103, result[0]["another"], places=5)
+            self.assertAlmostEqual((1 + 0.30103) * 0.69897, result[0]["test"], places=5)
+        finally:
+            index.delete()
+
+    def test_in_memory(self):
+        index = KeywordIndex("keyword_in_memory", in_memory=True)
+        self.assertTrue(index.in_memory)
+        index.init_writing(True)
+        index.new_content()
+        index.new_field("content_id", "0")
+        index.new_field("test1", ["this", "is", "a", "test"])
+        index.serialize_content()
+        index.new_content()
+        index.new_field("content_id", "1")
+        index.new_field("test1", ["test"])
+        index.serialize_content()
+        index.stop_writing()
+        self.assertFalse(os.path.exists("keyword_in_memory"))
+
+        self.assertEqual(["this", "is", "a", "test"], index.get_field("test1", "0"))
+        self.assertEqual((2, {"this": 1, "is": 1, "a": 1, "test": 2}), index.get_doc_frequencies("test1"))
+        self.assertAlmostEqual(0.30103, index.get_tf_idf_batch("test1", [0])[0]["this"], places=5)
+
+        # the index is opened again to add a content
+        index.init_writing()
+        index.new_content()
+        index.new_field("content_id", "2")
+        index.new_field("test1", ["test"])
+        index.serialize_content()
+        index.stop_writing()
+        self.assertEqual(3, index.get_doc_frequencies("test1")[0])
+
+        # the in memory index is not pickled
+        self.assertEqual(index, pickle.loads(pickle.dumps(index)))
+
+        index.delete()
+        with self.assertRaises(AttributeError):
+            index.get_field("test1", "0")
+
     def test_query(self):
         index = SearchIndex("testing_query")
         try:
@@ -4,7 +4,7 @@ from unittest import TestCase
 from orange_cb_recsys.content_analyzer.ratings_manager.rating_processor import NumberNormalizer
 from orange_cb_recsys.content_analyzer.ratings_manager.ratings_importer import RatingsImporter
 from orange_cb_recsys.content_analyzer.ratings_manager.sentiment_analysis import TextBlobSentimentAnalysis
-from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile, CSVFile, DATFile
 from orange_cb_recsys.utils.const import datasets_path
 
 
@@ -77,6 +77,22 @@ class TestRatingsImporter(TestCase):
         self.assertEqual(to_id_expected, to_id_result)
         self.assertEqual(score_expected, score_result)
 
+    def test_import_ratings_batches(self):
+        # the csv and dat files are read in batches parsed by pandas
+        csv_path = os.path.join(datasets_path, 'test_ratings', 'ratings_1591277020.csv')
+        dat_path = os.path.join(datasets_path, 'examples', 'users_70.dat')
+        for source, score_column in [(CSVFile(csv_path, has_header=False), 2), (DATFile(dat_path), 3)]:
+            ratings = RatingsImporter(source, from_id_column=0, to_id_column='1', score_column=score_column,
+                                      timestamp_column=3).import_ratings()
+
+            raw_contents = list(source)
+            self.assertEqual(['from_id', 'to_id', 'score', 'timestamp'], list(ratings.columns))
+            self.assertEqual([raw_content['0'] for raw_content in raw_contents], list(ratings['from_id']))
+            self.assertEqual([raw_content['1'] for raw_content in raw_contents], list(ratings['to_id']))
+            self.assertEqual([float(raw_content[str(score_column)]) for raw_content in raw_contents],
+                             list(ratings['score']))
+            self.assertEqual([raw_content['3'] for raw_content in raw_contents], list(ratings['timestamp']))
+
     def test_import_ratings_w_timestamp_index(self):
         ri = RatingsImporter(
             source=self.raw_source,
@@ -258,6 +274,36 @@ class TestRatingsImporter(TestCase):
         with self.assertRaises(ValueError):
             ri.import_ratings()
 
+    def test_exception_missing_field(self):
+        # Test exception column name missing in some of the raw contents
+        file_path = 'test_missing_field.json'
+        with open(file_path, 'w') as f:
+            f.write('[{"u": "01", "i": "a", "s": 2.0, "t": 1234567},'
+                    ' {"i": "b", "s": 5.0, "t": 1234567},'
+                    ' {"u": "02", "i": "a", "s": 3.0}]')
+
+        try:
+            ri = RatingsImporter(
+                source=JSONFile(file_path),
+                from_id_column='u',
+                to_id_column='i',
+                score_column='s')
+
+            with self.assertRaises(KeyError):
+                ri.import_ratings()
+
+            ri = RatingsImporter(
+                source=JSONFile(file_path),
+                from_id_column='i',
+                to_id_column='i',
+                score_column='s',
+                timestamp_column='t')
+
+            with self.assertRaises(KeyError):
+                ri.import_ratings()
+        finally:
+            os.remove(file_path)
+
     def test_exception_add_score_column(self):
         # Test exception score column can't be converted into float
         ri = RatingsImporter(
@@ -1,3 +1,4 @@
+import json
 import os
 import shutil
 from unittest import TestCase
@@ -7,17 +8,24 @@ import numpy as np
 
 from orange_cb_recsys.content_analyzer.exogenous_properties_retrieval import DBPediaMappingTechnique, \
     BabelPyEntityLinking
-from orange_cb_recsys.content_analyzer import ContentAnalyzer, FieldConfig, ExogenousConfig, ItemAnalyzerConfig
+from orange_cb_recsys.content_analyzer import ContentAnalyzer, FieldConfig, ExogenousConfig, ItemAnalyzerConfig, \
+    ShardedContentAnalyzer
+from orange_cb_recsys.content_analyzer.content_representation.columnar_store import ColumnarContentStore
 from orange_cb_recsys.content_analyzer.content_representation.content import SimpleField, FeaturesBagField, \
-    EmbeddingField, IndexField, EntitiesProp
+    EmbeddingField, IndexField, EntitiesProp, QuantizedEmbeddingField
 from orange_cb_recsys.content_analyzer.field_content_production_techniques import OriginalData
 from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.gensim import Gensim
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.embedding_technique.combining_technique \
+    import Centroid
 from orange_cb_recsys.content_analyzer.field_content_production_techniques.embedding_technique.embedding_technique \
     import WordEmbeddingTechnique
-from orange_cb_recsys.content_analyzer.field_content_production_techniques.tf_idf import SkLearnTfIdf
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.tf_idf import SkLearnTfIdf, WhooshTfIdf
 from orange_cb_recsys.content_analyzer.information_processor import NLTK
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import TextProcessor
 from orange_cb_recsys.content_analyzer.memory_interfaces import SearchIndex, KeywordIndex
-from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile, MaterializedSource, JSONLinesFile
+from orange_cb_recsys.utils.load_content import load_content_instance
+from orange_cb_recsys.utils.manifest import load_manifest
 
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 movies_info_reduced = os.path.join(THIS_DIR, "../../datasets/movies_info_reduced.json")
@@ -27,6 +35,20 @@ decode_embedding = os.path.join(THIS_DIR, "../../datasets/test_decode/movies_tit
 decode_path = os.path.join(THIS_DIR, '../../datasets/test_decode/')
 
 
+class CountingTokenizer(TextProcessor):
+    """
+    Splits the text in lowercase tokens, counting the texts processed
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.n_processed = 0
+
+    def process(self, field_data):
+        self.n_processed += 1
+        return field_data.lower().split()
+
+
 class TestContentsProducer(TestCase):
     def test_create_content(self):
         exogenous_config = ExogenousConfig(DBPediaMappingTechnique('dbo:Film', 'Title'))
@@ -284,6 +306,473 @@ class TestContentAnalyzer(TestCase):
             self.assertIn('Plot#1', processed_content)
             self.assertIn('imdbRating#0', processed_content)
 
+    def test_fit_columnar_store(self):
+        output_dir = os.path.join(THIS_DIR, "movielens_test_columnar")
+        movies_ca_config = ItemAnalyzerConfig(
+            source=JSONFile(decode_embedding),
+            id=['imdbID'],
+            output_directory=output_dir,
+            columnar_store=True
+        )
+
+        movies_ca_config.add_single_config('Title', FieldConfig())
+        movies_ca_config.add_single_config('imdbID', FieldConfig(OriginalData(), id='original'))
+
+        ContentAnalyzer(movies_ca_config).fit()
+
+        self.assertFalse(os.path.isfile(os.path.join(output_dir, 'tt0113497.xz')))
+
+        store = ColumnarContentStore(output_dir)
+        self.assertIn('tt0113497', store)
+
+        content = store.load_content('tt0113497')
+        self.assertIsInstance(content.get_field_representation('Title', 0), EmbeddingField)
+        self.assertIsInstance(content.get_field_representation('Title', 0).value, np.ndarray)
+        self.assertEqual(content.get_field_representation('imdbID', 'original').value, 'tt0113497')
+
+        shutil.rmtree(output_dir)
+
+    def test_fit_codec(self):
+        output_dir = os.path.join(THIS_DIR, "movielens_test_codec")
+        movies_ca_config = ItemAnalyzerConfig(
+            source=JSONFile(decode_embedding),
+            id=['imdbID'],
+            output_directory=output_dir,
+            codec='none'
+        )
+        movies_ca_config.add_single_config('Title', FieldConfig())
+
+        ContentAnalyzer(movies_ca_config).fit()
+
+        self.assertFalse(os.path.isfile(os.path.join(output_dir, 'tt0113497.xz')))
+        self.assertTrue(os.path.isfile(os.path.join(output_dir, 'tt0113497.pkl')))
+
+        content = load_content_instance(output_dir, 'tt0113497')
+        self.assertIsInstance(content.get_field_representation('Title', 0).value, np.ndarray)
+
+        with self.assertRaises(ValueError):
+            ItemAnalyzerConfig(JSONFile(decode_embedding), ['imdbID'], output_dir, codec='not_existent')
+
+        shutil.rmtree(output_dir)
+
+    def test_fit_embedding_precision(self):
+        output_dir = os.path.join(THIS_DIR, "movielens_test_precision")
+        os.makedirs(output_dir)
+        source_path = os.path.join(output_dir, "movies_embedding_matrix.json")
+        with open(source_path, 'w') as f:
+            json.dump([{'imdbID': 'tt0113497', 'Title': '[[1.0, -0.5], [0.25, 2.0]]'}], f)
+
+        movies_ca_config = ItemAnalyzerConfig(
+            source=JSONFile(source_path),
+            id=['imdbID'],
+            output_directory=os.path.join(output_dir, "contents")
+        )
+        movies_ca_config.add_multiple_config('Title', [
+            FieldConfig(id='default'),
+            FieldConfig(id='float32', embedding_precision='float32'),
+            FieldConfig(id='int8', embedding_precision='int8'),
+            FieldConfig(id='combined', embedding_precision='int8', embedding_combiner=Centroid())
+        ])
+        movies_ca_config.add_single_config('imdbID', FieldConfig(OriginalData(), embedding_precision='int8'))
+
+        ContentAnalyzer(movies_ca_config).fit()
+
+        content = load_content_instance(os.path.join(output_dir, "contents"), 'tt0113497')
+        expected = np.array([[1.0, -0.5], [0.25, 2.0]])
+
+        self.assertEqual(np.float64, content.get_field_representation('Title', 'default').value.dtype)
+
+        float32_embedding = content.get_field_representation('Title', 'float32').value
+        self.assertEqual(np.float32, float32_embedding.dtype)
+        np.testing.assert_array_equal(expected, float32_embedding)
+
+        int8_embedding = content.get_field_representation('Title', 'int8')
+        self.assertIsInstance(int8_embedding, QuantizedEmbeddingField)
+        self.assertEqual(np.int8, int8_embedding.codes.dtype)
+        np.testing.assert_allclose(expected, int8_embedding.value, atol=2.0 / 127)
+
+        combined_embedding = content.get_field_representation('Title', 'combined')
+        self.assertIsInstance(combined_embedding, QuantizedEmbeddingField)
+        np.testing.assert_allclose(expected.mean(axis=0), combined_embedding.value, atol=0.75 / 127)
+
+        # the representations that aren't embeddings are not modified
+        self.assertEqual('tt0113497', content.get_field_representation('imdbID', 0).value)
+
+        with self.assertRaises(ValueError):
+            FieldConfig(embedding_precision='float16')
+
+        shutil.rmtree(output_dir)
+
+    def test_fit_chunks(self):
+        contents = {}
+        for chunk_size in [None, 3]:
+            output_dir = os.path.join(THIS_DIR, "movielens_test_chunks_{}".format(chunk_size))
+            movies_ca_config = ItemAnalyzerConfig(
+                source=JSONFile(movies_info_reduced),
+                id=['imdbID'],
+                output_directory=output_dir,
+                export_json=True,
+                chunk_size=chunk_size
+            )
+            movies_ca_config.add_single_config('Title', FieldConfig(
+                OriginalData(), memory_interface=SearchIndex(os.path.join(output_dir, "index")), id='index'))
+            movies_ca_config.add_single_config('Plot', FieldConfig(WhooshTfIdf(), id='tfidf'))
+            movies_ca_config.add_single_config('Year', FieldConfig(OriginalData(), id='original'))
+
+            ContentAnalyzer(movies_ca_config).fit()
+
+            manifest = load_manifest(output_dir)
+            contents[chunk_size] = [load_content_instance(output_dir, content_id)
+                                    for content_id in manifest.content_ids]
+
+            processed_source = list(JSONFile(os.path.join(output_dir, 'contents.json')))
+            self.assertEqual([content['content_id'] for content in processed_source], manifest.content_ids)
+
+        self.assertEqual(len(contents[3]), 20)
+        for content, chunked_content in zip(contents[None], contents[3]):
+            self.assertEqual(content.content_id, chunked_content.content_id)
+            self.assertEqual(content.get_field_representation('Plot', 'tfidf').value,
+                             chunked_content.get_field_representation('Plot', 'tfidf').value)
+            self.assertEqual(content.get_field_representation('Year', 'original').value,
+                             chunked_content.get_field_representation('Year', 'original').value)
+            # the representations stored in the index refer to the same position in both cases
+            self.assertEqual(content.get_field_representation('Title', 'index').value,
+                             chunked_content.get_field_representation('Title', 'index').value)
+
+        for chunk_size in [None, 3]:
+            shutil.rmtree(os.path.join(THIS_DIR, "movielens_test_chunks_{}".format(chunk_size)))
+
+        with self.assertRaises(ValueError):
+            ItemAnalyzerConfig(JSONFile(movies_info_reduced), ['imdbID'], 'not_existent', chunk_size=0)
+
+    def test_fit_json_lines(self):
+        output_dir = os.path.join(THIS_DIR, "movielens_test_json_lines")
+        movies_ca_config = ItemAnalyzerConfig(
+            source=JSONFile(movies_info_reduced),
+            id=['imdbID'],
+            output_directory=output_dir,
+            export_json=True,
+            json_format='jsonl'
+        )
+        movies_ca_config.add_single_config('Title', FieldConfig(OriginalData(), id='original'))
+
+        ContentAnalyzer(movies_ca_config).fit()
+
+        with open(os.path.join(output_dir, 'contents.jsonl')) as f:
+            exported = [json.loads(line) for line in f]
+        self.assertEqual([content['Title#0'] for content in exported],
+                         [raw_content['Title'] for raw_content in JSONFile(movies_info_reduced)])
+        self.assertFalse(os.path.isfile(os.path.join(output_dir, 'contents.json')))
+
+        shutil.rmtree(output_dir)
+
+        with self.assertRaises(ValueError):
+            ItemAnalyzerConfig(JSONFile(movies_info_reduced), ['imdbID'], 'not_existent', json_format='xml')
+
+    def test_fit_workers(self):
+        contents = {}
+        for n_workers, chunk_size in [(1, None), (2, None), (3, 7)]:
+            output_dir = os.path.join(THIS_DIR, "movielens_test_workers_{}".format(n_workers))
+            movies_ca_config = ItemAnalyzerConfig(
+                source=JSONFile(movies_info_reduced),
+                id=['imdbID'],
+                output_directory=output_dir,
+                chunk_size=chunk_size,
+                n_workers=n_workers
+            )
+            movies_ca_config.add_single_config('Title', FieldConfig(
+                OriginalData(), memory_interface=SearchIndex(os.path.join(output_dir, "index")), id='index'))
+            movies_ca_config.add_multiple_config('Plot', [FieldConfig(WhooshTfIdf(), id='tfidf'),
+                                                          FieldConfig(WhooshTfIdf(), id='tfidf_copy'),
+                                                          FieldConfig(OriginalData(), id='original')])
+            movies_ca_config.add_single_config('Year', FieldConfig(OriginalData(), id='original'))
+
+            ContentAnalyzer(movies_ca_config).fit()
+
+            manifest = load_manifest(output_dir)
+            contents[n_workers] = [load_content_instance(output_dir, content_id)
+                                   for content_id in manifest.content_ids]
+
+        self.assertEqual(len(contents[2]), 20)
+        for n_workers in [2, 3]:
+            for content, parallel_content in zip(contents[1], contents[n_workers]):
+                self.assertEqual(content.content_id, parallel_content.content_id)
+                for field_name, representation_id in [('Plot', 'tfidf'), ('Plot', 'tfidf_copy'), ('Plot', 'original'),
+                                                      ('Year', 'original'), ('Title', 'index')]:
+                    self.assertEqual(content.get_field_representation(field_name, representation_id).value,
+                                     parallel_content.get_field_representation(field_name, representation_id).value)
+
+        for n_workers in [1, 2, 3]:
+            shutil.rmtree(os.path.join(THIS_DIR, "movielens_test_workers_{}".format(n_workers)))
+
+        with self.assertRaises(ValueError):
+            ItemAnalyzerConfig(JSONFile(movies_info_reduced), ['imdbID'], 'not_existent', n_workers=0)
+
+    def test_fit_sharded(self):
+        jsonl_path = os.path.join(THIS_DIR, "movies_info_reduced_sharded.jsonl")
+        with open(jsonl_path, 'w') as f:
+            for raw_content in JSONFile(movies_info_reduced):
+                f.write(json.dumps(raw_content) + '\n')
+
+        contents = {}
+        for shard_count, n_processes in [(1, 1), (3, 1), (4, 2)]:
+            output_dir = os.path.join(THIS_DIR, "movielens_test_sharded_{}".format(shard_count))
+            movies_ca_config = ItemAnalyzerConfig(
+                source=JSONLinesFile(jsonl_path),
+                id=['imdbID'],
+                output_directory=output_dir,
+                export_json=True,
+                # the lzma files would keep the vocabularies inline, gzip stores them in the shared directory
+                codec='gzip'
+            )
+            movies_ca_config.add_multiple_config('Plot', [FieldConfig(WhooshTfIdf(), id='tfidf'),
+                                                          FieldConfig(SkLearnTfIdf(), id='sk_tfidf'),
+                                                          FieldConfig(OriginalData(), id='original')])
+            movies_ca_config.add_single_config('Year', FieldConfig(OriginalData(), id='original'))
+
+            if shard_count == 1:
+                ContentAnalyzer(movies_ca_config).fit()
+            else:
+                ShardedContentAnalyzer(movies_ca_config, shard_count, n_processes).fit()
+                self.assertFalse(any(file_name.startswith('shard_') for file_name in os.listdir(output_dir)))
+
+            manifest = load_manifest(output_dir)
+            contents[shard_count] = [load_content_instance(output_dir, content_id)
+                                     for content_id in manifest.content_ids]
+            with open(os.path.join(output_dir, 'contents.json')) as f:
+                self.assertEqual(manifest.content_ids, [content['content_id'] for content in json.load(f)])
+
+        # the contents produced with the statistics of the whole collection are the same, in the same order
+        self.assertEqual(len(contents[1]), 20)
+        for shard_count in [3, 4]:
+            self.assertEqual([content.content_id for content in contents[1]],
+                             [content.content_id for content in contents[shard_count]])
+            for content, sharded_content in zip(contents[1], contents[shard_count]):
+                self.assertEqual(content.get_field_representation('Year', 'original').value,
+                                 sharded_content.get_field_representation('Year', 'original').value)
+                # the SkLearnTfIdf representations refer to the vocabulary moved from the shared directory of the
+                # shards
+                for representation_id in ['tfidf', 'sk_tfidf']:
+                    tfidf = content.get_field_representation('Plot', representation_id).value
+                    sharded_tfidf = sharded_content.get_field_representation('Plot', representation_id).value
+                    self.assertEqual(tfidf.keys(), sharded_tfidf.keys())
+                    for term in tfidf:
+                        self.assertAlmostEqual(tfidf[term], sharded_tfidf[term], places=6)
+
+        for shard_count in [1, 3, 4]:
+            shutil.rmtree(os.path.join(THIS_DIR, "movielens_test_sharded_{}".format(shard_count)))
+
+        # the sources that can't be split and the features needing a single writer are not available
+        with self.assertRaises(ValueError):
+            ShardedContentAnalyzer(ItemAnalyzerConfig(JSONFile(movies_info_reduced), ['imdbID'], 'not_existent'),
+                                   2).fit()
+        with self.assertRaises(ValueError):
+            ShardedContentAnalyzer(ItemAnalyzerConfig(JSONLinesFile(jsonl_path), ['imdbID'], 'not_existent',
+                                                      incremental=True), 2).fit()
+        config = ItemAnalyzerConfig(JSONLinesFile(jsonl_path), ['imdbID'], 'not_existent')
+        config.add_single_config('Plot', FieldConfig(SkLearnTfIdf(max_features=10)))
+        with self.assertRaises(ValueError):
+            ShardedContentAnalyzer(config, 2).fit()
+        config = ItemAnalyzerConfig(JSONLinesFile(jsonl_path), ['imdbID'], 'not_existent')
+        config.add_single_config('Title', FieldConfig(OriginalData(), memory_interface=SearchIndex('not_existent')))
+        with self.assertRaises(ValueError):
+            ShardedContentAnalyzer(config, 2).fit()
+        with self.assertRaises(ValueError):
+            ShardedContentAnalyzer(config, 0)
+        self.assertFalse(os.path.exists('not_existent'))
+        os.remove(jsonl_path)
+
+    def test_fit_preprocessing_cache(self):
+        contents = {}
+        for preprocessing_cache_budget, chunk_size in [(None, None), (256 * 1024 ** 2, None), (0, 7)]:
+            output_dir = os.path.join(THIS_DIR, "movielens_test_preprocessing_cache")
+            movies_ca_config = ItemAnalyzerConfig(
+                source=JSONFile(movies_info_reduced),
+                id=['imdbID'],
+                output_directory=output_dir,
+                chunk_size=chunk_size,
+                preprocessing_cache_budget=preprocessing_cache_budget
+            )
+            tokenizers = [CountingTokenizer(), CountingTokenizer(), CountingTokenizer()]
+            movies_ca_config.add_multiple_config('Plot', [
+                FieldConfig(WhooshTfIdf(), tokenizers[0], id='tfidf'),
+                FieldConfig(OriginalData(), tokenizers[1], id='original')])
+            movies_ca_config.add_single_config('Title', FieldConfig(OriginalData(), tokenizers[2], id='original'))
+
+            ContentAnalyzer(movies_ca_config).fit()
+
+            manifest = load_manifest(output_dir)
+            contents[(preprocessing_cache_budget, chunk_size)] = [
+                load_content_instance(output_dir, content_id) for content_id in manifest.content_ids]
+            shutil.rmtree(output_dir)
+
+            if preprocessing_cache_budget is None:
+                self.assertEqual([20, 20, 20], [tokenizer.n_processed for tokenizer in tokenizers])
+            else:
+                # the Plot field is preprocessed only once for the two field configs, even if the collection based
+                # technique preprocesses the whole source before the chunks
+                self.assertEqual(20, tokenizers[0].n_processed + tokenizers[1].n_processed)
+                self.assertEqual(20, tokenizers[2].n_processed)
+
+        expected = contents[(None, None)]
+        for key in [(256 * 1024 ** 2, None), (0, 7)]:
+            for content, cached_content in zip(expected, contents[key]):
+                for field_name, representation_id in [('Plot', 'tfidf'), ('Plot', 'original'), ('Title', 'original')]:
+                    self.assertEqual(content.get_field_representation(field_name, representation_id).value,
+                                     cached_content.get_field_representation(field_name, representation_id).value)
+
+        with self.assertRaises(ValueError):
+            ItemAnalyzerConfig(JSONFile(movies_info_reduced), ['imdbID'], 'not_existent',
+                               preprocessing_cache_budget=-1)
+
+    def test_fit_materialized_source(self):
+        class CountingJSONFile(JSONFile):
+            n_iterations = 0
+
+            def __iter__(self):
+                CountingJSONFile.n_iterations += 1
+                yield from super().__iter__()
+
+        contents = {}
+        for name, memory_budget, n_workers in [('plain', None, 1), ('memory', 1024 ** 3, 1), ('disk', 1, 2)]:
+            output_dir = os.path.join(THIS_DIR, "movielens_test_materialized_{}".format(name))
+            source = CountingJSONFile(movies_info_reduced)
+            if memory_budget is not None:
+                source = MaterializedSource(source, memory_budget)
+            movies_ca_config = ItemAnalyzerConfig(
+                source=source,
+                id=['imdbID'],
+                output_directory=output_dir,
+                n_workers=n_workers
+            )
+            movies_ca_config.add_multiple_config('Plot', [FieldConfig(WhooshTfIdf(), id='tfidf'),
+                                                          FieldConfig(OriginalData(), id='original')])
+            movies_ca_config.add_single_config('Year', FieldConfig(OriginalData(), id='original'))
+
+            CountingJSONFile.n_iterations = 0
+            ContentAnalyzer(movies_ca_config).fit()
+            if memory_budget is not None:
+                # the wrapped source is parsed only once
+                self.assertEqual(1, CountingJSONFile.n_iterations)
+                self.assertEqual(memory_budget == 1, source.on_disk)
+            else:
+                self.assertGreater(CountingJSONFile.n_iterations, 1)
+
+            manifest = load_manifest(output_dir)
+            contents[name] = [load_content_instance(output_dir, content_id) for content_id in manifest.content_ids]
+            shutil.rmtree(output_dir)
+
+        self.assertEqual(len(contents['plain']), 20)
+        for name in ['memory', 'disk']:
+            for content, materialized_content in zip(contents['plain'], contents[name]):
+                self.assertEqual(content.content_id, materialized_content.content_id)
+                for field_name, representation_id in [('Plot', 'tfidf'), ('Plot', 'original'), ('Year', 'original')]:
+                    self.assertEqual(
+                        content.get_field_representation(field_name, representation_id).value,
+                        materialized_content.get_field_representation(field_name, representation_id).value)
+
+    def test_fit_incremental(self):
+        output_dir = os.path.join(THIS_DIR, "movielens_test_incremental")
+        source_path = os.path.join(THIS_DIR, "movies_incremental.json")
+        with open(movies_info_reduced) as f:
+            raw_contents = json.load(f)[:6]
+
+        def fit(source: list, drift_threshold: float):
+            with open(source_path, 'w') as f:
+                json.dump(source, f)
+            movies_ca_config = ItemAnalyzerConfig(
+                source=JSONFile(source_path),
+                id=['imdbID'],
+                output_directory=output_dir,
+                export_json=True,
+                incremental=True,
+                drift_threshold=drift_threshold
+            )
+            movies_ca_config.add_single_config('Title', FieldConfig(
+                OriginalData(), memory_interface=SearchIndex(os.path.join(output_dir + "_index")), id='index'))
+            movies_ca_config.add_single_config('Plot', FieldConfig(WhooshTfIdf(), id='tfidf'))
+            movies_ca_config.add_single_config('Year', FieldConfig(OriginalData(), id='original'))
+            ContentAnalyzer(movies_ca_config).fit()
+            return load_manifest(output_dir)
+
+        def modification_times() -> dict:
+            return {file_name: os.stat(os.path.join(output_dir, file_name)).st_mtime_ns
+                    for file_name in os.listdir(output_dir) if file_name.endswith('.xz')}
+
+        try:
+            ids = [raw_content['imdbID'] for raw_content in raw_contents]
+            fit(raw_contents, 1)
+            first_times = modification_times()
+
+            # a content is modified, one is deleted and one is added
+            raw_contents[1] = dict(raw_contents[1], Title="Modified title")
+            deleted = raw_contents.pop(2)
+            with open(movies_info_reduced) as f:
+                raw_contents.append(json.load(f)[6])
+
+            manifest = fit(raw_contents, 1)
+            self.assertEqual(manifest.content_ids, [raw_content['imdbID'] for raw_content in raw_contents])
+            self.assertEqual(manifest.drift, 0.5)
+            self.assertFalse(os.path.isfile(os.path.join(output_dir, deleted['imdbID'] + '.xz')))
+
+            second_times = modification_times()
+            for content_id in [ids[0], ids[3], ids[4], ids[5]]:
+                self.assertEqual(first_times[content_id + '.xz'], second_times[content_id + '.xz'])
+            self.assertNotEqual(first_times[ids[1] + '.xz'], second_times[ids[1] + '.xz'])
+
+            # the representations in the index are retrieved by id, so the unchanged contents are still valid
+            for raw_content in raw_contents:
+                content = load_content_instance(output_dir, raw_content['imdbID'])
+                self.assertEqual(content.get_field_representation('Title', 'index').value, raw_content['Title'])
+                self.assertEqual(content.get_field_representation('Year', 'original').value, raw_content['Year'])
+            index = SearchIndex(output_dir + "_index")
+            self.assertEqual(index.query("Title#0#index:modified", 10).keys(), {ids[1]})
+            self.assertEqual(index.query("content_id:" + deleted['imdbID'], 10), {})
+
+            processed_source = list(JSONFile(os.path.join(output_dir, 'contents.json')))
+            self.assertEqual([content['content_id'] for content in processed_source], manifest.content_ids)
+
+            # nothing changed, so nothing is processed
+            manifest = fit(raw_contents, 1)
+            self.assertEqual(manifest.drift, 0.5)
+            self.assertEqual(modification_times(), second_times)
+
+            # the drift exceeds the threshold, so every content is processed again
+            raw_contents[0] = dict(raw_contents[0], Plot="Modified plot")
+            manifest = fit(raw_contents, 0.5)
+            self.assertEqual(manifest.drift, 0)
+            third_times = modification_times()
+            for content_id in manifest.content_ids:
+                self.assertNotEqual(second_times[content_id + '.xz'], third_times[content_id + '.xz'])
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            shutil.rmtree(output_dir + "_index", ignore_errors=True)
+            os.remove(source_path)
+
+        with self.assertRaises(ValueError):
+            ItemAnalyzerConfig(JSONFile(movies_info_reduced), ['imdbID'], 'not_existent',
+                               columnar_store=True, incremental=True)
+
+    def test_fit_manifest(self):
+        output_dir = os.path.join(THIS_DIR, "movielens_test_manifest")
+        movies_ca_config = ItemAnalyzerConfig(
+            source=JSONFile(decode_embedding),
+            id=['imdbID'],
+            output_directory=output_dir
+        )
+        movies_ca_config.add_single_config('Title', FieldConfig())
+
+        ContentAnalyzer(movies_ca_config).fit()
+
+        manifest = load_manifest(output_dir)
+        self.assertEqual(len(manifest), len(list(JSONFile(decode_embedding))))
+        self.assertIn('tt0113497', manifest)
+        self.assertEqual(manifest.get_file_name('tt0113497'), 'tt0113497.xz')
+        self.assertEqual(manifest.get_size('tt0113497'), os.path.getsize(os.path.join(output_dir, 'tt0113497.xz')))
+        self.assertEqual(manifest.get_fields('tt0113497'), ['Title'])
+
+        shutil.rmtree(output_dir)
+
     # def doCleanups(self) -> None:
     #     if os.path.isdir(self.out_dir):
     #         shutil.rmtree(self.out_dir)
\ No newline at end of file
@@ -1,7 +1,14 @@
+import functools
+import io
+import json
 import os
+import pickle
+import shutil
+import sqlite3
 from unittest import TestCase
 
-from orange_cb_recsys.content_analyzer.raw_information_source import SQLDatabase, CSVFile, JSONFile, DATFile
+from orange_cb_recsys.content_analyzer.raw_information_source import SQLDatabase, CSVFile, JSONFile, DATFile, \
+    JSONLinesFile, _iter_json_array, MaterializedSource, RawInformationSource
 from orange_cb_recsys.utils.const import datasets_path
 
 
@@ -19,6 +26,82 @@ class TestSQLDatabase(TestCase):
         self.assertDictEqual(next(my_iter), d3)
 
 
+class CountingConnectionFactory:
+    """
+    Opens connections to a SQLite database, counting them
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.n_connections = 0
+
+    def __call__(self):
+        self.n_connections += 1
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+
+class TestSQLDatabaseSQLite(TestCase):
+
+    def setUp(self) -> None:
+        self.path = 'sql_database_test.db'
+        with sqlite3.connect(self.path) as connection:
+            connection.execute("CREATE TABLE movies (imdbID TEXT, Title TEXT, Year INTEGER)")
+            connection.executemany("INSERT INTO movies VALUES (?, ?, ?)",
+                                   [("tt{}".format(i), "title {}".format(i), 1990 + i) for i in range(10)])
+        connection.close()
+        self.expected = [{'imdbID': "tt{}".format(i), 'Title': "title {}".format(i), 'Year': 1990 + i}
+                         for i in range(10)]
+
+    def test_iter(self):
+        factory = CountingConnectionFactory(self.path)
+        sql = SQLDatabase(None, None, None, None, 'movies', batch_size=3, connection_factory=factory)
+        self.assertEqual(self.expected, list(sql))
+        self.assertEqual(self.expected, list(sql))
+        # the connection opened when the source was created is reused
+        self.assertEqual(1, factory.n_connections)
+
+        # nested iterations use different connections, then both are kept in the pool
+        for raw_content, same_raw_content in zip(sql, sql):
+            self.assertEqual(raw_content, same_raw_content)
+        self.assertEqual(2, factory.n_connections)
+        list(sql)
+        self.assertEqual(2, factory.n_connections)
+
+        with self.assertRaises(ValueError):
+            SQLDatabase(None, None, None, None, 'movies', batch_size=0, connection_factory=factory)
+
+    def test_projection(self):
+        factory = CountingConnectionFactory(self.path)
+        sql = SQLDatabase(None, None, None, None, 'movies', fields=['imdbID', 'Year'], connection_factory=factory)
+        self.assertEqual([{'imdbID': raw_content['imdbID'], 'Year': raw_content['Year']}
+                          for raw_content in self.expected], list(sql))
+
+        # the projected source reads only the requested fields among the ones of the source
+        projected = sql.project(['Year', 'Title'])
+        self.assertEqual(['Year'], projected.fields)
+        self.assertEqual([{'Year': raw_content['Year']} for raw_content in self.expected], list(projected))
+        self.assertEqual(['imdbID', 'Year'], sql.fields)
+        self.assertEqual(1, factory.n_connections)
+
+    def test_where_limit(self):
+        factory = CountingConnectionFactory(self.path)
+        sql = SQLDatabase(None, None, None, None, 'movies', where="Year >= ? AND Title != ?",
+                          parameters=(1995, 'title 6'), limit=3, connection_factory=factory)
+        self.assertEqual([self.expected[5], self.expected[7], self.expected[8]], list(sql))
+
+        sql = SQLDatabase(None, None, None, None, 'movies', limit=0, connection_factory=factory)
+        self.assertEqual([], list(sql))
+
+    def test_pickle(self):
+        sql = SQLDatabase(None, None, None, None, 'movies', fields=['Title'],
+                          connection_factory=functools.partial(sqlite3.connect, self.path))
+        unpickled = pickle.loads(pickle.dumps(sql))
+        self.assertEqual(list(sql), list(unpickled))
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+
+
 class TestCSVFile(TestCase):
 
     @classmethod
@@ -102,6 +185,27 @@ class TestCSVFile(TestCase):
         self.assertDictEqual(expected_row_5, result_row_5)
         self.assertDictEqual(expected_row_6, result_row_6)
 
+    def test_iter_batches(self):
+        for csv_file in [CSVFile(self.filepath_w_header), CSVFile(self.filepath_no_header, has_header=False)]:
+            batches = list(csv_file.iter_batches(batch_size=2))
+            self.assertEqual(len(list(csv_file)), sum(len(batch) for batch in batches))
+            # every value is a string, as in the dicts
+            self.assertEqual(list(csv_file),
+                             [raw_content for batch in batches for raw_content in batch.to_dict('records')])
+
+    def test_shard(self):
+        for csv_file in [CSVFile(self.filepath_w_header), CSVFile(self.filepath_no_header, has_header=False)]:
+            for shard_count in [1, 2, 3, 7]:
+                shards = [csv_file.shard(shard_index, shard_count) for shard_index in range(shard_count)]
+                # the shards are disjoint and, concatenated, they are the whole file
+                self.assertEqual(list(csv_file), [raw_content for shard in shards for raw_content in shard])
+                self.assertEqual(list(csv_file), [raw_content for shard in shards
+                                                  for batch in shard.iter_batches(batch_size=3)
+                                                  for raw_content in batch.to_dict('records')])
+
+        with self.assertRaises(ValueError):
+            CSVFile(self.filepath_w_header).shard(2, 2)
+
 
 class TestJSONFile(TestCase):
 
@@ -160,6 +264,56 @@ class TestJSONFile(TestCase):
         self.assertDictEqual(next(my_iter), d3)
 
 
+    def test_iter_incremental(self):
+        filepath = os.path.join(datasets_path, 'movies_info_reduced.json')
+        with open(filepath) as f:
+            expected = json.load(f, parse_int=str, parse_float=str)
+
+        # same contents of json.load, whatever the size of the chunks read from the file
+        self.assertEqual(expected, list(JSONFile(filepath)))
+        for chunk_size in [1, 7, 1000]:
+            with open(filepath) as f:
+                self.assertEqual(expected, list(_iter_json_array(f, chunk_size)))
+
+        # the numbers split between two chunks are parsed as a whole
+        document = '[ 12345, -2.5e10 ,{"a": [1, 2]}, "x", true, null ]'
+        for chunk_size in [1, 2, 3]:
+            self.assertEqual(['12345', '-2.5e10', {'a': ['1', '2']}, 'x', True, None],
+                             list(_iter_json_array(io.StringIO(document), chunk_size)))
+
+        self.assertEqual([], list(_iter_json_array(io.StringIO(' [ ] '))))
+        for document in ['[1 2]', '[{"a": 1}', '[1,', '[1.]']:
+            with self.assertRaises(json.JSONDecodeError):
+                list(_iter_json_array(io.StringIO(document), 2))
+
+
+class TestJSONLinesFile(TestCase):
+
+    def test_iter(self):
+        filepath = os.path.join(datasets_path, 'movies_info_reduced.json')
+        with open(filepath) as f:
+            expected = json.load(f, parse_int=str, parse_float=str)
+
+        jsonl_path = 'movies_info_reduced.jsonl'
+        with open(jsonl_path, 'w') as f:
+            for content in expected:
+                f.write(json.dumps(content) + '\n')
+            f.write('\n')
+
+        self.assertEqual(expected, list(JSONLinesFile(jsonl_path)))
+
+        self.assertTrue(JSONLinesFile(jsonl_path).supports_sharding)
+        for shard_count in [2, 3, 40]:
+            self.assertEqual(expected, [raw_content for shard_index in range(shard_count)
+                                        for raw_content in JSONLinesFile(jsonl_path).shard(shard_index, shard_count)])
+
+        # a json file can't be split in shards
+        self.assertFalse(JSONFile(filepath).supports_sharding)
+        with self.assertRaises(ValueError):
+            JSONFile(filepath).shard(0, 2)
+        os.remove(jsonl_path)
+
+
 class TestDATFile(TestCase):
     def test_iter(self):
         filepath = '../../datasets/examples/users_70.dat'
@@ -180,3 +334,68 @@ class TestDATFile(TestCase):
         for line in expected:
             dat1 = next(my_iter)
             self.assertEqual(line, dat1)
+
+    def test_iter_batches(self):
+        dat = DATFile(os.path.join(datasets_path, 'examples', 'users_70.dat'))
+        batches = list(dat.iter_batches(batch_size=30))
+        self.assertEqual([30, 30, 10], [len(batch) for batch in batches])
+        self.assertEqual(list(dat), [raw_content for batch in batches for raw_content in batch.to_dict('records')])
+
+        # the fields are stripped like in the dicts, the lines with a different number of fields are padded
+        filepath = 'dat_batches_test.dat'
+        with open(filepath, 'w') as f:
+            f.write("1::a\t::0.5\n\t2::b::1\n3::c::1.5::extra\n")
+        batch = next(DATFile(filepath).iter_batches())
+        self.assertEqual(['0', '1', '2', '3'], list(batch.columns))
+        self.assertEqual(['1', '2', '3'], list(batch['0']))
+        self.assertEqual(['a', 'b', 'c'], list(batch['1']))
+        self.assertEqual([None, None, 'extra'], list(batch['3']))
+        os.remove(filepath)
+
+    def test_shard(self):
+        dat = DATFile(os.path.join(datasets_path, 'examples', 'users_70.dat'))
+        for shard_count in [1, 2, 5]:
+            shards = [dat.shard(shard_index, shard_count) for shard_index in range(shard_count)]
+            self.assertTrue(all(len(list(shard)) > 0 for shard in shards))
+            self.assertEqual(list(dat), [raw_content for shard in shards for raw_content in shard])
+
+        with self.assertRaises(ValueError):
+            dat.shard(0, 0)
+
+
+class TestMaterializedSource(TestCase):
+
+    def test_iter(self):
+        source = CSVFile(os.path.join(datasets_path, 'movies_info_reduced.csv'))
+        expected = list(source)
+
+        for memory_budget, on_disk in [(1024 ** 3, False), (2000, True), (1, True)]:
+            materialized_source = MaterializedSource(source, memory_budget)
+            self.assertEqual(expected, list(materialized_source))
+            self.assertEqual(expected, list(materialized_source))
+            self.assertEqual(len(expected), len(materialized_source))
+            self.assertEqual(on_disk, materialized_source.on_disk)
+
+            projected = materialized_source.project(['Title', 'Year', 'not_existent'])
+            self.assertEqual([{'Title': raw_content['Title'], 'Year': raw_content['Year']} for raw_content in expected],
+                             list(projected))
+
+        with self.assertRaises(ValueError):
+            MaterializedSource(source, 0)
+
+    def test_different_fields(self):
+        class DifferentFieldsSource(RawInformationSource):
+            def __iter__(self):
+                yield {'a': '1'}
+                yield {'b': '2', 'a': '3'}
+                yield {'c': None}
+                yield {'a': '4'}
+
+        for memory_budget in [1024 ** 3, 1]:
+            directory = 'materialized_source_test'
+            materialized_source = MaterializedSource(DifferentFieldsSource(), memory_budget, directory)
+            self.assertEqual(list(DifferentFieldsSource()), list(materialized_source))
+            self.assertEqual([{}, {'b': '2'}, {'c': None}, {}], list(materialized_source.project(['b', 'c'])))
+            self.assertEqual(memory_budget == 1, os.path.isdir(directory))
+            if os.path.isdir(directory):
+                shutil.rmtree(directory)
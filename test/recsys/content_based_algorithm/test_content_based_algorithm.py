@@ -1,11 +1,27 @@
 import os
+import shutil
 from unittest import TestCase
 
+import numpy as np
+import pandas as pd
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, SparseFeaturesBagField, \
+    Vocabulary, EmbeddingField
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.embedding_technique.combining_technique \
+    import Centroid
+from orange_cb_recsys.recsys.content_based_algorithm.classifier.classifier_recommender import ClassifierRecommender
+from orange_cb_recsys.recsys.content_based_algorithm.classifier.classifiers import SkLogisticRegression, \
+    SkGaussianProcess
+from orange_cb_recsys.recsys.content_based_algorithm.feature_store import _loaded_feature_stores
+from orange_cb_recsys.recsys.content_based_algorithm.regressor.linear_predictor import LinearPredictor
+from orange_cb_recsys.recsys.content_based_algorithm.regressor.regressors import SkLinearRegression, SkBayesianRidge
 from orange_cb_recsys.utils.load_content import load_content_instance
 
 from orange_cb_recsys.recsys.content_based_algorithm.centroid_vector.centroid_vector import CentroidVector
 from orange_cb_recsys.recsys.content_based_algorithm.centroid_vector.similarities import CosineSimilarity
 from orange_cb_recsys.utils.const import root_path
+from orange_cb_recsys.utils.manifest import CatalogManifest
+from orange_cb_recsys.utils.serialization import deserialize, serialize, find_content_file
 
 contents_path = os.path.join(root_path, 'contents')
 
@@ -44,3 +60,80 @@ class TestContentBasedAlgorithm(TestCase):
 
         self.assertEqual(1, len(result))
         self.assertIsInstance(result[0], dict)
+
+    def test_fuse_sparse_representations(self):
+        vocabulary = Vocabulary(['apple', 'banana', 'cherry'])
+        alg = CentroidVector({'Plot': ['tfidf', 'embedding']}, CosineSimilarity(), 0)
+        alg._set_transformer()
+
+        X = []
+        for i in range(2):
+            content = Content('tt{}'.format(i))
+            content.append_field_representation('Plot', SparseFeaturesBagField([i], [0.5], vocabulary), 'tfidf')
+            content.append_field_representation('Plot', EmbeddingField(np.ones(2) * i), 'embedding')
+            X.append(alg.extract_features_item(content))
+
+        # the sparse bags have a column only for the terms of the items the transformer is fitted on, like the dicts
+        result = alg.fuse_representations(X, Centroid())
+        np.testing.assert_array_almost_equal([[0.5, 0, 0, 0], [0, 0.5, 1, 1]], result.toarray())
+
+        content = Content('tt2')
+        content.append_field_representation('Plot', SparseFeaturesBagField([0, 2], [0.2, 0.3], vocabulary), 'tfidf')
+        content.append_field_representation('Plot', EmbeddingField(np.ones(2)), 'embedding')
+        result = alg.fuse_representations([alg.extract_features_item(content)], Centroid())
+        np.testing.assert_array_almost_equal([[0.2, 0, 1, 1]], result.toarray())
+
+    def test_sparse_rankings(self):
+        # copy of the items where the tfidf dicts of the Plot are stored as SparseFeaturesBagField too
+        items_dir = 'sparse_rankings_test'
+        os.makedirs(items_dir)
+        try:
+            movies_dir = os.path.join(contents_path, 'movies_codified/')
+            items = [deserialize(find_content_file(movies_dir, os.path.splitext(file_name)[0]))
+                     for file_name in sorted(os.listdir(movies_dir)) if file_name.endswith('.xz')]
+            terms = sorted({term for item in items for term in item.get_field_representation('Plot', 'tfidf').value})
+            vocabulary = Vocabulary(terms)
+            for item in items:
+                features = item.get_field_representation('Plot', 'tfidf').value
+                term_ids = [vocabulary.get_term_id(term) for term in features]
+                item.append_field_representation('Plot', SparseFeaturesBagField(term_ids, list(features.values()),
+                                                                                vocabulary), 'sparse_tfidf')
+                serialize(item, os.path.join(items_dir, item.content_id + '.xz'))
+
+            ratings = pd.DataFrame.from_records([
+                ("A000", "tt0114576", 1, "54654675"),
+                ("A000", "tt0112453", -0.2, "54654675"),
+                ("A000", "tt0113041", 0.6, "54654675")],
+                columns=["from_id", "to_id", "score", "timestamp"])
+
+            def rank(alg):
+                alg.process_rated(ratings, items_dir)
+                alg.fit()
+                return alg.rank(ratings, items_dir)
+
+            algorithms = [
+                lambda representation: CentroidVector({'Plot': representation}, CosineSimilarity(), 0),
+                lambda representation: ClassifierRecommender({'Plot': representation}, SkLogisticRegression(), 0),
+                lambda representation: ClassifierRecommender({'Plot': representation}, SkGaussianProcess(), 0),
+                lambda representation: LinearPredictor({'Plot': representation}, SkLinearRegression()),
+                lambda representation: LinearPredictor({'Plot': representation}, SkBayesianRidge())]
+
+            # the rankings are the same of the dicts whether the items are fused one by one or sliced from the
+            # feature store of the items with a manifest
+            for with_manifest in [False, True]:
+                if with_manifest:
+                    manifest = CatalogManifest()
+                    for item in items:
+                        file_name = item.content_id + '.xz'
+                        manifest.add(item.content_id, file_name, os.path.getsize(os.path.join(items_dir, file_name)),
+                                     [])
+                    manifest.save(items_dir)
+
+                for algorithm in algorithms:
+                    expected = rank(algorithm('tfidf'))
+                    result = rank(algorithm('sparse_tfidf'))
+                    self.assertEqual(list(expected['to_id']), list(result['to_id']))
+                    np.testing.assert_array_almost_equal(expected['score'], result['score'], decimal=5)
+        finally:
+            shutil.rmtree(items_dir)
+            _loaded_feature_stores.clear()
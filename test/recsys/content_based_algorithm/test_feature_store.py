@@ -0,0 +1,104 @@
+import os
+import shutil
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.embedding_technique.combining_technique \
+    import Centroid, Sum
+from orange_cb_recsys.recsys.content_based_algorithm.centroid_vector.centroid_vector import CentroidVector
+from orange_cb_recsys.recsys.content_based_algorithm.centroid_vector.similarities import CosineSimilarity
+from orange_cb_recsys.recsys.content_based_algorithm.feature_store import get_feature_store, ItemFeatureStore, \
+    FEATURE_STORE_DIRECTORY, _loaded_feature_stores
+from orange_cb_recsys.utils.const import root_path
+from orange_cb_recsys.utils.load_content import load_content_instance
+from orange_cb_recsys.utils.manifest import CatalogManifest
+
+contents_path = os.path.join(root_path, 'contents')
+movies_dir = os.path.join(contents_path, 'movies_codified/')
+
+
+class TestItemFeatureStore(TestCase):
+
+    def setUp(self) -> None:
+        # copy of the items with a manifest, the items without a manifest can't have a feature store
+        self.items_dir = 'feature_store_test'
+        os.makedirs(self.items_dir)
+        manifest = CatalogManifest()
+        for file_name in sorted(os.listdir(movies_dir)):
+            if file_name.endswith('.xz'):
+                shutil.copy(os.path.join(movies_dir, file_name), self.items_dir)
+                content_id = os.path.splitext(file_name)[0]
+                manifest.add(content_id, file_name, os.path.getsize(os.path.join(movies_dir, file_name)), [])
+        manifest.save(self.items_dir)
+
+        self.ratings = pd.DataFrame.from_records([
+            ("A000", "tt0114576", 1, "54654675"),
+            ("A000", "tt0112453", -0.2, "54654675"),
+            ("A000", "tt0113041", 0.6, "54654675")],
+            columns=["from_id", "to_id", "score", "timestamp"])
+
+    def test_get_feature_store(self):
+        item_field = {'Genre': ['embedding'], 'Plot': ['embedding']}
+        feature_store = get_feature_store(self.items_dir, item_field, Centroid())
+
+        self.assertIsInstance(feature_store, ItemFeatureStore)
+        self.assertEqual(len([file_name for file_name in os.listdir(movies_dir) if file_name.endswith('.xz')]),
+                         len(feature_store))
+        self.assertIs(feature_store, get_feature_store(self.items_dir, item_field, Centroid()))
+
+        # each row is the fused features of the item
+        alg = CentroidVector(item_field, CosineSimilarity(), 0)
+        alg._set_transformer()
+        item = load_content_instance(self.items_dir, 'tt0112281')
+        expected = alg.fuse_representations([alg.extract_features_item(item)], Centroid())
+        np.testing.assert_array_almost_equal(expected.toarray(), feature_store.get_features(['tt0112281']).toarray())
+
+        # the features are sliced without being densified
+        self.assertTrue(sparse.issparse(feature_store.get_features(['tt0112281', 'tt0112302'])))
+        self.assertEqual(0, feature_store.get_features([]).shape[0])
+
+        # the store is persisted next to the items and loaded by the next runs
+        self.assertEqual(1, len(os.listdir(os.path.join(self.items_dir, FEATURE_STORE_DIRECTORY))))
+        _loaded_feature_stores.clear()
+        loaded = get_feature_store(self.items_dir, item_field, Centroid())
+        self.assertIsNot(feature_store, loaded)
+        self.assertEqual(feature_store.content_ids, loaded.content_ids)
+        self.assertEqual(0, (feature_store.matrix != loaded.matrix).nnz)
+
+        # a different combiner has its own store
+        get_feature_store(self.items_dir, item_field, Sum())
+        self.assertEqual(2, len(os.listdir(os.path.join(self.items_dir, FEATURE_STORE_DIRECTORY))))
+
+        # the items serialized again invalidate the store
+        os.utime(os.path.join(self.items_dir, 'manifest.json'), (0, 0))
+        rebuilt = get_feature_store(self.items_dir, item_field, Centroid())
+        self.assertIsNot(loaded, rebuilt)
+        self.assertEqual(2, len(os.listdir(os.path.join(self.items_dir, FEATURE_STORE_DIRECTORY))))
+
+    def test_no_feature_store(self):
+        # the tfidf representations of these items are dicts, fused with a vectorizer fitted for each user
+        self.assertIsNone(get_feature_store(self.items_dir, {'Plot': ['tfidf']}, Centroid()))
+        # the items without manifest are loaded one by one
+        self.assertIsNone(get_feature_store(movies_dir, {'Genre': ['embedding']}, Centroid()))
+
+    def test_rank(self):
+        alg = CentroidVector({'Genre': ['embedding']}, CosineSimilarity(), threshold=0)
+        alg.process_rated(self.ratings, movies_dir)
+        alg.fit()
+
+        # same rank whether the features are sliced from the feature store or fused for the user
+        expected = alg.rank(self.ratings, movies_dir)
+        result = alg.rank(self.ratings, self.items_dir)
+        self.assertEqual(list(expected['to_id']), list(result['to_id']))
+        np.testing.assert_array_almost_equal(expected['score'], result['score'])
+
+        filter_list = ['tt0112641', 'tt0112760', 'not_existent']
+        result = alg.rank(self.ratings, self.items_dir, filter_list=filter_list)
+        self.assertCountEqual(['tt0112641', 'tt0112760'], list(result['to_id']))
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.items_dir)
+        _loaded_feature_stores.clear()
@@ -0,0 +1,105 @@
+import lzma
+import os
+import pickle
+import shutil
+from unittest import TestCase
+
+import pandas as pd
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, SimpleField
+from orange_cb_recsys.utils.content_cache import ContentCache
+from orange_cb_recsys.utils.load_content import load_content_instance, get_rated_items
+
+
+def serialize(directory: str, content: Content):
+    with lzma.open(os.path.join(directory, '{}.xz'.format(content.content_id)), 'wb') as f:
+        pickle.dump(content, f)
+
+
+class TestContentCache(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = 'content_cache_test'
+        os.makedirs(self.directory, exist_ok=True)
+        for item_id in ['i1', 'i2', 'i3']:
+            content = Content(item_id)
+            content.append_field_representation('Title', SimpleField(item_id), 'original')
+            serialize(self.directory, content)
+
+        self.cache = ContentCache.get_instance()
+        self.cache.invalidate()
+        self.cache.reset_stats()
+
+    def test_singleton(self):
+        self.assertIs(ContentCache.get_instance(), self.cache)
+        with self.assertRaises(Exception):
+            ContentCache()
+
+    def test_hits_misses(self):
+        first = load_content_instance(self.directory, 'i1')
+        second = load_content_instance(self.directory, 'i1')
+
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+        # contents that don't exist are not cached
+        self.assertIsNone(load_content_instance(self.directory, 'not_existent'))
+        self.assertIsNone(load_content_instance(self.directory, 'not_existent'))
+        self.assertEqual(self.cache.misses, 3)
+        self.assertEqual(len(self.cache), 1)
+
+        get_rated_items(self.directory, pd.DataFrame({'to_id': ['i1', 'i2']}))
+        self.assertEqual(self.cache.hits, 2)
+        self.assertEqual(self.cache.misses, 4)
+
+    def test_lru_eviction(self):
+        self.cache.max_entries = 2
+        try:
+            load_content_instance(self.directory, 'i1')
+            load_content_instance(self.directory, 'i2')
+            # i1 becomes the most recently used, so i2 is evicted when i3 is loaded
+            load_content_instance(self.directory, 'i1')
+            load_content_instance(self.directory, 'i3')
+            self.assertEqual(len(self.cache), 2)
+
+            self.cache.reset_stats()
+            load_content_instance(self.directory, 'i1')
+            load_content_instance(self.directory, 'i2')
+            self.assertEqual(self.cache.hits, 1)
+            self.assertEqual(self.cache.misses, 1)
+
+            self.cache.max_entries = 0
+            self.assertEqual(len(self.cache), 0)
+
+            with self.assertRaises(ValueError):
+                self.cache.max_entries = -1
+        finally:
+            self.cache.max_entries = ContentCache.DEFAULT_MAX_ENTRIES
+
+    def test_invalidate(self):
+        load_content_instance(self.directory, 'i1')
+        load_content_instance(self.directory, 'i2')
+
+        self.cache.invalidate('another_directory')
+        self.assertEqual(len(self.cache), 2)
+
+        self.cache.invalidate(self.directory)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_stale_content(self):
+        first = load_content_instance(self.directory, 'i1')
+
+        content = Content('i1')
+        content.append_field_representation('Title', SimpleField('modified'), 'original')
+        serialize(self.directory, content)
+        file_path = os.path.join(self.directory, 'i1.xz')
+        stat = os.stat(file_path)
+        os.utime(file_path, (stat.st_atime, stat.st_mtime + 10))
+
+        second = load_content_instance(self.directory, 'i1')
+        self.assertIsNot(first, second)
+        self.assertEqual(second.get_field_representation('Title', 'original').value, 'modified')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
@@ -0,0 +1,64 @@
+import json
+import os
+import shutil
+from unittest import TestCase
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, SimpleField, \
+    FeaturesBagField, ContentEncoder
+from orange_cb_recsys.utils.json_exporter import ContentsJSONExporter
+
+
+class TestContentsJSONExporter(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = 'json_exporter_test'
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.contents = []
+        for i in range(3):
+            content = Content('tt{}'.format(i))
+            content.append_field_representation('Title', SimpleField('title {}'.format(i)), 'original')
+            content.append_field_representation('Plot', FeaturesBagField({'word': float(i)}), 'tfidf')
+            self.contents.append(content)
+
+        self.expected = json.loads(json.dumps(self.contents, cls=ContentEncoder))
+
+    def test_pretty_json(self):
+        with ContentsJSONExporter(self.directory) as exporter:
+            for content in self.contents:
+                exporter.export(content)
+        self.assertEqual(exporter.n_exported, 3)
+
+        # the file is the same that json.dump would write on the whole list
+        with open(os.path.join(self.directory, 'contents.json')) as f:
+            self.assertEqual(f.read(), json.dumps(self.contents, cls=ContentEncoder, indent=4))
+
+    def test_compact_json(self):
+        with ContentsJSONExporter(self.directory, pretty=False) as exporter:
+            for content in self.contents:
+                exporter.export(content)
+
+        with open(os.path.join(self.directory, 'contents.json')) as f:
+            text = f.read()
+        self.assertEqual(json.loads(text), self.expected)
+        self.assertEqual(len(text.splitlines()), 5)
+
+    def test_empty_json(self):
+        ContentsJSONExporter(self.directory).close()
+        with open(os.path.join(self.directory, 'contents.json')) as f:
+            self.assertEqual(json.load(f), [])
+
+    def test_json_lines(self):
+        with ContentsJSONExporter(self.directory, 'jsonl') as exporter:
+            for content in self.contents:
+                exporter.export(content)
+
+        with open(os.path.join(self.directory, 'contents.jsonl')) as f:
+            self.assertEqual([json.loads(line) for line in f], self.expected)
+
+    def test_not_existent_format(self):
+        with self.assertRaises(ValueError):
+            ContentsJSONExporter(self.directory, 'xml')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+import orange_cb_recsys.content_analyzer as content_analyzer
+import orange_cb_recsys.recsys as recsys
+from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.gensim import Gensim
+from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+from orange_cb_recsys.recsys.recsys import ContentBasedRS
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+root_path = os.path.join(THIS_DIR, '../../')
+
+# public entry points and heavy optional dependencies that importing them must not import
+entry_points = ['orange_cb_recsys.content_analyzer', 'orange_cb_recsys.recsys', 'orange_cb_recsys.evaluation',
+                'orange_cb_recsys.content_analyzer.content_analyzer_main']
+heavy_dependencies = ['sentence_transformers', 'torch', 'gensim', 'wikipedia2vec', 'pywsd', 'textblob', 'whoosh',
+                      'nltk', 'sklearn', 'networkx', 'matplotlib']
+
+
+def imported_modules(statement: str) -> set:
+    """
+    Runs the statement in a new interpreter and returns the names of the top level modules it imported
+    """
+    code = statement + "\nimport sys\nprint('\\n'.join(sorted({name.split('.')[0] for name in sys.modules})))"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.abspath(root_path), os.environ.get('PYTHONPATH', '')]))
+    result = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            env=env, universal_newlines=True, check=True)
+    return set(result.stdout.split())
+
+
+class TestLazyImport(TestCase):
+    def test_entry_points(self):
+        for entry_point in entry_points:
+            modules = imported_modules('import ' + entry_point)
+            self.assertIn('orange_cb_recsys', modules)
+            self.assertEqual([], [dependency for dependency in heavy_dependencies if dependency in modules],
+                             entry_point)
+
+        # the heavy dependency is imported only by the class using it
+        modules = imported_modules('from orange_cb_recsys.content_analyzer import SkLearnTfIdf')
+        self.assertIn('sklearn', modules)
+        self.assertNotIn('gensim', modules)
+
+    def test_getattr(self):
+        self.assertIs(JSONFile, content_analyzer.JSONFile)
+        self.assertIs(ContentBasedRS, recsys.ContentBasedRS)
+        self.assertIs(Gensim, content_analyzer.embeddings.embedding_loader.Gensim)
+        self.assertIs(content_analyzer.embedding_learner, content_analyzer.embeddings.embedding_learner)
+        self.assertIn('ContentAnalyzer', dir(content_analyzer))
+
+        with self.assertRaises(AttributeError):
+            content_analyzer.NotExistent
+
+        with self.assertRaises(ImportError):
+            from orange_cb_recsys.content_analyzer import NotExistent
+
+    def test_star_import(self):
+        namespace = {}
+        exec('from orange_cb_recsys.content_analyzer import *', namespace)
+        self.assertTrue(all(name in namespace for name in content_analyzer.__all__))
+        self.assertIs(JSONFile, namespace['JSONFile'])
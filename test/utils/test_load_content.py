@@ -1,6 +1,11 @@
 import os
+import shutil
 from unittest import TestCase
-from orange_cb_recsys.utils.load_content import load_content_instance, remove_not_existent_items, get_rated_items
+
+from orange_cb_recsys.content_analyzer.content_representation.columnar_store import ColumnarStoreWriter
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, SimpleField
+from orange_cb_recsys.utils.load_content import load_content_instance, remove_not_existent_items, get_rated_items, \
+    get_unrated_items, get_chosen_items
 import pandas as pd
 from orange_cb_recsys.utils.const import root_path
 
@@ -20,3 +25,36 @@ class Test(TestCase):
     def test_get_rated_items(self):
         ratings = pd.DataFrame({'to_id': ['tt0112281', 'tt0113497']})
         get_rated_items(os.path.join(contents_path, 'movies_codified'), ratings)
+
+    def test_columnar_store(self):
+        directory = 'load_content_columnar_test'
+        os.makedirs(directory, exist_ok=True)
+
+        writer = ColumnarStoreWriter(directory)
+        for item_id in ['tt0112281', 'tt0113497', 'tt0114709']:
+            content = Content(item_id)
+            content.append_field_representation('Title', SimpleField(item_id), 'original')
+            writer.add_content(content)
+        writer.close()
+
+        ratings = pd.DataFrame({'to_id': ['tt0113497', 'tt0112281', 'aaaa']})
+
+        self.assertEqual(load_content_instance(directory, 'tt0114709').content_id, 'tt0114709')
+        self.assertIsNone(load_content_instance(directory, 'aaaa'))
+
+        rated_items = get_rated_items(directory, ratings)
+        self.assertEqual([item.content_id for item in rated_items], ['tt0112281', 'tt0113497'])
+
+        unrated_items = get_unrated_items(directory, ratings)
+        self.assertEqual([item.content_id for item in unrated_items], ['tt0114709'])
+        self.assertEqual(unrated_items[0].get_field_representation('Title', 'original').value, 'tt0114709')
+
+        chosen_items = get_chosen_items(directory, ['tt0114709', 'aaaa'], {'Title': 'original'})
+        self.assertEqual(chosen_items[0].content_id, 'tt0114709')
+        self.assertEqual(chosen_items[0].get_field_representation('Title', 'original').value, 'tt0114709')
+        self.assertIsNone(chosen_items[1])
+
+        valid_ratings = remove_not_existent_items(ratings, directory)
+        self.assertEqual(list(valid_ratings['to_id']), ['tt0113497', 'tt0112281'])
+
+        shutil.rmtree(directory)
@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+from unittest import TestCase
+
+import pandas as pd
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, SimpleField
+from orange_cb_recsys.utils.load_content import load_content_instance, get_rated_items, get_unrated_items, \
+    remove_not_existent_items
+from orange_cb_recsys.utils.manifest import CatalogManifest, load_manifest
+from orange_cb_recsys.utils.serialization import serialize, content_file_path
+
+
+class TestCatalogManifest(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = 'manifest_test'
+        os.makedirs(self.directory, exist_ok=True)
+
+        manifest = CatalogManifest()
+        for content_id, file_name in [('tt0112281', 'tt0112281'), ('tt0113497', 'tt0113497'), ('tt:01', 'tt01')]:
+            content = Content(content_id)
+            content.append_field_representation('Title', SimpleField(content_id), 'original')
+            path = content_file_path(self.directory, file_name, 'gzip')
+            serialize(content, path, 'gzip')
+            manifest.add(content_id, os.path.basename(path), os.path.getsize(path), ['Title'])
+        manifest.save(self.directory)
+
+    def test_load_manifest(self):
+        self.assertIsNone(load_manifest('not_existent'))
+
+        manifest = load_manifest(self.directory)
+        self.assertIs(load_manifest(self.directory), manifest)
+
+        self.assertEqual(manifest.content_ids, ['tt0112281', 'tt0113497', 'tt:01'])
+        self.assertEqual(len(manifest), 3)
+        self.assertIn('tt:01', manifest)
+        # contents can also be referred to with the name of their file
+        self.assertIn('tt01', manifest)
+        self.assertNotIn('aaaa', manifest)
+
+        self.assertEqual(manifest.get_file_name('tt:01'), 'tt01.gz')
+        self.assertEqual(manifest.get_file_name('tt01'), 'tt01.gz')
+        self.assertIsNone(manifest.get_file_name('aaaa'))
+        self.assertEqual(manifest.get_fields('tt0112281'), ['Title'])
+        self.assertEqual(manifest.get_size('tt0112281'),
+                         os.path.getsize(os.path.join(self.directory, 'tt0112281.gz')))
+        self.assertIsNone(manifest.get_fingerprint('tt0112281'))
+        self.assertEqual(manifest.drift, 0)
+
+    def test_fingerprint(self):
+        manifest = CatalogManifest(drift=0.25)
+        manifest.add('tt0112281', 'tt0112281.gz', 10, ['Title'], 'abcdef')
+        manifest.save(self.directory)
+
+        manifest = load_manifest(self.directory)
+        self.assertEqual(manifest.get_fingerprint('tt0112281'), 'abcdef')
+        self.assertEqual(manifest.drift, 0.25)
+
+    def test_legacy_manifest(self):
+        with open(os.path.join(self.directory, 'manifest.json'), 'w') as f:
+            json.dump([{'content_id': 'tt0112281', 'file_name': 'tt0112281.gz', 'size': 10, 'fields': ['Title']}], f)
+
+        manifest = load_manifest(self.directory)
+        self.assertEqual(manifest.content_ids, ['tt0112281'])
+        self.assertEqual(manifest.drift, 0)
+
+    def test_load_content(self):
+        self.assertEqual(load_content_instance(self.directory, 'tt:01').content_id, 'tt:01')
+        self.assertIsNone(load_content_instance(self.directory, 'aaaa'))
+
+        ratings = pd.DataFrame({'to_id': ['tt0113497', 'tt0112281', 'aaaa']})
+
+        rated_items = get_rated_items(self.directory, ratings)
+        self.assertEqual([item.content_id for item in rated_items], ['tt0112281', 'tt0113497'])
+
+        unrated_items = get_unrated_items(self.directory, ratings)
+        self.assertEqual([item.content_id for item in unrated_items], ['tt:01'])
+
+        self.assertEqual(list(remove_not_existent_items(ratings, self.directory).to_id), ['tt0113497', 'tt0112281'])
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
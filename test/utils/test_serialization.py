@@ -0,0 +1,123 @@
+import lzma
+import os
+import pickle
+import shutil
+from unittest import TestCase
+
+import numpy as np
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, EmbeddingField, \
+    SimpleField, SparseFeaturesBagField, Vocabulary
+from orange_cb_recsys.utils.serialization import serialize, deserialize, available_codecs, detect_codec, \
+    content_file_path, find_content_file, check_codec, FRAME_MAGIC, SHARED_DIRECTORY, SharedObject
+
+
+class TestSerialization(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = 'serialization_test'
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.content = Content('tt0113497')
+        self.content.append_field_representation('Title', SimpleField('Jumanji'), 'original')
+        self.content.append_field_representation('Plot', EmbeddingField(np.random.rand(20, 50)), 'embedding')
+
+    def test_codecs(self):
+        self.assertEqual(available_codecs()[:4], ['none', 'gzip', 'bz2', 'lzma'])
+
+        for codec in available_codecs():
+            path = content_file_path(self.directory, 'tt0113497', codec)
+            serialize(self.content, path, codec)
+
+            self.assertEqual(detect_codec(path), codec)
+
+            loaded = deserialize(path)
+            self.assertEqual(loaded.content_id, 'tt0113497')
+            self.assertEqual(loaded.get_field_representation('Title', 'original').value, 'Jumanji')
+
+            array = loaded.get_field_representation('Plot', 'embedding').value
+            np.testing.assert_array_equal(array, self.content.get_field_representation('Plot', 'embedding').value)
+            self.assertTrue(array.flags.writeable)
+
+            os.remove(path)
+
+        with self.assertRaises(ValueError):
+            check_codec('not_existent')
+
+    def test_out_of_band(self):
+        path = content_file_path(self.directory, 'tt0113497', 'none')
+        serialize(self.content, path, 'none')
+
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(len(FRAME_MAGIC)), FRAME_MAGIC)
+
+        # the array is a view of the buffer where the file was read
+        array = deserialize(path).get_field_representation('Plot', 'embedding').value
+        self.assertFalse(array.flags.owndata)
+
+    def test_legacy(self):
+        # files written with lzma.open and pickle.dump by previous versions
+        path = os.path.join(self.directory, 'tt0113497.xz')
+        with lzma.open(path, 'wb') as f:
+            pickle.dump(self.content, f)
+
+        self.assertEqual(detect_codec(path), 'lzma')
+        self.assertEqual(deserialize(path).get_field_representation('Title', 0).value, 'Jumanji')
+
+        # the lzma codec keeps writing files that can be read with pickle.load
+        serialize(self.content, path, 'lzma')
+        with lzma.open(path, 'rb') as f:
+            self.assertEqual(pickle.load(f).content_id, 'tt0113497')
+
+    def test_find_content_file(self):
+        self.assertIsNone(find_content_file(self.directory, 'tt0113497'))
+
+        path = content_file_path(self.directory, 'tt0113497', 'gzip')
+        serialize(self.content, path, 'gzip')
+        self.assertEqual(find_content_file(self.directory, 'tt0113497'), path)
+
+    def test_shared_objects(self):
+        vocabulary = Vocabulary(['apple', 'banana', 'cherry'])
+        self.assertIsInstance(vocabulary, SharedObject)
+
+        for codec in ['gzip', 'none']:
+            paths = []
+            for i, content_id in enumerate(['tt0113497', 'tt0112281']):
+                content = Content(content_id)
+                content.append_field_representation('Plot', SparseFeaturesBagField([i], [0.5], vocabulary), 'tfidf')
+                paths.append(content_file_path(self.directory, content_id + codec, codec))
+                serialize(content, paths[-1], codec)
+
+            # the vocabulary is stored only once for every content referring to it
+            self.assertEqual([vocabulary.shared_id + '.pkl'],
+                             os.listdir(os.path.join(self.directory, SHARED_DIRECTORY)))
+
+            first, second = [deserialize(path).get_field_representation('Plot', 'tfidf') for path in paths]
+            self.assertEqual({'apple': 0.5}, first.value)
+            self.assertEqual({'banana': 0.5}, second.value)
+            self.assertIs(first.vocabulary, second.vocabulary)
+
+        # a content copied in another directory without its shared directory can't be loaded
+        copy_directory = os.path.join(self.directory, 'copy')
+        os.makedirs(copy_directory)
+        shutil.copy(paths[0], copy_directory)
+        with self.assertRaises(FileNotFoundError):
+            deserialize(os.path.join(copy_directory, os.path.basename(paths[0])))
+
+    def test_legacy_shared_objects(self):
+        vocabulary = Vocabulary(['apple', 'banana', 'cherry'])
+        content = Content('tt0113497')
+        content.append_field_representation('Plot', SparseFeaturesBagField([1], [0.5], vocabulary), 'tfidf')
+        path = content_file_path(self.directory, 'tt0113497', 'lzma')
+        serialize(content, path, 'lzma')
+
+        # the vocabulary is pickled with the content, so the file can be read with pickle.load
+        self.assertFalse(os.path.exists(os.path.join(self.directory, SHARED_DIRECTORY)))
+        with lzma.open(path, 'rb') as f:
+            bag = pickle.load(f).get_field_representation('Plot', 'tfidf')
+        self.assertEqual({'banana': 0.5}, bag.value)
+        self.assertEqual(vocabulary, bag.vocabulary)
+        self.assertEqual({'banana': 0.5}, deserialize(path).get_field_representation('Plot', 'tfidf').value)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)